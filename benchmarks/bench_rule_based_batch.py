@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+ルールベース一括採点のベンチマーク
+同一問題の解答全件を1件ずつ採点した場合と、score_batchで一括採点した場合の処理時間を比較する
+
+実行方法（リポジトリルートで）:
+    python benchmarks/bench_rule_based_batch.py [解答件数]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ai_engine.scoring.rule_based import RuleBasedScoring  # noqa: E402
+
+QUESTION_DATA = {
+    "keywords": ["スキル不足", "品質問題", "手戻り", "要員計画", "教育"],
+    "max_chars": 40,
+    "points": 25
+}
+
+FRAGMENTS = [
+    "プロジェクトメンバーの", "スキル不足により", "設計品質が低下し", "テスト工程で", "多数の不具合が発見された",
+    "ため。", "要員計画の見直しが遅れ", "手戻りが発生した", "教育を実施せず", "品質問題が顕在化した", "、"
+]
+
+
+def _make_answers(count: int):
+    rng = random.Random(0)
+    return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+
+
+def main(count: int):
+    scorer = RuleBasedScoring()
+    answers = _make_answers(count)
+    print(f"🚀 ルールベース一括採点ベンチマーク ({count:,}件)\n")
+
+    start = time.perf_counter()
+    per_answer = [scorer.score(answer, QUESTION_DATA)["score"] for answer in answers]
+    per_answer_time = time.perf_counter() - start
+    print(f"  1件ずつ (score)        {per_answer_time:>8.3f} 秒")
+
+    start = time.perf_counter()
+    batch = scorer.score_batch(answers, QUESTION_DATA)
+    batch_time = time.perf_counter() - start
+    print(f"  一括 (score_batch)     {batch_time:>8.3f} 秒 ({per_answer_time / batch_time:.1f}倍)")
+
+    assert batch.scores.tolist() == per_answer, "一括採点の結果が一致しません"
+    print("\n  ✅ 全件のスコアが一致")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+API ↔ AI Engine間のシリアライズ性能ベンチマーク
+採点レスポンス（長い日本語の採点理由を含む）1件あたりのエンコード・デコード時間と、
+一括採点ペイロードの圧縮率・圧縮時間を計測する
+
+実行方法（リポジトリルートで）:
+    python benchmarks/bench_serialization.py
+"""
+import gzip
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.utils import serialization as api_serialization  # noqa: E402
+
+REASONING = (
+    "解答は品質計画・品質保証・品質管理の三つの活動を挙げており、出題趣旨に沿っている。"
+    "特に既存の販売管理システムとの整合性確保と回帰テストに言及している点は評価できる。"
+    "一方で、品質目標値の具体的な設定方法や、不具合密度の基準値についての記述が不足している。"
+) * 4
+
+SCORING_RESPONSE = {
+    "total_score": 18.5,
+    "max_score": 25,
+    "percentage": 74.0,
+    "confidence": 0.82,
+    "rule_based_score": None,
+    "semantic_score": None,
+    "comprehensive_score": 18.5,
+    "details": {
+        "method": "llm_scoring",
+        "provider": "lmstudio",
+        "aspect_scores": {
+            "問題理解の正確性": 4.0,
+            "論理的構成": 4.0,
+            "具体性・実践性": 3.5,
+            "PM知識の活用": 4.0,
+            "文章表現力": 3.0
+        },
+        "reasoning": REASONING
+    },
+    "reasons": [REASONING],
+    "suggestions": ["品質目標値を定量的に示してください", "不具合管理の手順を具体化してください"],
+    "model_name": "local-model",
+    "temperature": 0.1,
+    "tokens_used": 0,
+    "processing_time_ms": 5230
+}
+
+BATCH_SIZE = 100
+
+
+def _bench(label: str, func, number: int = 2000):
+    """1回あたりの平均実行時間（マイクロ秒）を表示"""
+    elapsed = timeit.timeit(func, number=number)
+    print(f"  {label:<28} {elapsed / number * 1_000_000:>9.1f} µs/回")
+
+
+def bench_single_response():
+    """採点レスポンス1件のエンコード＋デコード"""
+    print(f"📦 採点レスポンス1件 (JSON {len(json.dumps(SCORING_RESPONSE, ensure_ascii=False).encode())} bytes)")
+
+    _bench("json (標準ライブラリ)", lambda: json.loads(json.dumps(SCORING_RESPONSE, ensure_ascii=False)))
+
+    if api_serialization.ORJSON_AVAILABLE:
+        import orjson
+        _bench("orjson", lambda: orjson.loads(orjson.dumps(SCORING_RESPONSE)))
+    else:
+        print("  orjson                       未インストール")
+
+    if api_serialization.MSGPACK_AVAILABLE:
+        import msgpack
+        packed = msgpack.packb(SCORING_RESPONSE, use_bin_type=True)
+        _bench(f"msgpack ({len(packed)} bytes)", lambda: msgpack.unpackb(msgpack.packb(SCORING_RESPONSE, use_bin_type=True), raw=False))
+    else:
+        print("  msgpack                      未インストール")
+
+
+def bench_batch_payload():
+    """一括採点レスポンスの圧縮"""
+    payload = {"results": [{"index": i, "result": SCORING_RESPONSE, "error": None} for i in range(BATCH_SIZE)]}
+    body = api_serialization.dumps_json(payload)
+    print(f"\n🗜  一括採点レスポンス {BATCH_SIZE}件 ({len(body):,} bytes)")
+
+    gzipped = gzip.compress(body, compresslevel=5)
+    print(f"  gzip  圧縮後 {len(gzipped):>9,} bytes ({len(gzipped) / len(body):.1%})")
+    _bench("gzip 圧縮＋展開", lambda: gzip.decompress(gzip.compress(body, compresslevel=5)), number=50)
+
+    if api_serialization.ZSTD_AVAILABLE:
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=3)
+        decompressor = zstandard.ZstdDecompressor()
+        compressed = compressor.compress(body)
+        print(f"  zstd  圧縮後 {len(compressed):>9,} bytes ({len(compressed) / len(body):.1%})")
+        _bench("zstd 圧縮＋展開", lambda: decompressor.decompress(compressor.compress(body)), number=50)
+    else:
+        print("  zstd                         未インストール")
+
+    _bench("encode_request (API側)", lambda: api_serialization.encode_request(payload, 1024), number=50)
+
+
+if __name__ == "__main__":
+    print("🚀 シリアライズ性能ベンチマーク\n")
+    bench_single_response()
+    bench_batch_payload()
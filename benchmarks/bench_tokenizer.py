@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+形態素解析（Janome）のベンチマーク
+解答1,000件あたりの解析コストを、キャッシュなし（1プロセス・プロセスプール）、
+メモリ（LRU）キャッシュ、ディスクキャッシュの各場合で比較する
+
+実行方法（リポジトリルートで）:
+    python benchmarks/bench_tokenizer.py [解答件数] [プロセス数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ai_engine.scoring.morphology import MorphologicalAnalyzer, _tokenize_texts  # noqa: E402
+
+FRAGMENTS = [
+    "プロジェクトメンバーの", "スキル不足により", "設計品質が低下し", "テスト工程で", "多数の不具合が発見された",
+    "ため。", "要員計画の見直しが遅れ", "手戻りが発生した", "教育を実施せず", "品質問題が顕在化した", "、"
+]
+
+
+def _make_answers(count: int):
+    rng = random.Random(0)
+    # 同じ解答が重複しないよう受験者ごとの番号を付ける
+    return [
+        "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(2, 6))) + f"（{i}）"
+        for i in range(count)
+    ]
+
+
+def _report(label: str, elapsed: float, count: int):
+    print(f"  {label:<28} {elapsed:>8.3f} 秒  ({elapsed / count * 1000 * 1000:>8.1f} ms / 1,000件)")
+
+
+def main(count: int, processes: int):
+    answers = _make_answers(count)
+    _tokenize_texts(["辞書の読み込み"])  # Janomeの辞書読み込みは計測から除く
+    print(f"🚀 形態素解析ベンチマーク ({count:,}件, プロセス数={processes})\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tokens.sqlite3")
+
+        analyzer = MorphologicalAnalyzer(processes=1)
+        start = time.perf_counter()
+        analyzer.tokenize_many(answers)
+        _report("キャッシュなし（1プロセス）", time.perf_counter() - start, count)
+
+        start = time.perf_counter()
+        analyzer.tokenize_many(answers)
+        _report("メモリキャッシュ", time.perf_counter() - start, count)
+
+        pooled = MorphologicalAnalyzer(cache_path=path, processes=processes, parallel_min=1)
+        start = time.perf_counter()
+        tokens = pooled.tokenize_many(answers)
+        _report("キャッシュなし（プロセスプール）", time.perf_counter() - start, count)
+        pooled.close()
+
+        reloaded = MorphologicalAnalyzer(cache_path=path)
+        start = time.perf_counter()
+        cached = reloaded.tokenize_many(answers)
+        _report("ディスクキャッシュ", time.perf_counter() - start, count)
+        reloaded.close()
+
+    assert cached == tokens == analyzer.tokenize_many(answers), "解析結果が一致しません"
+    print("\n  ✅ 全件の解析結果が一致")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    )
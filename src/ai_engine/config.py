@@ -14,6 +14,11 @@ class Settings:
     LMSTUDIO_URL: str = os.getenv("LMSTUDIO_URL", "http://localhost:1234")
     LMSTUDIO_MODEL: str = os.getenv("LMSTUDIO_MODEL", "local-model")
 
+    # LLM初期化の再試行設定（0は成功するまで再試行）
+    LLM_INIT_MAX_ATTEMPTS: int = int(os.getenv("LLM_INIT_MAX_ATTEMPTS", "0"))
+    LLM_INIT_BACKOFF_INITIAL: float = float(os.getenv("LLM_INIT_BACKOFF_INITIAL", "1.0"))
+    LLM_INIT_BACKOFF_MAX: float = float(os.getenv("LLM_INIT_BACKOFF_MAX", "60.0"))
+
     # 他のLLMプロバイダー設定
     OLLAMA_URL: str = os.getenv("OLLAMA_URL", "http://localhost:11434")
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
@@ -28,11 +33,80 @@ class Settings:
     # キャッシュ設定
     CACHE_DIR: str = os.getenv("CACHE_DIR", "/app/cache")
     MODEL_CACHE_SIZE: int = int(os.getenv("MODEL_CACHE_SIZE", "1000"))
+    # 解答の解析結果（正規化・語句照合）のキャッシュ件数
+    ANALYSIS_CACHE_SIZE: int = int(os.getenv("ANALYSIS_CACHE_SIZE", "10000"))
+    # 形態素解析（Janome）による語句照合（見出し語での一致・形態素境界での一致）
+    MORPHOLOGICAL_MATCHING: bool = os.getenv("MORPHOLOGICAL_MATCHING", "false").lower() == "true"
+    TOKENIZER_CACHE_SIZE: int = int(os.getenv("TOKENIZER_CACHE_SIZE", "10000"))
+    # 形態素解析結果のディスクキャッシュ（空文字列でディスクキャッシュなし）
+    TOKENIZER_CACHE_PATH: str = os.getenv("TOKENIZER_CACHE_PATH", os.path.join(CACHE_DIR, "tokens.sqlite3"))
+    # キャッシュにない解答がこの件数以上ならプロセスプールで解析
+    TOKENIZER_PROCESSES: int = int(os.getenv("TOKENIZER_PROCESSES", os.getenv("MAX_WORKERS", "4")))
+    TOKENIZER_PARALLEL_MIN: int = int(os.getenv("TOKENIZER_PARALLEL_MIN", "256"))
+    # 問題ごとの採点計画（キーワード照合・しきい値・重みの事前準備）のキャッシュ件数
+    SCORING_PLAN_CACHE_SIZE: int = int(os.getenv("SCORING_PLAN_CACHE_SIZE", "256"))
+    # 問題ごとのTF-IDFモデル（意味理解採点）のキャッシュ件数
+    SEMANTIC_MODEL_CACHE_SIZE: int = int(os.getenv("SEMANTIC_MODEL_CACHE_SIZE", "256"))
+
+    # 埋め込みモデル設定（none / onnx / hashing、noneは埋め込みを使用しない）
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "none")
+    EMBEDDING_MODEL_PATH: str = os.getenv("EMBEDDING_MODEL_PATH", os.path.join(CACHE_DIR, "models", "embedding.onnx"))
+    # 未指定の場合はモデルと同じディレクトリの tokenizer.json
+    EMBEDDING_TOKENIZER_PATH: str = os.getenv("EMBEDDING_TOKENIZER_PATH", "")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_MAX_LENGTH: int = int(os.getenv("EMBEDDING_MAX_LENGTH", "256"))
+    # 埋め込みベクトルの永続キャッシュ（メモリマップ）
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(CACHE_DIR, "embeddings"))
+
+    # 起動設定（起動後に採点モジュールをバックグラウンドで事前読み込み）
+    PRELOAD_SCORING_MODULES: bool = os.getenv("PRELOAD_SCORING_MODULES", "true").lower() == "true"
+
+    # 採点パイプライン（/score で実行するステージの順序。triage, anchors, rule_based, semantic, comprehensive, llm）
+    SCORING_PIPELINE: str = os.getenv("SCORING_PIPELINE", "triage,anchors,llm")
+    # ステージごとの設定（JSON。例: {"llm": {"timeout": 60, "cost": 100, "skip_if": ["rule_based.percentage>=90"]}}）
+    SCORING_STAGE_OPTIONS: str = os.getenv("SCORING_STAGE_OPTIONS", "")
+    # 1解答あたりのコスト予算（0は無制限）
+    SCORING_BUDGET: float = float(os.getenv("SCORING_BUDGET", "0"))
 
     # パフォーマンス設定
     SCORING_TIMEOUT: int = int(os.getenv("SCORING_TIMEOUT", "30"))
     BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "10"))
 
+    # 通信設定（この値以上の本文をzstd/gzip圧縮）
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    MAX_BATCH_ITEMS: int = int(os.getenv("MAX_BATCH_ITEMS", "200"))
+
+    # 採点前トリアージ（白紙・極端に短い・字数超過・模範解答の丸写しはLLMを使わず得点を確定）
+    TRIAGE_ENABLED: bool = os.getenv("TRIAGE_ENABLED", "true").lower() == "true"
+    TRIAGE_RULES: str = os.getenv("TRIAGE_RULES", "blank,too_short,over_length,model_answer_copy")
+    # 空白・句読点を除いた文字数がこの値未満なら0点
+    TRIAGE_MIN_CHARS: int = int(os.getenv("TRIAGE_MIN_CHARS", "2"))
+    # 字数制限のこの倍率を超える解答は0点
+    TRIAGE_OVER_LENGTH_RATIO: float = float(os.getenv("TRIAGE_OVER_LENGTH_RATIO", "1.5"))
+    # 模範解答の丸写しに与える得点（配点に対する割合）
+    TRIAGE_MODEL_ANSWER_SCORE_RATIO: float = float(os.getenv("TRIAGE_MODEL_ANSWER_SCORE_RATIO", "1.0"))
+
+    # 人間レビュー済み解答（アンカー）からの得点伝播
+    ANCHOR_ENABLED: bool = os.getenv("ANCHOR_ENABLED", "true").lower() == "true"
+    ANCHOR_DIR: str = os.getenv("ANCHOR_DIR", os.path.join(CACHE_DIR, "anchors"))
+    # 上位K件のアンカーがすべて類似度しきい値以上で、得点の幅が配点のこの割合以下なら得点を伝播
+    ANCHOR_K: int = int(os.getenv("ANCHOR_K", "3"))
+    ANCHOR_MIN_SIMILARITY: float = float(os.getenv("ANCHOR_MIN_SIMILARITY", "0.9"))
+    ANCHOR_MAX_SCORE_SPREAD: float = float(os.getenv("ANCHOR_MAX_SCORE_SPREAD", "0.1"))
+
+    # 一括採点の重複・類似解答検出（クラスタごとに代表解答のみLLMで採点）
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    # 代表解答との推定Jaccard類似度（文字n-gram）がこの値以上なら同じクラスタとする
+    DEDUP_SIMILARITY_THRESHOLD: float = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.85"))
+    DEDUP_NUM_PERM: int = int(os.getenv("DEDUP_NUM_PERM", "64"))
+    DEDUP_SHINGLE_SIZE: int = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+
+    # アドミッション制御設定（同時採点数・待ち行列長・最大待機秒数）
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", os.getenv("MAX_WORKERS", "4")))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+    ADMISSION_MAX_QUEUE_WAIT: float = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", "20"))
+    ADMISSION_MAX_RETRY_AFTER: int = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "60"))
+
 
 # グローバル設定インスタンス
 settings = Settings()
\ No newline at end of file
@@ -2,10 +2,12 @@
 LLM統合の抽象化レイヤー
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from pydantic import BaseModel
 from enum import Enum
 
+from ..utils.startup import import_attribute
+
 
 class LLMProvider(str, Enum):
     """サポートするLLMプロバイダー"""
@@ -225,11 +227,15 @@ JSON形式で以下を出力してください：
 class LLMFactory:
     """LLMプロバイダーファクトリー"""
 
-    _providers: Dict[LLMProvider, type] = {}
+    _providers: Dict[LLMProvider, Union[type, str]] = {}
 
     @classmethod
-    def register(cls, provider_type: LLMProvider, provider_class: type):
-        """プロバイダーを登録"""
+    def register(cls, provider_type: LLMProvider, provider_class: Union[type, str]):
+        """プロバイダーを登録
+
+        provider_classには "module:Class" 形式のパスも指定でき、
+        その場合は初回生成時にインポートする（aiohttp等の重い依存を遅延読み込み）
+        """
         cls._providers[provider_type] = provider_class
 
     @classmethod
@@ -239,6 +245,10 @@ class LLMFactory:
             raise ValueError(f"未サポートのプロバイダー: {provider_type}")
 
         provider_class = cls._providers[provider_type]
+        if isinstance(provider_class, str):
+            provider_class = import_attribute(provider_class, __package__)
+            cls._providers[provider_type] = provider_class
+
         return provider_class(config)
 
     @classmethod
@@ -2,10 +2,13 @@
 LMStudio ローカルLLM統合
 """
 import json
+import re
+import time
 import aiohttp
 import asyncio
 from typing import Dict, Any, Optional
 from .base import BaseLLMProvider, LLMProvider, LLMResponse, ScoringCriteria, LLMScoring, DetailedAnalysis, AspectDetail
+from ..utils.metrics import ERRORS, LLM_SECONDS, PARSE_FALLBACKS, PARSE_SECONDS, PROMPT_BUILD_SECONDS
 
 
 class LMStudioProvider(BaseLLMProvider):
@@ -45,11 +48,13 @@ class LMStudioProvider(BaseLLMProvider):
                 ) as response:
                     if response.status != 200:
                         error_text = await response.text()
+                        ERRORS.inc(type="llm_http_error")
                         raise Exception(f"LMStudio API error: {response.status} - {error_text}")
 
                     result = await response.json()
 
                     if "choices" not in result or not result["choices"]:
+                        ERRORS.inc(type="llm_invalid_response")
                         raise Exception("Invalid response from LMStudio")
 
                     content = result["choices"][0]["message"]["content"]
@@ -64,20 +69,27 @@ class LMStudioProvider(BaseLLMProvider):
                     )
 
             except aiohttp.ClientError as e:
+                ERRORS.inc(type="llm_connection_error")
                 raise Exception(f"LMStudio接続エラー: {str(e)}")
             except asyncio.TimeoutError:
+                ERRORS.inc(type="llm_timeout")
                 raise Exception(f"LMStudio応答タイムアウト ({self.timeout}秒)")
 
     async def score_answer(self, criteria: ScoringCriteria) -> LLMScoring:
         """解答採点"""
-        prompt = self._build_scoring_prompt(criteria)
+        provider = self.provider_type.value
+        with PROMPT_BUILD_SECONDS.time(provider=provider):
+            prompt = self._build_scoring_prompt(criteria)
 
         try:
-            response = await self.generate_response(
-                prompt,
-                temperature=0.1,  # 採点時は低温度で一貫性を確保
-                max_tokens=1500
-            )
+            with LLM_SECONDS.time(provider=provider):
+                response = await self.generate_response(
+                    prompt,
+                    temperature=0.1,  # 採点時は低温度で一貫性を確保
+                    max_tokens=1500
+                )
+
+            parse_start = time.perf_counter()
 
             # JSONレスポンスを解析
             content = response.content.strip()
@@ -99,7 +111,7 @@ class LMStudioProvider(BaseLLMProvider):
             except json.JSONDecodeError:
                 # JSONパースに失敗した場合のフォールバック
                 # レスポンスから数値を抽出して基本的な採点を行う
-                import re
+                PARSE_FALLBACKS.inc(provider=provider)
 
                 score_match = re.search(r'"?total_score"?\s*:\s*(\d+(?:\.\d+)?)', content)
                 total_score = float(score_match.group(1)) if score_match else 15.0
@@ -138,7 +150,7 @@ class LMStudioProvider(BaseLLMProvider):
                         deduction_points=details.get("deduction_points")
                     )
 
-            return LLMScoring(
+            scoring = LLMScoring(
                 total_score=min(float(result.get("total_score", 0)), criteria.max_score),
                 aspect_scores=result.get("aspect_scores", {}),
                 detailed_feedback=result.get("detailed_feedback", ""),
@@ -153,6 +165,8 @@ class LMStudioProvider(BaseLLMProvider):
                 overall_reasoning=result.get("overall_reasoning"),
                 attention_points=result.get("attention_points", [])
             )
+            PARSE_SECONDS.observe(time.perf_counter() - parse_start, provider=provider)
+            return scoring
 
         except Exception as e:
             raise Exception(f"採点処理エラー: {str(e)}")
@@ -2,9 +2,13 @@
 LLMプロバイダーマネージャー
 """
 import asyncio
+import logging
+import random
+import time
 from typing import Dict, Any, Optional, List
 from .base import LLMProvider, BaseLLMProvider, LLMFactory, ScoringCriteria, LLMScoring
-from .lmstudio import LMStudioProvider
+
+logger = logging.getLogger(__name__)
 
 
 class LLMManager:
@@ -13,12 +17,14 @@ class LLMManager:
     def __init__(self):
         self._providers: Dict[LLMProvider, BaseLLMProvider] = {}
         self._default_provider: Optional[LLMProvider] = None
+        self._init_tasks: Dict[LLMProvider, asyncio.Task] = {}
+        self._init_status: Dict[LLMProvider, Dict[str, Any]] = {}
         self._register_providers()
 
     def _register_providers(self):
         """プロバイダーをファクトリーに登録"""
-        # LMStudioプロバイダーを登録
-        LLMFactory.register(LLMProvider.LMSTUDIO, LMStudioProvider)
+        # LMStudioプロバイダーを登録（初回生成時にインポート）
+        LLMFactory.register(LLMProvider.LMSTUDIO, ".lmstudio:LMStudioProvider")
 
         # 他のプロバイダーも事前に登録（実装時に追加）
         # LLMFactory.register(LLMProvider.OLLAMA, OllamaProvider)
@@ -43,9 +49,95 @@ class LLMManager:
             return True
 
         except Exception as e:
-            print(f"プロバイダー初期化エラー ({provider_type}): {str(e)}")
+            logger.warning(f"プロバイダー初期化エラー ({provider_type}): {str(e)}")
             return False
 
+    def start_initialization(
+        self,
+        provider_type: LLMProvider,
+        config: Dict[str, Any],
+        max_attempts: int = 0,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0
+    ) -> asyncio.Task:
+        """プロバイダーをバックグラウンドで初期化（失敗時は指数バックオフで再試行）
+
+        max_attemptsが0の場合は成功するまで再試行を続ける。
+        起動処理をLLMの起動待ちでブロックしないために使用する。
+        """
+        existing = self._init_tasks.get(provider_type)
+        if existing and not existing.done():
+            return existing
+
+        self._init_status[provider_type] = {
+            "state": "initializing",
+            "attempts": 0,
+            "last_error": None,
+            "next_retry_in": None
+        }
+        task = asyncio.create_task(
+            self._initialize_with_retry(provider_type, config, max_attempts, initial_backoff, max_backoff)
+        )
+        self._init_tasks[provider_type] = task
+        return task
+
+    async def _initialize_with_retry(
+        self,
+        provider_type: LLMProvider,
+        config: Dict[str, Any],
+        max_attempts: int,
+        initial_backoff: float,
+        max_backoff: float
+    ) -> bool:
+        """初期化を再試行するループ"""
+        status = self._init_status[provider_type]
+        backoff = initial_backoff
+
+        while True:
+            status["attempts"] += 1
+            start = time.perf_counter()
+
+            if await self.initialize_provider(provider_type, config):
+                status.update({
+                    "state": "ready",
+                    "last_error": None,
+                    "next_retry_in": None,
+                    "init_ms": round((time.perf_counter() - start) * 1000, 2)
+                })
+                logger.info(f"プロバイダーを初期化しました: {provider_type.value} (試行{status['attempts']}回目)")
+                return True
+
+            status["last_error"] = "health_check_failed"
+            if max_attempts and status["attempts"] >= max_attempts:
+                status.update({"state": "failed", "next_retry_in": None})
+                logger.error(f"プロバイダー初期化を断念しました: {provider_type.value} ({status['attempts']}回試行)")
+                return False
+
+            # ジッター付き指数バックオフ（複数レプリカの同時再接続を避ける）
+            delay = backoff * random.uniform(0.5, 1.0)
+            status.update({"state": "retrying", "next_retry_in": round(delay, 2)})
+            logger.warning(f"プロバイダー初期化に失敗、{delay:.1f}秒後に再試行します: {provider_type.value}")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, max_backoff)
+
+    async def shutdown(self):
+        """バックグラウンド初期化タスクを停止"""
+        for task in self._init_tasks.values():
+            if not task.done():
+                task.cancel()
+
+        await asyncio.gather(*self._init_tasks.values(), return_exceptions=True)
+        self._init_tasks.clear()
+
+    def is_available(self, provider_type: Optional[LLMProvider] = None) -> bool:
+        """プロバイダーが利用可能か（初期化済みか）"""
+        target_provider = provider_type or self._default_provider
+        return target_provider is not None and target_provider in self._providers
+
+    def get_initialization_status(self) -> Dict[str, Dict[str, Any]]:
+        """プロバイダー別の初期化状況を取得"""
+        return {provider_type.value: dict(status) for provider_type, status in self._init_status.items()}
+
     def set_default_provider(self, provider_type: LLMProvider):
         """デフォルトプロバイダーを設定"""
         if provider_type in self._providers:
@@ -1,15 +1,20 @@
 """
 AI採点エンジン - メインアプリケーション
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from .config import settings
 from .llm.manager import llm_manager
 from .llm import LLMProvider, ScoringCriteria
+from .utils.startup import startup_report, timed_import
+from .utils.admission import AdmissionController, AdmissionRejected
+from .utils.serialization import NegotiatedResponse, NegotiatedRoute
+from .utils import metrics
 
 # ロギング設定
 logging.basicConfig(
@@ -18,37 +23,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# アドミッション制御（過負荷時は429で早期に拒否する）
+admission_controller = AdmissionController(
+    max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    default_max_wait=settings.ADMISSION_MAX_QUEUE_WAIT,
+    max_retry_after=settings.ADMISSION_MAX_RETRY_AFTER
+)
+
+
+def _collect_provider_up():
+    """プロバイダー別の利用可否（初期化状況から算出）"""
+    return {
+        (provider,): 1.0 if status.get("state") == "ready" else 0.0
+        for provider, status in llm_manager.get_initialization_status().items()
+    }
+
+
+metrics.registry.gauge(
+    "ai_engine_provider_up",
+    "LLMプロバイダーが利用可能か（1: 利用可能, 0: 初期化中・失敗）",
+    ("provider",),
+    collect=_collect_provider_up
+)
+
+# 起動後にバックグラウンドで読み込む採点モジュール
+PRELOAD_MODULES = [
+    ".scoring.rule_based",
+    ".scoring.semantic",
+    ".scoring.comprehensive",
+    ".scoring.integrator",
+    ".scoring.dedup",
+    ".scoring.triage",
+    ".scoring.anchors",
+    ".scoring.pipeline",
+]
+
+
+def _preload_scoring_modules():
+    """採点モジュールを事前に読み込み、インポートコストを起動レポートに記録"""
+    for module_name in PRELOAD_MODULES:
+        try:
+            timed_import(module_name, __package__)
+        except Exception as e:
+            logger.warning(f"採点モジュールの事前読み込みに失敗: {module_name}: {e}")
+    startup_report.mark("scoring_modules_loaded")
+    startup_report.log_summary()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """アプリケーションのライフサイクル管理"""
     logger.info("AI採点エンジンを起動中...")
 
-    # LLMプロバイダー初期化
-    try:
-        # LMStudioプロバイダーの初期化
-        lmstudio_config = {
-            "base_url": settings.LMSTUDIO_URL,
-            "model": settings.LMSTUDIO_MODEL,
-            "timeout": 120,
-            "max_tokens": 2000,
-            "temperature": 0.1
-        }
+    # LLMプロバイダー初期化（起動をブロックせず、バックグラウンドで再試行）
+    lmstudio_config = {
+        "base_url": settings.LMSTUDIO_URL,
+        "model": settings.LMSTUDIO_MODEL,
+        "timeout": 120,
+        "max_tokens": 2000,
+        "temperature": 0.1
+    }
+    llm_manager.start_initialization(
+        LLMProvider.LMSTUDIO,
+        lmstudio_config,
+        max_attempts=settings.LLM_INIT_MAX_ATTEMPTS,
+        initial_backoff=settings.LLM_INIT_BACKOFF_INITIAL,
+        max_backoff=settings.LLM_INIT_BACKOFF_MAX
+    )
 
-        if await llm_manager.initialize_provider(LLMProvider.LMSTUDIO, lmstudio_config):
-            logger.info("LMStudio プロバイダーを初期化しました")
-            app.state.llm_available = True
-        else:
-            logger.warning("LMStudio プロバイダーの初期化に失敗しました")
-            app.state.llm_available = False
+    preload_task = None
+    if settings.PRELOAD_SCORING_MODULES:
+        preload_task = asyncio.create_task(asyncio.to_thread(_preload_scoring_modules))
 
-    except Exception as e:
-        logger.error(f"LLM初期化エラー: {e}")
-        app.state.llm_available = False
+    startup_report.mark("app_ready")
+    logger.info("AI採点エンジンを起動しました（LLMプロバイダーはバックグラウンドで初期化中）")
 
     yield
 
     logger.info("AI採点エンジンを停止中...")
+    if preload_task and not preload_task.done():
+        preload_task.cancel()
+    await llm_manager.shutdown()
 
 
 # FastAPIアプリケーション初期化
@@ -58,9 +114,13 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.ENVIRONMENT == "development" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT == "development" else None,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=NegotiatedResponse
 )
 
+# orjson / msgpack / zstd・gzip圧縮のネゴシエーションを全ルートに適用
+app.router.route_class = NegotiatedRoute
+
 # CORS設定
 app.add_middleware(
     CORSMiddleware,
@@ -81,8 +141,8 @@ class ScoringRequest(BaseModel):
     answer_text: str = Field(..., description="解答文")
     question_data: Dict[str, Any] = Field(..., description="問題データ")
 
-    class Config:
-        schema_extra = {
+    model_config = {
+        "json_schema_extra": {
             "example": {
                 "answer_text": "プロジェクトメンバーのスキル不足により、設計品質が低下し、テスト工程で多数の不具合が発見されたため。",
                 "question_data": {
@@ -95,6 +155,7 @@ class ScoringRequest(BaseModel):
                 }
             }
         }
+    }
 
 
 class ScoringResponse(BaseModel):
@@ -114,6 +175,41 @@ class ScoringResponse(BaseModel):
     tokens_used: int
     processing_time_ms: int
 
+    model_config = {"protected_namespaces": ()}
+
+
+class ScoringBatchRequest(BaseModel):
+    """一括採点リクエスト"""
+    items: List[ScoringRequest] = Field(..., description="採点対象（解答文と問題データ）のリスト")
+
+
+class ScoringBatchItem(BaseModel):
+    """一括採点の個別結果（失敗時はresultがNoneでerrorに理由）"""
+    index: int
+    result: Optional[ScoringResponse] = None
+    error: Optional[str] = None
+
+
+class ScoringBatchResponse(BaseModel):
+    """一括採点レスポンス"""
+    results: List[ScoringBatchItem]
+    processing_time_ms: int
+
+
+class AnchorItem(BaseModel):
+    """人間レビュー済みの解答"""
+    answer_id: Any = Field(..., description="解答ID（再レビュー時は同じIDで上書き）")
+    answer_text: str = Field(..., description="解答文")
+    score: float = Field(..., description="人間による最終スコア")
+    max_score: float = Field(..., description="配点")
+
+
+class AnchorRequest(BaseModel):
+    """アンカー登録リクエスト"""
+    question_id: Any = Field(..., description="問題ID")
+    question_data: Optional[Dict[str, Any]] = Field(None, description="レビュー時の問題データ（採点に使う内容の版ごとに索引を分ける）")
+    anchors: List[AnchorItem]
+
 
 @app.get("/")
 async def root():
@@ -122,14 +218,14 @@ async def root():
         "message": "PM試験AI採点エンジン",
         "version": "1.0.0",
         "environment": settings.ENVIRONMENT,
-        "llm_available": getattr(app.state, 'llm_available', False)
+        "llm_available": llm_manager.is_available()
     }
 
 
 @app.get("/health")
 async def health_check():
     """ヘルスチェック"""
-    llm_available = getattr(app.state, 'llm_available', False)
+    llm_available = llm_manager.is_available()
 
     # LLMプロバイダーの状態をチェック
     provider_status = {}
@@ -143,66 +239,408 @@ async def health_check():
         "status": "healthy",
         "llm_available": llm_available,
         "providers": provider_status,
+        "provider_initialization": llm_manager.get_initialization_status(),
+        "admission": admission_controller.get_status(),
         "environment": settings.ENVIRONMENT,
         "timestamp": time.time()
     }
 
 
-@app.post("/score", response_model=ScoringResponse)
-async def score_answer(request: ScoringRequest):
-    """解答採点"""
+@app.get("/startup")
+async def startup_info():
+    """起動レポート（フェーズ時間・モジュール別インポートコスト）"""
+    return startup_report.as_dict()
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus形式のメトリクス"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+async def _score_with_llm(answer_text: str, question_data: Dict[str, Any]) -> ScoringResponse:
+    """LLMによる採点（アドミッション制御の実行枠内で呼び出す）"""
     start_time = time.time()
 
-    try:
-        if not getattr(app.state, 'llm_available', False):
-            raise HTTPException(
-                status_code=503,
-                detail="LLMサービスが利用できません。LMStudioが起動していることを確認してください。"
+    criteria = ScoringCriteria(
+        question_text=question_data.get("question_text", ""),
+        answer_text=answer_text,
+        max_score=question_data.get("points", 25)
+    )
+
+    llm_result = await llm_manager.score_answer(criteria)
+
+    # レスポンス形式に変換
+    processing_time = int((time.time() - start_time) * 1000)
+
+    result = {
+        "total_score": llm_result.total_score,
+        "max_score": criteria.max_score,
+        "percentage": (llm_result.total_score / criteria.max_score) * 100,
+        "confidence": llm_result.confidence,
+        "rule_based_score": None,  # LLMでは使用しない
+        "semantic_score": None,    # LLMでは使用しない
+        "comprehensive_score": llm_result.total_score,  # LLMスコアを総合スコアとする
+        "details": {
+            "method": "llm_scoring",
+            "provider": llm_manager.get_provider().provider_type.value,
+            "aspect_scores": llm_result.aspect_scores,
+            "reasoning": llm_result.reasoning
+        },
+        "reasons": [llm_result.detailed_feedback],
+        "suggestions": [],  # LLMからの提案があれば追加
+        "model_name": llm_manager.get_provider().config.get("model", "unknown"),
+        "temperature": llm_manager.get_provider().config.get("temperature"),
+        "tokens_used": 0,  # 実装時に追加
+        "processing_time_ms": processing_time
+    }
+
+    return ScoringResponse(**result)
+
+
+def _ensure_llm_available():
+    """LLMが利用できない場合は503を返す"""
+    if not llm_manager.is_available():
+        metrics.ERRORS.inc(type="llm_unavailable")
+        raise HTTPException(
+            status_code=503,
+            detail="LLMサービスが利用できません。LMStudioが起動していることを確認してください。"
+        )
+
+
+def _admission_rejected(e: AdmissionRejected) -> HTTPException:
+    """アドミッション拒否を429レスポンスに変換"""
+    metrics.ERRORS.inc(type=f"admission_{e.reason}")
+    logger.warning(f"採点リクエストを拒否しました: {e}")
+    return HTTPException(
+        status_code=429,
+        detail=f"採点リクエストが混雑しています。{e.retry_after}秒後に再試行してください。",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def _triage(item: ScoringRequest) -> Optional[ScoringResponse]:
+    """採点前トリアージ（ルールに該当すればLLMを使わずに確定した採点結果を返す）"""
+    # トリアージモジュールは初回の採点時に読み込む
+    from .scoring.triage import triage_answer
+
+    start_time = time.perf_counter()
+    decision = triage_answer(item.answer_text, item.question_data)
+    question_id = str(item.question_data.get("question_id", "unknown"))
+    metrics.TRIAGE_DECISIONS.inc(question_id=question_id, rule=decision.rule if decision else "passed")
+    if decision is None:
+        return None
+
+    return ScoringResponse(
+        total_score=decision.score,
+        max_score=decision.max_score,
+        percentage=(decision.score / decision.max_score) * 100 if decision.max_score else 0,
+        confidence=decision.confidence,
+        rule_based_score=decision.score,
+        semantic_score=None,
+        comprehensive_score=None,
+        details={"method": "triage", "triage_rule": decision.rule},
+        reasons=[decision.reason],
+        suggestions=[],
+        model_name="triage",
+        temperature=None,
+        tokens_used=0,
+        processing_time_ms=int((time.perf_counter() - start_time) * 1000)
+    )
+
+
+def _propagate_from_anchors(items: List[ScoringRequest], indices: List[int]) -> Dict[int, ScoringResponse]:
+    """レビュー済み解答（アンカー）から得点を伝播できる解答の採点結果（インデックス → 結果）"""
+    if not settings.ANCHOR_ENABLED:
+        return {}
+
+    # アンカー索引モジュール（numpy）は初回の採点時に読み込む
+    from .scoring.anchors import anchor_registry, question_version
+
+    # 問題の版ごとに検索する（問題の編集前のアンカーは使わない）
+    groups: Dict[Any, List[int]] = {}
+    for index in indices:
+        question_data = items[index].question_data
+        question_id = question_data.get("question_id")
+        if question_id is not None:
+            groups.setdefault((question_id, question_version(question_data)), []).append(index)
+
+    results = {}
+    for (question_id, version), group in groups.items():
+        start_time = time.perf_counter()
+        points = items[group[0]].question_data.get("points", 25)
+        try:
+            propagations = anchor_registry.propagate(
+                question_id,
+                [items[index].answer_text for index in group],
+                points,
+                k=settings.ANCHOR_K,
+                min_similarity=settings.ANCHOR_MIN_SIMILARITY,
+                max_score_spread=settings.ANCHOR_MAX_SCORE_SPREAD,
+                version=version
             )
+        except Exception as e:
+            logger.error(f"アンカー検索エラー: question_id={question_id}, error={e}")
+            continue
+
+        processing_time = int((time.perf_counter() - start_time) * 1000)
+        for index, propagation in zip(group, propagations):
+            metrics.ANCHOR_DECISIONS.inc(
+                question_id=str(question_id),
+                outcome="passed" if propagation is None else "propagated"
+            )
+            if propagation is None:
+                continue
+            results[index] = ScoringResponse(
+                total_score=propagation.score,
+                max_score=points,
+                percentage=(propagation.score / points) * 100 if points else 0,
+                confidence=propagation.confidence,
+                rule_based_score=None,
+                semantic_score=None,
+                comprehensive_score=propagation.score,
+                details={
+                    "method": "anchor_propagation",
+                    "anchors": [
+                        {"answer_id": n.answer_id, "similarity": round(n.similarity, 4), "score": n.score}
+                        for n in propagation.neighbours
+                    ]
+                },
+                reasons=[f"レビュー済みの類似解答{len(propagation.neighbours)}件の得点から採点"],
+                suggestions=[],
+                model_name="anchor_propagation",
+                temperature=None,
+                tokens_used=0,
+                processing_time_ms=processing_time
+            )
+    return results
+
 
-        # LLMによる採点
-        criteria = ScoringCriteria(
-            question_text=request.question_data.get("question_text", ""),
-            answer_text=request.answer_text,
-            max_score=request.question_data.get("points", 25)
+@app.post("/anchors")
+async def register_anchors(request: AnchorRequest):
+    """人間レビュー済みの解答をアンカーとして登録（問題・問題の版ごとの索引に追記）"""
+    from .scoring.anchors import anchor_registry, question_version
+
+    try:
+        count = await asyncio.to_thread(
+            anchor_registry.add,
+            request.question_id,
+            [anchor.model_dump() for anchor in request.anchors],
+            question_version(request.question_data)
         )
+        return {"question_id": request.question_id, "anchor_count": count}
+    except Exception as e:
+        metrics.ERRORS.inc(type="anchor_registration_failed")
+        logger.error(f"アンカー登録エラー: {e}")
+        raise HTTPException(status_code=500, detail=f"アンカー登録に失敗しました: {str(e)}")
+
+
+def _triage_stage(context) -> Optional[Dict[str, Any]]:
+    """パイプラインのトリアージステージ"""
+    triaged = _triage(context.options["item"])
+    return triaged.model_dump() if triaged is not None else None
+
+
+def _anchor_stage(context) -> Optional[Dict[str, Any]]:
+    """パイプラインのアンカー伝播ステージ"""
+    propagated = _propagate_from_anchors([context.options["item"]], [0])
+    return propagated[0].model_dump() if 0 in propagated else None
+
+
+async def _llm_stage(context) -> Dict[str, Any]:
+    """パイプラインのLLM採点ステージ（一括採点では実行枠を確保済み）"""
+    item = context.options["item"]
+    if context.options.get("admitted"):
+        result = await _score_with_llm(item.answer_text, item.question_data)
+    else:
+        _ensure_llm_available()
+        async with admission_controller.admit(context.options.get("max_queue_wait")) as queue_wait:
+            metrics.QUEUE_WAIT_SECONDS.observe(queue_wait, endpoint="score")
+            result = await _score_with_llm(item.answer_text, item.question_data)
+    return {**result.model_dump(), "score": result.total_score}
+
+
+_scoring_pipeline = None
 
-        llm_result = await llm_manager.score_answer(criteria)
-
-        # レスポンス形式に変換
-        processing_time = int((time.time() - start_time) * 1000)
-
-        result = {
-            "total_score": llm_result.total_score,
-            "max_score": criteria.max_score,
-            "percentage": (llm_result.total_score / criteria.max_score) * 100,
-            "confidence": llm_result.confidence,
-            "rule_based_score": None,  # LLMでは使用しない
-            "semantic_score": None,    # LLMでは使用しない
-            "comprehensive_score": llm_result.total_score,  # LLMスコアを総合スコアとする
-            "details": {
-                "method": "llm_scoring",
-                "provider": llm_manager.get_provider().provider_type.value,
-                "aspect_scores": llm_result.aspect_scores,
-                "reasoning": llm_result.reasoning
-            },
-            "reasons": [llm_result.detailed_feedback],
-            "suggestions": [],  # LLMからの提案があれば追加
-            "model_name": llm_manager.get_provider().config.get("model", "unknown"),
-            "temperature": llm_manager.get_provider().config.get("temperature"),
-            "tokens_used": 0,  # 実装時に追加
-            "processing_time_ms": processing_time
+
+def _get_scoring_pipeline():
+    """採点パイプライン（初回の採点時に設定から作成）"""
+    global _scoring_pipeline
+    if _scoring_pipeline is None:
+        from .scoring.pipeline import ScoringPipeline, Stage, default_pipeline_config, local_stages
+
+        stages = {
+            **local_stages(),
+            "triage": Stage(run=_triage_stage, final=True),
+            "anchors": Stage(run=_anchor_stage, final=True),
+            "llm": Stage(run=_llm_stage, cost=100.0, raise_errors=True),
         }
+        _scoring_pipeline = ScoringPipeline(stages, default_pipeline_config())
+    return _scoring_pipeline
+
+
+async def _score_with_pipeline(item: ScoringRequest, **options) -> ScoringResponse:
+    """採点パイプラインで採点（処理時間はパイプライン全体）"""
+    start_time = time.perf_counter()
+    exclude = options.pop("exclude", ())
+    result = await _get_scoring_pipeline().score(
+        item.answer_text, item.question_data, options={"item": item, **options}, exclude=exclude
+    )
+    result["processing_time_ms"] = int((time.perf_counter() - start_time) * 1000)
+    return ScoringResponse(**result)
+
 
-        return ScoringResponse(**result)
+@app.post("/score", response_model=ScoringResponse)
+async def score_answer(
+    request: ScoringRequest,
+    max_queue_wait: Optional[float] = Header(None, alias="X-Max-Queue-Wait", description="採点待ちの最大秒数")
+):
+    """解答採点（採点パイプライン（SCORING_PIPELINE、問題ごとの設定）の各ステージを順に実行）
+
+    既定ではトリアージ・レビュー済み解答からの伝播で得点が確定した解答はLLMを使わない。
+    """
+    try:
+        with metrics.IN_FLIGHT.track_inprogress(endpoint="score"), \
+                metrics.SCORE_REQUEST_SECONDS.time(endpoint="score"):
+            return await _score_with_pipeline(request, max_queue_wait=max_queue_wait)
 
+    except AdmissionRejected as e:
+        raise _admission_rejected(e)
     except HTTPException:
         raise
     except Exception as e:
+        metrics.ERRORS.inc(type="scoring_failed")
         logger.error(f"採点エラー: {e}")
         raise HTTPException(status_code=500, detail=f"採点処理に失敗しました: {str(e)}")
 
 
+def _cluster_batch_items(items: List[ScoringRequest]) -> list:
+    """一括採点の解答を問題ごとに重複・類似クラスタに分ける"""
+    # 重複検出モジュール（numpy）は初回の一括採点時に読み込む
+    from .scoring.dedup import ClusterAssignment, cluster_batch
+
+    if not settings.DEDUP_ENABLED:
+        return [ClusterAssignment(index, index, 1.0, True) for index in range(len(items))]
+
+    assignments = cluster_batch(
+        [(item.answer_text, item.question_data) for item in items],
+        threshold=settings.DEDUP_SIMILARITY_THRESHOLD,
+        num_perm=settings.DEDUP_NUM_PERM,
+        shingle_size=settings.DEDUP_SHINGLE_SIZE
+    )
+    for index, assignment in enumerate(assignments):
+        kind = "representative" if assignment.representative == index else ("exact" if assignment.exact else "near")
+        metrics.DEDUP_ANSWERS.inc(kind=kind)
+    return assignments
+
+
+def _fan_out_result(index: int, assignment, result: ScoringResponse, cluster_size: int) -> ScoringResponse:
+    """代表解答の採点結果をクラスタの解答に展開し、クラスタ情報を記録する
+
+    類似（完全一致でない）として採点を省略した解答は、採点者の抜き取り確認対象とする。
+    """
+    if cluster_size <= 1:
+        return result
+
+    is_representative = assignment.representative == index
+    details = dict(result.details)
+    details["cluster"] = {
+        "cluster_id": assignment.cluster_id,
+        "representative_index": assignment.representative,
+        "size": cluster_size,
+        "similarity": round(assignment.similarity, 4),
+        "exact_duplicate": assignment.exact and not is_representative,
+        "review_required": not assignment.exact
+    }
+    return result.model_copy(update={"details": details})
+
+
+@app.post("/score/batch", response_model=ScoringBatchResponse)
+async def score_answers_batch(
+    request: ScoringBatchRequest,
+    max_queue_wait: Optional[float] = Header(None, alias="X-Max-Queue-Wait", description="採点待ちの最大秒数")
+):
+    """解答一括採点
+
+    トリアージ・レビュー済み解答（アンカー）からの伝播で得点が確定した解答を除き、同じ問題の解答は正規化後の完全一致と
+    MinHash/LSHによる類似で事前にクラスタリングし、クラスタごとに代表解答のみを採点パイプラインで採点して結果を各解答に展開する。
+    バッチ全体で1つの実行枠を使用し、代表解答を順に採点する。
+    個別の採点失敗はバッチ全体を失敗させず、該当項目のerrorに記録する。
+    """
+    start_time = time.time()
+
+    if len(request.items) > settings.MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"一括採点の件数が上限を超えています: {len(request.items)}件 (上限: {settings.MAX_BATCH_ITEMS}件)"
+        )
+
+    try:
+        with metrics.IN_FLIGHT.track_inprogress(endpoint="score_batch"), \
+                metrics.SCORE_REQUEST_SECONDS.time(endpoint="score_batch"):
+            outcomes: Dict[int, ScoringBatchItem] = {}
+            pending = []
+            for index, item in enumerate(request.items):
+                triaged = _triage(item)
+                if triaged is not None:
+                    outcomes[index] = ScoringBatchItem(index=index, result=triaged)
+                else:
+                    pending.append(index)
+
+            for index, result in _propagate_from_anchors(request.items, pending).items():
+                outcomes[index] = ScoringBatchItem(index=index, result=result)
+            pending = [index for index in pending if index not in outcomes]
+
+            if pending:
+                pipeline = _get_scoring_pipeline()
+                if any(pipeline.uses("llm", request.items[index].question_data) for index in pending):
+                    _ensure_llm_available()
+
+                # クラスタリング結果のインデックスをバッチ全体の位置に変換
+                assignments = {
+                    pending[position]: assignment._replace(
+                        cluster_id=pending[assignment.cluster_id],
+                        representative=pending[assignment.representative]
+                    )
+                    for position, assignment in enumerate(_cluster_batch_items([request.items[i] for i in pending]))
+                }
+                cluster_sizes: Dict[int, int] = {}
+                for assignment in assignments.values():
+                    cluster_sizes[assignment.cluster_id] = cluster_sizes.get(assignment.cluster_id, 0) + 1
+                representatives = sorted(cluster_sizes)
+
+                scored: Dict[int, Any] = {}
+                async with admission_controller.admit(max_queue_wait, units=len(representatives)) as queue_wait:
+                    metrics.QUEUE_WAIT_SECONDS.observe(queue_wait, endpoint="score_batch")
+                    for index in representatives:
+                        item = request.items[index]
+                        try:
+                            # トリアージ・アンカー伝播は一括で適用済み
+                            scored[index] = await _score_with_pipeline(
+                                item, admitted=True, exclude=("triage", "anchors")
+                            )
+                        except Exception as e:
+                            metrics.ERRORS.inc(type="batch_item_failed")
+                            logger.error(f"一括採点エラー: index={index}, error={e}")
+                            scored[index] = e
+
+                for index, assignment in assignments.items():
+                    outcome = scored[assignment.representative]
+                    if isinstance(outcome, Exception):
+                        outcomes[index] = ScoringBatchItem(index=index, error=str(outcome))
+                    else:
+                        result = _fan_out_result(index, assignment, outcome, cluster_sizes[assignment.cluster_id])
+                        outcomes[index] = ScoringBatchItem(index=index, result=result)
+
+            results = [outcomes[index] for index in range(len(request.items))]
+
+        return ScoringBatchResponse(
+            results=results,
+            processing_time_ms=int((time.time() - start_time) * 1000)
+        )
+
+    except AdmissionRejected as e:
+        raise _admission_rejected(e)
 
 
 if __name__ == "__main__":
@@ -1 +1,23 @@
-# AI採点モジュール
\ No newline at end of file
+# AI採点モジュール
+# 採点クラスは初回アクセス時に遅延インポートする（起動時間短縮のため）
+from ..utils.startup import import_attribute
+
+_LAZY_EXPORTS = {
+    "RuleBasedScoring": ".rule_based:RuleBasedScoring",
+    "SemanticScoring": ".semantic:SemanticScoring",
+    "ComprehensiveScoring": ".comprehensive:ComprehensiveScoring",
+    "ScoringIntegrator": ".integrator:ScoringIntegrator",
+    "TermMatcher": ".matcher:TermMatcher",
+    "ScoringPlan": ".plan:ScoringPlan",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = import_attribute(_LAZY_EXPORTS[name], __name__)
+    globals()[name] = value
+    return value
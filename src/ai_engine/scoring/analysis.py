@@ -0,0 +1,219 @@
+"""
+解答の前処理（正規化・照合・文分割）
+
+各採点クラスが解答文から個別に求めていた文字数・文字集合・語句照合・文末判定などを
+AnalyzedAnswerとして1回だけ計算し、全採点クラスで共有する。
+解析結果は正規化後の解答文と照合語句（問題キーワードとその類義語）の組のハッシュごとにLRUキャッシュする。
+MORPHOLOGICAL_MATCHING が有効な場合、語句照合は形態素解析の結果を考慮して行う（morphology）。
+"""
+import hashlib
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from .matcher import MatchResult, TermMatcher, get_matcher
+from ..config import settings
+from ..utils.metrics import CACHE_HITS, CACHE_MISSES
+
+# 文の区切り（正規化後の文字）
+SENTENCE_DELIMITERS = frozenset("。!?\n")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC正規化（全角英数字→半角、半角カナ→全角などの幅を統一）"""
+    return unicodedata.normalize("NFKC", text or "")
+
+
+@lru_cache(maxsize=1024)
+def normalize_terms(terms: Tuple[str, ...]) -> Tuple[str, ...]:
+    """キーワードを解答と同じ規則で正規化"""
+    return tuple(normalize_text(term) for term in terms)
+
+
+def split_sentences(text: str) -> Tuple[Tuple[int, int], ...]:
+    """文の境界（開始位置, 終了位置）の一覧。区切り文字は文に含める"""
+    sentences = []
+    start = 0
+    for index, char in enumerate(text):
+        if char in SENTENCE_DELIMITERS:
+            if index + 1 > start and text[start:index + 1].strip():
+                sentences.append((start, index + 1))
+            start = index + 1
+    if text[start:].strip():
+        sentences.append((start, len(text)))
+    return tuple(sentences)
+
+
+class AnalyzedAnswer:
+    """1つの解答の解析結果（全採点クラスで共有する）
+
+    文字数・出現位置などはすべて正規化後のテキスト（text）が基準。
+    """
+
+    __slots__ = ("raw", "text", "length", "chars", "tokens", "matches", "sentences", "_ngrams")
+
+    def __init__(self, raw: str, matcher: TermMatcher, tokens: Optional[Sequence] = None):
+        self.raw = raw
+        self.text = normalize_text(raw)
+        self.length = len(self.text)
+        self.chars: FrozenSet[str] = frozenset(self.text)
+        # 形態素（形態素解析による照合が無効の場合は None）
+        self.tokens = tokens
+        if tokens is None:
+            self.matches: MatchResult = matcher.match(self.text)
+        else:
+            from .morphology import match_tokens
+            self.matches = match_tokens(matcher, self.text, tokens)
+        self.sentences = split_sentences(self.text)
+        self._ngrams: Dict[int, Counter] = {}
+
+    def ngrams(self, n: int = 2) -> Counter:
+        """文字n-gramの出現回数（初回呼び出し時に計算）"""
+        counts = self._ngrams.get(n)
+        if counts is None:
+            counts = Counter(self.text[i:i + n] for i in range(len(self.text) - n + 1))
+            self._ngrams[n] = counts
+        return counts
+
+    def ends_with(self, *suffixes: str) -> bool:
+        """文末判定"""
+        return self.text.endswith(suffixes)
+
+    def has_char(self, *chars: str) -> bool:
+        """いずれかの文字を含むか"""
+        return not self.chars.isdisjoint(chars)
+
+
+class _AnalysisCache:
+    """正規化後の解答文＋問題キーワードのハッシュごとの解析結果のLRUキャッシュ
+
+    採点処理はワーカースレッドからも呼ばれるため、キャッシュの参照・更新はロック内で行う。
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, AnalyzedAnswer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, keywords: Tuple[str, ...]) -> str:
+        """正規化後の解答文と問題キーワードのハッシュ（長い解答文をキーとして保持しない）"""
+        return hashlib.sha1("\x00".join((text, *keywords)).encode("utf-8")).hexdigest()
+
+    def get(self, answer: str, keywords: Tuple[str, ...]) -> AnalyzedAnswer:
+        return self.get_many([answer], keywords)[0]
+
+    def get_many(self, answers: Sequence[str], keywords: Tuple[str, ...]) -> List[AnalyzedAnswer]:
+        """複数の解答の解析結果（形態素解析はキャッシュにない解答をまとめて行う）"""
+        keys = [self.key(normalize_text(answer), keywords) for answer in answers]
+        results: List[Optional[AnalyzedAnswer]] = []
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for index, key in enumerate(keys):
+                analysis = self._entries.get(key)
+                if analysis is not None:
+                    self._entries.move_to_end(key)
+                else:
+                    missing.setdefault(key, []).append(index)
+                results.append(analysis)
+        hits = sum(analysis is not None for analysis in results)
+        if hits:
+            CACHE_HITS.inc(hits, cache="analyzed_answer")
+
+        if missing:
+            CACHE_MISSES.inc(len(missing), cache="analyzed_answer")
+            matcher = get_matcher(normalize_terms(keywords))
+            analyzer = morphological_analyzer()
+            if analyzer is not None:
+                tokens = analyzer.tokenize_many([normalize_text(answers[indices[0]]) for indices in missing.values()])
+            else:
+                tokens = [None] * len(missing)
+
+            analyzed = []
+            for (key, indices), answer_tokens in zip(missing.items(), tokens):
+                analysis = AnalyzedAnswer(answers[indices[0]], matcher, answer_tokens)
+                for index in indices:
+                    results[index] = analysis
+                analyzed.append((key, analysis))
+            if self.max_size > 0:
+                with self._lock:
+                    for key, analysis in analyzed:
+                        self._entries[key] = analysis
+                        self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+
+        return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_analysis_cache = _AnalysisCache(settings.ANALYSIS_CACHE_SIZE)
+
+
+def morphological_analyzer():
+    """形態素解析器（MORPHOLOGICAL_MATCHING が無効の場合は None）"""
+    if not settings.MORPHOLOGICAL_MATCHING:
+        return None
+    # janomeは有効な場合のみ読み込む
+    from .morphology import get_analyzer
+    return get_analyzer()
+
+
+def question_synonyms(question_data: Mapping[str, Any]) -> Dict[str, Tuple[str, ...]]:
+    """採点基準（grading_criteria の "synonyms"）に定義されたキーワードの類義語（正規化前）"""
+    criteria = question_data.get("grading_criteria") or {}
+    synonyms = criteria.get("synonyms") if isinstance(criteria, Mapping) else None
+    if not isinstance(synonyms, Mapping):
+        return {}
+    return {
+        str(keyword): tuple(str(term) for term in (terms if isinstance(terms, (list, tuple)) else [terms]) if term)
+        for keyword, terms in synonyms.items()
+    }
+
+
+def question_keywords(question_data: Mapping[str, Any]) -> Tuple[str, ...]:
+    """問題データの照合語句（キーワードとその類義語、正規化前）"""
+    keywords = tuple(question_data.get("keywords") or ())
+    synonyms = question_synonyms(question_data)
+    if not synonyms:
+        return keywords
+    expansions = (term for keyword in keywords for term in synonyms.get(keyword, ()) if term not in keywords)
+    return keywords + tuple(dict.fromkeys(expansions))
+
+
+def analyze_terms(answers: Sequence[str], terms: Tuple[str, ...]) -> Tuple[AnalyzedAnswer, ...]:
+    """照合語句（正規化前）を指定して複数の解答を解析（同じ解答・語句の組はキャッシュから返す）"""
+    return tuple(_analysis_cache.get_many([answer or "" for answer in answers], terms))
+
+
+def analyze_answer(answer: str, question_data: Mapping[str, Any]) -> AnalyzedAnswer:
+    """解答を解析（同じ解答・キーワードの組はキャッシュから返す）"""
+    return _analysis_cache.get(answer or "", question_keywords(question_data))
+
+
+def analyze_answers(answers: Sequence[str], question_data: Mapping[str, Any]) -> Tuple[AnalyzedAnswer, ...]:
+    """複数の解答を解析"""
+    return analyze_terms(answers, question_keywords(question_data))
+
+
+def answer_hit_matrix(matcher: TermMatcher, answers: Sequence[str], texts: Sequence[str], terms: Tuple[str, ...]):
+    """一括採点用の解答×語句の出現行列（textsは answers を normalize_text したもの、termsは matcher の照合語句）
+
+    形態素解析による照合が有効な場合は、1件ずつの採点と同じ照合結果から作成する。
+    """
+    if morphological_analyzer() is None:
+        return matcher.hit_matrix(texts)
+    return matcher.match_matrix([analysis.matches for analysis in analyze_terms(answers, terms)])
+
+
+def keyword_terms(keywords: Sequence[str]) -> Tuple[str, ...]:
+    """照合に使用する（正規化済みの）キーワード"""
+    return normalize_terms(tuple(keywords or ()))
@@ -0,0 +1,231 @@
+"""
+人間レビュー済み解答（アンカー）からの得点伝播
+
+問題ごとにレビュー済み解答のベクトルをメモリマップしたファイルに追記していき、
+新しい解答の近傍アンカーを総当たりの行列積で検索する。
+近傍のアンカーが十分に近く、得点もほぼ一致している場合はLLMを使わずにその得点を採用し、
+根拠として近傍アンカーを記録する。
+
+ベクトルは埋め込みモデル（EMBEDDING_BACKEND）が設定されていればその埋め込み、
+未設定の場合は文字n-gramの特徴量ハッシングを使用する。
+索引は問題の採点に使う内容の版（plan_fingerprint）ごとに分け、問題の編集前のアンカーからは伝播しない。
+"""
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .embedding import EmbeddingBackend, EmbeddingEncoder, HashingEmbeddingBackend, get_embedding_encoder
+from .plan import plan_fingerprint
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AnchorNeighbour(NamedTuple):
+    """近傍アンカー（伝播の根拠）"""
+    answer_id: Any
+    similarity: float
+    score: float  # 問題の配点に換算した得点
+
+
+class AnchorPropagation(NamedTuple):
+    """近傍アンカーから伝播した得点"""
+    score: float
+    confidence: float
+    neighbours: List[AnchorNeighbour]
+
+
+class AnchorIndex:
+    """1つの問題のアンカー索引
+
+    vectors.f32 にベクトル行を、anchors.jsonl に各行のメタデータ（解答ID・得点）を追記する。
+    同じ解答IDが再レビューされた場合は新しい行を追記し、古い行は検索対象から外す。
+    """
+
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "anchors.jsonl")
+        self._lock = threading.Lock()
+        self._records: List[Dict[str, Any]] = []
+        self._latest: Dict[str, int] = {}  # 解答ID → 有効な行
+        self._mmap: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self):
+        records = []
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # 書き込み途中で停止した行
+        row_bytes = self.dim * 4
+        vector_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        rows = min(len(records), vector_rows)
+
+        # ベクトル → メタデータの順に書き込むため、対応の取れない行は切り詰める
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * row_bytes)
+        if rows < len(records):
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records[:rows])
+
+        self._records = records[:rows]
+        self._latest = {str(record["answer_id"]): row for row, record in enumerate(self._records)}
+        self._mmap = None
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def _vectors(self) -> np.ndarray:
+        rows = len(self._records)
+        if self._mmap is None or self._mmap.shape[0] != rows:
+            if rows == 0:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def add(self, anchors: Sequence[Dict[str, Any]], vectors: np.ndarray):
+        """アンカーを追加・更新（anchorsは answer_id / score / max_score を持つ辞書）"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            start = len(self._records)
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            records = [
+                {"answer_id": anchor["answer_id"], "score": float(anchor["score"]), "max_score": float(anchor["max_score"])}
+                for anchor in anchors
+            ]
+            with open(self._meta_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            for offset, record in enumerate(records):
+                self._records.append(record)
+                self._latest[str(record["answer_id"])] = start + offset
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[AnchorNeighbour]]:
+        """各クエリの近傍アンカー（類似度の高い順、得点は配点に対する割合）"""
+        with self._lock:
+            active = np.fromiter(sorted(self._latest.values()), dtype=np.int64)
+            if not len(active) or not len(queries):
+                return [[] for _ in range(len(queries))]
+            vectors = np.asarray(self._vectors()[active])
+            records = [self._records[row] for row in active]
+
+        similarities = queries @ vectors.T
+        k = min(k, len(active))
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-similarities[row, candidates])]
+            results.append([
+                AnchorNeighbour(
+                    records[i]["answer_id"],
+                    float(similarities[row, i]),
+                    records[i]["score"] / records[i]["max_score"] if records[i]["max_score"] else 0.0
+                )
+                for i in ordered
+            ])
+        return results
+
+
+def question_version(question_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """アンカー索引を分ける問題の版（問題データがない場合は None）"""
+    return plan_fingerprint(question_data) if question_data else None
+
+
+class AnchorRegistry:
+    """問題ID・問題の版ごとのアンカー索引"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._indexes: Dict[str, AnchorIndex] = {}
+        self._lock = threading.Lock()
+        self._fallback_encoder: Optional[EmbeddingEncoder] = None
+
+    def encoder(self) -> EmbeddingEncoder:
+        """アンカー・解答のベクトル化に使用する変換器"""
+        encoder = get_embedding_encoder()
+        if encoder is not None:
+            return encoder
+        if self._fallback_encoder is None:
+            self._fallback_encoder = EmbeddingEncoder(HashingEmbeddingBackend(), settings.EMBEDDING_CACHE_DIR)
+        return self._fallback_encoder
+
+    def _backend(self) -> EmbeddingBackend:
+        encoder = get_embedding_encoder() or self._fallback_encoder
+        return encoder.backend if encoder is not None else HashingEmbeddingBackend()
+
+    def index(self, question_id: Any, create: bool = False, version: Optional[str] = None) -> Optional[AnchorIndex]:
+        """問題のアンカー索引（ベクトル化の方式・問題の版ごとに別の索引、未登録で create=False なら None）"""
+        backend = self._backend()
+        name = str(question_id) if version is None else f"{question_id}-{version}"
+        directory = os.path.join(
+            self.directory,
+            re.sub(r"[^0-9A-Za-z._-]", "_", backend.model_id),
+            re.sub(r"[^0-9A-Za-z._-]", "_", name)
+        )
+        with self._lock:
+            index = self._indexes.get(directory)
+            if index is None and (create or os.path.exists(directory)):
+                index = AnchorIndex(directory, backend.dim)
+                self._indexes[directory] = index
+            return index
+
+    def add(self, question_id: Any, anchors: Sequence[Dict[str, Any]], version: Optional[str] = None) -> int:
+        """レビュー済み解答をアンカーとして追加し、問題（の版）の有効なアンカー件数を返す"""
+        index = self.index(question_id, create=True, version=version)
+        if anchors:
+            index.add(anchors, self.encoder().encode([anchor["answer_text"] for anchor in anchors]))
+        return len(index)
+
+    def propagate(
+        self,
+        question_id: Any,
+        texts: Sequence[str],
+        points: float,
+        k: int = 3,
+        min_similarity: float = 0.9,
+        max_score_spread: float = 0.1,
+        version: Optional[str] = None
+    ) -> List[Optional[AnchorPropagation]]:
+        """近傍アンカーから得点を伝播（条件を満たさない解答は None）
+
+        上位k件のアンカーがすべて min_similarity 以上で、得点の幅が配点の max_score_spread 以下の場合に、
+        類似度で重み付けした平均点を採用する。
+        """
+        index = self.index(question_id, version=version)
+        if index is None or len(index) < k:
+            return [None] * len(texts)
+
+        results = []
+        for neighbours in index.search(self.encoder().encode(texts), k):
+            neighbours = [neighbour._replace(score=neighbour.score * points) for neighbour in neighbours]
+            similarities = np.array([neighbour.similarity for neighbour in neighbours])
+            scores = np.array([neighbour.score for neighbour in neighbours])
+            spread = (scores.max() - scores.min()) / points if points else 0.0
+            if len(neighbours) < k or similarities.min() < min_similarity or spread > max_score_spread:
+                results.append(None)
+                continue
+            score = float(np.average(scores, weights=similarities))
+            confidence = float(np.clip(similarities.min() * (1 - spread), 0.0, 1.0))
+            results.append(AnchorPropagation(score, confidence, neighbours))
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+            self._fallback_encoder = None
+
+
+anchor_registry = AnchorRegistry(settings.ANCHOR_DIR)
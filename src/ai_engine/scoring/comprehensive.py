@@ -1,9 +1,13 @@
 """
 総合評価採点（モック実装）
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
+from .analysis import AnalyzedAnswer
+from .matcher import MatchResult
+from .plan import ScoringPlan, get_plan
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,19 +17,30 @@ class ComprehensiveScoring:
     def __init__(self):
         self.weight = 0.3  # 総合スコアでの重み
 
-    def score(self, answer: str, question_data: Dict[str, Any]) -> Dict[str, Any]:
+    def score(
+        self,
+        answer: str,
+        question_data: Dict[str, Any],
+        analysis: Optional[AnalyzedAnswer] = None,
+        plan: Optional[ScoringPlan] = None
+    ) -> Dict[str, Any]:
         """総合評価採点実行（モック）"""
         try:
-            points = question_data.get("points", 100)
+            if plan is None:
+                plan = get_plan(question_data)
+            if analysis is None:
+                analysis = plan.analyze(answer)
+
+            points = plan.points
 
             # 1. プロジェクトマネジメント観点での評価
-            pm_perspective = self._evaluate_pm_perspective(answer)
+            pm_perspective = self._evaluate_pm_perspective(analysis.matches)
 
             # 2. 実務的妥当性の評価
-            practical_validity = self._evaluate_practical_validity(answer)
+            practical_validity = self._evaluate_practical_validity(analysis.matches)
 
             # 3. 完全性の評価
-            completeness = self._evaluate_completeness(answer, question_data)
+            completeness = self._evaluate_completeness(analysis, plan)
 
             # 総合スコア算出
             comprehensive_score = (
@@ -63,18 +78,12 @@ class ComprehensiveScoring:
                 "reasons": ["総合評価採点でエラーが発生しました"]
             }
 
-    def _evaluate_pm_perspective(self, answer: str) -> float:
+    def _evaluate_pm_perspective(self, matches: MatchResult) -> float:
         """プロジェクトマネジメント観点での評価"""
         score = 0.3  # 基本点
 
         # PM用語の使用
-        pm_terms = [
-            "プロジェクト", "マネジメント", "ステークホルダー", "リスク",
-            "スケジュール", "品質", "コスト", "スコープ", "要件",
-            "工程", "フェーズ", "マイルストーン", "レビュー"
-        ]
-
-        term_count = sum(1 for term in pm_terms if term in answer)
+        term_count = matches.count("pm")
         if term_count >= 3:
             score += 0.4
         elif term_count >= 2:
@@ -83,67 +92,44 @@ class ComprehensiveScoring:
             score += 0.2
 
         # 管理的視点の表現
-        management_expressions = [
-            "管理", "計画", "統制", "監視", "制御", "調整",
-            "予防", "対策", "改善", "最適化"
-        ]
-
-        if any(expr in answer for expr in management_expressions):
+        if matches.has("management"):
             score += 0.2
 
         # 問題解決の視点
-        problem_solving = [
-            "原因", "要因", "解決", "対応", "改善", "防止"
-        ]
-
-        if any(ps in answer for ps in problem_solving):
+        if matches.has("problem_solving"):
             score += 0.1
 
         return min(score, 1.0)
 
-    def _evaluate_practical_validity(self, answer: str) -> float:
+    def _evaluate_practical_validity(self, matches: MatchResult) -> float:
         """実務的妥当性の評価"""
         score = 0.4  # 基本点
 
         # 具体性
-        concrete_expressions = [
-            "具体的", "明確", "詳細", "例えば", "実際に",
-            "現実的", "実用的", "実践的"
-        ]
-
-        if any(expr in answer for expr in concrete_expressions):
+        if matches.has("concrete"):
             score += 0.2
 
         # 実装可能性
-        implementation_terms = [
-            "実施", "実行", "導入", "適用", "運用", "活用"
-        ]
-
-        if any(term in answer for term in implementation_terms):
+        if matches.has("implementation"):
             score += 0.2
 
         # 定量的要素
-        quantitative_indicators = [
-            "時間", "工数", "コスト", "期間", "工期", "人数",
-            "頻度", "回数", "割合", "率"
-        ]
-
-        if any(indicator in answer for indicator in quantitative_indicators):
+        if matches.has("quantitative"):
             score += 0.2
 
         return min(score, 1.0)
 
-    def _evaluate_completeness(self, answer: str, question_data: Dict[str, Any]) -> float:
+    def _evaluate_completeness(self, analysis: AnalyzedAnswer, plan: ScoringPlan) -> float:
         """完全性の評価"""
-        max_chars = question_data.get("max_chars", 40)
-        char_count = len(answer)
+        char_count = analysis.length
 
-        # 文字数に基づく完全性評価
-        if char_count >= max_chars * 0.8:
+        # 文字数に基づく完全性評価（しきい値は最大文字数の80%・60%・40%）
+        complete_chars, mostly_chars, partial_chars = plan.completeness_bounds
+        if char_count >= complete_chars:
             length_score = 1.0
-        elif char_count >= max_chars * 0.6:
+        elif char_count >= mostly_chars:
             length_score = 0.8
-        elif char_count >= max_chars * 0.4:
+        elif char_count >= partial_chars:
             length_score = 0.6
         else:
             length_score = 0.3
@@ -152,11 +138,11 @@ class ComprehensiveScoring:
         logical_completeness = 0.5
 
         # 文の終わり方
-        if answer.endswith("。") or answer.endswith("た。") or answer.endswith("ため。"):
+        if analysis.ends_with("。"):
             logical_completeness += 0.3
 
         # 主語述語の関係
-        if ("が" in answer or "は" in answer) and ("た" in answer or "る" in answer):
+        if analysis.has_char("が", "は") and analysis.has_char("た", "る"):
             logical_completeness += 0.2
 
         return (length_score + min(logical_completeness, 1.0)) / 2
@@ -0,0 +1,186 @@
+"""
+解答の重複・類似検出（LLM採点前のクラスタリング）
+
+同じ問題の解答を次の2段階でクラスタにまとめ、クラスタごとに代表解答だけをLLMで採点する。
+1. 完全一致: 正規化（NFKC・空白と文の句読点の除去）後のテキストのハッシュが同じ解答
+   （数字に隣接する符号・小数点・区切り・分数の記号は残し、それ以外の記号の違いは類似として扱う）
+2. 類似: 文字n-gramのMinHashをLSH（バンド分割）で候補検索し、
+   推定Jaccard類似度がしきい値以上の代表解答があればそのクラスタに加える
+
+各解答は代表解答との類似度がしきい値以上のクラスタにだけ加わるため、類似の連鎖でクラスタが広がることはない。
+"""
+import hashlib
+import json
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 正規化時に除去する文字カテゴリ（空白・制御文字）
+_STRIP_CATEGORIES = ("Z", "C")
+
+# 正規化時に除去する文の句読点（NFKC後の文字）
+_SENTENCE_PUNCTUATION = frozenset("、。!?;:・「」『』()【】[]\"'…")
+
+# 数字に隣接しない場合だけ除去する記号（符号・小数点・桁区切り・分数）
+_NUMERIC_PUNCTUATION = frozenset("-+.,/")
+
+# MinHashのハッシュ族 (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+class ClusterAssignment(NamedTuple):
+    """解答のクラスタ割り当て"""
+    cluster_id: int
+    representative: int  # 代表解答のインデックス
+    similarity: float    # 代表解答との推定Jaccard類似度（完全一致は1.0）
+    exact: bool          # 正規化後のテキストが代表解答と完全一致
+
+
+def dedup_text(text: str) -> str:
+    """重複判定用の正規化（幅の統一・小文字化、空白・文の句読点の除去）
+
+    -3 と 3、3.14 と 314 が一致しないよう、数字に隣接する符号・小数点などは残す。
+    """
+    normalized = unicodedata.normalize("NFKC", text or "").lower()
+    chars = []
+    for i, char in enumerate(normalized):
+        if unicodedata.category(char)[0] in _STRIP_CATEGORIES or char in _SENTENCE_PUNCTUATION:
+            continue
+        if char in _NUMERIC_PUNCTUATION:
+            before = normalized[i - 1] if i > 0 else ""
+            after = normalized[i + 1] if i + 1 < len(normalized) else ""
+            if not (before.isdigit() or after.isdigit()):
+                continue
+        chars.append(char)
+    return "".join(chars)
+
+
+def _lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """LSHのバンド数と行数
+
+    候補になる類似度の目安 (1/b)^(1/r) がしきい値以下となる範囲で、行数が最大の組を選ぶ（再現率優先）。
+    偽陽性はMinHashの推定類似度で除外する。
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """文字n-gramのMinHash署名"""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        n = self.shingle_size
+        if len(text) <= n:
+            return [text] if text else []
+        return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """正規化済みテキストの署名（文字がない場合は None）"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in set(shingles)),
+            dtype=np.uint64
+        )
+        return ((self._a * hashes[None, :] + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+
+def cluster_answers(
+    texts: Sequence[str],
+    threshold: float = 0.85,
+    num_perm: int = 64,
+    shingle_size: int = 3,
+    near_duplicates: bool = True
+) -> List[ClusterAssignment]:
+    """解答をクラスタに分ける（代表解答は各クラスタで最初に現れた解答）"""
+    hasher = MinHasher(num_perm, shingle_size)
+    bands, rows = _lsh_bands(num_perm, threshold)
+
+    assignments: List[ClusterAssignment] = []
+    exact: Dict[bytes, ClusterAssignment] = {}
+    buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+    signatures: Dict[int, np.ndarray] = {}  # クラスタID → 代表解答の署名
+
+    for index, text in enumerate(texts):
+        key = dedup_text(text)
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+
+        # 1. 完全一致（正規化後）。類似として加えた解答と一致する場合はその割り当てを引き継ぐ
+        known = exact.get(digest)
+        if known is not None:
+            assignments.append(known)
+            continue
+
+        signature = hasher.signature(key) if near_duplicates else None
+        band_keys = []
+        if signature is not None:
+            band_keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+
+            # 2. 類似（LSHの候補を推定類似度で確認し、最も近い代表解答のクラスタに加える）
+            candidates = {cluster_id for band_key in band_keys for cluster_id in buckets.get(band_key, ())}
+            best_id, best_similarity = None, threshold
+            for cluster_id in sorted(candidates):
+                similarity = float(np.mean(signatures[cluster_id] == signature))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = cluster_id, similarity
+            if best_id is not None:
+                assignment = ClusterAssignment(best_id, best_id, best_similarity, False)
+                exact[digest] = assignment
+                assignments.append(assignment)
+                continue
+
+        # 新しいクラスタ（クラスタIDは代表解答のインデックス）
+        assignment = ClusterAssignment(index, index, 1.0, True)
+        exact[digest] = assignment
+        assignments.append(assignment)
+        if signature is not None:
+            signatures[index] = signature
+            for band_key in band_keys:
+                buckets[band_key].append(index)
+
+    return assignments
+
+
+def question_group_key(question_data: Mapping[str, Any]) -> str:
+    """同じ問題とみなす問題データのキー"""
+    return json.dumps(question_data, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def cluster_batch(
+    items: Sequence[Tuple[str, Mapping[str, Any]]],
+    threshold: float = 0.85,
+    num_perm: int = 64,
+    shingle_size: int = 3
+) -> List[ClusterAssignment]:
+    """一括採点の (解答文, 問題データ) を問題ごとにクラスタリング
+
+    インデックス・クラスタIDはバッチ全体での位置（クラスタIDは代表解答のインデックス）。
+    """
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for index, (_, question_data) in enumerate(items):
+        groups[question_group_key(question_data)].append(index)
+
+    assignments: List[Optional[ClusterAssignment]] = [None] * len(items)
+    for indices in groups.values():
+        local = cluster_answers([items[i][0] for i in indices], threshold, num_perm, shingle_size)
+        for position, assignment in zip(indices, local):
+            representative = indices[assignment.representative]
+            assignments[position] = assignment._replace(cluster_id=representative, representative=representative)
+    return assignments
@@ -0,0 +1,362 @@
+"""
+解答の埋め込みベクトル（CPU推論）と永続キャッシュ
+
+埋め込みモデルは EmbeddingBackend.encode(texts) で差し替え可能とする。
+- onnx:    ローカルのONNXモデル（量子化モデル可）をonnxruntimeのCPU推論で一括変換（ネットワーク不要）
+- hashing: 文字n-gramを特徴量ハッシングするだけの軽量バックエンド（モデルファイル不要）
+
+変換結果は「モデルID＋正規化後テキストのハッシュ」をキーに、メモリマップしたファイルへ保存する。
+再起動後も同じ解答は再計算せず、新規・変更された解答だけを推論する。
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .analysis import normalize_text
+from ..config import settings
+from ..utils.metrics import CACHE_HITS, CACHE_MISSES
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windowsではプロセス間のファイルロックを行わない（キャッシュディレクトリは1プロセスで使用する）
+    FCNTL_AVAILABLE = False
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# キャッシュのキー（sha1）のバイト数
+KEY_SIZE = 20
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32, copy=False)
+
+
+class EmbeddingBackend:
+    """埋め込みバックエンドの基底クラス
+
+    encode は正規化済みテキストを受け取り、L2正規化済みの (件数, dim) の float32 行列を返す。
+    model_id はモデルファイルの内容が変わると変わる値とする（キャッシュのキーに使用）。
+    """
+
+    model_id: str = ""
+    dim: int = 0
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """文字n-gramの特徴量ハッシング（モデルファイル不要・決定的）"""
+
+    def __init__(self, dim: int = 256, ngram_range=(2, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model_id = f"hashing-{dim}-{ngram_range[0]}{ngram_range[1]}"
+
+    def _bucket(self, gram: str) -> int:
+        return int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little") % self.dim
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        low, high = self.ngram_range
+        for row, text in enumerate(texts):
+            for n in range(low, high + 1):
+                for i in range(len(text) - n + 1):
+                    vectors[row, self._bucket(text[i:i + n])] += 1.0
+        return _l2_normalize(vectors)
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """ローカルのONNX文埋め込みモデルによるCPU推論
+
+    入力は input_ids / attention_mask（必要なら token_type_ids）、出力が3次元の場合は
+    attention_maskで平均プーリングする。トークナイザーはモデルと同じディレクトリの tokenizer.json を既定とする。
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: Optional[str] = None,
+        batch_size: int = 64,
+        max_length: int = 256,
+        num_threads: int = 0
+    ):
+        if not ONNXRUNTIME_AVAILABLE or not TOKENIZERS_AVAILABLE:
+            raise RuntimeError("onnxruntime と tokenizers がインストールされていません")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"埋め込みモデルが見つかりません: {model_path}")
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path or os.path.join(os.path.dirname(model_path), "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+        sha1 = hashlib.sha1()
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha1.update(chunk)
+        digest = sha1.hexdigest()
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        self.model_id = f"onnx-{name}-{digest[:12]}"
+        self.dim = self._encode_batch([""]).shape[1]
+
+    def _encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        output = self.session.run(None, {key: value for key, value in feeds.items() if key in self.input_names})[0]
+
+        if output.ndim == 3:
+            # トークン単位の出力 → 平均プーリング
+            mask = attention_mask[:, :, None].astype(output.dtype)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1)
+        return _l2_normalize(output)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        if not len(texts):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([
+            self._encode_batch(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ])
+
+
+class EmbeddingStore:
+    """埋め込みベクトルの永続キャッシュ（モデルIDごとのディレクトリ）
+
+    vectors.f32 に float32 の行を追記し、読み出しはメモリマップで行う。
+    keys.bin には各行のキー（sha1, 20バイト）を同じ順序で追記する。
+    ベクトル → キーの順に書き込むため、途中で停止しても未完了の行は読み込まれない。
+    同じディレクトリを複数のプロセスで共有できるよう、追記はファイルロック（fcntl.flock）中に
+    他のプロセスが追記した行を読み込んでから行う。参照時もファイルが伸びていれば索引に追加する。
+    """
+
+    def __init__(self, directory: str, model_id: str, dim: int):
+        self.model_id = model_id
+        self.dim = dim
+        self.directory = os.path.join(directory, re.sub(r"[^0-9A-Za-z._-]", "_", model_id))
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._keys_path = os.path.join(self.directory, "keys.bin")
+        self._lock_path = os.path.join(self.directory, "lock")
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, int] = {}
+        self._rows = 0
+        self._mmap: Optional[np.memmap] = None
+        with self._lock, self._file_lock():
+            self._refresh(repair=True)
+
+    @contextmanager
+    def _file_lock(self):
+        """プロセス間の排他（fcntlがない環境ではプロセス内の排他のみ）"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self, repair: bool = False):
+        """ファイルに追記された完全な行を索引に加える
+
+        repair=True（ファイルロック中のみ）の場合は、書き込み途中で停止した行を切り詰める。
+        """
+        key_bytes = os.path.getsize(self._keys_path) if os.path.exists(self._keys_path) else 0
+        row_bytes = self.dim * 4
+        vector_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        rows = min(key_bytes // KEY_SIZE, vector_rows)
+
+        if rows > self._rows:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._rows * KEY_SIZE)
+                keys = f.read((rows - self._rows) * KEY_SIZE)
+            for offset in range(rows - self._rows):
+                self._index.setdefault(keys[offset * KEY_SIZE:(offset + 1) * KEY_SIZE], self._rows + offset)
+            self._rows = rows
+
+        if repair:
+            with open(self._keys_path, "ab") as f:
+                f.truncate(rows * KEY_SIZE)
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def key(self, text: str) -> bytes:
+        """正規化済みテキストのキー"""
+        return hashlib.sha1(f"{self.model_id}\x00{text}".encode("utf-8")).digest()
+
+    def _vectors(self) -> np.ndarray:
+        rows = self._rows
+        if self._mmap is None or self._mmap.shape[0] != rows:
+            if rows == 0:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def lookup(self, keys: Sequence[bytes]) -> List[Optional[int]]:
+        """キーに対応する行番号（未登録はNone。他のプロセスが追記した行も含む）"""
+        with self._lock:
+            self._refresh()
+            return [self._index.get(key) for key in keys]
+
+    def rows(self, indices: Sequence[int]) -> np.ndarray:
+        """行番号のベクトルをまとめて取得"""
+        with self._lock:
+            return np.asarray(self._vectors()[np.asarray(indices, dtype=np.int64)])
+
+    def append(self, keys: Sequence[bytes], vectors: np.ndarray) -> List[int]:
+        """新しいベクトルを追記し、行番号を返す（登録済みのキーは既存の行を返す）"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            # 他のプロセスが追記した行を読み込んでから行番号を割り当てる
+            self._refresh(repair=True)
+            new_keys, new_rows, result = [], [], []
+            for key, vector in zip(keys, vectors):
+                row = self._index.get(key)
+                if row is None and key not in new_keys:
+                    new_keys.append(key)
+                    new_rows.append(vector)
+                result.append(row)
+
+            if new_keys:
+                start = self._rows
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.vstack(new_rows).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self._keys_path, "ab") as f:
+                    f.write(b"".join(new_keys))
+                for offset, key in enumerate(new_keys):
+                    self._index[key] = start + offset
+                self._rows += len(new_keys)
+
+            return [self._index[key] if row is None else row for key, row in zip(keys, result)]
+
+
+class EmbeddingEncoder:
+    """バックエンドと永続キャッシュを組み合わせた埋め込み変換"""
+
+    def __init__(self, backend: EmbeddingBackend, cache_dir: str):
+        self.backend = backend
+        self.store = EmbeddingStore(cache_dir, backend.model_id, backend.dim)
+
+    @property
+    def model_id(self) -> str:
+        return self.backend.model_id
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """テキストを埋め込みベクトルに変換（キャッシュにない解答だけを推論）
+
+        textsは正規化前のテキストでもよい（キーとモデル入力は normalize_text 後の値）。
+        """
+        normalized = [normalize_text(text) for text in texts]
+        keys = [self.store.key(text) for text in normalized]
+        rows = self.store.lookup(keys)
+
+        missing: Dict[bytes, str] = {}
+        for key, text, row in zip(keys, normalized, rows):
+            if row is None:
+                missing.setdefault(key, text)
+
+        hits = len(keys) - sum(row is None for row in rows)
+        if hits:
+            CACHE_HITS.inc(hits, cache="embedding")
+        if missing:
+            CACHE_MISSES.inc(len(missing), cache="embedding")
+            new_rows = self.store.append(list(missing), self.backend.encode(list(missing.values())))
+            added = dict(zip(missing, new_rows))
+            rows = [added[key] if row is None else row for key, row in zip(keys, rows)]
+
+        if not rows:
+            return np.zeros((0, self.backend.dim), dtype=np.float32)
+        return self.store.rows(rows)
+
+    def similarities(self, texts: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        """解答と参照文のコサイン類似度（行: 解答, 列: 参照文）を1回の行列積で計算"""
+        if not len(texts):
+            return np.zeros((0, len(references)))
+        vectors = self.encode(texts)
+        reference_vectors = self.encode(references)
+        return (vectors @ reference_vectors.T).astype(np.float64)
+
+
+_encoder: Optional[EmbeddingEncoder] = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def create_backend(name: str) -> Optional[EmbeddingBackend]:
+    """設定名からバックエンドを生成（none は None）"""
+    if name == "onnx":
+        return OnnxEmbeddingBackend(
+            settings.EMBEDDING_MODEL_PATH,
+            settings.EMBEDDING_TOKENIZER_PATH or None,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_length=settings.EMBEDDING_MAX_LENGTH
+        )
+    if name == "hashing":
+        return HashingEmbeddingBackend()
+    if name in ("", "none"):
+        return None
+    raise ValueError(f"未対応の埋め込みバックエンドです: {name}")
+
+
+def get_embedding_encoder() -> Optional[EmbeddingEncoder]:
+    """設定された埋め込み変換器（未設定・読み込み失敗時は None）"""
+    global _encoder, _encoder_loaded
+    if _encoder_loaded:
+        return _encoder
+
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                backend = create_backend(settings.EMBEDDING_BACKEND.lower())
+                _encoder = EmbeddingEncoder(backend, settings.EMBEDDING_CACHE_DIR) if backend else None
+            except Exception as e:
+                logger.error(f"埋め込みモデル読み込みエラー: {e}")
+                _encoder = None
+            _encoder_loaded = True
+    return _encoder
+
+
+def set_embedding_encoder(encoder: Optional[EmbeddingEncoder]):
+    """埋め込み変換器を差し替え（テスト・起動処理用）"""
+    global _encoder, _encoder_loaded
+    with _encoder_lock:
+        _encoder = encoder
+        _encoder_loaded = True
@@ -0,0 +1,279 @@
+"""
+複数語句の一括照合（Aho–Corasick法）
+
+用語辞書と問題キーワードから照合オートマトンを一度だけ構築し、
+解答を1回走査するだけで全語句の出現位置を取得する。
+照合結果（MatchResult）はルールベース・意味理解・総合評価の各採点で共有する。
+pyahocorasick（C実装）が利用可能ならそれを使い、なければ純Python実装で照合する。
+"""
+import threading
+from collections import OrderedDict, deque
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .terms import KEYWORD_CATEGORY, TERM_DICTIONARY
+from ..utils.metrics import CACHE_HITS, CACHE_MISSES
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+# 一括照合で解答を連結する際の区切り文字
+SEPARATOR = "\x00"
+
+
+class TermHit(NamedTuple):
+    """語句の出現箇所"""
+    term: str
+    start: int
+    end: int
+
+
+class MatchResult:
+    """1つの解答に対する照合結果"""
+
+    __slots__ = ("categories", "_category_sets", "_positions")
+
+    def __init__(
+        self,
+        categories: Mapping[str, Tuple[str, ...]],
+        category_sets: Mapping[str, frozenset],
+        positions: Dict[str, List[int]]
+    ):
+        self.categories = categories
+        self._category_sets = category_sets
+        self._positions = positions
+
+    def contains(self, term: str) -> bool:
+        """語句が出現するか（`term in text` と同じ判定）"""
+        return term == "" or term in self._positions
+
+    def matched(self, category: str) -> List[str]:
+        """カテゴリ内で出現した語句（辞書の定義順、重複定義はそのまま）"""
+        return [term for term in self.categories.get(category, ()) if self.contains(term)]
+
+    def count(self, category: str) -> int:
+        """カテゴリ内で出現した語句の数"""
+        return len(self.matched(category))
+
+    def has(self, category: str) -> bool:
+        """カテゴリ内の語句が1つでも出現するか"""
+        terms = self._category_sets.get(category, frozenset())
+        return "" in terms or not terms.isdisjoint(self._positions)
+
+    def terms(self) -> List[str]:
+        """出現した語句"""
+        return list(self._positions)
+
+    def offsets(self, term: str) -> List[int]:
+        """語句の出現開始位置"""
+        return list(self._positions.get(term, []))
+
+    def hits(self, category: Optional[str] = None) -> List[TermHit]:
+        """出現箇所の一覧（開始位置順）"""
+        terms = self._positions.keys() if category is None else set(self.matched(category))
+        hits = [
+            TermHit(term, start, start + len(term))
+            for term in terms
+            for start in self._positions.get(term, [])
+        ]
+        return sorted(hits, key=lambda hit: (hit.start, -len(hit.term)))
+
+    def highlights(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """レビュー画面での強調表示用（JSON化可能な形式）"""
+        return [hit._asdict() for hit in self.hits(category)]
+
+
+class TermMatcher:
+    """カテゴリ別語句辞書から構築する照合オートマトン"""
+
+    def __init__(self, dictionary: Mapping[str, Sequence[str]], native: bool = AHOCORASICK_AVAILABLE):
+        self.categories: Dict[str, Tuple[str, ...]] = {
+            category: tuple(terms) for category, terms in dictionary.items()
+        }
+        self._category_sets = {category: frozenset(terms) for category, terms in self.categories.items()}
+        terms = sorted({term for category_terms in self.categories.values() for term in category_terms if term})
+        # 語句番号（一括照合の結果で使用）
+        self.terms: Tuple[str, ...] = tuple(terms)
+        self._term_ids: Dict[str, int] = {term: index for index, term in enumerate(terms)}
+
+        self._automaton = None
+        if native and terms:
+            self._automaton = ahocorasick.Automaton()
+            for term_id, term in enumerate(terms):
+                self._automaton.add_word(term, term_id)
+            self._automaton.make_automaton()
+        else:
+            self._build(terms)
+
+    def _build(self, terms: Iterable[str]):
+        """トライ木と失敗リンクを構築し、遷移表（DFA）に展開（純Python実装用）"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[str, ...]] = [()]
+
+        for term in terms:
+            node = 0
+            for char in term:
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto.append({})
+                    outputs.append(())
+                    goto[node][char] = next_node
+                node = next_node
+            outputs[node] += (term,)
+
+        # 幅優先で失敗リンクを計算し、失敗先の遷移・出力を取り込む
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in range(len(goto) - 1)]
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            outputs[node] += outputs[fail[node]]
+            for char, child in goto[node].items():
+                fail[child] = delta[fail[node]].get(char, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = outputs
+
+    def _iter_hits(self, text: str) -> Iterator[Tuple[int, str]]:
+        """出現した語句を (終了位置, 語句) で列挙"""
+        if self._automaton is not None:
+            terms = self.terms
+            for end, term_id in self._automaton.iter(text):
+                yield end, terms[term_id]
+            return
+
+        delta = self._delta
+        outputs = self._outputs
+        node = 0
+        for index, char in enumerate(text):
+            node = delta[node].get(char, 0)
+            if outputs[node]:
+                for term in outputs[node]:
+                    yield index, term
+
+    def match(self, text: str) -> MatchResult:
+        """解答を1回走査して全語句の出現位置を取得"""
+        positions: Dict[str, List[int]] = {}
+        for end, term in self._iter_hits(text):
+            positions.setdefault(term, []).append(end - len(term) + 1)
+        return self.make_result(positions)
+
+    def make_result(self, positions: Dict[str, List[int]]) -> MatchResult:
+        """語句の出現位置から照合結果を作成"""
+        return MatchResult(self.categories, self._category_sets, positions)
+
+    def term_ids(self, terms: Iterable[str]) -> List[int]:
+        """語句番号の一覧（空文字列は -1）"""
+        return [self._term_ids[term] if term else -1 for term in terms]
+
+    def scan_many(self, texts: Sequence[str]) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """複数の解答を連結して1回で走査
+
+        戻り値は (各解答の開始位置, 出現箇所の (終了位置, 語句番号) の一覧)。
+        区切り文字は語句に含まれないため、解答をまたいだ出現は生じない。
+        """
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+
+        if any(SEPARATOR in term for term in self.terms):
+            # 区切り文字を含む語句がある場合は1件ずつ走査
+            hits = [
+                (start + end, self._term_ids[term])
+                for start, text in zip(starts, texts)
+                for end, term in self._iter_hits(text)
+            ]
+            return starts, hits
+
+        joined = SEPARATOR.join(texts)
+        if self._automaton is not None:
+            # C実装のイテレータが (終了位置, 語句番号) を直接返す
+            hits = list(self._automaton.iter(joined))
+        else:
+            term_ids = self._term_ids
+            hits = [(end, term_ids[term]) for end, term in self._iter_hits(joined)]
+
+        return starts, hits
+
+    def hit_matrix(self, texts: Sequence[str]):
+        """解答×語句の出現行列（NumPyのbool配列）
+
+        列は語句番号順で、末尾に空文字列の語句用の常にTrueの列を持つ（term_idsの -1 に対応）。
+        """
+        import numpy as np  # 一括採点時のみ使用
+
+        starts, scanned = self.scan_many(texts)
+        hits = np.zeros((len(texts), len(self.terms) + 1), dtype=bool)
+        hits[:, -1] = True
+        if scanned:
+            pairs = np.fromiter(chain.from_iterable(scanned), dtype=np.int64, count=2 * len(scanned)).reshape(-1, 2)
+            answer_index = np.searchsorted(np.asarray(starts), pairs[:, 0], side="right") - 1
+            hits[answer_index, pairs[:, 1]] = True
+        return hits
+
+    def match_matrix(self, results: Sequence[MatchResult]):
+        """照合結果の一覧から hit_matrix と同じ形式の出現行列を作成（形態素解析による照合用）"""
+        import numpy as np  # 一括採点時のみ使用
+
+        hits = np.zeros((len(results), len(self.terms) + 1), dtype=bool)
+        hits[:, -1] = True
+        for row, result in enumerate(results):
+            hits[row, self.term_ids(result.terms())] = True
+        return hits
+
+    def category_hits(self, hits, category: str):
+        """出現行列からカテゴリ内の語句が出現した解答を求める"""
+        return hits[:, self.term_ids(self.categories[category])].any(axis=1)
+
+
+class _MatcherCache:
+    """キーワード集合ごとの照合オートマトンのLRUキャッシュ（ワーカースレッドからも参照するためロック内で更新）"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._matchers: "OrderedDict[Tuple[str, ...], TermMatcher]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, keywords: Tuple[str, ...]) -> TermMatcher:
+        with self._lock:
+            matcher = self._matchers.get(keywords)
+            if matcher is not None:
+                self._matchers.move_to_end(keywords)
+        if matcher is not None:
+            CACHE_HITS.inc(cache="term_matcher")
+            return matcher
+
+        CACHE_MISSES.inc(cache="term_matcher")
+        matcher = TermMatcher({**TERM_DICTIONARY, KEYWORD_CATEGORY: keywords})
+        with self._lock:
+            # 同時に作成された場合は先に登録されたオートマトンを使う
+            matcher = self._matchers.setdefault(keywords, matcher)
+            self._matchers.move_to_end(keywords)
+            if len(self._matchers) > self.max_size:
+                self._matchers.popitem(last=False)
+        return matcher
+
+    def clear(self):
+        with self._lock:
+            self._matchers.clear()
+
+
+_matcher_cache = _MatcherCache()
+
+
+def get_matcher(keywords: Sequence[str] = ()) -> TermMatcher:
+    """用語辞書＋問題キーワードの照合オートマトンを取得（キーワード集合ごとにキャッシュ）
+
+    キーワードは解答と同じ規則で正規化済みのものを渡す（analysis.keyword_terms）
+    """
+    return _matcher_cache.get(tuple(keywords or ()))
+
@@ -0,0 +1,273 @@
+"""
+日本語形態素解析による語句照合（オプション）
+
+部分文字列の一致だけでは「ため」が無関係な語の一部にも一致し、活用した語（「遅延した」と「遅延する」）は一致しない。
+MORPHOLOGICAL_MATCHING を有効にすると、Janome（純Python）で解答を形態素に分割し、
+- 照合オートマトンの出現箇所のうち、形態素の境界に揃ったものだけを採用する
+- 語句の見出し語（基本形）の並びが解答の見出し語の並びに現れる箇所を追加する
+
+形態素解析はCPU負荷が高いため、解析結果をテキストのハッシュをキーにLRU＋ディスク（SQLite）にキャッシュし、
+キャッシュにない解答はまとめてプロセスプールで解析する。
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .matcher import MatchResult, TermMatcher
+from ..config import settings
+from ..utils.metrics import CACHE_HITS, CACHE_MISSES
+
+try:
+    import janome
+    from janome.tokenizer import Tokenizer as JanomeTokenizer
+    JANOME_AVAILABLE = True
+    ANALYZER_VERSION = f"janome-{janome.__version__}"
+except ImportError:
+    JANOME_AVAILABLE = False
+    ANALYZER_VERSION = ""
+
+logger = logging.getLogger(__name__)
+
+
+class Token(NamedTuple):
+    """形態素（開始位置は解析したテキスト上の位置）"""
+    surface: str
+    base_form: str
+    start: int
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.surface)
+
+
+# プロセスごとのJanomeの解析器（辞書の読み込みに時間がかかるため使い回す）
+_janome: Optional["JanomeTokenizer"] = None
+
+
+def _tokenize_texts(texts: Sequence[str]) -> List[Tuple[Token, ...]]:
+    """テキストを形態素解析（プロセスプールのワーカーでも実行する）"""
+    global _janome
+    if _janome is None:
+        _janome = JanomeTokenizer()
+
+    results = []
+    for text in texts:
+        tokens = []
+        position = 0
+        for token in _janome.tokenize(text):
+            surface = token.surface
+            start = text.find(surface, position)
+            if start < 0:
+                start = position
+            base_form = token.base_form if token.base_form and token.base_form != "*" else surface
+            tokens.append(Token(surface, base_form, start))
+            position = start + len(surface)
+        results.append(tuple(tokens))
+    return results
+
+
+class _TokenDiskCache:
+    """形態素解析結果のディスクキャッシュ（SQLite、キーはテキストのハッシュ）"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, tokens TEXT NOT NULL)")
+        self._connection.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Tuple[Token, ...]]:
+        found = {}
+        with self._lock:
+            # SQLiteのパラメータ数上限を超えないよう分割して取得
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, tokens FROM tokens WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, tokens in rows:
+                    found[key] = tuple(Token(*token) for token in json.loads(tokens))
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, Tuple[Token, ...]]]):
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tokens (key, tokens) VALUES (?, ?)",
+                [(key, json.dumps(tokens, ensure_ascii=False)) for key, tokens in items]
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class MorphologicalAnalyzer:
+    """キャッシュ付きの形態素解析器"""
+
+    def __init__(
+        self,
+        cache_size: int = 10000,
+        cache_path: Optional[str] = None,
+        processes: int = 1,
+        parallel_min: int = 256,
+        chunk_size: int = 64
+    ):
+        if not JANOME_AVAILABLE:
+            raise RuntimeError("janome がインストールされていません")
+        self.cache_size = cache_size
+        self.processes = processes
+        self.parallel_min = parallel_min
+        self.chunk_size = chunk_size
+        self._entries: "OrderedDict[str, Tuple[Token, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _TokenDiskCache(cache_path) if cache_path else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(f"{ANALYZER_VERSION}\x00{text}".encode("utf-8")).hexdigest()
+
+    def tokenize(self, text: str) -> Tuple[Token, ...]:
+        return self.tokenize_many([text])[0]
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[Tuple[Token, ...]]:
+        """複数のテキストを形態素解析（キャッシュにないテキストだけをまとめて解析）"""
+        keys = {text: self.key(text) for text in texts}
+        results: Dict[str, Tuple[Token, ...]] = {}
+
+        with self._lock:
+            for text, key in keys.items():
+                tokens = self._entries.get(key)
+                if tokens is not None:
+                    self._entries.move_to_end(key)
+                    results[text] = tokens
+        missing = [text for text in keys if text not in results]
+        if results:
+            CACHE_HITS.inc(len(results), cache="tokens")
+
+        if missing and self._disk is not None:
+            found = self._disk.get_many([keys[text] for text in missing])
+            if found:
+                CACHE_HITS.inc(len(found), cache="tokens_disk")
+            for text in missing:
+                if keys[text] in found:
+                    results[text] = found[keys[text]]
+            self._remember((keys[text], results[text]) for text in missing if text in results)
+            missing = [text for text in missing if text not in results]
+
+        if missing:
+            CACHE_MISSES.inc(len(missing), cache="tokens")
+            analyzed = list(zip(missing, self._analyze(missing)))
+            results.update(analyzed)
+            items = [(keys[text], tokens) for text, tokens in analyzed]
+            self._remember(items)
+            if self._disk is not None:
+                self._disk.put_many(items)
+
+        return [results[text] for text in texts]
+
+    def _remember(self, items):
+        with self._lock:
+            for key, tokens in items:
+                self._entries[key] = tokens
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.cache_size:
+                self._entries.popitem(last=False)
+
+    def _analyze(self, texts: List[str]) -> List[Tuple[Token, ...]]:
+        """件数が多い場合はプロセスプールで分割して解析"""
+        if self.processes <= 1 or len(texts) < self.parallel_min:
+            return _tokenize_texts(texts)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        return list(chain.from_iterable(self._executor.map(_tokenize_texts, chunks)))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+
+@lru_cache(maxsize=4096)
+def term_lemmas(term: str) -> Tuple[str, ...]:
+    """語句の見出し語の並び"""
+    return tuple(token.base_form for token in _tokenize_texts([term])[0])
+
+
+def match_tokens(matcher: TermMatcher, text: str, tokens: Sequence[Token]) -> MatchResult:
+    """形態素を考慮した語句照合
+
+    照合オートマトンの出現箇所のうち形態素の境界に揃ったものと、
+    語句の見出し語の並びが解答に現れる箇所を出現位置とする。
+    """
+    starts = {token.start for token in tokens}
+    ends = {token.end for token in tokens}
+    positions: Dict[str, set] = defaultdict(set)
+    for hit in matcher.match(text).hits():
+        if hit.start in starts and hit.end in ends:
+            positions[hit.term].add(hit.start)
+
+    lemmas = [token.base_form for token in tokens]
+    lemma_index: Dict[str, List[int]] = defaultdict(list)
+    for index, lemma in enumerate(lemmas):
+        lemma_index[lemma].append(index)
+    for term in matcher.terms:
+        sequence = term_lemmas(term)
+        if not sequence:
+            continue
+        for index in lemma_index.get(sequence[0], ()):
+            if tuple(lemmas[index:index + len(sequence)]) == sequence:
+                positions[term].add(tokens[index].start)
+
+    return matcher.make_result({term: sorted(offsets) for term, offsets in positions.items()})
+
+
+_analyzer: Optional[MorphologicalAnalyzer] = None
+_analyzer_loaded = False
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> Optional[MorphologicalAnalyzer]:
+    """設定された形態素解析器（無効・janome未インストールの場合は None）"""
+    global _analyzer, _analyzer_loaded
+    if _analyzer_loaded:
+        return _analyzer
+
+    with _analyzer_lock:
+        if not _analyzer_loaded:
+            if settings.MORPHOLOGICAL_MATCHING and not JANOME_AVAILABLE:
+                logger.warning("janome がインストールされていないため、形態素解析による照合を無効にします")
+            elif settings.MORPHOLOGICAL_MATCHING:
+                try:
+                    _analyzer = MorphologicalAnalyzer(
+                        cache_size=settings.TOKENIZER_CACHE_SIZE,
+                        cache_path=settings.TOKENIZER_CACHE_PATH or None,
+                        processes=settings.TOKENIZER_PROCESSES,
+                        parallel_min=settings.TOKENIZER_PARALLEL_MIN
+                    )
+                except Exception as e:
+                    logger.error(f"形態素解析器の初期化エラー: {e}")
+            _analyzer_loaded = True
+    return _analyzer
+
+
+def set_analyzer(analyzer: Optional[MorphologicalAnalyzer]):
+    """形態素解析器を差し替え（テスト・ベンチマーク用）"""
+    global _analyzer, _analyzer_loaded
+    with _analyzer_lock:
+        _analyzer = analyzer
+        _analyzer_loaded = True
@@ -0,0 +1,462 @@
+"""
+採点パイプライン
+
+採点手法（ステージ）を宣言した順に実行し、得点を出したステージの結果を問題ごとの重みで統合する。
+ステージごとに次の項目を設定でき、問題ごとの採点基準（grading_criteria の "pipeline"）で上書きできる。
+- timeout: タイムアウト秒数（0はタイムアウトなし）
+- cost: 予算の消費量（パイプラインの budget を超えるステージは実行しない）
+- skip_if: 省略条件（例: "rule_based.confidence>=0.8"。"combined" はそれまでの統合結果）
+得点を確定するステージ（トリアージなど）が結果を返した時点で以降のステージは実行しない。
+各ステージの状態・処理時間は結果の details["pipeline"] に記録する。
+"""
+import asyncio
+import inspect
+import json
+import logging
+import operator
+import re
+import time
+from functools import lru_cache
+from statistics import pvariance
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .analysis import AnalyzedAnswer, analyze_answer
+from .plan import ScoringPlan, get_plan
+from ..config import settings
+from ..utils import metrics
+from ..utils.startup import import_attribute
+
+logger = logging.getLogger(__name__)
+
+# ステージの状態
+STATUS_COMPLETED = "completed"      # 得点を出した
+STATUS_FINAL = "final"              # 得点を確定し、以降のステージを省略した
+STATUS_PASSED = "passed"            # 得点を確定するステージで該当なし
+STATUS_SKIPPED = "skipped"          # 省略条件に該当
+STATUS_OVER_BUDGET = "over_budget"  # 予算不足
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+# 省略条件で参照できる値と、それまでの統合結果を表すステージ名
+CONDITION_FIELDS = ("score", "percentage", "confidence")
+COMBINED = "combined"
+
+_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+_CONDITION_PATTERN = re.compile(r"^\s*(\w+)\.(\w+)\s*(>=|<=|==|>|<)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+# AI Engine内で完結する採点ステージ（ステージ名: (採点クラス, コスト)）
+LOCAL_SCORERS = {
+    "rule_based": (".rule_based:RuleBasedScoring", 1.0),
+    "semantic": (".semantic:SemanticScoring", 5.0),
+    "comprehensive": (".comprehensive:ComprehensiveScoring", 1.0),
+}
+
+# 採点手法別の改善提案（百分率がしきい値未満の場合）
+_SUGGESTIONS = {
+    "rule_based": ["キーワードをより多く含めることを検討してください", "文字数制限を意識して回答してください"],
+    "semantic": ["出題趣旨により適合した内容を心がけてください", "論理的な文章構成を意識してください"],
+    "comprehensive": ["プロジェクトマネジメントの観点を強化してください", "より実務的で具体的な内容を含めてください"],
+}
+
+
+class PipelineError(Exception):
+    """得点を出したステージがない"""
+
+
+class Condition(NamedTuple):
+    """ステージの省略条件"""
+    stage: str
+    field: str
+    op: str
+    value: float
+
+    @property
+    def expression(self) -> str:
+        return f"{self.stage}.{self.field}{self.op}{self.value:g}"
+
+    def holds(self, values: Mapping[str, Mapping[str, float]]) -> bool:
+        """条件を満たすか（参照先のステージが得点を出していない場合は満たさない）"""
+        measured = values.get(self.stage, {}).get(self.field)
+        return measured is not None and _OPERATORS[self.op](measured, self.value)
+
+
+@lru_cache(maxsize=256)
+def parse_condition(expression: str) -> Condition:
+    """省略条件の式（"<ステージ>.<score|percentage|confidence><比較演算子><数値>"）を解析"""
+    match = _CONDITION_PATTERN.match(expression)
+    if match is None or match.group(2) not in CONDITION_FIELDS:
+        raise ValueError(f"省略条件の形式が不正です: {expression!r}（例: rule_based.confidence>=0.8）")
+    stage, field, op, value = match.groups()
+    return Condition(stage, field, op, float(value))
+
+
+class StageSpec(NamedTuple):
+    """パイプラインでのステージの設定（None はステージの既定値）"""
+    name: str
+    timeout: Optional[float] = None
+    cost: Optional[float] = None
+    skip_if: Tuple[Condition, ...] = ()
+
+
+class PipelineConfig(NamedTuple):
+    """パイプラインの設定"""
+    stages: Tuple[StageSpec, ...]
+    budget: Optional[float] = None  # 1解答あたりのコスト予算（0は無制限、None は既定値）
+
+
+def _parse_stage(spec: Any) -> StageSpec:
+    if isinstance(spec, str):
+        return StageSpec(spec.strip())
+    if not isinstance(spec, Mapping) or not spec.get("name"):
+        raise ValueError(f"ステージの設定が不正です: {spec!r}")
+
+    skip_if = spec.get("skip_if") or ()
+    if isinstance(skip_if, str):
+        skip_if = [skip_if]
+    timeout = spec.get("timeout")
+    cost = spec.get("cost")
+    return StageSpec(
+        name=str(spec["name"]),
+        timeout=float(timeout) if timeout is not None else None,
+        cost=float(cost) if cost is not None else None,
+        skip_if=tuple(parse_condition(str(expression)) for expression in skip_if)
+    )
+
+
+def parse_pipeline(config: Any) -> PipelineConfig:
+    """宣言的な設定からパイプライン設定を作成
+
+    configはステージ名のカンマ区切り文字列、ステージ（名前または設定の辞書）のリスト、
+    {"stages": [...], "budget": 100} の辞書のいずれか。
+    """
+    budget = None
+    if isinstance(config, Mapping):
+        budget = config.get("budget")
+        config = config.get("stages")
+    if isinstance(config, str):
+        config = [name for name in config.split(",") if name.strip()]
+    if not isinstance(config, (list, tuple)) or not config:
+        raise ValueError(f"採点パイプラインの設定が不正です: {config!r}")
+
+    stages = tuple(_parse_stage(spec) for spec in config)
+    return PipelineConfig(stages, float(budget) if budget is not None else None)
+
+
+def default_pipeline_config() -> PipelineConfig:
+    """設定（SCORING_PIPELINE・SCORING_STAGE_OPTIONS・SCORING_BUDGET）による既定のパイプライン"""
+    options = json.loads(settings.SCORING_STAGE_OPTIONS) if settings.SCORING_STAGE_OPTIONS.strip() else {}
+    names = [name.strip() for name in settings.SCORING_PIPELINE.split(",") if name.strip()]
+    return parse_pipeline({
+        "stages": [{**options.get(name, {}), "name": name} for name in names],
+        "budget": settings.SCORING_BUDGET
+    })
+
+
+class Stage(NamedTuple):
+    """ステージの実装
+
+    run(context) は得点（score・max_score・percentage・confidence・details・reasons を持つ辞書）を返す。
+    final=True のステージは採点結果（ScoringResponse形式の辞書）を返した時点で採点を確定し、None なら次のステージへ進む。
+    同期関数はタイムアウトを指定した場合のみスレッドで実行する。
+    raise_errors=True のステージの例外（LLMの過負荷・利用不可など）は記録せず呼び出し元に伝える。
+    """
+    run: Callable[["StageContext"], Any]
+    final: bool = False
+    cost: float = 0.0
+    timeout: float = 0.0
+    raise_errors: bool = False
+
+
+class StageContext:
+    """ステージに渡す採点対象と、先行ステージの得点"""
+
+    def __init__(
+        self,
+        answer_text: str,
+        question_data: Mapping[str, Any],
+        plan: ScoringPlan,
+        analysis: Optional[AnalyzedAnswer] = None,
+        options: Optional[Mapping[str, Any]] = None
+    ):
+        self.answer_text = answer_text
+        self.question_data = question_data
+        self.plan = plan
+        # 呼び出し元からステージへの追加情報（キュー待ちの上限など）
+        self.options = dict(options or {})
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._analysis = analysis
+
+    @property
+    def analysis(self) -> AnalyzedAnswer:
+        """解答の解析結果（ローカルの採点ステージを実行する場合のみ求める）"""
+        if self._analysis is None:
+            self._analysis = analyze_answer(self.answer_text, self.question_data)
+        return self._analysis
+
+    def values(self) -> Dict[str, Dict[str, float]]:
+        """省略条件で参照する値（ステージ別と、それまでの統合結果）"""
+        values = {
+            name: {field: result.get(field) for field in CONDITION_FIELDS}
+            for name, result in self.results.items()
+        }
+        if self.results:
+            combined = combine(self.results, self.plan)
+            values[COMBINED] = {
+                "score": combined["total_score"],
+                "percentage": combined["percentage"],
+                "confidence": combined["confidence"]
+            }
+        return values
+
+
+def calculate_confidence(scores: Sequence[float]) -> float:
+    """信頼度計算（採点手法間のスコア（0〜1）の分散が小さいほど高い）"""
+    if not scores or len(scores) < 2:
+        return 0.5
+
+    # スコアの分散を計算（3値程度のためnumpyは使わない）
+    variance = pvariance(scores)
+
+    # 最大分散は0.25（0と1の間の分散）なので、それで正規化
+    max_variance = 0.25
+    confidence = 1 - min(variance / max_variance, 1.0)
+
+    # 最低信頼度を0.3、最高を0.9に調整
+    confidence = 0.3 + (confidence * 0.6)
+
+    return round(confidence, 2)
+
+
+def generate_suggestions(results: Mapping[str, Mapping[str, Any]]) -> List[str]:
+    """改善提案生成（ルールベース・意味理解・総合評価の採点結果から）"""
+    suggestions = []
+    percentages = []
+    for name, messages in _SUGGESTIONS.items():
+        if name not in results:
+            continue
+        percentage = results[name].get("percentage", 0)
+        percentages.append(percentage)
+        if percentage < 60:
+            suggestions.extend(messages)
+
+    # 全体的なスコアが低い場合
+    if percentages and sum(percentages) / len(percentages) < 50:
+        suggestions.append("模範解答を参考に、より包括的な回答を心がけてください")
+
+    return suggestions
+
+
+def combine(results: Mapping[str, Mapping[str, Any]], plan: ScoringPlan) -> Dict[str, Any]:
+    """得点を出したステージの結果を問題ごとの重みで統合
+
+    1つのステージだけが得点を出した場合はその結果をそのまま採点結果とする。
+    """
+    if len(results) == 1:
+        name, result = next(iter(results.items()))
+        return {
+            "total_score": result["score"],
+            "max_score": result.get("max_score", plan.points),
+            "percentage": result.get("percentage", 0),
+            "confidence": result.get("confidence", 0.5),
+            "rule_based_score": result["score"] if name == "rule_based" else None,
+            "semantic_score": result["score"] if name == "semantic" else None,
+            "comprehensive_score": result["score"] if name in ("comprehensive", "llm") else None,
+            "details": dict(result.get("details", {})),
+            "reasons": list(result.get("reasons", [])),
+            "suggestions": list(result.get("suggestions", [])) + generate_suggestions(results),
+            "model_name": result.get("model_name", "integrated_scoring_engine"),
+            "temperature": result.get("temperature", settings.TEMPERATURE),
+            "tokens_used": result.get("tokens_used", 0)
+        }
+
+    points = plan.points
+    weights = {name: plan.weights.get(name, 0.0) for name in results}
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        weights = {name: 1.0 / len(results) for name in results}
+    elif abs(total_weight - 1.0) > 1e-9:
+        weights = {name: weight / total_weight for name, weight in weights.items()}
+
+    # 重み付き平均
+    total_score = 0
+    for name, result in results.items():
+        total_score += result.get("score", 0) * weights[name]
+
+    confidence = calculate_confidence([result.get("percentage", 0) / 100 for result in results.values()])
+
+    llm = results.get("llm", {})
+    details = {name: result.get("details", {}) for name, result in results.items()}
+    details["integration"] = {"weights": weights, "method": "weighted_average"}
+
+    return {
+        "total_score": total_score,
+        "max_score": points,
+        "percentage": (total_score / points) * 100,
+        "confidence": confidence,
+        "rule_based_score": results.get("rule_based", {}).get("score"),
+        "semantic_score": results.get("semantic", {}).get("score"),
+        # LLMの得点を総合評価の得点とする
+        "comprehensive_score": (llm or results.get("comprehensive", {})).get("score"),
+        "details": details,
+        "reasons": [reason for result in results.values() for reason in result.get("reasons", [])],
+        "suggestions": [suggestion for result in results.values() for suggestion in result.get("suggestions", [])]
+        + generate_suggestions(results),
+        "model_name": llm.get("model_name", "integrated_scoring_engine"),
+        "temperature": llm.get("temperature", settings.TEMPERATURE),
+        "tokens_used": sum(result.get("tokens_used", 0) for result in results.values())
+    }
+
+
+class _ScorerStage:
+    """採点クラスによるステージ（採点クラスは初回の実行時に読み込む）"""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self._scorer = None
+
+    def __call__(self, context: StageContext) -> Dict[str, Any]:
+        if self._scorer is None:
+            self._scorer = import_attribute(self.spec, __package__)()
+        return self._scorer.score(context.answer_text, context.question_data, context.analysis, context.plan)
+
+
+def local_stages() -> Dict[str, Stage]:
+    """AI Engine内で完結する採点ステージ（ルールベース・意味理解・総合評価）"""
+    return {name: Stage(run=_ScorerStage(spec), cost=cost) for name, (spec, cost) in LOCAL_SCORERS.items()}
+
+
+class ScoringPipeline:
+    """宣言的な設定に従ってステージを順に実行する採点パイプライン"""
+
+    def __init__(self, stages: Mapping[str, Stage], config: PipelineConfig, question_overrides: bool = True):
+        self.stages = dict(stages)
+        self.config = self._validate(config)
+        # 問題ごとのパイプライン設定（grading_criteria の "pipeline"）を適用するか
+        self.question_overrides = question_overrides
+
+    def _validate(self, config: PipelineConfig) -> PipelineConfig:
+        unknown = [spec.name for spec in config.stages if spec.name not in self.stages]
+        if unknown:
+            raise ValueError(f"未対応の採点ステージです: {', '.join(unknown)}")
+        return config
+
+    def config_for(self, plan: ScoringPlan) -> PipelineConfig:
+        """問題に適用するパイプライン設定（問題ごとの設定が不正な場合は既定の設定）"""
+        if not self.question_overrides:
+            return self.config
+        try:
+            config = plan.pipeline_config()
+            return self.config if config is None else self._validate(config)
+        except ValueError as e:
+            logger.error(f"採点パイプラインの設定エラー（既定の設定を使用）: question_id={plan.question_id}, {e}")
+            return self.config
+
+    def uses(self, stage: str, question_data: Mapping[str, Any]) -> bool:
+        """問題のパイプラインにステージが含まれるか"""
+        return any(spec.name == stage for spec in self.config_for(get_plan(question_data)).stages)
+
+    async def score(
+        self,
+        answer_text: str,
+        question_data: Mapping[str, Any],
+        analysis: Optional[AnalyzedAnswer] = None,
+        options: Optional[Mapping[str, Any]] = None,
+        exclude: Sequence[str] = ()
+    ) -> Dict[str, Any]:
+        """パイプラインで採点（excludeのステージは実行しない）"""
+        start_time = time.perf_counter()
+        plan = get_plan(question_data)
+        config = self.config_for(plan)
+        budget = config.budget if config.budget is not None else (self.config.budget or 0)
+        context = StageContext(answer_text, question_data, plan, analysis, options)
+
+        records = []
+        spent = 0.0
+        final = None
+        for spec in config.stages:
+            if spec.name in exclude:
+                continue
+            stage = self.stages[spec.name]
+            cost = spec.cost if spec.cost is not None else stage.cost
+            record = {"stage": spec.name, "cost": cost}
+            records.append(record)
+
+            condition = None
+            if spec.skip_if:
+                values = context.values()
+                condition = next((condition for condition in spec.skip_if if condition.holds(values)), None)
+            if condition is not None:
+                record.update(status=STATUS_SKIPPED, condition=condition.expression)
+            elif budget and spent + cost > budget:
+                record["status"] = STATUS_OVER_BUDGET
+            else:
+                spent += cost
+                timeout = spec.timeout if spec.timeout is not None else stage.timeout
+                outcome = await self._run_stage(spec.name, stage, context, timeout, record)
+                if record["status"] == STATUS_COMPLETED:
+                    if stage.final:
+                        if outcome is None:
+                            record["status"] = STATUS_PASSED
+                        else:
+                            record["status"] = STATUS_FINAL
+                            final = outcome
+                    else:
+                        context.results[spec.name] = outcome
+
+            metrics.PIPELINE_STAGES.inc(stage=spec.name, status=record["status"])
+            if final is not None:
+                break
+
+        if final is not None:
+            result = dict(final)
+            result["details"] = dict(final.get("details", {}))
+        elif context.results:
+            result = combine(context.results, plan)
+        else:
+            raise PipelineError("得点を出した採点ステージがありません")
+
+        result["details"]["pipeline"] = {
+            "stages": records,
+            "budget": budget,
+            "spent": spent,
+            "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 3)
+        }
+        return result
+
+    async def _run_stage(self, name: str, stage: Stage, context: StageContext, timeout: float, record: Dict[str, Any]):
+        """ステージを実行し、状態と処理時間を記録"""
+        stage_start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(stage.run):
+                call = stage.run(context)
+                outcome = await (asyncio.wait_for(call, timeout) if timeout else call)
+            elif timeout:
+                # 同期処理はスレッドで実行（タイムアウト後も処理自体は中断されない）
+                outcome = await asyncio.wait_for(asyncio.to_thread(stage.run, context), timeout)
+            else:
+                outcome = stage.run(context)
+            record["status"] = STATUS_COMPLETED
+            return outcome
+        except asyncio.TimeoutError:
+            record["status"] = STATUS_TIMEOUT
+            logger.warning(f"採点ステージがタイムアウトしました: {name} ({timeout}秒)")
+            if stage.raise_errors:
+                metrics.PIPELINE_STAGES.inc(stage=name, status=STATUS_TIMEOUT)
+                raise
+        except Exception as e:
+            record.update(status=STATUS_ERROR, error=str(e))
+            if stage.raise_errors:
+                metrics.PIPELINE_STAGES.inc(stage=name, status=STATUS_ERROR)
+                raise
+            logger.error(f"採点ステージエラー: {name}: {e}")
+        finally:
+            elapsed = time.perf_counter() - stage_start
+            record["elapsed_ms"] = round(elapsed * 1000, 3)
+            metrics.PIPELINE_STAGE_SECONDS.observe(elapsed, stage=name)
+        return None
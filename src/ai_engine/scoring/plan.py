@@ -0,0 +1,204 @@
+"""
+問題ごとの採点計画（ScoringPlan）
+
+キーワードの正規化・類義語の展開・照合オートマトン・文字数のしきい値・採点手法の重み・模範解答の特徴量など、
+解答によらない採点の準備を問題データから一度だけ行い、問題内容のハッシュごとにLRUキャッシュする。
+各採点クラスは計画と解答だけから得点を求めるため、同じ問題の解答ごとに準備をやり直さない。
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from .analysis import (
+    AnalyzedAnswer, analyze_terms, answer_hit_matrix, normalize_terms, normalize_text,
+    question_keywords, question_synonyms
+)
+from .dedup import dedup_text
+from .matcher import get_matcher
+from ..config import settings
+from ..utils.metrics import CACHE_HITS, CACHE_MISSES
+
+logger = logging.getLogger(__name__)
+
+# 採点手法の重み（設計書に従う。grading_criteria の "weights" で問題ごとに変更できる）
+# 相対値で、統合時に実行した採点手法の重みの合計が1になるよう正規化する
+DEFAULT_WEIGHTS = {
+    "rule_based": 0.3,
+    "semantic": 0.4,
+    "comprehensive": 0.3,
+    "llm": 1.0
+}
+
+# 採点計画に影響する問題データの項目
+PLAN_FIELDS = (
+    "question_text", "model_answer", "grading_intention", "keywords",
+    "max_chars", "points", "grading_criteria"
+)
+
+# 意味理解採点のTF-IDFモデルの参照文となる項目
+SEMANTIC_FIELDS = ("model_answer", "grading_intention", "question_text")
+
+
+def plan_fingerprint(question_data: Mapping[str, Any]) -> str:
+    """採点計画に影響する問題データのハッシュ"""
+    payload = json.dumps(
+        [question_data.get(key) for key in PLAN_FIELDS],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def question_weights(question_data: Mapping[str, Any]) -> Dict[str, float]:
+    """採点手法の重み（grading_criteria の "weights" で指定した手法のみ上書き）"""
+    weights = dict(DEFAULT_WEIGHTS)
+    criteria = question_data.get("grading_criteria") or {}
+    configured = criteria.get("weights") if isinstance(criteria, Mapping) else None
+    if configured is None:
+        return weights
+    if not isinstance(configured, Mapping):
+        logger.warning(f"採点手法の重みの形式が不正なため既定値を使用します: {configured!r}")
+        return weights
+
+    for name, value in configured.items():
+        if name not in weights or isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            logger.warning(f"採点手法の重みを無視します: {name}={value!r}")
+            continue
+        weights[name] = float(value)
+
+    if sum(weights.values()) <= 0:
+        logger.warning("採点手法の重みの合計が0のため既定値を使用します")
+        return dict(DEFAULT_WEIGHTS)
+    return weights
+
+
+def _scaled(value: Any, ratios: Sequence[float]) -> Optional[Tuple[float, ...]]:
+    """文字数制限に割合を掛けたしきい値（文字数制限が数値でない場合は None）"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return tuple(value * ratio for ratio in ratios)
+
+
+class ScoringPlan:
+    """1つの問題の採点計画（作成後は変更しない）"""
+
+    def __init__(self, question_data: Mapping[str, Any], fingerprint: Optional[str] = None):
+        self.fingerprint = fingerprint or plan_fingerprint(question_data)
+        self.question_id = question_data.get("question_id")
+        self.points = question_data.get("points", 100)
+        self.max_chars = question_data.get("max_chars", 40)
+
+        # キーワードと類義語（キーワードごとの照合語句。いずれかが出現すれば一致）
+        self.keywords: Tuple[str, ...] = tuple(question_data.get("keywords") or ())
+        synonyms = question_synonyms(question_data)
+        self.keyword_groups: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (keyword, tuple(dict.fromkeys(normalize_terms((keyword,) + synonyms.get(keyword, ())))))
+            for keyword in self.keywords
+        )
+        # 照合オートマトン（用語辞書＋キーワード・類義語）と解析キャッシュのキー
+        self.match_terms = question_keywords(question_data)
+        self.matcher = get_matcher(normalize_terms(self.match_terms))
+        self.keyword_term_ids: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(self.matcher.term_ids(terms)) for _, terms in self.keyword_groups
+        )
+
+        # 文字数のしきい値（ルールベース: 適切・良好、総合評価: 完全性の段階）
+        self.length_bounds = _scaled(self.max_chars, (0.7, 0.5))
+        self.completeness_bounds = _scaled(self.max_chars, (0.8, 0.6, 0.4))
+
+        self.weights: Dict[str, float] = question_weights(question_data)
+        # 採点パイプラインの設定（grading_criteria の "pipeline"、未指定は既定のパイプライン）
+        criteria = question_data.get("grading_criteria") or {}
+        self.pipeline_spec = criteria.get("pipeline") if isinstance(criteria, Mapping) else None
+        self._pipeline_config = None
+
+        # 模範解答の特徴量
+        model_answer = question_data.get("model_answer") or ""
+        self.model_answer = normalize_text(model_answer)
+        self.model_answer_digest = dedup_text(model_answer) if model_answer.strip() else ""
+        # 意味理解採点の参照文（TF-IDFモデルは一括採点で学習し直されるため計画には保持しない）
+        self.semantic_reference = {key: question_data.get(key) or "" for key in SEMANTIC_FIELDS}
+        self._semantic_key: Optional[str] = None
+
+    def analyze(self, answer: str) -> AnalyzedAnswer:
+        """解答を解析（同じ解答はキャッシュから返す）"""
+        return analyze_terms([answer], self.match_terms)[0]
+
+    def analyze_many(self, answers: Sequence[str]) -> Tuple[AnalyzedAnswer, ...]:
+        """複数の解答を解析"""
+        return analyze_terms(answers, self.match_terms)
+
+    def hit_matrix(self, answers: Sequence[str], texts: Sequence[str]):
+        """一括採点用の解答×語句の出現行列（textsは answers を normalize_text したもの）"""
+        return answer_hit_matrix(self.matcher, answers, texts, self.match_terms)
+
+    def keyword_hits(self, hits):
+        """出現行列から解答×キーワードの一致を求める（類義語のいずれかが出現すれば一致）"""
+        import numpy as np  # 一括採点時のみ使用
+
+        columns = [hits[:, list(term_ids)].any(axis=1) for term_ids in self.keyword_term_ids]
+        if not columns:
+            return np.zeros((len(hits), 0), dtype=bool)
+        return np.column_stack(columns)
+
+    def pipeline_config(self):
+        """問題ごとの採点パイプライン設定（未指定の場合は None、形式が不正な場合は ValueError）"""
+        if self.pipeline_spec is None:
+            return None
+        if self._pipeline_config is None:
+            from .pipeline import parse_pipeline
+            self._pipeline_config = parse_pipeline(self.pipeline_spec)
+        return self._pipeline_config
+
+    def semantic_model(self):
+        """意味理解採点のTF-IDFモデル"""
+        # scikit-learnは意味理解採点時のみ読み込む
+        from .semantic_model import get_semantic_model, question_fingerprint
+
+        if self._semantic_key is None:
+            self._semantic_key = question_fingerprint(self.semantic_reference)
+        return get_semantic_model(self.semantic_reference, key=self._semantic_key)
+
+
+class _ScoringPlanCache:
+    """問題内容のハッシュごとの採点計画のLRUキャッシュ（ワーカースレッドからも参照するためロック内で更新）"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._plans: "OrderedDict[str, ScoringPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, question_data: Mapping[str, Any]) -> ScoringPlan:
+        key = plan_fingerprint(question_data)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+        if plan is not None:
+            CACHE_HITS.inc(cache="scoring_plan")
+            return plan
+
+        CACHE_MISSES.inc(cache="scoring_plan")
+        plan = ScoringPlan(question_data, key)
+        if self.max_size > 0:
+            with self._lock:
+                # 同時に作成された場合は先に登録された計画を使う
+                plan = self._plans.setdefault(key, plan)
+                self._plans.move_to_end(key)
+                if len(self._plans) > self.max_size:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+
+scoring_plans = _ScoringPlanCache(settings.SCORING_PLAN_CACHE_SIZE)
+
+
+def get_plan(question_data: Mapping[str, Any]) -> ScoringPlan:
+    """問題の採点計画を取得（同じ内容の問題はキャッシュから返す）"""
+    return scoring_plans.get(question_data)
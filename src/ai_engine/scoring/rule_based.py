@@ -1,41 +1,114 @@
 """
 ルールベース採点
 """
-import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
 import logging
 
+from .analysis import AnalyzedAnswer, normalize_text
+from .matcher import MatchResult
+from .plan import ScoringPlan, get_plan
+
 logger = logging.getLogger(__name__)
 
 
+class RuleBasedBatchResult:
+    """ルールベース一括採点の結果（列形式）
+
+    各列は解答順のNumPy配列。詳細（details・reasons）は必要な解答だけ
+    result(i) で組み立てる。値は RuleBasedScoring.score と完全に一致する。
+    """
+
+    def __init__(
+        self,
+        scorer: "RuleBasedScoring",
+        answers: Sequence[str],
+        question_data: Dict[str, Any],
+        columns: Dict[str, Any],
+        plan: Optional[ScoringPlan] = None
+    ):
+        self._scorer = scorer
+        self._answers = answers
+        self._question_data = question_data
+        self._plan = plan
+
+        self.max_score = plan.points if plan is not None else question_data.get("points", 100)
+        self.scores = columns["scores"]
+        self.percentages = columns["percentages"]
+        self.keyword_scores = columns["keyword_scores"]
+        self.match_ratios = columns["match_ratios"]
+        self.length_scores = columns["length_scores"]
+        self.char_counts = columns["char_counts"]
+        self.structure_scores = columns["structure_scores"]
+        self.has_proper_structure = columns["has_proper_structure"]
+        self.has_causal_expressions = columns["has_causal_expressions"]
+        self.has_technical_terms = columns["has_technical_terms"]
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def result(self, index: int) -> Dict[str, Any]:
+        """1件分の採点結果（score()と同じ形式）を組み立てる"""
+        return self._scorer.score(self._answers[index], self._question_data, plan=self._plan)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """全件の採点結果を組み立てる"""
+        return [self.result(index) for index in range(len(self))]
+
+    def as_columns(self) -> Dict[str, List[Any]]:
+        """JSON化可能な列形式"""
+        return {
+            "score": self.scores.tolist(),
+            "percentage": self.percentages.tolist(),
+            "keyword_score": self.keyword_scores.tolist(),
+            "match_ratio": self.match_ratios.tolist(),
+            "length_score": self.length_scores.tolist(),
+            "char_count": self.char_counts.tolist(),
+            "structure_score": self.structure_scores.tolist(),
+            "has_proper_structure": self.has_proper_structure.tolist(),
+            "has_causal_expressions": self.has_causal_expressions.tolist(),
+            "has_technical_terms": self.has_technical_terms.tolist()
+        }
+
+
 class RuleBasedScoring:
     """ルールベース採点クラス"""
 
     def __init__(self):
         self.weight = 0.3  # 総合スコアでの重み
 
-    def score(self, answer: str, question_data: Dict[str, Any]) -> Dict[str, Any]:
-        """ルールベース採点実行"""
+    def score(
+        self,
+        answer: str,
+        question_data: Dict[str, Any],
+        analysis: Optional[AnalyzedAnswer] = None,
+        plan: Optional[ScoringPlan] = None
+    ) -> Dict[str, Any]:
+        """ルールベース採点実行
+
+        planには問題の採点計画、analysisには同じ解答・問題データの解析結果を渡す（省略時はキャッシュから取得）
+        """
         try:
-            model_answer = question_data.get("model_answer", "")
-            keywords = question_data.get("keywords", [])
-            max_chars = question_data.get("max_chars", 40)
-            points = question_data.get("points", 100)
+            if plan is None:
+                plan = get_plan(question_data)
+            if analysis is None:
+                analysis = plan.analyze(answer)
+
+            points = plan.points
 
             # 基本スコア算出
             score = 0
             details = {}
 
             # 1. キーワードマッチング (60%)
-            keyword_score, keyword_details = self._evaluate_keywords(answer, keywords)
+            keyword_score, keyword_details = self._evaluate_keywords(plan, analysis.matches)
             score += keyword_score * 0.6
 
             # 2. 文字数チェック (20%)
-            length_score, length_details = self._evaluate_length(answer, max_chars)
+            length_score, length_details = self._evaluate_length(analysis.length, plan)
             score += length_score * 0.2
 
             # 3. 必須要素チェック (20%)
-            structure_score, structure_details = self._evaluate_structure(answer, model_answer)
+            structure_score, structure_details = self._evaluate_structure(plan.model_answer, analysis.matches)
             score += structure_score * 0.2
 
             # スコアの正規化
@@ -67,15 +140,134 @@ class RuleBasedScoring:
                 "reasons": ["採点処理でエラーが発生しました"]
             }
 
-    def _evaluate_keywords(self, answer: str, keywords: List[str]) -> tuple:
-        """キーワード評価"""
+    def score_batch(
+        self,
+        answers: Sequence[str],
+        question_data: Dict[str, Any],
+        plan: Optional[ScoringPlan] = None
+    ) -> RuleBasedBatchResult:
+        """同一問題の解答をまとめて採点（列形式）
+
+        全解答を連結して照合オートマトンで1回だけ走査し、解答×語句の出現行列から
+        キーワード一致率・構造フラグを求め、段階評価・重み付けは配列演算で一括計算する。
+        キーワード編集後の全解答の再採点などで使用する。
+        """
+        import numpy as np  # 一括採点時のみ使用（起動時のインポートコストを避ける）
+
+        if plan is None:
+            plan = get_plan(question_data)
+        keywords = plan.keywords
+        max_chars = plan.max_chars
+        points = plan.points
+        count = len(answers)
+
+        if not max_chars or not points:
+            # 0除算となる問題データは1件ずつの採点（エラー結果）に合わせる
+            return self._score_batch_fallback(answers, question_data, plan)
+
+        # 1件ずつの採点（AnalyzedAnswer）と同じ正規化を行う
+        texts = [normalize_text(answer) for answer in answers]
+        matcher = plan.matcher
+        hits = plan.hit_matrix(answers, texts)
+
+        # 1. キーワードマッチング (60%)
+        if keywords:
+            # 重複したキーワードは1件ずつの採点と同様に別々に数える
+            matched_counts = plan.keyword_hits(hits).sum(axis=1)
+            match_ratios = matched_counts / len(keywords)
+            keyword_scores = np.select(
+                [match_ratios >= 0.8, match_ratios >= 0.6, match_ratios >= 0.4, match_ratios >= 0.2],
+                [1.0, 0.8, 0.6, 0.4],
+                default=0.2
+            )
+        else:
+            match_ratios = np.zeros(count)
+            keyword_scores = np.ones(count)
+
+        # 2. 文字数チェック (20%)
+        char_counts = np.fromiter((len(text) for text in texts), dtype=np.int64, count=count)
+        excess_ratios = (char_counts - max_chars) / max_chars
+        length_scores = np.select(
+            [
+                char_counts == 0,
+                (char_counts <= max_chars) & (char_counts >= max_chars * 0.7),
+                (char_counts <= max_chars) & (char_counts >= max_chars * 0.5),
+                char_counts <= max_chars,
+                excess_ratios <= 0.1,
+                excess_ratios <= 0.3
+            ],
+            [0.0, 1.0, 0.9, 0.7, 0.9, 0.7],
+            default=0.5
+        )
+
+        # 3. 必須要素チェック (20%)
+        has_proper_structure = matcher.category_hits(hits, "punctuation")
+        has_causal_expressions = matcher.category_hits(hits, "causal")
+        has_technical_terms = matcher.category_hits(hits, "technical")
+        structure_scores = np.full(count, 0.5)
+        structure_scores = structure_scores + np.where(has_proper_structure, 0.2, 0.0)
+        structure_scores = structure_scores + np.where(has_causal_expressions, 0.2, 0.0)
+        structure_scores = structure_scores + np.where(has_technical_terms, 0.1, 0.0)
+        structure_scores = np.minimum(structure_scores, 1.0)
+
+        # score()と同じ演算順序で重み付けし、浮動小数点の結果を一致させる
+        raw_scores = keyword_scores * 0.6 + length_scores * 0.2 + structure_scores * 0.2
+        scores = np.minimum(raw_scores * points, points)
+
+        return RuleBasedBatchResult(self, answers, question_data, {
+            "scores": scores,
+            "percentages": (scores / points) * 100,
+            "keyword_scores": keyword_scores,
+            "match_ratios": match_ratios,
+            "length_scores": length_scores,
+            "char_counts": char_counts,
+            "structure_scores": structure_scores,
+            "has_proper_structure": has_proper_structure,
+            "has_causal_expressions": has_causal_expressions,
+            "has_technical_terms": has_technical_terms
+        }, plan)
+
+    def _score_batch_fallback(
+        self,
+        answers: Sequence[str],
+        question_data: Dict[str, Any],
+        plan: ScoringPlan
+    ) -> RuleBasedBatchResult:
+        """1件ずつの採点結果から列を組み立てる"""
+        import numpy as np
+
+        results = [self.score(answer, question_data, plan=plan) for answer in answers]
+
+        def column(getter, dtype=float):
+            return np.array([getter(result) for result in results], dtype=dtype)
+
+        def detail(section, key, default):
+            return lambda result: result["details"].get(section, {}).get(key, default)
+
+        return RuleBasedBatchResult(self, answers, question_data, {
+            "scores": column(lambda result: result["score"]),
+            "percentages": column(lambda result: result["percentage"]),
+            "keyword_scores": column(detail("keyword_evaluation", "score", 0.0)),
+            "match_ratios": column(detail("keyword_evaluation", "match_ratio", 0.0)),
+            "length_scores": column(detail("length_evaluation", "score", 0.0)),
+            "char_counts": np.array([len(normalize_text(answer)) for answer in answers], dtype=np.int64),
+            "structure_scores": column(detail("structure_evaluation", "score", 0.0)),
+            "has_proper_structure": column(detail("structure_evaluation", "has_proper_structure", False), bool),
+            "has_causal_expressions": column(detail("structure_evaluation", "has_causal_expressions", False), bool),
+            "has_technical_terms": column(detail("structure_evaluation", "has_technical_terms", False), bool)
+        }, plan)
+
+    def _evaluate_keywords(self, plan: ScoringPlan, matches: MatchResult) -> tuple:
+        """キーワード評価（類義語のいずれかが出現すればキーワードに一致）"""
+        keywords = plan.keywords
         if not keywords:
             return 1.0, {"matched": [], "total": 0, "score": 1.0}
 
-        matched_keywords = []
-        for keyword in keywords:
-            if keyword in answer:
-                matched_keywords.append(keyword)
+        terms = dict(plan.keyword_groups)
+        matched_keywords = [
+            keyword for keyword in keywords
+            if any(matches.contains(term) for term in terms[keyword])
+        ]
 
         match_ratio = len(matched_keywords) / len(keywords)
 
@@ -95,22 +287,26 @@ class RuleBasedScoring:
             "matched": matched_keywords,
             "total": len(keywords),
             "match_ratio": match_ratio,
-            "score": score
+            "score": score,
+            "offsets": {
+                keyword: sorted({offset for term in terms[keyword] for offset in matches.offsets(term)})
+                for keyword in matched_keywords
+            }
         }
 
-    def _evaluate_length(self, answer: str, max_chars: int) -> tuple:
-        """文字数評価"""
-        char_count = len(answer)
-
+    def _evaluate_length(self, char_count: int, plan: ScoringPlan) -> tuple:
+        """文字数評価（正規化後の文字数）"""
+        max_chars = plan.max_chars
         if char_count == 0:
             return 0.0, {"char_count": 0, "max_chars": max_chars, "score": 0.0, "status": "empty"}
 
         if char_count <= max_chars:
-            # 適切な長さ
-            if char_count >= max_chars * 0.7:
+            # 適切な長さ（しきい値は最大文字数の70%・50%）
+            optimal_chars, good_chars = plan.length_bounds
+            if char_count >= optimal_chars:
                 score = 1.0
                 status = "optimal"
-            elif char_count >= max_chars * 0.5:
+            elif char_count >= good_chars:
                 score = 0.9
                 status = "good"
             else:
@@ -136,54 +332,44 @@ class RuleBasedScoring:
             "status": status
         }
 
-    def _evaluate_structure(self, answer: str, model_answer: str) -> tuple:
+    def _evaluate_structure(self, model_answer: str, matches: MatchResult) -> tuple:
         """構造・論理性評価"""
         score = 0.5  # 基本点
 
+        has_proper_structure = self._has_proper_sentence_structure(matches)
+        has_causal_expressions = self._has_causal_expressions(matches)
+        has_technical_terms = self._has_technical_terms(matches)
+
         # 基本的な文構造チェック
-        if self._has_proper_sentence_structure(answer):
+        if has_proper_structure:
             score += 0.2
 
         # 因果関係の表現チェック
-        if self._has_causal_expressions(answer):
+        if has_causal_expressions:
             score += 0.2
 
         # 専門用語の使用チェック
-        if self._has_technical_terms(answer):
+        if has_technical_terms:
             score += 0.1
 
         return min(score, 1.0), {
-            "has_proper_structure": self._has_proper_sentence_structure(answer),
-            "has_causal_expressions": self._has_causal_expressions(answer),
-            "has_technical_terms": self._has_technical_terms(answer),
+            "has_proper_structure": has_proper_structure,
+            "has_causal_expressions": has_causal_expressions,
+            "has_technical_terms": has_technical_terms,
             "score": min(score, 1.0)
         }
 
-    def _has_proper_sentence_structure(self, text: str) -> bool:
-        """適切な文構造かチェック"""
-        # 句読点の使用
-        if "、" in text or "。" in text:
-            return True
-        # 文末が適切か
-        if text.endswith("。") or text.endswith("た。") or text.endswith("る。"):
-            return True
-        return False
-
-    def _has_causal_expressions(self, text: str) -> bool:
+    def _has_proper_sentence_structure(self, matches: MatchResult) -> bool:
+        """適切な文構造かチェック（句読点の使用。文末の「。」もここに含まれる）"""
+        return matches.has("punctuation")
+
+    def _has_causal_expressions(self, matches: MatchResult) -> bool:
         """因果関係表現のチェック"""
-        causal_patterns = [
-            "ため", "により", "によって", "原因", "理由", "結果",
-            "したがって", "そのため", "なので", "ので"
-        ]
-        return any(pattern in text for pattern in causal_patterns)
+        return matches.has("causal")
 
-    def _has_technical_terms(self, text: str) -> bool:
+    def _has_technical_terms(self, matches: MatchResult) -> bool:
         """技術用語・専門用語のチェック"""
-        technical_terms = [
-            "プロジェクト", "システム", "開発", "設計", "要件", "テスト",
-            "品質", "リスク", "マネジメント", "工程", "レビュー", "検証"
-        ]
-        return any(term in text for term in technical_terms)
+        return matches.has("technical")
 
     def _generate_reasons(self, keyword_details: Dict, length_details: Dict, structure_details: Dict) -> List[str]:
         """採点理由生成"""
@@ -1,37 +1,59 @@
 """
-意味理解採点（モック実装）
+意味理解採点（文字n-gram TF-IDF、埋め込みモデル設定時は埋め込みの類似度を併用）
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
 import logging
-import random
+
+import numpy as np
+
+from .analysis import AnalyzedAnswer, normalize_text
+from .matcher import MatchResult
+from .embedding import get_embedding_encoder
+from .plan import ScoringPlan, get_plan
+from .semantic_model import embedding_validity, fit_semantic_model, similarity_scores
 
 logger = logging.getLogger(__name__)
 
 
 class SemanticScoring:
-    """意味理解採点クラス（モック実装）"""
+    """意味理解採点クラス
+
+    問題ごとに学習した文字n-gram TF-IDFで、模範解答・出題趣旨とのコサイン類似度を求める。
+    乱数を使わないため、同じ解答には常に同じスコアを返す（結果をキャッシュできる）。
+    埋め込みモデル（EMBEDDING_BACKEND）が設定されている場合、意味的妥当性は埋め込みの類似度で求める。
+    """
 
     def __init__(self):
         self.weight = 0.4  # 総合スコアでの重み
 
-    def score(self, answer: str, question_data: Dict[str, Any]) -> Dict[str, Any]:
-        """意味理解採点実行（モック）"""
+    def score(
+        self,
+        answer: str,
+        question_data: Dict[str, Any],
+        analysis: Optional[AnalyzedAnswer] = None,
+        plan: Optional[ScoringPlan] = None
+    ) -> Dict[str, Any]:
+        """意味理解採点実行"""
         try:
-            model_answer = question_data.get("model_answer", "")
-            grading_intention = question_data.get("grading_intention", "")
-            points = question_data.get("points", 100)
-
-            # モック実装: 実際のLLM/embedding処理の代わりに
-            # 簡単な類似度計算とランダム要素を組み合わせ
-
-            # 1. 語彙的類似度（簡易版）
-            lexical_similarity = self._calculate_lexical_similarity(answer, model_answer)
-
-            # 2. 意味的妥当性（モック）
-            semantic_validity = self._mock_semantic_validity(answer, grading_intention)
-
-            # 3. 論理的整合性（モック）
-            logical_consistency = self._mock_logical_consistency(answer)
+            if plan is None:
+                plan = get_plan(question_data)
+            if analysis is None:
+                analysis = plan.analyze(answer)
+
+            points = plan.points
+            model = plan.semantic_model()
+
+            # 1. 語彙的類似度（模範解答とのコサイン類似度）
+            # 2. 意味的妥当性（出題趣旨とのコサイン類似度）
+            lexical, validity = similarity_scores(model.similarities([analysis.text]), model)
+            embedding = self._embedding_validity([analysis.text], model)
+            if embedding is not None:
+                validity = embedding
+            lexical_similarity = float(lexical[0])
+            semantic_validity = float(validity[0])
+
+            # 3. 論理的整合性
+            logical_consistency = self._evaluate_logical_consistency(analysis.matches)
 
             # 総合スコア算出
             semantic_score = (
@@ -46,14 +68,14 @@ class SemanticScoring:
                 "lexical_similarity": lexical_similarity,
                 "semantic_validity": semantic_validity,
                 "logical_consistency": logical_consistency,
-                "method": "mock_semantic_analysis"
+                "method": "char_ngram_tfidf" if embedding is None else "char_ngram_tfidf+embedding"
             }
 
             return {
                 "score": final_score,
                 "max_score": points,
                 "percentage": semantic_score * 100,
-                "confidence": 0.7,  # モック実装なので中程度の信頼度
+                "confidence": 0.7,
                 "details": details,
                 "reasons": self._generate_reasons(details)
             }
@@ -69,52 +91,74 @@ class SemanticScoring:
                 "reasons": ["意味理解採点でエラーが発生しました"]
             }
 
-    def _calculate_lexical_similarity(self, answer: str, model_answer: str) -> float:
-        """語彙的類似度計算（簡易版）"""
-        if not answer or not model_answer:
-            return 0.0
-
-        # 単語レベルでの重複計算
-        answer_words = set(answer)
-        model_words = set(model_answer)
-
-        if not model_words:
-            return 0.0
-
-        intersection = answer_words & model_words
-        similarity = len(intersection) / len(model_words)
-
-        return min(similarity * 1.5, 1.0)  # 多少補正
-
-    def _mock_semantic_validity(self, answer: str, grading_intention: str) -> float:
-        """意味的妥当性評価（モック）"""
-        # 実際の実装では、LLMを使用して出題趣旨との合致度を評価
-
-        # 長さベースの簡易評価
-        if len(answer) < 10:
-            return 0.3
-        elif len(answer) < 20:
-            return 0.6
+    def score_batch(
+        self,
+        answers: Sequence[str],
+        question_data: Dict[str, Any],
+        fit_corpus: bool = True,
+        plan: Optional[ScoringPlan] = None
+    ) -> Dict[str, np.ndarray]:
+        """同一問題の解答をまとめて採点（列形式）
+
+        fit_corpusがTrueの場合はこの解答群を含めてTF-IDFを学習する（キャッシュ済みのscore()用のモデルは変更しない）。
+        類似度は全解答分を1回の疎行列積で計算する。
+        """
+        if plan is None:
+            plan = get_plan(question_data)
+        texts = [normalize_text(answer) for answer in answers]
+        if fit_corpus:
+            model, similarities = fit_semantic_model(plan.semantic_reference, texts)
         else:
-            return 0.8 + random.uniform(0, 0.2)  # 模擬的なバリエーション
-
-    def _mock_logical_consistency(self, answer: str) -> float:
-        """論理的整合性評価（モック）"""
-        # 実際の実装では、論理構造の分析を行う
-
+            model = plan.semantic_model()
+            similarities = model.similarities(texts)
+        lexical, validity = similarity_scores(similarities, model)
+        embedding = self._embedding_validity(texts, model)
+        if embedding is not None:
+            validity = embedding
+
+        matcher = plan.matcher
+        hits = plan.hit_matrix(answers, texts)
+        logical = np.full(len(texts), 0.5)
+        logical = logical + np.where(matcher.category_hits(hits, "logical_connector"), 0.2, 0.0)
+        logical = logical + np.where(matcher.category_hits(hits, "negation"), 0.1, 0.0)
+        logical = logical + np.where(matcher.category_hits(hits, "specificity"), 0.2, 0.0)
+        logical = np.minimum(logical, 1.0)
+
+        semantic_scores = lexical * 0.4 + validity * 0.4 + logical * 0.2
+        points = plan.points
+
+        return {
+            "scores": semantic_scores * points,
+            "percentages": semantic_scores * 100,
+            "lexical_similarity": lexical,
+            "semantic_validity": validity,
+            "logical_consistency": logical
+        }
+
+    def _embedding_validity(self, texts: Sequence[str], model) -> Optional[np.ndarray]:
+        """埋め込みによる意味的妥当性（埋め込みモデル未設定の場合は None）
+
+        解答・参照文の埋め込みは永続キャッシュから取得し、未計算の解答だけを推論する。
+        """
+        encoder = get_embedding_encoder()
+        if encoder is None:
+            return None
+        return embedding_validity(encoder.similarities(texts, model.reference_texts), model)
+
+    def _evaluate_logical_consistency(self, matches: MatchResult) -> float:
+        """論理的整合性評価（接続表現・否定表現・具体性の有無）"""
         score = 0.5  # 基本点
 
         # 論理的接続詞の存在
-        logical_connectors = ["ため", "により", "したがって", "そのため", "結果"]
-        if any(conn in answer for conn in logical_connectors):
+        if matches.has("logical_connector"):
             score += 0.2
 
         # 否定的・肯定的表現のバランス
-        if "ない" in answer or "しない" in answer:
+        if matches.has("negation"):
             score += 0.1
 
         # 具体性
-        if "具体的" in answer or "例えば" in answer:
+        if matches.has("specificity"):
             score += 0.2
 
         return min(score, 1.0)
@@ -150,6 +194,4 @@ class SemanticScoring:
         else:
             reasons.append("論理的整合性に課題がある")
 
-        reasons.append("※意味理解採点はモック実装です")
-
         return reasons
\ No newline at end of file
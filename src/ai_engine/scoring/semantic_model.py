@@ -0,0 +1,164 @@
+"""
+問題ごとの文字n-gram TF-IDFモデル
+
+模範解答・出題趣旨（と解答群）で問題ごとにTF-IDFを学習し、参照文のベクトルを事前計算しておく。
+解答との類似度は疎行列の積（L2正規化済みのためコサイン類似度）で一括計算する。
+日本語は分かち書きせず文字2〜3-gramで扱うため、形態素解析器やLLMは不要。
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .analysis import normalize_text
+from ..config import settings
+from ..utils.metrics import CACHE_HITS, CACHE_MISSES
+
+# 参照文の列（similaritiesの列順）
+REFERENCE_MODEL_ANSWER = 0
+REFERENCE_INTENTION = 1
+
+NGRAM_RANGE = (2, 3)
+
+
+def question_fingerprint(question_data: Mapping[str, Any]) -> str:
+    """TF-IDFモデルに影響する問題データのハッシュ"""
+    payload = json.dumps(
+        [question_data.get(key) or "" for key in ("model_answer", "grading_intention", "question_text")],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SemanticModel:
+    """1つの問題に対するTF-IDFモデルと参照ベクトル"""
+
+    def __init__(self, question_data: Mapping[str, Any], corpus: Sequence[str] = ()):
+        model_answer = normalize_text(question_data.get("model_answer", ""))
+        # 出題趣旨がない問題は問題文を参照文とする
+        intention = normalize_text(question_data.get("grading_intention") or question_data.get("question_text", ""))
+        self.has_model_answer = bool(model_answer.strip())
+        self.has_intention = bool(intention.strip())
+        self.corpus_size = len(corpus)
+        # 参照文（埋め込みとの類似度計算にも使用）
+        self.reference_texts = (model_answer, intention)
+
+        documents = [model_answer, intention] + [normalize_text(text) for text in corpus]
+        self.vectorizer: Optional[TfidfVectorizer] = TfidfVectorizer(
+            analyzer="char",
+            ngram_range=NGRAM_RANGE,
+            sublinear_tf=True,
+            dtype=np.float64
+        )
+        # 学習時の解答群と参照文の類似度（fit_semantic_model の戻り値用、キャッシュには保持しない）
+        self._corpus_similarities: Optional[np.ndarray] = None
+        try:
+            matrix = self.vectorizer.fit_transform(documents)
+            self.references = matrix[:2]
+            if corpus:
+                self._corpus_similarities = (matrix[2:] @ self.references.T).toarray()
+        except ValueError:
+            # 参照文・解答がすべて空（語彙なし）
+            self.vectorizer = None
+            self.references = None
+            if corpus:
+                self._corpus_similarities = np.zeros((len(corpus), 2))
+
+    def transform(self, texts: Sequence[str]):
+        """正規化済みテキストを疎ベクトル（L2正規化済み）に変換"""
+        return self.vectorizer.transform(texts)
+
+    def similarities(self, texts: Sequence[str]) -> np.ndarray:
+        """参照文とのコサイン類似度（行: 解答, 列: 模範解答・出題趣旨）
+
+        textsは normalize_text 済みのテキスト。全解答分を1回の疎行列積で計算する。
+        """
+        if self.vectorizer is None or not len(texts):
+            return np.zeros((len(texts), 2))
+        return (self.transform(texts) @ self.references.T).toarray()
+
+
+class _SemanticModelCache:
+    """問題データのハッシュごとのTF-IDFモデルのLRUキャッシュ"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._models: "OrderedDict[str, SemanticModel]" = OrderedDict()
+
+    def get(self, question_data: Mapping[str, Any], key: Optional[str] = None) -> SemanticModel:
+        key = key or question_fingerprint(question_data)
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            CACHE_HITS.inc(cache="semantic_model")
+            return model
+
+        CACHE_MISSES.inc(cache="semantic_model")
+        return self.put(key, SemanticModel(question_data))
+
+    def put(self, key: str, model: SemanticModel) -> SemanticModel:
+        self._models[key] = model
+        self._models.move_to_end(key)
+        if len(self._models) > self.max_size:
+            self._models.popitem(last=False)
+        return model
+
+    def clear(self):
+        self._models.clear()
+
+
+semantic_models = _SemanticModelCache(settings.SEMANTIC_MODEL_CACHE_SIZE)
+
+
+def get_semantic_model(question_data: Mapping[str, Any], key: Optional[str] = None) -> SemanticModel:
+    """問題のTF-IDFモデルを取得（未学習なら参照文のみで学習。keyは事前に求めた question_fingerprint）"""
+    return semantic_models.get(question_data, key)
+
+
+def fit_semantic_model(question_data: Mapping[str, Any], corpus: Sequence[str]) -> Tuple[SemanticModel, np.ndarray]:
+    """解答群を含めて問題のTF-IDFモデルを学習し、(モデル, 解答群の類似度) を返す
+
+    解答群ごとに結果が変わるモデルはキャッシュしない（score() は参照文のみで学習したモデルを使い続ける）。
+    学習と同時に求めた解答群の類似度も返す（再変換を省くため）。
+    """
+    model = SemanticModel(question_data, corpus)
+    similarities, model._corpus_similarities = model._corpus_similarities, None
+    if similarities is None:
+        similarities = np.zeros((0, 2))
+    return model, similarities
+
+
+def similarity_scores(similarities: np.ndarray, model: SemanticModel) -> Tuple[np.ndarray, np.ndarray]:
+    """類似度を0〜1のスコアに換算（語彙的類似度, 意味的妥当性）
+
+    短い解答と模範解答のコサイン類似度は1に届きにくいため1.5倍して上限1とする。
+    """
+    lexical = np.minimum(similarities[:, REFERENCE_MODEL_ANSWER] * 1.5, 1.0)
+    if not model.has_model_answer:
+        lexical = np.zeros(len(similarities))
+
+    if model.has_intention:
+        validity = np.minimum(similarities[:, REFERENCE_INTENTION] * 1.5, 1.0)
+    else:
+        validity = lexical.copy()
+
+    return lexical, validity
+
+
+def embedding_validity(similarities: np.ndarray, model: SemanticModel) -> np.ndarray:
+    """埋め込みの類似度（列: 模範解答・出題趣旨）を0〜1の意味的妥当性に換算
+
+    言い換えた解答も評価できるよう、存在する参照文のうち類似度が高い方を採用する。
+    """
+    columns = [
+        column for column, present in (
+            (REFERENCE_MODEL_ANSWER, model.has_model_answer),
+            (REFERENCE_INTENTION, model.has_intention)
+        ) if present
+    ]
+    if not columns:
+        return np.zeros(len(similarities))
+    return np.clip(similarities[:, columns].max(axis=1), 0.0, 1.0)
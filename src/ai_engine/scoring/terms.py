@@ -0,0 +1,49 @@
+"""
+採点用語辞書
+
+各採点クラスで使用する語句をカテゴリ別に定義する。
+TermMatcherはこの辞書（＋問題ごとのキーワード）から一度だけ構築される。
+"""
+from typing import Dict, Tuple
+
+# 問題ごとのキーワード用カテゴリ名
+KEYWORD_CATEGORY = "keyword"
+
+TERM_DICTIONARY: Dict[str, Tuple[str, ...]] = {
+    # ルールベース採点
+    "punctuation": ("、", "。"),
+    "causal": (
+        "ため", "により", "によって", "原因", "理由", "結果",
+        "したがって", "そのため", "なので", "ので"
+    ),
+    "technical": (
+        "プロジェクト", "システム", "開発", "設計", "要件", "テスト",
+        "品質", "リスク", "マネジメント", "工程", "レビュー", "検証"
+    ),
+
+    # 総合評価採点
+    "pm": (
+        "プロジェクト", "マネジメント", "ステークホルダー", "リスク",
+        "スケジュール", "品質", "コスト", "スコープ", "要件",
+        "工程", "フェーズ", "マイルストーン", "レビュー"
+    ),
+    "management": (
+        "管理", "計画", "統制", "監視", "制御", "調整",
+        "予防", "対策", "改善", "最適化"
+    ),
+    "problem_solving": ("原因", "要因", "解決", "対応", "改善", "防止"),
+    "concrete": (
+        "具体的", "明確", "詳細", "例えば", "実際に",
+        "現実的", "実用的", "実践的"
+    ),
+    "implementation": ("実施", "実行", "導入", "適用", "運用", "活用"),
+    "quantitative": (
+        "時間", "工数", "コスト", "期間", "工期", "人数",
+        "頻度", "回数", "割合", "率"
+    ),
+
+    # 意味理解採点
+    "logical_connector": ("ため", "により", "したがって", "そのため", "結果"),
+    "negation": ("ない", "しない"),
+    "specificity": ("具体的", "例えば"),
+}
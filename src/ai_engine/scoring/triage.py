@@ -0,0 +1,118 @@
+"""
+採点前のトリアージ（LLMを使わずに得点を確定できる解答の判定）
+
+白紙・極端に短い解答・字数制限を大きく超える解答・模範解答の丸写しは、
+決定的なルールで得点・信頼度・理由コードを付けてLLM採点を省略する。
+適用するルールとしきい値は設定（TRIAGE_*）で変更できる。
+"""
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
+
+from .dedup import dedup_text
+from .plan import ScoringPlan, get_plan
+from ..config import settings
+
+# 理由コード
+RULE_BLANK = "blank"
+RULE_TOO_SHORT = "too_short"
+RULE_OVER_LENGTH = "over_length"
+RULE_MODEL_ANSWER_COPY = "model_answer_copy"
+
+ALL_RULES = (RULE_BLANK, RULE_TOO_SHORT, RULE_OVER_LENGTH, RULE_MODEL_ANSWER_COPY)
+
+
+class TriageDecision(NamedTuple):
+    """トリアージ結果（LLM採点を省略して確定した得点）"""
+    rule: str          # 理由コード
+    score: float
+    max_score: float
+    confidence: float
+    reason: str
+
+
+class TriageRules:
+    """トリアージルールの設定"""
+
+    def __init__(
+        self,
+        enabled_rules: Sequence[str] = ALL_RULES,
+        min_chars: int = 2,
+        over_length_ratio: float = 1.5,
+        model_answer_score_ratio: float = 1.0
+    ):
+        unknown = set(enabled_rules) - set(ALL_RULES)
+        if unknown:
+            raise ValueError(f"未対応のトリアージルールです: {', '.join(sorted(unknown))}")
+        self.enabled_rules = frozenset(enabled_rules)
+        self.min_chars = min_chars
+        self.over_length_ratio = over_length_ratio
+        self.model_answer_score_ratio = model_answer_score_ratio
+
+    @classmethod
+    def from_settings(cls) -> "TriageRules":
+        return cls(
+            enabled_rules=[rule.strip() for rule in settings.TRIAGE_RULES.split(",") if rule.strip()],
+            min_chars=settings.TRIAGE_MIN_CHARS,
+            over_length_ratio=settings.TRIAGE_OVER_LENGTH_RATIO,
+            model_answer_score_ratio=settings.TRIAGE_MODEL_ANSWER_SCORE_RATIO
+        )
+
+    def evaluate(
+        self,
+        answer_text: str,
+        question_data: Mapping[str, Any],
+        plan: Optional[ScoringPlan] = None
+    ) -> Optional[TriageDecision]:
+        """ルールに該当すれば確定した得点を返す（該当しなければ None でLLM採点へ）
+
+        planを渡した場合、模範解答の正規化結果は計画で事前に求めたものを使う
+        """
+        points = question_data.get("points", 25)
+        text = (answer_text or "").strip()
+
+        if not text:
+            if RULE_BLANK in self.enabled_rules:
+                return TriageDecision(RULE_BLANK, 0.0, points, 1.0, "白紙解答のため0点")
+            return None
+
+        if RULE_TOO_SHORT in self.enabled_rules and len(dedup_text(text)) < self.min_chars:
+            return TriageDecision(RULE_TOO_SHORT, 0.0, points, 0.95, f"有効な文字が{self.min_chars}文字未満のため0点")
+
+        # 字数超過は字数制限と同じく空白を除かない解答文で数える
+        max_chars = question_data.get("max_chars") or 0
+        if (
+            RULE_OVER_LENGTH in self.enabled_rules
+            and max_chars > 0
+            and len(answer_text) > max_chars * self.over_length_ratio
+        ):
+            return TriageDecision(
+                RULE_OVER_LENGTH, 0.0, points, 0.9,
+                f"字数制限（{max_chars}字）を大幅に超過しているため0点（{len(answer_text)}字）"
+            )
+
+        if plan is not None:
+            model_answer_digest = plan.model_answer_digest
+        else:
+            model_answer = question_data.get("model_answer") or ""
+            model_answer_digest = dedup_text(model_answer) if model_answer.strip() else ""
+        if (
+            RULE_MODEL_ANSWER_COPY in self.enabled_rules
+            and model_answer_digest
+            and dedup_text(text) == model_answer_digest
+        ):
+            score = points * self.model_answer_score_ratio
+            return TriageDecision(RULE_MODEL_ANSWER_COPY, score, points, 0.95, f"模範解答と一致するため{score:g}点")
+
+        return None
+
+
+_rules: Optional[TriageRules] = None
+
+
+def triage_answer(answer_text: str, question_data: Mapping[str, Any]) -> Optional[TriageDecision]:
+    """設定されたルールでトリアージ（無効の場合は常に None）"""
+    global _rules
+    if not settings.TRIAGE_ENABLED:
+        return None
+    if _rules is None:
+        _rules = TriageRules.from_settings()
+    return _rules.evaluate(answer_text, question_data, get_plan(question_data))
@@ -0,0 +1,117 @@
+"""
+採点リクエストのアドミッション制御（過負荷時の負荷制限）
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """アドミッション制御によりリクエストが拒否された"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"{reason} (retry after {retry_after}s)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """同時実行数と待ち行列長を制限するアドミッション制御
+
+    実行枠（max_concurrency）が埋まっている間は最大max_queue件まで待機させ、
+    それを超える要求や待ち時間の上限を超えた要求は即座に拒否する。
+    呼び出し側が既に諦めた要求にGPU時間を使わないための仕組み。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        default_max_wait: float,
+        max_retry_after: int = 60,
+        smoothing: float = 0.2
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.default_max_wait = default_max_wait
+        self.max_retry_after = max_retry_after
+        self.smoothing = smoothing
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+        self._avg_service_time: Optional[float] = None
+        self._admitted = 0
+        self._rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """現在のスループット推定値（件/秒）"""
+        if not self._avg_service_time:
+            return None
+        return self.max_concurrency / self._avg_service_time
+
+    def retry_after(self) -> int:
+        """待ち行列が捌けるまでの推定秒数（Retry-Afterヘッダー用）"""
+        throughput = self.throughput
+        if throughput is None:
+            return 1
+
+        backlog = self._waiting + self._in_flight + 1
+        estimate = math.ceil(backlog / throughput)
+        return max(1, min(estimate, self.max_retry_after))
+
+    @asynccontextmanager
+    async def admit(self, max_wait: Optional[float] = None, units: int = 1) -> AsyncIterator[float]:
+        """実行枠を確保し、待機時間（秒）を返す
+
+        待ち行列が満杯、または待機時間がmax_waitを超えた場合はAdmissionRejectedを送出。
+        unitsには一括採点の件数を指定し、処理時間を1件あたりに換算して記録する。
+        """
+        if self._waiting >= self.max_queue and self._semaphore.locked():
+            self._rejected["queue_full"] += 1
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        wait_limit = self.default_max_wait if max_wait is None else max_wait
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=wait_limit)
+        except asyncio.TimeoutError:
+            self._rejected["queue_timeout"] += 1
+            raise AdmissionRejected("queue_timeout", self.retry_after())
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        self._admitted += 1
+        try:
+            yield started_at - queued_at
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+            self._record_service_time((time.perf_counter() - started_at) / max(units, 1))
+
+    def _record_service_time(self, elapsed: float):
+        """処理時間の指数移動平均を更新"""
+        if self._avg_service_time is None:
+            self._avg_service_time = elapsed
+        else:
+            self._avg_service_time += self.smoothing * (elapsed - self._avg_service_time)
+
+    def get_status(self) -> Dict[str, Any]:
+        """現在の状態を取得"""
+        throughput = self.throughput
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "admitted": self._admitted,
+            "rejected": dict(self._rejected),
+            "avg_service_time_ms": round(self._avg_service_time * 1000, 2) if self._avg_service_time else None,
+            "throughput_per_sec": round(throughput, 3) if throughput else None
+        }
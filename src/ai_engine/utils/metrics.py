@@ -0,0 +1,341 @@
+"""
+Prometheus形式のメトリクス収集
+
+外部ライブラリに依存しない最小実装（Counter / Gauge / Histogram）。
+/metrics エンドポイントからテキスト形式（version 0.0.4）で出力する。
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 採点処理向けのバケット境界（秒）。LLM応答は数秒〜数十秒かかるため上側を厚めにする
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """ラベル値のエスケープ"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    """ラベルを {a="x",b="y"} 形式に整形"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """数値の整形（整数は小数点なし）"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """メトリクスの基底クラス"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"ラベルが一致しません: {self.name} {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """単調増加するカウンター"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """カウントを加算"""
+        if amount < 0:
+            raise ValueError("Counterは減算できません")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        """現在値を取得"""
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """増減する現在値
+
+    collectを指定した場合は出力時に呼び出して値を取得する（プロバイダー状態など）。
+    """
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: str):
+        """値を設定"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """値を加算"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        """値を減算"""
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: str) -> float:
+        """現在値を取得"""
+        return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """ブロック実行中だけ値を1増やす"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            values = dict(self._values)
+        if self._collect:
+            values.update(self._collect())
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """累積バケット付きヒストグラム"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベル値ごとに [バケット別件数..., 合計, 件数]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        """観測値を記録"""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """ブロックの実行時間（秒）を記録"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels: str) -> int:
+        """観測件数を取得"""
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def get_sum(self, **labels: str) -> float:
+        """観測値の合計を取得"""
+        state = self._values.get(self._key(labels))
+        return state[-2] if state else 0.0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += state[i]
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """メトリクスの登録と出力"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """メトリクスを登録（同名は登録済みのものを返す）"""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """テキスト形式で出力"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# グローバルレジストリ
+registry = MetricsRegistry()
+
+# 採点リクエスト
+SCORE_REQUEST_SECONDS = registry.histogram(
+    "ai_engine_score_request_seconds",
+    "採点リクエスト全体の処理時間（キュー待ちを含む）",
+    ("endpoint",)
+)
+QUEUE_WAIT_SECONDS = registry.histogram(
+    "ai_engine_queue_wait_seconds",
+    "アドミッション制御での実行枠待ち時間",
+    ("endpoint",)
+)
+IN_FLIGHT = registry.gauge(
+    "ai_engine_in_flight_requests",
+    "処理中の採点リクエスト数",
+    ("endpoint",)
+)
+ERRORS = registry.counter(
+    "ai_engine_errors_total",
+    "種類別のエラー件数",
+    ("type",)
+)
+
+# LLM採点の各段階
+PROMPT_BUILD_SECONDS = registry.histogram(
+    "ai_engine_prompt_build_seconds",
+    "採点プロンプトの構築時間",
+    ("provider",)
+)
+LLM_SECONDS = registry.histogram(
+    "ai_engine_llm_seconds",
+    "LLM呼び出しの応答時間",
+    ("provider",)
+)
+PARSE_SECONDS = registry.histogram(
+    "ai_engine_parse_seconds",
+    "LLM応答の解析時間",
+    ("provider",)
+)
+PARSE_FALLBACKS = registry.counter(
+    "ai_engine_parse_fallbacks_total",
+    "JSON解析に失敗し正規表現による抽出にフォールバックした件数",
+    ("provider",)
+)
+
+# 採点前トリアージ（rule: 理由コード、LLM採点に回した解答は passed）
+TRIAGE_DECISIONS = registry.counter(
+    "ai_engine_triage_decisions_total",
+    "採点前トリアージの判定件数（問題別）",
+    ("question_id", "rule")
+)
+
+# アンカーからの得点伝播（outcome: propagated / passed）
+ANCHOR_DECISIONS = registry.counter(
+    "ai_engine_anchor_decisions_total",
+    "レビュー済み解答からの得点伝播の判定件数（問題別）",
+    ("question_id", "outcome")
+)
+
+# 一括採点の重複・類似解答検出（kind: representative / exact / near）
+DEDUP_ANSWERS = registry.counter(
+    "ai_engine_dedup_answers_total",
+    "重複検出で分類した解答件数（representative以外はLLM採点を省略）",
+    ("kind",)
+)
+
+# 採点パイプラインのステージ（status: completed / final / passed / skipped / over_budget / timeout / error）
+PIPELINE_STAGE_SECONDS = registry.histogram(
+    "ai_engine_pipeline_stage_seconds",
+    "採点パイプラインのステージ別処理時間",
+    ("stage",)
+)
+PIPELINE_STAGES = registry.counter(
+    "ai_engine_pipeline_stages_total",
+    "採点パイプラインのステージ別・状態別の件数",
+    ("stage", "status")
+)
+
+# キャッシュ
+CACHE_HITS = registry.counter(
+    "ai_engine_cache_hits_total",
+    "キャッシュヒット件数",
+    ("cache",)
+)
+CACHE_MISSES = registry.counter(
+    "ai_engine_cache_misses_total",
+    "キャッシュミス件数",
+    ("cache",)
+)
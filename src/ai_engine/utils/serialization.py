@@ -0,0 +1,185 @@
+"""
+API ↔ AI Engine間の高速シリアライズと圧縮
+
+- JSONはorjsonが利用可能ならorjsonで、なければ標準jsonでエンコード
+- Accept / Content-Type が application/x-msgpack の場合はMessagePackを使用
+- 一定サイズ以上の本文は Accept-Encoding に応じて zstd / gzip で圧縮
+"""
+import gzip
+import json
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from ..config import settings
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# 圧縮対象とする本文の最小バイト数
+COMPRESSION_MIN_SIZE = settings.COMPRESSION_MIN_SIZE
+
+# リクエストごとのネゴシエーション結果（レスポンス形式, Accept-Encoding）
+_negotiation: ContextVar[Tuple[str, str]] = ContextVar("negotiation", default=(JSON_MEDIA_TYPE, ""))
+
+
+def dumps_json(data: Any) -> bytes:
+    """JSONエンコード"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(body: bytes) -> Any:
+    """JSONデコード"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def is_msgpack(media_type: Optional[str]) -> bool:
+    """MessagePack形式かどうか"""
+    return bool(media_type) and "msgpack" in media_type
+
+
+def encode(data: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """指定形式でエンコード"""
+    if is_msgpack(media_type) and MSGPACK_AVAILABLE:
+        return msgpack.packb(data, use_bin_type=True)
+    return dumps_json(data)
+
+
+def decode(body: bytes, media_type: Optional[str] = JSON_MEDIA_TYPE) -> Any:
+    """指定形式でデコード"""
+    if is_msgpack(media_type):
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("msgpackがインストールされていません")
+        return msgpack.unpackb(body, raw=False)
+    return loads_json(body)
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """Acceptヘッダーからレスポンス形式を決定"""
+    if MSGPACK_AVAILABLE and is_msgpack(accept):
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def compress(body: bytes, accept_encoding: Optional[str], min_size: int = COMPRESSION_MIN_SIZE) -> Tuple[bytes, Optional[str]]:
+    """Accept-Encodingに応じて圧縮（zstd優先、次にgzip）"""
+    if len(body) < min_size or not accept_encoding:
+        return body, None
+
+    accept_encoding = accept_encoding.lower()
+    if ZSTD_AVAILABLE and "zstd" in accept_encoding:
+        return zstandard.ZstdCompressor(level=3).compress(body), "zstd"
+    if "gzip" in accept_encoding:
+        return gzip.compress(body, compresslevel=5), "gzip"
+
+    return body, None
+
+
+def decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """Content-Encodingに応じて展開"""
+    if not content_encoding or content_encoding == "identity":
+        return body
+    if content_encoding == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstandardがインストールされていません")
+        return zstandard.ZstdDecompressor().decompress(body)
+    if content_encoding == "gzip":
+        return gzip.decompress(body)
+
+    raise ValueError(f"未対応のContent-Encoding: {content_encoding}")
+
+
+class NegotiatedResponse(Response):
+    """Accept / Accept-Encoding に応じて形式と圧縮を切り替えるレスポンス"""
+
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(self, content: Any = None, status_code: int = 200, headers=None, media_type=None, background=None):
+        negotiated_type, accept_encoding = _negotiation.get()
+        media_type = media_type or negotiated_type
+
+        body, content_encoding = compress(encode(content, media_type), accept_encoding)
+        headers = dict(headers or {})
+        headers["vary"] = "Accept, Accept-Encoding"
+        if content_encoding:
+            headers["content-encoding"] = content_encoding
+
+        super().__init__(body, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        # __init__でエンコード済み
+        return content
+
+
+class NegotiatedRequest(Request):
+    """圧縮・MessagePack形式のリクエスト本文を透過的に展開するリクエスト"""
+
+    def __init__(self, scope, receive):
+        self.body_media_type = None
+        content_type = dict(scope.get("headers", [])).get(b"content-type", b"").decode("latin-1")
+        if is_msgpack(content_type):
+            # FastAPIにJSONとして本文を解析させるため、Content-Typeを差し替える
+            self.body_media_type = MSGPACK_MEDIA_TYPE
+            scope = dict(scope)
+            scope["headers"] = [
+                (key, b"application/json" if key == b"content-type" else value)
+                for key, value in scope["headers"]
+            ]
+        super().__init__(scope, receive)
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_decoded_body"):
+            raw_body = await super().body()
+            self._decoded_body = decompress(raw_body, self.headers.get("content-encoding"))
+        return self._decoded_body
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = decode(await self.body(), self.body_media_type)
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """リクエスト展開とレスポンス形式のネゴシエーションを行うルート"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            token = _negotiation.set((
+                negotiate_media_type(request.headers.get("accept")),
+                request.headers.get("accept-encoding", "")
+            ))
+            try:
+                return await handler(NegotiatedRequest(request.scope, request.receive))
+            finally:
+                _negotiation.reset(token)
+
+        return negotiated_handler
@@ -0,0 +1,82 @@
+"""
+起動時間計測とモジュールの遅延インポート
+"""
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """起動処理のフェーズ時間とモジュール別インポートコストを記録するクラス"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._imports: Dict[str, Dict[str, Any]] = {}
+        self._phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record_import(self, module_name: str, elapsed: float, lazy: bool = True):
+        """モジュールのインポートコストを記録"""
+        with self._lock:
+            if module_name in self._imports:
+                return
+            self._imports[module_name] = {
+                "module": module_name,
+                "import_ms": round(elapsed * 1000, 2),
+                "lazy": lazy,
+                "loaded_at_ms": round((time.perf_counter() - self.started_at) * 1000, 2)
+            }
+
+    def mark(self, phase: str):
+        """起動フェーズの到達時刻を記録"""
+        with self._lock:
+            self._phases.append({
+                "phase": phase,
+                "elapsed_ms": round((time.perf_counter() - self.started_at) * 1000, 2)
+            })
+
+    def as_dict(self) -> Dict[str, Any]:
+        """レポートを辞書形式で取得（インポートコストの大きい順）"""
+        with self._lock:
+            imports = sorted(self._imports.values(), key=lambda item: item["import_ms"], reverse=True)
+            return {
+                "phases": list(self._phases),
+                "imports": imports,
+                "total_import_ms": round(sum(item["import_ms"] for item in imports), 2)
+            }
+
+    def log_summary(self, limit: int = 10):
+        """インポートコスト上位をログ出力"""
+        report = self.as_dict()
+        top = ", ".join(f"{item['module']}={item['import_ms']}ms" for item in report["imports"][:limit])
+        logger.info(f"起動レポート: phases={report['phases']} imports=[{top}]")
+
+
+def timed_import(module_name: str, package: Optional[str] = None):
+    """モジュールをインポートし、初回のコストを起動レポートに記録"""
+    resolved_name = importlib.util.resolve_name(module_name, package) if module_name.startswith(".") else module_name
+    already_loaded = resolved_name in sys.modules
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name, package)
+    if not already_loaded:
+        startup_report.record_import(resolved_name, time.perf_counter() - start)
+
+    return module
+
+
+def import_attribute(path: str, package: Optional[str] = None):
+    """"module:Attribute" 形式のパスから属性を遅延インポート"""
+    module_name, _, attribute = path.partition(":")
+    module = timed_import(module_name, package)
+    return getattr(module, attribute) if attribute else module
+
+
+# グローバル起動レポート
+startup_report = StartupReport()
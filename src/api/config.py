@@ -12,6 +12,11 @@ class Settings(BaseSettings):
         "DATABASE_URL",
         "sqlite:///./pm_scoring.db"
     )
+    # 非同期ドライバ（asyncpg / aiosqlite）でAPIのデータベース処理を行う
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # 秒
 
     # Redis設定
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -28,6 +33,28 @@ class Settings(BaseSettings):
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.1"))
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1000"))
 
+    # AI Engine混雑時（429 Retry-After）の待機設定
+    AI_ENGINE_MAX_BUSY_WAIT: float = float(os.getenv("AI_ENGINE_MAX_BUSY_WAIT", "30"))  # API同期処理での累計待機上限（秒）
+    AI_ENGINE_BUSY_RETRIES: int = int(os.getenv("AI_ENGINE_BUSY_RETRIES", "5"))  # Celeryタスクでの再試行回数
+
+    # AI Engine通信設定
+    AI_ENGINE_BATCH_SIZE: int = int(os.getenv("AI_ENGINE_BATCH_SIZE", "20"))  # 一括採点1回あたりの件数
+    AI_ENGINE_COMPRESSION_MIN_SIZE: int = int(os.getenv("AI_ENGINE_COMPRESSION_MIN_SIZE", "1024"))  # 圧縮する本文の最小バイト数
+
+    # AI Engine接続プール設定（プロセスごとに共有するHTTPクライアント）
+    AI_ENGINE_HTTP2: bool = os.getenv("AI_ENGINE_HTTP2", "false").lower() == "true"  # h2が必要
+    AI_ENGINE_MAX_CONNECTIONS: int = int(os.getenv("AI_ENGINE_MAX_CONNECTIONS", "20"))
+    AI_ENGINE_MAX_KEEPALIVE: int = int(os.getenv("AI_ENGINE_MAX_KEEPALIVE", "10"))
+    AI_ENGINE_KEEPALIVE_EXPIRY: float = float(os.getenv("AI_ENGINE_KEEPALIVE_EXPIRY", "30"))  # 秒
+    AI_ENGINE_CONNECT_TIMEOUT: float = float(os.getenv("AI_ENGINE_CONNECT_TIMEOUT", "5"))  # 秒
+    AI_ENGINE_CONNECT_RETRIES: int = int(os.getenv("AI_ENGINE_CONNECT_RETRIES", "3"))  # 接続エラー時の再試行回数
+    AI_ENGINE_RETRY_BACKOFF: float = float(os.getenv("AI_ENGINE_RETRY_BACKOFF", "0.2"))  # 再試行の基準待機秒数
+
+    # プロセス内採点設定（AI Engineの採点ライブラリをAPI・Celeryワーカー内で実行）
+    SCORING_MODE: str = os.getenv("SCORING_MODE", "engine")  # engine: AI Engineで採点, local: プロセス内で採点（通信なし）
+    LOCAL_SCORING_STAGES: str = os.getenv("LOCAL_SCORING_STAGES", "rule_based")  # 例: "rule_based,semantic"（semanticはscikit-learnが必要）
+    LOCAL_SCORING_FALLBACK: bool = os.getenv("LOCAL_SCORING_FALLBACK", "true").lower() == "true"  # AI Engine障害時にプロセス内で採点
+
     # Celery設定
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
@@ -46,6 +73,18 @@ class Settings(BaseSettings):
     # 採点システム設定
     MAX_SCORING_WORKERS: int = int(os.getenv("MAX_SCORING_WORKERS", "4"))
     SCORING_TIMEOUT: int = int(os.getenv("SCORING_TIMEOUT", "300"))  # 5分
+    BULK_SUBMIT_CHUNK_SIZE: int = int(os.getenv("BULK_SUBMIT_CHUNK_SIZE", "500"))  # 解答一括提出の1トランザクションあたりの件数
+    BULK_SUBMIT_MAX_ITEMS: int = int(os.getenv("BULK_SUBMIT_MAX_ITEMS", "10000"))  # 解答一括提出の1リクエストあたりの上限
+    SCORING_ENGINE_VERSION: str = os.getenv("SCORING_ENGINE_VERSION", "1")  # 採点ロジック・プロンプトの版（変更すると既存の採点結果を再利用しない）
+    RESULT_CLEANUP_BATCH_SIZE: int = int(os.getenv("RESULT_CLEANUP_BATCH_SIZE", "1000"))  # 置き換え済みの採点結果の1回あたりの削除件数
+    RESULTS_PAGE_SIZE: int = int(os.getenv("RESULTS_PAGE_SIZE", "100"))  # 採点結果一覧の1ページあたりの既定件数
+    RESULTS_MAX_PAGE_SIZE: int = int(os.getenv("RESULTS_MAX_PAGE_SIZE", "1000"))  # 採点結果一覧の1ページあたりの上限
+    QUESTION_CACHE_TTL: float = float(os.getenv("QUESTION_CACHE_TTL", "300"))  # 問題の文字数制限・採点に使う内容のキャッシュ秒数
+
+    # 試験・問題カタログのキャッシュ設定
+    CATALOG_CACHE_TTL: float = float(os.getenv("CATALOG_CACHE_TTL", "300"))  # 秒（0でキャッシュしない）
+    CATALOG_REDIS: bool = os.getenv("CATALOG_REDIS", "false").lower() == "true"  # Redisでプロセス間の無効化・内容を共有
+    CATALOG_SYNC_INTERVAL: float = float(os.getenv("CATALOG_SYNC_INTERVAL", "1"))  # Redisの世代を確認する間隔（秒）
 
     model_config = {
         "env_file": ".env",
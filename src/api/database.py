@@ -2,26 +2,74 @@
 データベース設定とセッション管理
 """
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Union
 import logging
 
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# 非同期エンジンで使うドライバ（DATABASE_ASYNC=true の場合）
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite"
+}
+
+
+def _pool_options(database_url: str) -> Dict[str, Any]:
+    """接続プールの設定（SQLiteはSQLAlchemyの既定のプールを使う）"""
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT
+    }
+
+
+def async_database_url(database_url: str) -> str:
+    """DATABASE_URL を非同期ドライバのURLに変換（postgresql → asyncpg、sqlite → aiosqlite）"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"非同期ドライバに対応していないデータベースです: {backend}")
+    return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
 # SQLAlchemyエンジン作成
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
-    echo=settings.ENVIRONMENT == "development"
+    echo=settings.ENVIRONMENT == "development",
+    **_pool_options(settings.DATABASE_URL)
 )
 
 # セッションメーカー
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同期エンジン・セッションメーカー（DATABASE_ASYNC=true の場合のみ）
+# コミット後に属性を失効させると参照時に暗黙のクエリが発生するため expire_on_commit=False とする
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    try:
+        async_engine = create_async_engine(
+            async_database_url(settings.DATABASE_URL),
+            pool_pre_ping=True,
+            pool_recycle=300,
+            echo=settings.ENVIRONMENT == "development",
+            **_pool_options(settings.DATABASE_URL)
+        )
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    except (ImportError, ValueError) as e:
+        logger.error(f"非同期データベースエンジンの初期化に失敗したため同期セッションを使用します: {e}")
+
 # ベースクラス
 Base = declarative_base()
 
@@ -42,11 +90,42 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_db_session() -> AsyncGenerator[Union[Session, AsyncSession], None]:
+    """データベースセッションの依存性注入（DATABASE_ASYNC 有効時は AsyncSession、それ以外は Session）"""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
+
+def is_async_session(db: Any) -> bool:
+    """非同期セッションか判定"""
+    return isinstance(db, AsyncSession)
+
+
 async def init_db():
     """データベース初期化"""
     try:
         # テーブル作成
         Base.metadata.create_all(bind=engine)
+        # 既存のテーブルに不足している列・索引の追加
+        from .utils.schema_upgrade import upgrade_schema
+        upgrade_schema(engine)
         logger.info("データベーステーブルが正常に作成されました")
     except Exception as e:
         logger.error(f"データベース初期化エラー: {e}")
@@ -56,4 +135,6 @@ async def init_db():
 async def close_db():
     """データベース接続クローズ"""
     engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
     logger.info("データベース接続を閉じました")
\ No newline at end of file
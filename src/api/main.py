@@ -11,9 +11,11 @@ import time
 from contextlib import asynccontextmanager
 
 from .config import settings
-from .database import engine, Base
+from .database import engine, Base, close_db
 from .routers import health, scoring, admin, batch_upload, export
 from .models import exam, question, answer, scoring as scoring_models
+from .utils.ai_engine_client import get_ai_engine_client
+from .utils.schema_upgrade import upgrade_schema
 
 # ロギング設定
 logging.basicConfig(
@@ -31,6 +33,7 @@ async def lifespan(app: FastAPI):
 
     # データベーステーブル作成
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     logger.info("データベーステーブルを初期化しました")
 
     # 初期データ投入
@@ -45,10 +48,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"初期データ投入エラー: {e}")
 
+    # AI Engineへの共有HTTPクライアント（接続プール）
+    await get_ai_engine_client().start()
+
     yield
 
     # 終了時処理
     logger.info("PM採点システムを停止中...")
+    await get_ai_engine_client().aclose()
+    await close_db()
 
 
 # FastAPIアプリケーション初期化
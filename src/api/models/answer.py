@@ -1,7 +1,7 @@
 """
 解答関連モデル
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -11,6 +11,12 @@ from ..database import Base
 class Answer(Base):
     """解答テーブル"""
     __tablename__ = "answers"
+    # 受験者は試験の問題ごとに1解答（再提出は同じ行を更新する）
+    __table_args__ = (
+        UniqueConstraint("exam_id", "question_id", "candidate_id", name="uq_answers_exam_question_candidate"),
+        # 試験ごとの現在の採点結果をID順にページ分割する
+        Index("ix_answers_exam_current_result", "exam_id", "current_result_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False, index=True)
@@ -25,13 +31,24 @@ class Answer(Base):
     ip_address = Column(String(45))  # IPv6対応
     user_agent = Column(Text)
 
+    # 現在の採点結果（最新の採点。それ以外の採点結果は置き換え済みの履歴）
+    current_result_id = Column(
+        Integer,
+        ForeignKey("scoring_results.id", use_alter=True, name="fk_answers_current_result_id"),
+        index=True
+    )
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # リレーション
     exam = relationship("Exam", back_populates="answers")
     question = relationship("Question", back_populates="answers")
-    scoring_results = relationship("ScoringResult", back_populates="answer", cascade="all, delete-orphan")
+    scoring_results = relationship(
+        "ScoringResult", back_populates="answer", cascade="all, delete-orphan",
+        foreign_keys="ScoringResult.answer_id"
+    )
+    current_result = relationship("ScoringResult", foreign_keys=[current_result_id], post_update=True)
 
     def __repr__(self):
         return f"<Answer(candidate={self.candidate_id}, question={self.question_id})>"
@@ -1,7 +1,7 @@
 """
 採点関連モデル
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, Float, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, Float, DateTime, Boolean, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -27,6 +27,11 @@ class ScoringMethod(enum.Enum):
 class ScoringResult(Base):
     """採点結果テーブル"""
     __tablename__ = "scoring_results"
+    # 採点結果一覧の並べ替え（百分率・信頼度の順のページ分割）
+    __table_args__ = (
+        Index("ix_scoring_results_percentage_id", "percentage", "id"),
+        Index("ix_scoring_results_confidence_id", "confidence", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     answer_id = Column(Integer, ForeignKey("answers.id"), nullable=False, index=True)
@@ -51,6 +56,10 @@ class ScoringResult(Base):
     scoring_reasons = Column(JSON)  # 採点理由
     suggestions = Column(JSON)      # 改善提案
 
+    # 採点の指紋（正規化した解答文・問題の版・採点エンジンの版のハッシュ。一致する結果は再利用する）
+    fingerprint = Column(String(64), index=True)
+    question_version = Column(String(64))  # 採点時の問題の版
+
     # AI関連情報
     model_name = Column(String(100))
     temperature = Column(Float)
@@ -72,7 +81,7 @@ class ScoringResult(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # リレーション
-    answer = relationship("Answer", back_populates="scoring_results")
+    answer = relationship("Answer", back_populates="scoring_results", foreign_keys=[answer_id])
     audit_logs = relationship("ScoringAuditLog", back_populates="scoring_result")
 
     def __repr__(self):
@@ -2,9 +2,10 @@
 管理者APIエンドポイント
 試験・問題の登録・管理機能
 """
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 import csv
@@ -15,6 +16,10 @@ from ..database import get_db, SessionLocal
 from ..models.exam import Exam, ExamSeason
 from ..models.question import Question
 from ..auth.admin_auth import AdminAuth
+from ..services.question_cache import question_limits
+from ..services import catalog as catalog_service
+from ..services.catalog import CatalogEntry, catalog, etag_matches
+from ..services.fingerprint import invalidate_question_results, question_version
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -81,6 +86,29 @@ class QuestionResponse(BaseModel):
         from_attributes = True
 
 
+class QuestionSummaryResponse(BaseModel):
+    """問題の要約（背景情報・設問文・模範解答などの長い本文を含まない）"""
+    id: int
+    exam_id: int
+    title: str
+    question_number: str
+    sub_questions: Optional[List[str]]
+    max_chars: int
+    points: int
+    has_sub_questions: bool
+    display_name: str
+
+
+def _catalog_response(request: Request, entry: CatalogEntry, not_found: str = "") -> Response:
+    """カタログの内容をETag付きで返す（If-None-Match が一致する場合は304）"""
+    if entry.body is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(entry.body, headers=headers)
+
+
 class QuestionCSVPreview(BaseModel):
     """問題CSV プレビュー"""
     total_rows: int
@@ -103,7 +131,7 @@ class QuestionCSVUploadStatus(BaseModel):
 
 
 @router.post("/exams", response_model=ExamResponse)
-async def create_exam(
+def create_exam(
     exam: ExamCreate,
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
@@ -119,6 +147,7 @@ async def create_exam(
         )
         db.add(db_exam)
         db.commit()
+        catalog.invalidate()
         db.refresh(db_exam)
 
         # レスポンス用にデータを辞書で返す
@@ -134,41 +163,31 @@ async def create_exam(
 
 
 @router.get("/exams", response_model=List[ExamResponse])
-async def get_exams(
+def get_exams(
+    request: Request,
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
 ):
-    """試験一覧を取得"""
+    """試験一覧を取得（カタログのキャッシュから返す。ETagが一致する場合は304）"""
     try:
-        exams = db.query(Exam).all()
-        return [
-            {
-                "id": exam.id,
-                "title": exam.title,
-                "description": exam.description,
-                "created_at": exam.created_at
-            }
-            for exam in exams
-        ]
+        return _catalog_response(request, catalog_service.get_exams(db))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"試験一覧取得に失敗しました: {str(e)}")
 
 
 @router.get("/exams/{exam_id}", response_model=ExamResponse)
-async def get_exam(
+def get_exam(
     exam_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
 ):
     """試験詳細を取得"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
-    if not exam:
-        raise HTTPException(status_code=404, detail="試験が見つかりません")
-    return exam
+    return _catalog_response(request, catalog_service.get_exam(db, exam_id), "試験が見つかりません")
 
 
 @router.post("/questions", response_model=QuestionResponse)
-async def create_question(
+def create_question(
     question: QuestionCreate,
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
@@ -196,6 +215,7 @@ async def create_question(
         )
         db.add(db_question)
         db.commit()
+        catalog.invalidate()
         db.refresh(db_question)
 
         # レスポンス用にデータを辞書で返す
@@ -221,34 +241,31 @@ async def create_question(
         raise HTTPException(status_code=500, detail=f"問題作成に失敗しました: {str(e)}")
 
 
-@router.get("/questions", response_model=List[QuestionResponse])
-async def get_questions(
+@router.get("/questions", response_model=Union[List[QuestionResponse], List[QuestionSummaryResponse]])
+def get_questions(
+    request: Request,
     exam_id: Optional[int] = None,
+    view: str = Query("full", pattern="^(full|summary)$", description="summary: 長い本文を含まない要約"),
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
 ):
-    """問題一覧を取得"""
-    query = db.query(Question)
-    if exam_id:
-        query = query.filter(Question.exam_id == exam_id)
-    return query.all()
+    """問題一覧を取得（カタログのキャッシュから返す。ETagが一致する場合は304）"""
+    return _catalog_response(request, catalog_service.get_questions(db, exam_id, summary=view == "summary"))
 
 
 @router.get("/questions/{question_id}", response_model=QuestionResponse)
-async def get_question(
+def get_question(
     question_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
 ):
     """問題詳細を取得"""
-    question = db.query(Question).filter(Question.id == question_id).first()
-    if not question:
-        raise HTTPException(status_code=404, detail="問題が見つかりません")
-    return question
+    return _catalog_response(request, catalog_service.get_question(db, question_id), "問題が見つかりません")
 
 
 @router.put("/questions/{question_id}", response_model=QuestionResponse)
-async def update_question(
+def update_question(
     question_id: int,
     question_update: QuestionUpdate,
     db: Session = Depends(get_db),
@@ -259,17 +276,25 @@ async def update_question(
     if not question:
         raise HTTPException(status_code=404, detail="問題が見つかりません")
 
+    old_version = question_version(question)
     update_data = question_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(question, field, value)
 
+    # 採点に使う内容が変わった場合は、この問題の採点結果だけを無効化する
+    new_version = question_version(question)
+    if new_version != old_version:
+        invalidate_question_results(db, question_id, new_version)
+
     db.commit()
+    question_limits.invalidate(question_id)
+    catalog.invalidate()
     db.refresh(question)
     return question
 
 
 @router.delete("/questions/{question_id}")
-async def delete_question(
+def delete_question(
     question_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(AdminAuth.require_admin_auth)
@@ -281,6 +306,8 @@ async def delete_question(
 
     db.delete(question)
     db.commit()
+    question_limits.invalidate(question_id)
+    catalog.invalidate()
     return {"message": "問題を削除しました"}
 
 
@@ -584,6 +611,7 @@ async def _process_questions_csv_upload(
 
         # 変更をコミット
         db.commit()
+        catalog.invalidate()
 
         logger.info(f"Questions CSV upload {upload_id} completed: {success_count} success, {error_count} errors")
 
@@ -15,6 +15,7 @@ from ..database import get_db
 from ..models.answer import Answer
 from ..models.exam import Exam
 from ..models.question import Question
+from ..services.catalog import catalog
 from ..services.scoring_service import ScoringService
 
 logger = logging.getLogger(__name__)
@@ -283,6 +284,7 @@ async def _process_batch_upload(
         success_count = 0
         error_count = 0
         errors = []
+        seen_student_ids = set()
 
         for i, row in enumerate(rows, 1):
             try:
@@ -302,6 +304,13 @@ async def _process_batch_upload(
                     error_count += 1
                     continue
 
+                # 受験者ごとに1解答（解答テーブルの一意制約）
+                if student_id in seen_student_ids:
+                    errors.append(f"行{i}: 受験者IDが重複しています: {student_id}")
+                    error_count += 1
+                    continue
+                seen_student_ids.add(student_id)
+
                 # 解答レコード作成
                 answer = Answer(
                     exam_id=exam.id,
@@ -332,6 +341,7 @@ async def _process_batch_upload(
 
         # 変更をコミット
         db.commit()
+        catalog.invalidate()
 
         logger.info(f"Batch upload {upload_id} completed: {success_count} success, {error_count} errors")
 
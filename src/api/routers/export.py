@@ -20,7 +20,7 @@ router = APIRouter()
 
 
 @router.get("/scoring-results/{exam_id}")
-async def export_scoring_results(
+def export_scoring_results(
     exam_id: int,
     format: Literal["csv", "excel"] = Query(default="csv", description="出力形式"),
     reviewed_only: bool = Query(default=False, description="レビュー済みのみ"),
@@ -47,9 +47,9 @@ async def export_scoring_results(
             raise HTTPException(status_code=404, detail="エクスポート対象のデータがありません")
 
         if format == "csv":
-            return await _export_csv(exam, answers)
+            return _export_csv(exam, answers)
         elif format == "excel":
-            return await _export_excel(exam, answers)
+            return _export_excel(exam, answers)
         else:
             raise HTTPException(status_code=400, detail="サポートされていない形式です")
 
@@ -57,7 +57,7 @@ async def export_scoring_results(
         raise HTTPException(status_code=500, detail=f"エクスポートに失敗しました: {str(e)}")
 
 
-async def _export_csv(exam: Exam, answers: List[Answer]) -> StreamingResponse:
+def _export_csv(exam: Exam, answers: List[Answer]) -> StreamingResponse:
     """CSV形式でエクスポート"""
 
     output = io.StringIO()
@@ -136,7 +136,7 @@ async def _export_csv(exam: Exam, answers: List[Answer]) -> StreamingResponse:
     )
 
 
-async def _export_excel(exam: Exam, answers: List[Answer]) -> StreamingResponse:
+def _export_excel(exam: Exam, answers: List[Answer]) -> StreamingResponse:
     """Excel形式でエクスポート（今後実装予定）"""
     raise HTTPException(status_code=501, detail="Excel形式は今後実装予定です")
 
@@ -168,7 +168,7 @@ def _calculate_grade(score: float, max_score: float) -> str:
 
 
 @router.get("/summary/{exam_id}")
-async def export_summary_report(
+def export_summary_report(
     exam_id: int,
     db: Session = Depends(get_db)
 ):
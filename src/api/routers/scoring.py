@@ -1,15 +1,22 @@
 """
 採点APIエンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from collections import Counter
+from typing import Any, List, Optional, Union
+from pydantic import BaseModel, Field, ValidationError
+import json
 import logging
 
-from ..database import get_db
-from ..services.scoring_service import ScoringService
-from ..models.scoring import ScoringResult
+from ..config import settings
+from ..database import get_db_session
+from ..services.scoring_service import (
+    ScoringService, SUBMISSION_ACCEPTED, SUBMISSION_FAILED, SUBMISSION_REJECTED, SUBMISSION_SUPERSEDED
+)
+from ..models.scoring import ScoringResult, ScoringStatus
+from ..services.result_query import ResultFilters
 from ..models.answer import Answer
 
 logger = logging.getLogger(__name__)
@@ -47,6 +54,12 @@ class EvaluationRequest(BaseModel):
     }
 
 
+class ReviewRequest(BaseModel):
+    human_score: float = Field(..., description="人間による最終スコア")
+    reviewer_id: str = Field(..., description="レビュー担当者ID")
+    review_comments: Optional[str] = Field(None, description="レビューコメント")
+
+
 class AnswerResponse(BaseModel):
     id: int
     exam_id: int
@@ -61,6 +74,23 @@ class AnswerResponse(BaseModel):
         from_attributes = True
 
 
+class BulkSubmissionItemResult(BaseModel):
+    index: int = Field(..., description="リクエスト内の項目番号（0始まり）")
+    status: str = Field(..., description="accepted / rejected / superseded / failed")
+    answer_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkSubmissionResponse(BaseModel):
+    total: int
+    accepted: int
+    rejected: int = Field(..., description="検証エラーの件数")
+    superseded: int = Field(..., description="同じ受験者・問題の後続の項目で置き換えた件数")
+    failed: int = Field(..., description="書き込みエラーの件数")
+    scoring_task_id: Optional[str] = Field(None, description="採点タスクID（enqueue_scoring指定時）")
+    results: List[BulkSubmissionItemResult]
+
+
 class ScoringResultResponse(BaseModel):
     id: int
     answer_id: int
@@ -80,6 +110,11 @@ class ScoringResultResponse(BaseModel):
         from_attributes = True
 
 
+class ScoringResultPage(BaseModel):
+    items: List[ScoringResultResponse]
+    next_cursor: Optional[str] = Field(None, description="次のページのカーソル（最後のページはnull）")
+
+
 @router.get("/")
 async def scoring_info():
     """採点API情報"""
@@ -88,9 +123,11 @@ async def scoring_info():
         "version": "1.0.0",
         "endpoints": [
             "POST /submit - 解答提出",
-            "GET /results/{exam_id} - 採点結果取得",
+            "POST /submit/bulk - 解答一括提出（JSON配列・NDJSON）",
+            "GET /results/{exam_id} - 採点結果取得（絞り込み・並べ替え・カーソルによるページ分割）",
             "POST /evaluate - AI採点実行",
-            "GET /result/{result_id} - 採点結果詳細取得"
+            "GET /result/{result_id} - 採点結果詳細取得",
+            "POST /result/{result_id}/review - 人間レビュー結果登録"
         ],
         "status": "operational"
     }
@@ -100,7 +137,7 @@ async def scoring_info():
 async def submit_answer(
     request: AnswerSubmissionRequest,
     req: Request,
-    db: Session = Depends(get_db)
+    db: Union[Session, AsyncSession] = Depends(get_db_session)
 ):
     """解答提出"""
     try:
@@ -144,10 +181,131 @@ async def submit_answer(
         )
 
 
+class _InvalidItem:
+    """解析できなかった一括提出の項目"""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return _InvalidItem(f"JSONの形式が不正です: {e}")
+
+
+def _check_bulk_size(count: int):
+    if count > settings.BULK_SUBMIT_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"一括提出の上限（{settings.BULK_SUBMIT_MAX_ITEMS}件）を超えています"
+        )
+
+
+async def _read_bulk_items(req: Request) -> List[Any]:
+    """一括提出の本文を項目のリストとして読み込む（NDJSONは1行ずつ解析）"""
+    content_type = req.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items: List[Any] = []
+        buffer = b""
+        async for chunk in req.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            items.extend(_parse_ndjson_line(line) for line in lines if line.strip())
+            _check_bulk_size(len(items))
+        if buffer.strip():
+            items.append(_parse_ndjson_line(buffer))
+        _check_bulk_size(len(items))
+        return items
+
+    try:
+        body = json.loads(await req.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSONの形式が不正です")
+    if isinstance(body, dict):
+        body = body.get("answers")
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="解答の配列（または answers に配列を持つオブジェクト）を指定してください"
+        )
+    _check_bulk_size(len(body))
+    return body
+
+
+@router.post("/submit/bulk", response_model=BulkSubmissionResponse)
+async def submit_answers_bulk(
+    req: Request,
+    enqueue_scoring: bool = False,
+    db: Union[Session, AsyncSession] = Depends(get_db_session)
+):
+    """解答一括提出
+
+    本文は解答の JSON配列、または1行1解答のNDJSON（Content-Type: application/x-ndjson）。
+    項目ごとに受理・拒否の状態を返し、不正な項目があっても他の項目は登録する。
+    enqueue_scoring=true の場合は受理した解答の採点を1つのバッチ採点タスクとして登録する。
+    """
+    items = await _read_bulk_items(req)
+
+    results = [BulkSubmissionItemResult(index=index, status=SUBMISSION_REJECTED) for index in range(len(items))]
+    valid_indices = []
+    submissions = []
+    for index, item in enumerate(items):
+        if isinstance(item, _InvalidItem):
+            results[index].error = item.error
+            continue
+        try:
+            submissions.append(AnswerSubmissionRequest.model_validate(item).model_dump())
+            valid_indices.append(index)
+        except ValidationError as e:
+            results[index].error = "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc']) or 'item'}: {error['msg']}" for error in e.errors()
+            )
+
+    try:
+        service = ScoringService(db)
+        statuses = await service.submit_answers(
+            submissions,
+            ip_address=req.client.host if req.client else None,
+            user_agent=req.headers.get("user-agent")
+        )
+    except Exception as e:
+        logger.error(f"解答一括提出エラー: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"解答一括提出に失敗しました: {str(e)}"
+        )
+
+    for index, item_status in zip(valid_indices, statuses):
+        results[index] = BulkSubmissionItemResult(**{**item_status, "index": index})
+
+    accepted_ids = [result.answer_id for result in results if result.status == SUBMISSION_ACCEPTED]
+    scoring_task_id = None
+    if enqueue_scoring and accepted_ids:
+        try:
+            from ..tasks.scoring_tasks import batch_scoring
+            scoring_task_id = batch_scoring.delay(accepted_ids).id
+        except Exception as e:
+            # 解答は登録済みのため、採点タスクの登録失敗はエラーにせず記録のみ行う
+            logger.error(f"採点タスク登録エラー: 対象={len(accepted_ids)}件, {e}")
+
+    counts = Counter(result.status for result in results)
+    return BulkSubmissionResponse(
+        total=len(results),
+        accepted=counts[SUBMISSION_ACCEPTED],
+        rejected=counts[SUBMISSION_REJECTED],
+        superseded=counts[SUBMISSION_SUPERSEDED],
+        failed=counts[SUBMISSION_FAILED],
+        scoring_task_id=scoring_task_id,
+        results=results
+    )
+
+
 @router.post("/evaluate", response_model=ScoringResultResponse)
 async def evaluate_answer(
     request: EvaluationRequest,
-    db: Session = Depends(get_db)
+    db: Union[Session, AsyncSession] = Depends(get_db_session)
 ):
     """AI採点実行"""
     try:
@@ -183,18 +341,43 @@ async def evaluate_answer(
         )
 
 
-@router.get("/results/{exam_id}", response_model=List[ScoringResultResponse])
+@router.get("/results/{exam_id}", response_model=ScoringResultPage)
 async def get_results(
     exam_id: int,
     candidate_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    question_id: Optional[int] = None,
+    status_filter: Optional[ScoringStatus] = Query(None, alias="status", description="採点状態"),
+    min_confidence: Optional[float] = Query(None, ge=0, le=1, description="信頼度の下限"),
+    max_confidence: Optional[float] = Query(None, ge=0, le=1, description="信頼度の上限"),
+    is_reviewed: Optional[bool] = Query(None, description="人間レビュー済みか"),
+    sort: str = Query(
+        "id", pattern="^-?(id|percentage|confidence)$", description="並べ替え（先頭の - は降順。値がない結果は最後）"
+    ),
+    cursor: Optional[str] = Query(None, description="前のページの next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.RESULTS_MAX_PAGE_SIZE, description="1ページあたりの件数"),
+    db: Union[Session, AsyncSession] = Depends(get_db_session)
 ):
-    """採点結果取得"""
+    """採点結果取得（解答ごとの現在の採点結果。next_cursor を cursor に指定して次のページを取得する）"""
     try:
         service = ScoringService(db)
-        results = service.get_scoring_results(exam_id, candidate_id)
+        filters = ResultFilters(
+            candidate_id=candidate_id,
+            question_id=question_id,
+            status=status_filter,
+            min_confidence=min_confidence,
+            max_confidence=max_confidence,
+            is_reviewed=is_reviewed
+        )
+        results, next_cursor = await service.get_scoring_result_page(
+            exam_id,
+            filters,
+            sort=sort.lstrip("-"),
+            descending=sort.startswith("-"),
+            cursor=cursor,
+            limit=limit or settings.RESULTS_PAGE_SIZE
+        )
 
-        return [
+        items = [
             ScoringResultResponse(
                 id=result.id,
                 answer_id=result.answer_id,
@@ -212,7 +395,10 @@ async def get_results(
             )
             for result in results
         ]
+        return ScoringResultPage(items=items, next_cursor=next_cursor)
 
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"採点結果取得エラー: {e}")
         raise HTTPException(
@@ -224,12 +410,12 @@ async def get_results(
 @router.get("/result/{result_id}", response_model=ScoringResultResponse)
 async def get_result_detail(
     result_id: int,
-    db: Session = Depends(get_db)
+    db: Union[Session, AsyncSession] = Depends(get_db_session)
 ):
     """採点結果詳細取得"""
     try:
         service = ScoringService(db)
-        result = service.get_scoring_result_by_id(result_id)
+        result = await service.get_scoring_result_by_id(result_id)
 
         if not result:
             raise HTTPException(
@@ -260,4 +446,49 @@ async def get_result_detail(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"採点結果詳細の取得に失敗しました: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/result/{result_id}/review", response_model=ScoringResultResponse)
+async def review_result(
+    result_id: int,
+    request: ReviewRequest,
+    db: Union[Session, AsyncSession] = Depends(get_db_session)
+):
+    """人間レビュー結果登録（類似解答の得点伝播に使用するアンカーとしてAI Engineにも登録）"""
+    try:
+        service = ScoringService(db)
+        result = await service.review_result(
+            result_id,
+            human_score=request.human_score,
+            reviewer_id=request.reviewer_id,
+            review_comments=request.review_comments
+        )
+
+        return ScoringResultResponse(
+            id=result.id,
+            answer_id=result.answer_id,
+            status=result.status.value,
+            total_score=result.total_score,
+            max_score=result.max_score,
+            percentage=result.percentage,
+            confidence=result.confidence,
+            rule_based_score=result.rule_based_score,
+            semantic_score=result.semantic_score,
+            comprehensive_score=result.comprehensive_score,
+            is_reviewed=result.is_reviewed,
+            final_score=result.final_score,
+            grade=result.grade
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"レビュー登録エラー: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"レビュー結果の登録に失敗しました: {str(e)}"
+        )
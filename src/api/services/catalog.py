@@ -0,0 +1,276 @@
+"""
+試験・問題カタログのキャッシュ
+
+管理画面の試験・問題一覧と問題詳細を、応答の内容（JSONに変換済みの値）とETagの組としてプロセス内に保持する。
+試験・問題の作成・更新・削除（CSV取り込みを含む）で invalidate を呼ぶと世代が進み、以前の世代の内容は使わない。
+CATALOG_REDIS=true の場合は世代と内容をRedisで共有し、他のプロセスでの更新も反映する
+（Redisに接続できない場合はプロセス内のみで動作する）。
+Redisの世代は採点処理（イベントループ上）からも参照するため、バックグラウンドのスレッドで確認し、
+呼び出し元は最後に確認した世代を使う（他のプロセスでの更新の反映は sync_interval 秒＋確認の時間だけ遅れる）。
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session, load_only
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+from ..config import settings
+from ..models.exam import Exam
+from ..models.question import Question
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "catalog:generation"
+
+# 一覧の要約に含める問題の列（背景情報・模範解答などの長い本文は含めない）
+QUESTION_SUMMARY_COLUMNS = (
+    Question.id, Question.exam_id, Question.title, Question.question_number,
+    Question.sub_questions, Question.max_chars, Question.points
+)
+
+
+class CatalogEntry(NamedTuple):
+    """カタログの内容（JSONに変換済みの値）とETag"""
+    body: Any
+    etag: str
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSONに変換できない値です: {type(value).__name__}")
+
+
+def make_entry(value: Any) -> CatalogEntry:
+    """値をJSONに変換し、内容のハッシュをETagとする"""
+    encoded = json.dumps(value, default=_json_default, ensure_ascii=False, sort_keys=True)
+    return CatalogEntry(json.loads(encoded), f'"{hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match が ETag に一致するか（弱いETag・* を含む）"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class CatalogCache:
+    """世代付きのカタログキャッシュ（TTL付きLRU、Redisでの共有は任意）"""
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        redis_url: Optional[str] = None,
+        sync_interval: float = 1.0,
+        max_size: int = 256
+    ):
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.max_size = max_size
+        self._local_generation = 0
+        self._remote_generation: Optional[int] = None
+        self._remote_checked_at = 0.0
+        self._refreshing = False
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = self._connect(redis_url)
+
+    @staticmethod
+    def _connect(redis_url: Optional[str]):
+        if not redis_url:
+            return None
+        if not REDIS_AVAILABLE:
+            logger.warning("redisが利用できないためカタログのキャッシュはプロセス内のみで共有します")
+            return None
+        try:
+            return redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        except Exception as e:
+            logger.warning(f"カタログのキャッシュのRedis接続の初期化に失敗: {e}")
+            return None
+
+    def _remote(self) -> Optional[int]:
+        """最後に確認したRedisの世代（Redisを使わない・接続できない・未確認の場合はNone）
+
+        Redisへの問い合わせで呼び出し元をブロックしないよう、sync_interval 秒を過ぎていれば
+        バックグラウンドのスレッドで確認を始め、確認の完了を待たずに現在の値を返す。
+        """
+        if self._redis is None:
+            return None
+        if time.monotonic() - self._remote_checked_at >= self.sync_interval:
+            self._schedule_refresh()
+        return self._remote_generation
+
+    def _schedule_refresh(self):
+        """世代の確認をバックグラウンドで開始（確認中の場合は何もしない）"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        try:
+            threading.Thread(target=self.refresh, name="catalog-generation", daemon=True).start()
+        except Exception as e:
+            logger.warning(f"カタログの世代の確認を開始できません: {e}")
+            with self._lock:
+                self._refreshing = False
+
+    def refresh(self) -> Optional[int]:
+        """Redisの世代を確認して返す（Redisへの問い合わせを行う。通常はバックグラウンドのスレッドから呼ばれる）"""
+        started = time.monotonic()
+        try:
+            generation = int(self._redis.get(GENERATION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"カタログの世代の取得に失敗: {e}")
+            generation = None
+        with self._lock:
+            # 確認中に invalidate で更新した世代は古い値で上書きしない
+            if self._remote_checked_at <= started:
+                self._remote_generation = generation
+                self._remote_checked_at = time.monotonic()
+            self._refreshing = False
+            return self._remote_generation
+
+    def generation(self) -> Tuple[int, Optional[int]]:
+        """現在の世代（プロセス内の世代と最後に確認したRedisの世代。ブロックしない）"""
+        return self._local_generation, self._remote()
+
+    def get(self, key: str, loader: Callable[[], Any]) -> CatalogEntry:
+        """キーの内容を取得（現在の世代の内容がなければ loader の戻り値から作成する）"""
+        generation = self.generation()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == generation and cached[1] > now:
+                self._entries.move_to_end(key)
+                return cached[2]
+
+        remote = generation[1]
+        entry = self._get_shared(key, remote) if remote is not None else None
+        if entry is None:
+            entry = make_entry(loader())
+            if remote is not None:
+                self._set_shared(key, remote, entry)
+
+        if self.ttl > 0 and self.max_size > 0:
+            with self._lock:
+                # 読み込み中に無効化された場合は保持しない
+                if self._local_generation == generation[0]:
+                    self._entries[key] = (generation, now + self.ttl, entry)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+        return entry
+
+    def _get_shared(self, key: str, remote: int) -> Optional[CatalogEntry]:
+        try:
+            data = self._redis.get(f"catalog:{remote}:{key}")
+        except Exception as e:
+            logger.warning(f"カタログの共有キャッシュの取得に失敗: {e}")
+            return None
+        return CatalogEntry(*json.loads(data)) if data else None
+
+    def _set_shared(self, key: str, remote: int, entry: CatalogEntry):
+        try:
+            self._redis.set(f"catalog:{remote}:{key}", json.dumps(list(entry), ensure_ascii=False), ex=max(int(self.ttl), 1))
+        except Exception as e:
+            logger.warning(f"カタログの共有キャッシュの保存に失敗: {e}")
+
+    def invalidate(self):
+        """試験・問題の変更後に呼び出し、すべてのカタログの内容を破棄（Redis使用時は他のプロセスにも反映）"""
+        with self._lock:
+            self._local_generation += 1
+            self._entries.clear()
+        if self._redis is not None:
+            try:
+                generation = int(self._redis.incr(GENERATION_KEY))
+                with self._lock:
+                    self._remote_generation = generation
+                    self._remote_checked_at = time.monotonic()
+            except Exception as e:
+                logger.warning(f"カタログの世代の更新に失敗: {e}")
+
+
+catalog = CatalogCache(
+    ttl=settings.CATALOG_CACHE_TTL,
+    redis_url=settings.REDIS_URL if settings.CATALOG_REDIS else None,
+    sync_interval=settings.CATALOG_SYNC_INTERVAL
+)
+
+
+def exam_dict(exam: Exam) -> Dict[str, Any]:
+    """試験の応答（ExamResponse）"""
+    return {"id": exam.id, "title": exam.title, "description": exam.description, "created_at": exam.created_at}
+
+
+def question_dict(question: Question) -> Dict[str, Any]:
+    """問題の応答（QuestionResponse）"""
+    return {
+        **question_summary_dict(question),
+        "background_text": question.background_text,
+        "question_text": question.question_text,
+        "model_answer": question.model_answer,
+        "grading_intention": question.grading_intention,
+        "grading_commentary": question.grading_commentary,
+        "keywords": question.keywords
+    }
+
+
+def question_summary_dict(question: Question) -> Dict[str, Any]:
+    """問題の要約の応答（QuestionSummaryResponse）"""
+    return {
+        "id": question.id,
+        "exam_id": question.exam_id,
+        "title": question.title,
+        "question_number": question.question_number,
+        "sub_questions": question.sub_questions,
+        "max_chars": question.max_chars,
+        "points": question.points,
+        "has_sub_questions": question.has_sub_questions,
+        "display_name": question.display_name
+    }
+
+
+def get_exams(db: Session) -> CatalogEntry:
+    """試験一覧"""
+    return catalog.get("exams", lambda: [exam_dict(exam) for exam in db.query(Exam).order_by(Exam.id)])
+
+
+def get_exam(db: Session, exam_id: int) -> CatalogEntry:
+    """試験詳細（存在しない場合は body が None）"""
+    def load():
+        exam = db.get(Exam, exam_id)
+        return exam_dict(exam) if exam else None
+    return catalog.get(f"exam:{exam_id}", load)
+
+
+def get_questions(db: Session, exam_id: Optional[int] = None, summary: bool = False) -> CatalogEntry:
+    """問題一覧（summary=True の場合は長い本文を含まない要約）"""
+    def load() -> List[Dict[str, Any]]:
+        query = db.query(Question)
+        if summary:
+            query = query.options(load_only(*QUESTION_SUMMARY_COLUMNS))
+        if exam_id:
+            query = query.filter(Question.exam_id == exam_id)
+        to_dict = question_summary_dict if summary else question_dict
+        return [to_dict(question) for question in query.order_by(Question.id)]
+    return catalog.get(f"questions:{exam_id or 'all'}:{'summary' if summary else 'full'}", load)
+
+
+def get_question(db: Session, question_id: int) -> CatalogEntry:
+    """問題詳細（存在しない場合は body が None）"""
+    def load():
+        question = db.get(Question, question_id)
+        return question_dict(question) if question else None
+    return catalog.get(f"question:{question_id}", load)
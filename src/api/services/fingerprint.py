@@ -0,0 +1,80 @@
+"""
+採点の指紋（フィンガープリント）
+
+正規化した解答文・問題の採点に使う内容の版・採点エンジンの版から採点結果の指紋を作成する。
+指紋が一致する採点結果は再採点せずに再利用し、問題の内容が変わった場合はその問題の採点結果だけを無効化する。
+"""
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.answer import Answer
+from ..models.scoring import ScoringResult, ScoringStatus
+from .local_scoring import get_local_scorer, local_scoring_enabled
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def normalize_answer_text(answer_text: str) -> str:
+    """解答文の正規化（NFKC・空白の連続を1つにまとめ前後の空白を除く）"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", answer_text or "")).strip()
+
+
+def question_scoring_data(question: Any) -> Dict[str, Any]:
+    """AI Engineの採点に使う問題の内容（Question またはその列を持つ行）"""
+    return {
+        "question_text": question.question_text,
+        "model_answer": question.model_answer,
+        "keywords": question.keywords or [],
+        "grading_intention": question.grading_intention,
+        "max_chars": question.max_chars,
+        "points": question.points,
+        "grading_criteria": question.grading_criteria or {}
+    }
+
+
+def question_version(question: Any) -> str:
+    """問題の採点に使う内容の版（内容のハッシュ）"""
+    return _digest(json.dumps(question_scoring_data(question), ensure_ascii=False, sort_keys=True))
+
+
+def engine_version() -> str:
+    """採点エンジンの版（モデル名と採点ロジック・プロンプトの版、プロセス内採点の場合は実行するステージ）"""
+    if local_scoring_enabled():
+        return f"{get_local_scorer().engine_version}/{settings.SCORING_ENGINE_VERSION}"
+    return f"{settings.AI_MODEL}/{settings.SCORING_ENGINE_VERSION}"
+
+
+def scoring_fingerprint(answer_text: str, question_version: str, engine: Optional[str] = None) -> str:
+    """採点結果の指紋"""
+    return _digest("\n".join((normalize_answer_text(answer_text), question_version, engine or engine_version())))
+
+
+def invalidate_question_results(db: Session, question_id: int, version: str) -> int:
+    """問題の内容が変わった場合に、その問題の別の版で採点した結果を1文で無効化（コミットは呼び出し側）"""
+    invalidated = db.execute(
+        update(ScoringResult)
+        .where(
+            ScoringResult.answer_id.in_(select(Answer.id).where(Answer.question_id == question_id)),
+            ScoringResult.status == ScoringStatus.COMPLETED,
+            or_(ScoringResult.question_version.is_(None), ScoringResult.question_version != version)
+        )
+        .values(status=ScoringStatus.PENDING)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if invalidated:
+        logger.info(f"問題の更新により採点結果を無効化: question_id={question_id}, 件数={invalidated}")
+    return invalidated
@@ -0,0 +1,117 @@
+"""
+プロセス内採点（AI Engineの採点ライブラリをAPI・Celeryワーカー内で実行）
+
+AI Engineと同じ採点パイプライン・問題ごとの採点計画（ai_engine.scoring）で、
+ルールベース（と意味理解）の採点を通信なしに行う。
+SCORING_MODE=local の場合は常に、それ以外はAI Engine障害時のフォールバックとして使う。
+リポジトリからは src.ai_engine、APIコンテナ内では ai_engine としてインポートする。
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_PIPELINE_MODULES = ("src.ai_engine.scoring.pipeline", "ai_engine.scoring.pipeline")
+
+
+def _import_pipeline_module():
+    for name in _PIPELINE_MODULES:
+        try:
+            return importlib.import_module(name)
+        except ModuleNotFoundError as e:
+            # 採点ライブラリ自体がない場合のみ次の候補を試す（依存パッケージの不足はそのまま伝える）
+            if e.name is None or not name.startswith(e.name):
+                raise
+    raise ModuleNotFoundError("ai_engine.scoring")
+
+
+try:
+    _pipeline = _import_pipeline_module()
+    LOCAL_SCORING_AVAILABLE = True
+except ImportError as e:
+    _pipeline = None
+    LOCAL_SCORING_AVAILABLE = False
+    logger.warning(f"採点ライブラリ（ai_engine.scoring）が利用できないためプロセス内採点は無効です: {e}")
+
+
+class LocalScorer:
+    """AI Engineの採点パイプラインによるプロセス内採点
+
+    結果はAI Engineの /score と同じ形式（ScoringResponseの辞書）。
+    問題ごとのパイプライン設定（grading_criteria の "pipeline"）はLLMなどAI Engine専用のステージを
+    含みうるため適用しない。
+    """
+
+    def __init__(self, stages: str):
+        self.stages = self._available_stages(stages)
+        self.pipeline = _pipeline.ScoringPipeline(
+            _pipeline.local_stages(),
+            _pipeline.parse_pipeline(self.stages),
+            question_overrides=False
+        )
+
+    @staticmethod
+    def _available_stages(stages: str) -> List[str]:
+        """依存パッケージを読み込めるステージのみ（意味理解はscikit-learnが必要）"""
+        names = [name.strip() for name in stages.split(",") if name.strip()]
+        unknown = [name for name in names if name not in _pipeline.LOCAL_SCORERS]
+        if unknown:
+            raise ValueError(f"プロセス内で実行できない採点ステージです: {', '.join(unknown)}")
+
+        available = []
+        for name in names:
+            spec, _ = _pipeline.LOCAL_SCORERS[name]
+            try:
+                _pipeline.import_attribute(spec, _pipeline.__package__)
+                available.append(name)
+            except ImportError as e:
+                logger.error(f"プロセス内採点のステージを読み込めないため除外します: {name}: {e}")
+        if not available:
+            raise ValueError("プロセス内で実行できる採点ステージがありません")
+        return available
+
+    @property
+    def engine_version(self) -> str:
+        """採点結果の指紋に使う採点エンジンの版"""
+        return f"local:{'+'.join(self.stages)}"
+
+    async def score(self, answer_text: str, question_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """採点（処理時間はパイプライン全体）"""
+        start_time = time.perf_counter()
+        result = await self.pipeline.score(answer_text, question_data)
+        result.setdefault("semantic_score", None)
+        result.setdefault("comprehensive_score", None)
+        result.setdefault("temperature", None)
+        result.setdefault("tokens_used", 0)
+        result["processing_time_ms"] = int((time.perf_counter() - start_time) * 1000)
+        return result
+
+
+_local_scorer: Optional[LocalScorer] = None
+_lock = threading.Lock()
+
+
+def get_local_scorer() -> Optional[LocalScorer]:
+    """プロセスで共有するプロセス内採点（利用できない場合はNone）"""
+    global _local_scorer
+    if not LOCAL_SCORING_AVAILABLE:
+        return None
+    if _local_scorer is None:
+        with _lock:
+            if _local_scorer is None:
+                try:
+                    _local_scorer = LocalScorer(settings.LOCAL_SCORING_STAGES)
+                except ValueError as e:
+                    logger.error(f"プロセス内採点の設定エラー: {e}")
+                    return None
+    return _local_scorer
+
+
+def local_scoring_enabled() -> bool:
+    """常にプロセス内で採点するか（SCORING_MODE=local）"""
+    return settings.SCORING_MODE.lower() == "local" and get_local_scorer() is not None
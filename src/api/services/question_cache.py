@@ -0,0 +1,89 @@
+"""
+問題の制約（文字数制限など）と採点に使う内容のキャッシュ
+
+解答提出・採点のたびに問題を読み込まないよう、解答の検証・採点に使う項目と問題の版だけを問題IDごとに一定時間保持する。
+問題の更新・削除時は invalidate で破棄する。試験・問題カタログの世代が進んだ場合（他のプロセスでの更新を含む）も使わない。
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.question import Question
+from .catalog import catalog
+from .fingerprint import question_scoring_data, question_version
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionLimits(NamedTuple):
+    """解答の検証・採点・採点結果の指紋に使う問題の項目"""
+    max_chars: Optional[int]
+    version: Optional[str] = None  # 問題の採点に使う内容の版
+    scoring_data: Optional[Dict[str, Any]] = None  # AI Engineに送る問題の内容（question_scoring_data）
+
+
+class QuestionLimitsCache:
+    """問題IDごとの QuestionLimits のTTL付きLRUキャッシュ"""
+
+    def __init__(self, ttl: float = 300.0, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, question_id: int) -> Optional[QuestionLimits]:
+        """問題の制約を取得（存在しない問題は None、キャッシュしない）"""
+        return self.get_many(db, [question_id]).get(question_id)
+
+    def get_many(self, db: Session, question_ids: Iterable[int]) -> Dict[int, QuestionLimits]:
+        """複数の問題の制約を取得（キャッシュにない問題は1回のクエリでまとめて読み込む。存在しない問題は含まない）"""
+        now = time.monotonic()
+        generation = catalog.generation()
+        found: Dict[int, QuestionLimits] = {}
+        missing = []
+        with self._lock:
+            for question_id in dict.fromkeys(question_ids):
+                entry = self._entries.get(question_id)
+                if entry is not None and entry[1] > now and entry[2] == generation:
+                    self._entries.move_to_end(question_id)
+                    found[question_id] = entry[0]
+                else:
+                    missing.append(question_id)
+
+        if not missing:
+            return found
+
+        rows = db.query(
+            Question.id, Question.question_text, Question.model_answer, Question.keywords,
+            Question.grading_intention, Question.max_chars, Question.points, Question.grading_criteria
+        ).filter(Question.id.in_(missing)).all()
+        loaded = {
+            row.id: QuestionLimits(max_chars=row.max_chars, version=question_version(row), scoring_data=question_scoring_data(row))
+            for row in rows
+        }
+        if self.ttl > 0 and self.max_size > 0:
+            with self._lock:
+                for question_id, limits in loaded.items():
+                    self._entries[question_id] = (limits, now + self.ttl, generation)
+                    self._entries.move_to_end(question_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        found.update(loaded)
+        return found
+
+    def invalidate(self, question_id: Optional[int] = None):
+        """キャッシュを破棄（question_id 省略時はすべて）"""
+        with self._lock:
+            if question_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(question_id, None)
+
+
+question_limits = QuestionLimitsCache(ttl=settings.QUESTION_CACHE_TTL)
@@ -0,0 +1,82 @@
+"""
+置き換え済みの採点結果のクリーンアップ
+
+再採点のたびに採点結果は追加され、以前の結果は履歴として残る。
+解答の現在の採点結果（answers.current_result_id）から参照されていない古い結果を一定件数ずつ削除する。
+レビュー済み・監査ログのある結果と採点中の結果は削除しない。
+"""
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.orm import Session
+
+from ..models.answer import Answer
+from ..models.scoring import ScoringAuditLog, ScoringResult, ScoringStatus
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_current_results(db: Session) -> int:
+    """現在の採点結果が未設定の解答に、最新の採点完了済みの結果（なければ最新の結果）を設定"""
+    latest_completed = select(func.max(ScoringResult.id)).where(
+        ScoringResult.answer_id == Answer.id, ScoringResult.status == ScoringStatus.COMPLETED
+    ).scalar_subquery()
+    latest = select(func.max(ScoringResult.id)).where(ScoringResult.answer_id == Answer.id).scalar_subquery()
+
+    updated = db.execute(
+        update(Answer)
+        .where(Answer.current_result_id.is_(None), exists().where(ScoringResult.answer_id == Answer.id))
+        .values(current_result_id=func.coalesce(latest_completed, latest), updated_at=Answer.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if updated:
+        logger.info(f"現在の採点結果を設定: 解答={updated}件")
+    return updated
+
+
+def delete_superseded_results(
+    db: Session,
+    before: datetime,
+    batch_size: int = 1000,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """before より前に作成された置き換え済みの採点結果を batch_size 件ずつ削除し、削除件数を返す
+
+    1バッチごとにコミットし、on_progress に累計の削除件数を渡す
+    """
+    backfill_current_results(db)
+
+    superseded = (
+        select(ScoringResult.id)
+        .where(
+            ScoringResult.created_at < before,
+            ScoringResult.status != ScoringStatus.IN_PROGRESS,
+            ScoringResult.is_reviewed.isnot(True),
+            ~exists().where(Answer.current_result_id == ScoringResult.id),
+            ~exists().where(ScoringAuditLog.scoring_result_id == ScoringResult.id)
+        )
+        .order_by(ScoringResult.id)
+        .limit(max(batch_size, 1))
+    )
+
+    deleted = 0
+    while True:
+        result_ids = db.scalars(superseded).all()
+        if not result_ids:
+            break
+
+        db.execute(
+            delete(ScoringResult).where(ScoringResult.id.in_(result_ids)).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += len(result_ids)
+        if on_progress:
+            on_progress(deleted)
+        if len(result_ids) < batch_size:
+            break
+
+    logger.info(f"置き換え済みの採点結果を削除: {deleted}件 (作成日時 < {before.isoformat()})")
+    return deleted
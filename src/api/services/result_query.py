@@ -0,0 +1,133 @@
+"""
+採点結果一覧のクエリ（絞り込み・並べ替え・カーソルによるページ分割）
+
+試験ごとの解答の現在の採点結果だけを対象にし、一覧の応答に使う列だけを読み込む
+（採点詳細・理由・改善提案などのJSON列は読み込まない）。
+ページ分割は並べ替えの値と採点結果IDによるキーセット方式で、カーソルは最後の行の値を符号化した文字列。
+並べ替えの列にはそれぞれ索引がある（ID: answers(exam_id, current_result_id)、
+百分率・信頼度: scoring_results(percentage|confidence, id)）。
+"""
+import base64
+import binascii
+import json
+from typing import Any, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.orm import load_only
+
+from ..models.answer import Answer
+from ..models.scoring import ScoringResult, ScoringStatus
+
+# 並べ替えの名前と列（値がNULLの行は昇順・降順とも最後）
+SORT_COLUMNS = {
+    "id": Answer.current_result_id,
+    "percentage": ScoringResult.percentage,
+    "confidence": ScoringResult.confidence,
+}
+
+# 一覧の応答（ScoringResultResponse）に使う列
+LIST_COLUMNS = (
+    ScoringResult.id, ScoringResult.answer_id, ScoringResult.status,
+    ScoringResult.total_score, ScoringResult.max_score, ScoringResult.percentage, ScoringResult.confidence,
+    ScoringResult.rule_based_score, ScoringResult.semantic_score, ScoringResult.comprehensive_score,
+    ScoringResult.is_reviewed, ScoringResult.human_score
+)
+
+
+class InvalidCursorError(ValueError):
+    """カーソルが不正、または並べ替えの条件と一致しない"""
+
+
+class ResultFilters(NamedTuple):
+    """採点結果一覧の絞り込み条件（Noneは条件なし）"""
+    candidate_id: Optional[str] = None
+    question_id: Optional[int] = None
+    status: Optional[ScoringStatus] = None
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+    is_reviewed: Optional[bool] = None
+
+
+def encode_cursor(sort: str, descending: bool, value: Any, result_id: int) -> str:
+    """最後の行の並べ替えの値と採点結果IDをカーソルに符号化"""
+    raw = json.dumps([sort, descending, value, result_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, int]:
+    """カーソルから並べ替えの値と採点結果IDを取得"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_descending, value, result_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("カーソルの形式が不正です") from e
+
+    if (cursor_sort, cursor_descending) != (sort, descending):
+        raise InvalidCursorError("カーソルと並べ替えの条件が一致しません")
+    if not isinstance(result_id, int) or (value is not None and not isinstance(value, (int, float))):
+        raise InvalidCursorError("カーソルの形式が不正です")
+    return value, result_id
+
+
+def results_query(exam_id: int, filters: ResultFilters = ResultFilters()) -> Select:
+    """試験の解答ごとの現在の採点結果（一覧に使う列のみ）"""
+    query = (
+        select(ScoringResult)
+        .join(Answer, Answer.current_result_id == ScoringResult.id)
+        .where(Answer.exam_id == exam_id)
+        .options(load_only(*LIST_COLUMNS))
+    )
+
+    if filters.candidate_id:
+        query = query.where(Answer.candidate_id == filters.candidate_id)
+    if filters.question_id is not None:
+        query = query.where(Answer.question_id == filters.question_id)
+    if filters.status is not None:
+        query = query.where(ScoringResult.status == filters.status)
+    if filters.min_confidence is not None:
+        query = query.where(ScoringResult.confidence >= filters.min_confidence)
+    if filters.max_confidence is not None:
+        query = query.where(ScoringResult.confidence <= filters.max_confidence)
+    if filters.is_reviewed is not None:
+        query = query.where(
+            ScoringResult.is_reviewed.is_(True) if filters.is_reviewed else ScoringResult.is_reviewed.isnot(True)
+        )
+    return query
+
+
+def paginate(query: Select, sort: str, descending: bool, cursor: Optional[str], limit: int) -> Select:
+    """並べ替えとキーセット条件を適用（次のページの有無を判定するため limit + 1 件を取得する）"""
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"未対応の並べ替えです: {sort}")
+    column = SORT_COLUMNS[sort]
+    tiebreak = ScoringResult.id
+
+    if cursor:
+        value, result_id = decode_cursor(cursor, sort, descending)
+        after = (lambda left, right: left < right) if descending else (lambda left, right: left > right)
+        if sort == "id":
+            query = query.where(after(column, result_id))
+        elif value is None:
+            query = query.where(column.is_(None), after(tiebreak, result_id))
+        else:
+            query = query.where(or_(
+                after(column, value),
+                and_(column == value, after(tiebreak, result_id)),
+                column.is_(None)
+            ))
+
+    if sort == "id":
+        order = (column.desc() if descending else column.asc(),)
+    else:
+        direction = (lambda c: c.desc()) if descending else (lambda c: c.asc())
+        order = (direction(column).nulls_last(), direction(tiebreak))
+    return query.order_by(*order).limit(limit + 1)
+
+
+def next_cursor(results: list, sort: str, descending: bool, limit: int) -> Optional[str]:
+    """limit + 1 件の取得結果から次のページのカーソルを作成（最後のページはNone）"""
+    if len(results) <= limit:
+        return None
+    last = results[limit - 1]
+    value = last.id if sort == "id" else getattr(last, sort)
+    return encode_cursor(sort, descending, value, last.id)
@@ -2,26 +2,120 @@
 採点サービス
 """
 import logging
-from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import Session
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+from sqlalchemy import and_, bindparam, inspect, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 import httpx
 import asyncio
 from datetime import datetime, timezone
 
 from ..models.answer import Answer
-from ..models.question import Question
-from ..models.scoring import ScoringResult, ScoringStatus, ScoringMethod
+from ..models.scoring import ScoringResult, ScoringStatus, ScoringMethod, ScoringAuditLog
 from ..config import settings
+from ..database import AsyncSession, is_async_session
+from ..utils.serialization import encode_request, decode_response, accept_headers
+from ..utils.ai_engine_client import get_ai_engine_client
+from .question_cache import QuestionLimits, question_limits
+from .fingerprint import question_version, scoring_fingerprint
+from .local_scoring import get_local_scorer, local_scoring_enabled
+from .result_query import ResultFilters, next_cursor, paginate, results_query
 
 logger = logging.getLogger(__name__)
 
+# INSERT ... ON CONFLICT DO UPDATE に対応したデータベースのINSERT構文
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+# 一括提出の項目ごとの状態
+SUBMISSION_ACCEPTED = "accepted"      # 受理（登録・更新済み）
+SUBMISSION_REJECTED = "rejected"      # 検証エラー
+SUBMISSION_SUPERSEDED = "superseded"  # 同じ受験者・問題の後続の解答で置き換え
+SUBMISSION_FAILED = "failed"          # 書き込みエラー
+
+# キーワードマッチングによるフォールバック採点の版（採点結果の指紋に使う）
+FALLBACK_ENGINE_VERSION = "fallback_keyword_matching"
+
+
+def _validate_answer(limits: Optional[QuestionLimits], question_id: int, answer_text: str) -> Optional[str]:
+    """問題の制約に対する解答の検証（問題がない・文字数超過の場合はエラーメッセージ）"""
+    if limits is None:
+        return f"問題が見つかりません: {question_id}"
+    if limits.max_chars and len(answer_text) > limits.max_chars:
+        return f"文字数制限を超えています: {len(answer_text)}文字 (上限: {limits.max_chars}文字)"
+    return None
+
+
+def _answer_values(
+    exam_id: int,
+    question_id: int,
+    candidate_id: str,
+    answer_text: str,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None
+) -> Dict[str, Any]:
+    """answers テーブルに書き込む値"""
+    return {
+        "exam_id": exam_id,
+        "question_id": question_id,
+        "candidate_id": candidate_id,
+        "answer_text": answer_text,
+        "char_count": len(answer_text),
+        "is_blank": not bool(answer_text.strip()),
+        "ip_address": ip_address,
+        "user_agent": user_agent
+    }
+
+
+class AIEngineBusyError(Exception):
+    """AI Engineが混雑しており、Retry-After秒後の再試行を要求している"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"AI Engine is busy (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Retry-Afterヘッダー（秒数）を解析"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
 
 class ScoringService:
-    """採点サービスクラス"""
+    """採点サービスクラス
+
+    db は Session または AsyncSession。データベース処理は同期のメソッドにまとめて _run で実行し、
+    AsyncSession の場合は run_sync でイベントループを止めずに実行する。
+    AI Engineへの送信中はトランザクションを保持しない。
+    """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Union[Session, AsyncSession], defer_on_busy: bool = False):
         self.db = db
-        self.ai_engine_url = settings.AI_ENGINE_URL
+        # AI Engineへの接続はプロセス共有のクライアント（接続プール）を使う
+        self.ai_engine = get_ai_engine_client()
+        # Trueの場合、AI Engine混雑時に待機せずAIEngineBusyErrorを送出する（Celeryで再スケジュールするため）
+        self.defer_on_busy = defer_on_busy
+        # 問題IDごとのAI Engineへの送信内容（同じ問題の解答で共有する）と問題の版
+        self._question_payloads: Dict[int, Dict[str, Any]] = {}
+        self._question_versions: Dict[int, str] = {}
+        # 採点中の結果ID → 採点開始前の現在の採点結果ID（混雑で延期した場合に戻す）
+        self._previous_results: Dict[int, Optional[int]] = {}
+
+    @property
+    def session(self) -> Session:
+        """データベース処理に使う同期のSession（AsyncSession の場合は _run の中でのみ使用できる）"""
+        return self.db.sync_session if is_async_session(self.db) else self.db
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """データベース処理を実行（AsyncSession の場合は run_sync で実行）"""
+        if is_async_session(self.db):
+            return await self.db.run_sync(lambda _: func(*args))
+        return func(*args)
 
     async def submit_answer(
         self,
@@ -32,177 +126,677 @@ class ScoringService:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
     ) -> Answer:
-        """解答提出"""
+        """解答提出
+
+        解答は受験者・問題ごとに1件で、再提出は INSERT ... ON CONFLICT DO UPDATE の1文で更新する。
+        更新された解答の採点結果は1文の UPDATE でまとめて無効化する。
+        """
+        return await self._run(
+            self._submit_answer, exam_id, question_id, candidate_id, answer_text, ip_address, user_agent
+        )
+
+    def _submit_answer(
+        self,
+        exam_id: int,
+        question_id: int,
+        candidate_id: str,
+        answer_text: str,
+        ip_address: Optional[str],
+        user_agent: Optional[str]
+    ) -> Answer:
+        """解答提出のデータベース処理"""
         try:
-            # 問題情報取得と文字数制限チェック
-            question = self.db.query(Question).filter(Question.id == question_id).first()
-            if not question:
-                raise ValueError(f"問題が見つかりません: {question_id}")
-
-            # 文字数制限バリデーション
-            if question.max_chars and len(answer_text) > question.max_chars:
-                raise ValueError(f"文字数制限を超えています: {len(answer_text)}文字 (上限: {question.max_chars}文字)")
-            # 既存解答チェック
-            existing_answer = self.db.query(Answer).filter(
-                Answer.exam_id == exam_id,
-                Answer.question_id == question_id,
-                Answer.candidate_id == candidate_id
-            ).first()
-
-            if existing_answer:
-                # 解答更新時に関連する採点結果を無効化
-                existing_results = self.db.query(ScoringResult).filter(
-                    ScoringResult.answer_id == existing_answer.id,
-                    ScoringResult.status == ScoringStatus.COMPLETED
-                ).all()
-
-                for result in existing_results:
-                    result.status = ScoringStatus.PENDING
-                    logger.info(f"採点結果を無効化: scoring_result_id={result.id}")
-
-                # 解答更新
-                existing_answer.answer_text = answer_text
-                existing_answer.char_count = len(answer_text)
-                existing_answer.is_blank = not bool(answer_text.strip())
-                existing_answer.updated_at = datetime.now(timezone.utc)
-                answer = existing_answer
-            else:
-                # 新規解答作成
-                answer = Answer(
-                    exam_id=exam_id,
-                    question_id=question_id,
-                    candidate_id=candidate_id,
-                    answer_text=answer_text,
-                    char_count=len(answer_text),
-                    is_blank=not bool(answer_text.strip()),
-                    ip_address=ip_address,
-                    user_agent=user_agent
-                )
-                self.db.add(answer)
+            # 文字数制限バリデーション（問題の制約はキャッシュから取得）
+            limits = question_limits.get(self.session, question_id)
+            error = _validate_answer(limits, question_id, answer_text)
+            if error:
+                raise ValueError(error)
+
+            answer = self._upsert_answer(_answer_values(
+                exam_id, question_id, candidate_id, answer_text, ip_address, user_agent
+            ))
 
-            self.db.commit()
-            self.db.refresh(answer)
+            # 解答更新時に関連する採点結果を無効化（新規解答・内容が変わらない再提出では該当なし）
+            self._invalidate_results([answer.id], [scoring_fingerprint(answer_text, limits.version)])
+            self.session.commit()
 
             logger.info(f"解答提出完了: candidate={candidate_id}, question={question_id}")
             return answer
 
         except Exception as e:
-            self.db.rollback()
+            self.session.rollback()
             logger.error(f"解答提出エラー: {e}")
             raise
 
-    async def evaluate_answer(self, answer_id: int) -> ScoringResult:
-        """AI採点実行"""
-        answer = self.db.query(Answer).filter(Answer.id == answer_id).first()
-        if not answer:
-            raise ValueError(f"解答が見つかりません: {answer_id}")
+    async def submit_answers(
+        self,
+        submissions: List[Dict[str, Any]],
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """解答の一括提出
+
+        submissions は exam_id・question_id・candidate_id・answer_text を持つ辞書のリスト。
+        問題の制約はまとめて取得し、受理した解答は chunk_size 件ごとに1トランザクションで
+        複数行の INSERT ... ON CONFLICT DO UPDATE と採点結果の一括無効化を行う。
+        同じ受験者・問題の解答が複数ある場合は最後のものを採用する。
+        入力順に項目ごとの状態（index・status・answer_id・error）を返す。
+        """
+        return await self._run(self._submit_answers, submissions, ip_address, user_agent, chunk_size)
+
+    def _submit_answers(
+        self,
+        submissions: List[Dict[str, Any]],
+        ip_address: Optional[str],
+        user_agent: Optional[str],
+        chunk_size: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """解答一括提出のデータベース処理"""
+        statuses = [{"index": index, "status": SUBMISSION_ACCEPTED} for index in range(len(submissions))]
+        limits = question_limits.get_many(self.session, [submission["question_id"] for submission in submissions])
+
+        latest: Dict[tuple, int] = {}
+        for index, submission in enumerate(submissions):
+            question_id = submission["question_id"]
+            error = _validate_answer(limits.get(question_id), question_id, submission["answer_text"])
+            if error:
+                statuses[index].update(status=SUBMISSION_REJECTED, error=error)
+                continue
+
+            key = (submission["exam_id"], question_id, submission["candidate_id"])
+            if key in latest:
+                statuses[latest[key]].update(
+                    status=SUBMISSION_SUPERSEDED, error=f"同じ受験者・問題の解答が項目{index}で置き換えられました"
+                )
+            latest[key] = index
+
+        indices = list(latest.values())
+        chunk_size = max(chunk_size or settings.BULK_SUBMIT_CHUNK_SIZE, 1)
+        for start in range(0, len(indices), chunk_size):
+            chunk = indices[start:start + chunk_size]
+            try:
+                answer_ids = self._upsert_answers([
+                    _answer_values(
+                        submissions[index]["exam_id"], submissions[index]["question_id"],
+                        submissions[index]["candidate_id"], submissions[index]["answer_text"],
+                        ip_address, user_agent
+                    )
+                    for index in chunk
+                ])
+                self._invalidate_results(list(answer_ids.values()), [
+                    scoring_fingerprint(
+                        submissions[index]["answer_text"], limits[submissions[index]["question_id"]].version
+                    )
+                    for index in chunk
+                ])
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"解答一括提出エラー: {len(chunk)}件, {e}")
+                for index in chunk:
+                    statuses[index].update(status=SUBMISSION_FAILED, error=str(e))
+                continue
+
+            for index in chunk:
+                submission = submissions[index]
+                statuses[index]["answer_id"] = answer_ids[
+                    (submission["exam_id"], submission["question_id"], submission["candidate_id"])
+                ]
+
+        accepted = sum(1 for item in statuses if item["status"] == SUBMISSION_ACCEPTED)
+        logger.info(f"解答一括提出完了: 対象={len(submissions)}件, 受理={accepted}件")
+        return statuses
+
+    def _on_conflict_update(self, statement):
+        """同じ受験者・問題の解答がある場合に本文を置き換える ON CONFLICT DO UPDATE 句"""
+        return statement.on_conflict_do_update(
+            index_elements=[Answer.exam_id, Answer.question_id, Answer.candidate_id],
+            set_={
+                "answer_text": statement.excluded.answer_text,
+                "char_count": statement.excluded.char_count,
+                "is_blank": statement.excluded.is_blank,
+                # ON CONFLICT の更新には onupdate が適用されないため明示する
+                "updated_at": datetime.now(timezone.utc)
+            }
+        )
 
-        # 既存の有効な採点結果チェック（回答更新後の再採点を考慮）
-        existing_result = self.db.query(ScoringResult).filter(
-            ScoringResult.answer_id == answer_id,
-            ScoringResult.status == ScoringStatus.COMPLETED
+    def _upsert_answer(self, values: Dict[str, Any]) -> Answer:
+        """解答を登録・更新（同じ受験者・問題の解答があれば本文を置き換える）"""
+        insert = _UPSERT_INSERTS.get(self.session.get_bind().dialect.name)
+        if insert is None:
+            return self._merge_answer(values)
+
+        statement = self._on_conflict_update(insert(Answer).values(**values)).returning(Answer)
+        return self.session.scalars(statement, execution_options={"populate_existing": True}).one()
+
+    def _upsert_answers(self, rows: List[Dict[str, Any]]) -> Dict[tuple, int]:
+        """複数の解答を1文で登録・更新し、(exam_id, question_id, candidate_id) ごとの解答IDを返す"""
+        insert = _UPSERT_INSERTS.get(self.session.get_bind().dialect.name)
+        if insert is None:
+            return {
+                (values["exam_id"], values["question_id"], values["candidate_id"]): self._merge_answer(values).id
+                for values in rows
+            }
+
+        statement = self._on_conflict_update(insert(Answer).values(rows)).returning(
+            Answer.id, Answer.exam_id, Answer.question_id, Answer.candidate_id
+        )
+        return {(row.exam_id, row.question_id, row.candidate_id): row.id for row in self.session.execute(statement)}
+
+    def _merge_answer(self, values: Dict[str, Any]) -> Answer:
+        """ON CONFLICT 非対応のデータベース用の登録・更新（SELECTしてから更新）"""
+        answer = self.session.query(Answer).filter(
+            Answer.exam_id == values["exam_id"],
+            Answer.question_id == values["question_id"],
+            Answer.candidate_id == values["candidate_id"]
         ).first()
 
-        # 回答の更新時刻と採点完了時刻を比較して再採点の必要性を判定
-        if existing_result and existing_result.scoring_completed_at:
-            # updated_atがNoneの場合は初回登録なので既存結果を使用
-            if answer.updated_at is None or answer.updated_at <= existing_result.scoring_completed_at:
-                logger.info(f"既存の有効な採点結果を返します: {answer_id}")
-                return existing_result
-            else:
-                logger.info(f"回答が更新されているため再採点します: answer_id={answer_id}")
-                # 既存結果を無効化
-                existing_result.status = ScoringStatus.PENDING
-
-        # 新規採点結果作成
-        scoring_result = ScoringResult(
-            answer_id=answer_id,
-            status=ScoringStatus.PENDING,
-            scoring_method=ScoringMethod.COMPREHENSIVE,
-            scoring_started_at=datetime.now(timezone.utc)
-        )
-        self.db.add(scoring_result)
-        self.db.commit()
+        if answer is None:
+            answer = Answer(**values)
+            self.session.add(answer)
+        else:
+            answer.answer_text = values["answer_text"]
+            answer.char_count = values["char_count"]
+            answer.is_blank = values["is_blank"]
+            answer.updated_at = datetime.now(timezone.utc)
+        self.session.flush()
+        return answer
+
+    def _invalidate_results(self, answer_ids: List[int], fingerprints: Optional[List[str]] = None):
+        """更新された解答の採点済み結果を1文で無効化
+
+        fingerprints を指定した場合は、いずれの指紋とも一致しない結果のみ無効化する
+        （指紋は解答文・問題を含むため、別の解答の指紋と一致するのは同じ問題・同じ解答文の場合に限られる）
+        """
+        conditions = [ScoringResult.answer_id.in_(answer_ids), ScoringResult.status == ScoringStatus.COMPLETED]
+        if fingerprints:
+            conditions.append(or_(ScoringResult.fingerprint.is_(None), ScoringResult.fingerprint.notin_(fingerprints)))
+        invalidated = self.session.execute(
+            update(ScoringResult).where(*conditions).values(status=ScoringStatus.PENDING)
+        ).rowcount
+        if invalidated:
+            logger.info(f"採点結果を無効化: 解答={len(answer_ids)}件, 件数={invalidated}")
+
+    async def evaluate_answer(self, answer_id: int, defer_on_busy: Optional[bool] = None) -> ScoringResult:
+        """AI採点実行"""
+        existing_result, answer, payload, scoring_result = await self._run(self._start_evaluation, answer_id)
+        if existing_result:
+            return existing_result
 
         try:
             # AI採点実行
-            scoring_result.status = ScoringStatus.IN_PROGRESS
-            self.db.commit()
-
-            scores = await self._perform_ai_scoring(answer)
+            scores = await self._perform_ai_scoring(
+                answer,
+                self.defer_on_busy if defer_on_busy is None else defer_on_busy,
+                payload=payload
+            )
 
             # 結果更新
-            scoring_result.total_score = scores.get("total_score", 0)
-            scoring_result.max_score = scores.get("max_score", 100)
-            scoring_result.percentage = scores.get("percentage", 0)
-            scoring_result.confidence = scores.get("confidence", 0)
-
-            scoring_result.rule_based_score = scores.get("rule_based_score")
-            scoring_result.semantic_score = scores.get("semantic_score")
-            scoring_result.comprehensive_score = scores.get("comprehensive_score")
-
-            scoring_result.scoring_details = scores.get("details")
-            scoring_result.scoring_reasons = scores.get("reasons")
-            scoring_result.suggestions = scores.get("suggestions")
-
-            scoring_result.model_name = scores.get("model_name")
-            scoring_result.temperature = scores.get("temperature")
-            scoring_result.tokens_used = scores.get("tokens_used")
-            scoring_result.processing_time_ms = scores.get("processing_time_ms")
-
-            scoring_result.status = ScoringStatus.COMPLETED
-            scoring_result.scoring_completed_at = datetime.now(timezone.utc)
-
-            self.db.commit()
-            self.db.refresh(scoring_result)
+            await self._run(self._complete_results, [(scoring_result, scores)])
 
             logger.info(f"AI採点完了: answer_id={answer_id}, score={scoring_result.total_score}")
             return scoring_result
 
+        except AIEngineBusyError:
+            # 混雑による延期は失敗扱いにせず、再試行時に新しい採点結果を作成する
+            await self._run(self._discard_results, [scoring_result])
+            raise
         except Exception as e:
-            scoring_result.status = ScoringStatus.FAILED
-            self.db.commit()
+            await self._run(self._fail_results, [scoring_result])
             logger.error(f"AI採点エラー: {e}")
             raise
 
-    async def _perform_ai_scoring(self, answer: Answer) -> Dict[str, Any]:
-        """AI Engine による採点実行"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.ai_engine_url}/score",
-                    json={
-                        "answer_text": answer.answer_text,
-                        "question_data": {
-                            "question_text": answer.question.question_text,
-                            "model_answer": answer.question.model_answer,
-                            "keywords": answer.question.keyword_list,
-                            "grading_intention": answer.question.grading_intention,
-                            "max_chars": answer.question.max_chars,
-                            "points": answer.question.points
-                        }
-                    }
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    raise Exception(f"AI Engine error: {response.status_code}")
+    def _start_evaluation(
+        self,
+        answer_id: int
+    ) -> Tuple[Optional[ScoringResult], Optional[Answer], Optional[Dict[str, Any]], Optional[ScoringResult]]:
+        """採点開始のデータベース処理（再利用する結果、または解答・送信内容・作成した採点結果を返す）"""
+        answer = self.session.query(Answer).filter(Answer.id == answer_id).first()
+        if not answer:
+            raise ValueError(f"解答が見つかりません: {answer_id}")
+        self._load_questions([answer.question_id])
+
+        existing_result = self._find_reusable_result(answer)
+        if existing_result:
+            # 再利用する結果を現在の採点結果にする（無効化・復元した結果があればあわせてコミット）
+            if answer.current_result_id != existing_result.id or self.session.dirty:
+                self._set_current_results([(answer, existing_result.id)])
+                self.session.commit()
+                self._reload_results([existing_result])
+            return existing_result, None, None, None
+
+        # コミットで解答が失効する前にAI Engineへの送信内容を作成しておく（再読み込みを避ける）
+        payload = self._build_scoring_payload(answer)
+
+        # 新規採点結果作成（現在の採点結果とする）
+        previous_result_id = answer.current_result_id
+        scoring_result = self._start_scoring_result(answer, ScoringStatus.IN_PROGRESS)
+        self.session.flush()
+        self._previous_results[scoring_result.id] = previous_result_id
+        self._set_current_results([(answer, scoring_result.id)])
+        self.session.commit()
+        return None, answer, payload, scoring_result
+
+    async def evaluate_answers(self, answer_ids: List[int], defer_on_busy: Optional[bool] = None) -> Dict[int, ScoringResult]:
+        """複数解答のAI採点を一括実行（AI Engineの一括採点APIを1回呼び出す）
+
+        解答・問題・採点済み結果はそれぞれ1回のクエリでまとめて読み込み、解答数によらないクエリ数で採点する。
+        存在しない解答IDは結果に含まれない
+        """
+        results, pending = await self._run(self._start_batch_evaluation, answer_ids)
+        if not pending:
+            return results
 
-        except httpx.TimeoutException:
-            logger.error("AI Engine timeout")
-            # フォールバック: ルールベース採点のみ
-            return await self._fallback_scoring(answer)
+        try:
+            scores_list = await self._perform_ai_scoring_batch(
+                [answer for _, answer, _, _ in pending],
+                self.defer_on_busy if defer_on_busy is None else defer_on_busy,
+                payloads=[payload for _, _, payload, _ in pending]
+            )
+        except AIEngineBusyError:
+            await self._run(self._discard_results, [scoring_result for _, _, _, scoring_result in pending])
+            raise
         except Exception as e:
-            logger.error(f"AI Engine error: {e}")
-            return await self._fallback_scoring(answer)
+            await self._run(self._fail_results, [scoring_result for _, _, _, scoring_result in pending])
+            logger.error(f"一括AI採点エラー: {e}")
+            raise
 
-    async def _fallback_scoring(self, answer: Answer) -> Dict[str, Any]:
-        """フォールバック採点（ルールベースのみ）"""
-        # 簡単なキーワードマッチング
+        await self._run(self._complete_results, [
+            (scoring_result, scores) for (_, _, _, scoring_result), scores in zip(pending, scores_list)
+        ], list(results.values()))
+        for answer_id, _, _, scoring_result in pending:
+            results[answer_id] = scoring_result
+
+        logger.info(f"一括AI採点完了: 対象={len(answer_ids)}件, 採点={len(pending)}件")
+        return results
+
+    def _start_batch_evaluation(self, answer_ids: List[int]) -> Tuple[Dict[int, ScoringResult], List[tuple]]:
+        """一括採点開始のデータベース処理
+
+        再利用する結果と、採点する (解答ID, 解答, 送信内容, 作成した採点結果) のリストを返す
+        """
+        answers = self.session.query(Answer).filter(Answer.id.in_(answer_ids)).all()
+        self._load_questions([answer.question_id for answer in answers])
+        existing = self._existing_results([answer.id for answer in answers])
+
+        results: Dict[int, ScoringResult] = {}
+        pending = []
+        current = []
+        for answer in answers:
+            existing_result = self._reusable_result(answer, existing.get(answer.id, []))
+            if existing_result:
+                results[answer.id] = existing_result
+                if answer.current_result_id != existing_result.id:
+                    current.append((answer, existing_result))
+            else:
+                scoring_result = self._start_scoring_result(answer, ScoringStatus.IN_PROGRESS)
+                pending.append((answer.id, answer, self._build_scoring_payload(answer), scoring_result))
+                current.append((answer, scoring_result))
+        self.session.flush()
+        for answer_id, answer, _, scoring_result in pending:
+            self._previous_results[scoring_result.id] = answer.current_result_id
+        self._set_current_results([(answer, scoring_result.id) for answer, scoring_result in current])
+        self.session.commit()
+
+        if not pending:
+            self._reload_results(list(results.values()))
+        return results, pending
+
+    def _complete_results(
+        self,
+        completed: List[Tuple[ScoringResult, Dict[str, Any]]],
+        others: Optional[List[ScoringResult]] = None
+    ):
+        """採点結果を反映してコミット（others は同じ応答で返す、コミットで失効する他の採点結果）"""
+        results = [scoring_result for scoring_result, _ in completed] + list(others or [])
+        self._reload_results(results)
+        for scoring_result, scores in completed:
+            self._previous_results.pop(scoring_result.id, None)
+            self._apply_scores(scoring_result, scores)
+        self.session.commit()
+        self._reload_results(results)
+
+    def _discard_results(self, results: List[ScoringResult]):
+        """作成した採点結果を削除（AI Engine混雑による延期時。現在の採点結果は採点開始前の結果に戻す）"""
+        self._reload_results(results)
+        answers = Answer.__table__
+        self.session.execute(
+            update(answers)
+            .where(answers.c.current_result_id == bindparam("discarded_result_id"))
+            .values(current_result_id=bindparam("previous_result_id"), updated_at=answers.c.updated_at),
+            [
+                {
+                    "discarded_result_id": scoring_result.id,
+                    "previous_result_id": self._previous_results.pop(scoring_result.id, None)
+                }
+                for scoring_result in results
+            ]
+        )
+        for scoring_result in results:
+            self.session.delete(scoring_result)
+        self.session.commit()
+
+    def _fail_results(self, results: List[ScoringResult]):
+        """作成した採点結果を失敗状態にする"""
+        self.session.rollback()
+        self._reload_results(results)
+        for scoring_result in results:
+            self._previous_results.pop(scoring_result.id, None)
+            scoring_result.status = ScoringStatus.FAILED
+        self.session.commit()
+
+    def _reload_results(self, results: List[ScoringResult]):
+        """コミットで失効した採点結果を1回のクエリでまとめて読み直す（結果ごとの再読み込みを避ける）"""
+        # 主キーは失効しても identity から取得できる
+        result_ids = [inspect(result).identity[0] for result in results if inspect(result).expired_attributes]
+        if result_ids:
+            self.session.query(ScoringResult).filter(ScoringResult.id.in_(result_ids)).all()
+
+    def _set_current_results(self, current: List[Tuple[Answer, int]]):
+        """解答の現在の採点結果を1回の実行（executemany）でまとめて更新
+
+        解答の内容は変わらないため updated_at は更新しない
+        """
+        if not current:
+            return
+        answers = Answer.__table__
+        self.session.execute(
+            update(answers)
+            .where(answers.c.id == bindparam("target_answer_id"))
+            .values(current_result_id=bindparam("target_result_id"), updated_at=answers.c.updated_at),
+            [{"target_answer_id": answer.id, "target_result_id": result_id} for answer, result_id in current]
+        )
+        for answer, result_id in current:
+            set_committed_value(answer, "current_result_id", result_id)
+
+    def _existing_results(self, answer_ids: List[int]) -> Dict[int, List[ScoringResult]]:
+        """解答ごとの再利用候補の採点結果（採点完了済みと、無効化された採点済みの結果。1回のクエリでまとめて取得）"""
+        if not answer_ids:
+            return {}
+        existing: Dict[int, List[ScoringResult]] = {}
+        for result in self.session.query(ScoringResult).filter(
+            ScoringResult.answer_id.in_(answer_ids),
+            or_(
+                ScoringResult.status == ScoringStatus.COMPLETED,
+                and_(ScoringResult.status == ScoringStatus.PENDING, ScoringResult.fingerprint.isnot(None))
+            ),
+            ScoringResult.scoring_completed_at.isnot(None)
+        ).order_by(ScoringResult.id.desc()):
+            existing.setdefault(result.answer_id, []).append(result)
+        return existing
+
+    def _find_reusable_result(self, answer: Answer) -> Optional[ScoringResult]:
+        """再利用可能な採点結果を取得（再利用できない採点完了済みの結果は無効化してNone）"""
+        return self._reusable_result(answer, self._existing_results([answer.id]).get(answer.id, []))
+
+    def _reusable_result(self, answer: Answer, existing_results: List[ScoringResult]) -> Optional[ScoringResult]:
+        """採点結果が再利用できるか判定
+
+        解答文・問題・採点エンジンの指紋が一致する結果を再利用する（無効化されていた場合は完了に戻す）。
+        指紋のない従来の結果は回答の更新時刻と採点完了時刻で判定する。
+        再利用しない採点完了済みの結果は無効化する
+        """
+        fingerprint, _ = self._scoring_fingerprint(answer)
+        reusable = next((result for result in existing_results if result.fingerprint == fingerprint), None)
+        if reusable is None:
+            # updated_atがNoneの場合は初回登録なので既存結果を使用
+            reusable = next((
+                result for result in existing_results
+                if result.fingerprint is None
+                and (answer.updated_at is None or answer.updated_at <= result.scoring_completed_at)
+            ), None)
+
+        for result in existing_results:
+            if result is not reusable and result.status == ScoringStatus.COMPLETED:
+                result.status = ScoringStatus.PENDING
+
+        if reusable is None:
+            if existing_results:
+                logger.info(f"解答・問題・採点エンジンのいずれかが変わったため再採点します: answer_id={answer.id}")
+            return None
+
+        if reusable.status != ScoringStatus.COMPLETED:
+            reusable.status = ScoringStatus.COMPLETED
+        logger.info(f"既存の有効な採点結果を返します: {answer.id}")
+        return reusable
+
+    def _scoring_fingerprint(self, answer: Answer) -> Tuple[str, str]:
+        """解答の採点結果の指紋と問題の版（問題の版は問題ごとに1回だけ計算する）"""
+        version = self._question_versions.get(answer.question_id)
+        if version is None:
+            version = self._question_versions[answer.question_id] = question_version(answer.question)
+        return scoring_fingerprint(answer.answer_text, version), version
+
+    def _start_scoring_result(self, answer: Answer, status: ScoringStatus = ScoringStatus.PENDING) -> ScoringResult:
+        """新規採点結果を作成（採点対象の指紋を記録する）"""
+        fingerprint, version = self._scoring_fingerprint(answer)
+        scoring_result = ScoringResult(
+            answer_id=answer.id,
+            status=status,
+            scoring_method=ScoringMethod.COMPREHENSIVE,
+            scoring_started_at=datetime.now(timezone.utc),
+            fingerprint=fingerprint,
+            question_version=version
+        )
+        self.session.add(scoring_result)
+        return scoring_result
+
+    def _apply_scores(self, scoring_result: ScoringResult, scores: Dict[str, Any]):
+        """採点結果を反映して完了状態にする"""
+        scoring_result.total_score = scores.get("total_score", 0)
+        scoring_result.max_score = scores.get("max_score", 100)
+        scoring_result.percentage = scores.get("percentage", 0)
+        scoring_result.confidence = scores.get("confidence", 0)
+
+        scoring_result.rule_based_score = scores.get("rule_based_score")
+        scoring_result.semantic_score = scores.get("semantic_score")
+        scoring_result.comprehensive_score = scores.get("comprehensive_score")
+
+        scoring_result.scoring_details = scores.get("details")
+        scoring_result.scoring_reasons = scores.get("reasons")
+        scoring_result.suggestions = scores.get("suggestions")
+
+        scoring_result.model_name = scores.get("model_name")
+        scoring_result.temperature = scores.get("temperature")
+        scoring_result.tokens_used = scores.get("tokens_used")
+        scoring_result.processing_time_ms = scores.get("processing_time_ms")
+
+        # フォールバック採点は実際に採点した方式の指紋とする（AI Engineの復旧後に再利用しない）
+        if scores.get("engine_version"):
+            scoring_result.fingerprint = scoring_fingerprint(
+                scoring_result.answer.answer_text, scoring_result.question_version or "", scores["engine_version"]
+            )
+
+        scoring_result.status = ScoringStatus.COMPLETED
+        scoring_result.scoring_completed_at = datetime.now(timezone.utc)
+
+    async def _perform_ai_scoring(
+        self,
+        answer: Answer,
+        defer_on_busy: bool = False,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """AI Engine による採点実行
+
+        AI Engineが429（混雑）を返した場合はRetry-Afterに従って待機・再試行し、
+        待機上限を超えた場合にのみフォールバック採点を行う。
+        defer_on_busyがTrueの場合は待機せずAIEngineBusyErrorを送出する。
+        payload は作成済みの送信内容（省略時は解答から作成）
+        SCORING_MODE=local の場合はAI Engineに送らずプロセス内で採点する。
+        """
+        if local_scoring_enabled():
+            return await self._local_scoring(answer, payload)
+
+        waited = 0.0
+
+        while True:
+            try:
+                return await self._request_ai_scoring(answer, payload=payload)
+
+            except AIEngineBusyError as e:
+                if defer_on_busy:
+                    raise
+                if waited + e.retry_after > settings.AI_ENGINE_MAX_BUSY_WAIT:
+                    logger.warning(f"AI Engine混雑が続いているためフォールバック採点します: answer_id={answer.id}")
+                    return await self._fallback_scoring(answer, payload)
+
+                logger.info(f"AI Engine混雑のため{e.retry_after}秒後に再試行します: answer_id={answer.id}")
+                await asyncio.sleep(e.retry_after)
+                waited += e.retry_after
+
+            except httpx.TimeoutException:
+                logger.error("AI Engine timeout")
+                # フォールバック: ルールベース採点のみ
+                return await self._fallback_scoring(answer, payload)
+            except Exception as e:
+                logger.error(f"AI Engine error: {e}")
+                return await self._fallback_scoring(answer, payload)
+
+    async def _perform_ai_scoring_batch(
+        self,
+        answers: List[Answer],
+        defer_on_busy: bool = False,
+        payloads: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """AI Engine による一括採点実行（混雑時・SCORING_MODE=local の場合の扱いは_perform_ai_scoringと同じ）"""
+        payloads = payloads or [None] * len(answers)
+        if local_scoring_enabled():
+            return [await self._local_scoring(answer, payload) for answer, payload in zip(answers, payloads)]
+
+        waited = 0.0
+
+        while True:
+            try:
+                items = await self._request_ai_scoring_batch(answers, payloads=payloads)
+                break
+
+            except AIEngineBusyError as e:
+                if defer_on_busy:
+                    raise
+                if waited + e.retry_after > settings.AI_ENGINE_MAX_BUSY_WAIT:
+                    logger.warning(f"AI Engine混雑が続いているためフォールバック採点します: {len(answers)}件")
+                    return [await self._fallback_scoring(answer, payload) for answer, payload in zip(answers, payloads)]
+
+                logger.info(f"AI Engine混雑のため{e.retry_after}秒後に一括採点を再試行します")
+                await asyncio.sleep(e.retry_after)
+                waited += e.retry_after
+
+            except Exception as e:
+                logger.error(f"AI Engine batch error: {e}")
+                return [await self._fallback_scoring(answer, payload) for answer, payload in zip(answers, payloads)]
+
+        # 個別に失敗した項目のみフォールバック採点
+        results = []
+        for answer, payload, item in zip(answers, payloads, items):
+            if item.get("result") is not None:
+                results.append(item["result"])
+            else:
+                logger.error(f"AI Engine error: answer_id={answer.id}, {item.get('error')}")
+                results.append(await self._fallback_scoring(answer, payload))
+
+        return results
+
+    def _load_questions(self, question_ids: List[int]):
+        """採点に使う問題の内容と版を問題のキャッシュから取得（問題ごとに1回だけ。問題の行は読み込まない）"""
+        missing = [question_id for question_id in dict.fromkeys(question_ids) if question_id not in self._question_payloads]
+        if not missing:
+            return
+        for question_id, limits in question_limits.get_many(self.session, missing).items():
+            self._question_payloads[question_id] = {"question_id": question_id, **limits.scoring_data}
+            self._question_versions[question_id] = limits.version
+
+    def _build_scoring_payload(self, answer: Answer) -> Dict[str, Any]:
+        """AI Engineに送る採点対象データ（問題部分は問題ごとに1回だけ作成して共有する）"""
+        question_data = self._question_payloads.get(answer.question_id)
+        if question_data is None:
+            question = answer.question
+            question_data = {
+                "question_id": answer.question_id,
+                "question_text": question.question_text,
+                "model_answer": question.model_answer,
+                "keywords": question.keyword_list,
+                "grading_intention": question.grading_intention,
+                "max_chars": question.max_chars,
+                "points": question.points,
+                "grading_criteria": question.criteria_dict
+            }
+            self._question_payloads[answer.question_id] = question_data
+        return {"answer_text": answer.answer_text, "question_data": question_data}
+
+    async def _post_to_ai_engine(self, path: str, payload: Dict[str, Any], timeout: float) -> Any:
+        """AI Engineへリクエストを送信（orjson/msgpack・圧縮をネゴシエーション）"""
+        body, headers = encode_request(payload, settings.AI_ENGINE_COMPRESSION_MIN_SIZE)
+        headers.update(accept_headers())
+
+        response = await self.ai_engine.post(path, content=body, headers=headers, timeout=timeout)
+
+        if response.status_code == 200:
+            return decode_response(
+                response.content,
+                response.headers.get("content-type"),
+                response.headers.get("content-encoding")
+            )
+        elif response.status_code == 429:
+            raise AIEngineBusyError(_parse_retry_after(response.headers.get("Retry-After")))
+        else:
+            raise Exception(f"AI Engine error: {response.status_code}")
+
+    async def _request_ai_scoring(self, answer: Answer, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """AI Engineへの採点リクエスト送信"""
+        return await self._post_to_ai_engine("/score", payload or self._build_scoring_payload(answer), timeout=30.0)
+
+    async def _request_ai_scoring_batch(
+        self,
+        answers: List[Answer],
+        payloads: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """AI Engineへの一括採点リクエスト送信（解答順の個別結果を返す）"""
+        payload = {"items": [
+            payload or self._build_scoring_payload(answer)
+            for answer, payload in zip(answers, payloads or [None] * len(answers))
+        ]}
+        data = await self._post_to_ai_engine("/score/batch", payload, timeout=float(settings.SCORING_TIMEOUT))
+
+        items = sorted(data["results"], key=lambda item: item["index"])
+        if len(items) != len(answers):
+            raise Exception(f"AI Engine batch result size mismatch: {len(items)} != {len(answers)}")
+        return items
+
+    async def _local_scoring(
+        self,
+        answer: Answer,
+        payload: Optional[Dict[str, Any]] = None,
+        reason: str = "local"
+    ) -> Dict[str, Any]:
+        """プロセス内採点（AI Engineと同じ採点パイプライン・採点計画で、通信なしに採点）"""
+        payload = payload or self._build_scoring_payload(answer)
+        result = await get_local_scorer().score(payload["answer_text"], payload["question_data"])
+        result["details"]["local_scoring"] = reason
+        return result
+
+    async def _fallback_scoring(self, answer: Answer, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """フォールバック採点（プロセス内のルールベース採点、利用できない場合はキーワードマッチング）
+
+        engine_version には採点した方式の版を返し、AI Engineで採点した結果として再利用されないようにする。
+        """
+        local_scorer = get_local_scorer() if settings.LOCAL_SCORING_FALLBACK else None
+        if local_scorer is not None:
+            try:
+                result = await self._local_scoring(answer, payload, reason="fallback")
+                result["engine_version"] = f"{local_scorer.engine_version}/{settings.SCORING_ENGINE_VERSION}"
+                return result
+            except Exception as e:
+                logger.error(f"プロセス内採点エラー: answer_id={answer.id}, {e}")
+
+        # 簡単なキーワードマッチング（送信内容があれば問題を読み込まない）
         score = 0
-        max_score = answer.question.points
-        keywords = answer.question.keyword_list
+        if payload is not None:
+            max_score = payload["question_data"]["points"]
+            keywords = payload["question_data"]["keywords"] or []
+        else:
+            max_score = answer.question.points
+            keywords = answer.question.keyword_list
 
         for keyword in keywords:
             if keyword in answer.answer_text:
@@ -225,18 +819,102 @@ class ScoringService:
             "model_name": "fallback",
             "temperature": None,
             "tokens_used": 0,
-            "processing_time_ms": 100
+            "processing_time_ms": 100,
+            "engine_version": FALLBACK_ENGINE_VERSION
         }
 
-    def get_scoring_results(self, exam_id: int, candidate_id: Optional[str] = None) -> List[ScoringResult]:
-        """採点結果取得"""
-        query = self.db.query(ScoringResult).join(Answer).filter(Answer.exam_id == exam_id)
+    async def review_result(
+        self,
+        result_id: int,
+        human_score: float,
+        reviewer_id: str,
+        review_comments: Optional[str] = None
+    ) -> ScoringResult:
+        """人間レビューの最終スコアを記録し、AI Engineにアンカーとして登録
+
+        レビュー済み解答は以降の類似解答の得点伝播（LLM採点の省略）に使用される。
+        アンカー登録に失敗してもレビュー結果は保存する。
+        """
+        scoring_result, anchors = await self._run(
+            self._record_review, result_id, human_score, reviewer_id, review_comments
+        )
+
+        try:
+            await self._post_to_ai_engine("/anchors", anchors, timeout=30.0)
+        except Exception as e:
+            logger.error(f"アンカー登録エラー: answer_id={anchors['anchors'][0]['answer_id']}, error={e}")
 
-        if candidate_id:
-            query = query.filter(Answer.candidate_id == candidate_id)
+        return scoring_result
 
-        return query.all()
+    def _record_review(
+        self,
+        result_id: int,
+        human_score: float,
+        reviewer_id: str,
+        review_comments: Optional[str]
+    ) -> Tuple[ScoringResult, Dict[str, Any]]:
+        """レビュー結果のデータベース処理（更新した採点結果とアンカー登録の送信内容を返す）"""
+        scoring_result = self.session.query(ScoringResult).options(
+            joinedload(ScoringResult.answer).joinedload(Answer.question)
+        ).filter(ScoringResult.id == result_id).first()
+        if not scoring_result:
+            raise ValueError(f"採点結果が見つかりません: {result_id}")
+
+        answer = scoring_result.answer
+        max_score = scoring_result.max_score or answer.question.points
+        if human_score < 0 or human_score > max_score:
+            raise ValueError(f"スコアが範囲外です: {human_score} (0〜{max_score})")
+
+        old_values = {"human_score": scoring_result.human_score, "is_reviewed": scoring_result.is_reviewed}
+        scoring_result.human_score = human_score
+        scoring_result.score_adjustment = human_score - (scoring_result.total_score or 0)
+        scoring_result.is_reviewed = True
+        scoring_result.reviewer_id = reviewer_id
+        scoring_result.review_comments = review_comments
+        scoring_result.reviewed_at = datetime.now(timezone.utc)
+        self.session.add(ScoringAuditLog(
+            scoring_result_id=scoring_result.id,
+            action="reviewed",
+            user_id=reviewer_id,
+            user_type="human",
+            old_values=old_values,
+            new_values={"human_score": human_score, "is_reviewed": True},
+            reason=review_comments
+        ))
+
+        # 採点時と同じ問題データを送り、問題の版ごとの索引に登録する
+        self._load_questions([answer.question_id])
+        anchors = {
+            "question_id": answer.question_id,
+            "question_data": self._build_scoring_payload(answer)["question_data"],
+            "anchors": [{
+                "answer_id": answer.id,
+                "answer_text": answer.answer_text,
+                "score": human_score,
+                "max_score": max_score
+            }]
+        }
+        self.session.commit()
+        self._reload_results([scoring_result])
+        return scoring_result, anchors
 
-    def get_scoring_result_by_id(self, result_id: int) -> Optional[ScoringResult]:
+    async def get_scoring_result_page(
+        self,
+        exam_id: int,
+        filters: ResultFilters = ResultFilters(),
+        sort: str = "id",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[ScoringResult], Optional[str]]:
+        """採点結果の1ページ分と次のページのカーソルを取得（解答ごとの現在の採点結果のみ、一覧に使う列のみ）
+
+        カーソルが不正な場合は InvalidCursorError（ValueError）を送出する。
+        """
+        query = paginate(results_query(exam_id, filters), sort, descending, cursor, limit)
+        results = await self._run(lambda: self.session.scalars(query).all())
+        return results[:limit], next_cursor(results, sort, descending, limit)
+
+    async def get_scoring_result_by_id(self, result_id: int) -> Optional[ScoringResult]:
         """採点結果ID指定取得"""
-        return self.db.query(ScoringResult).filter(ScoringResult.id == result_id).first()
\ No newline at end of file
+        return await self._run(self.session.get, ScoringResult, result_id)
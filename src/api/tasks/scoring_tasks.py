@@ -2,17 +2,75 @@
 採点タスク（Celery）
 """
 from celery import current_task
-from typing import List, Dict, Any
+from celery.exceptions import Retry
+from celery.signals import worker_process_shutdown
+from typing import List, Dict, Any, Optional
 import logging
 import asyncio
-from datetime import datetime
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
 from ..celery_app import celery_app
+from ..config import settings
 from ..database import SessionLocal
-from ..services.scoring_service import ScoringService
+from ..services.scoring_service import ScoringService, AIEngineBusyError
+from ..services.result_cleanup import delete_superseded_results
+from ..utils.ai_engine_client import get_ai_engine_client
 
 logger = logging.getLogger(__name__)
 
+# ワーカープロセス（スレッドプールの場合はスレッド）ごとのイベントループ
+_worker_state = threading.local()
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """ワーカーのイベントループ（fork後の子プロセスでは作り直す）"""
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None or loop.is_closed() or getattr(_worker_state, "pid", None) != os.getpid():
+        loop = asyncio.new_event_loop()
+        _worker_state.loop = loop
+        _worker_state.pid = os.getpid()
+    return loop
+
+
+def _run_async(coro):
+    """非同期処理をワーカーのイベントループで実行
+
+    イベントループをタスク間で使い回し、AI Engineクライアントの接続プールを再利用する
+    """
+    loop = _get_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+@worker_process_shutdown.connect
+def _close_worker_event_loop(**kwargs):
+    """ワーカープロセス終了時にAI Engineクライアントとイベントループを閉じる"""
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None or loop.is_closed() or getattr(_worker_state, "pid", None) != os.getpid():
+        return
+    try:
+        loop.run_until_complete(get_ai_engine_client().aclose())
+    finally:
+        loop.close()
+
+
+def _evaluate_batch_with_busy_retry(service: ScoringService, answer_ids: List[int]):
+    """AI Engine混雑時にRetry-After秒待機して再試行する一括採点
+
+    再試行回数を使い切った最後の試行ではフォールバック採点を許可する
+    """
+    max_retries = settings.AI_ENGINE_BUSY_RETRIES
+
+    for attempt in range(max_retries + 1):
+        try:
+            return _run_async(service.evaluate_answers(answer_ids, defer_on_busy=attempt < max_retries))
+        except AIEngineBusyError as e:
+            logger.info(f"AI Engine混雑のため待機します: 対象={len(answer_ids)}件, retry_after={e.retry_after}s")
+            time.sleep(e.retry_after)
+
 
 @celery_app.task(bind=True)
 def batch_scoring(self, answer_ids: List[int]) -> Dict[str, Any]:
@@ -33,15 +91,28 @@ def batch_scoring(self, answer_ids: List[int]) -> Dict[str, Any]:
 
     try:
         db = SessionLocal()
-        service = ScoringService(db)
+        service = ScoringService(db, defer_on_busy=True)
 
-        for i, answer_id in enumerate(answer_ids):
+        # AI Engineの一括採点APIを使い、AI_ENGINE_BATCH_SIZE件ずつ採点
+        batch_size = max(settings.AI_ENGINE_BATCH_SIZE, 1)
+        for start in range(0, total_answers, batch_size):
+            chunk = answer_ids[start:start + batch_size]
             try:
-                # 非同期採点の実行
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(service.evaluate_answer(answer_id))
-                loop.close()
+                # 非同期採点の実行（AI Engine混雑時はRetry-Afterに従って待機）
+                chunk_results = _evaluate_batch_with_busy_retry(service, chunk)
+            except Exception as e:
+                for answer_id in chunk:
+                    errors.append(f"answer_id={answer_id}: {str(e)}")
+                logger.error(f"採点エラー: answer_ids={chunk}: {e}")
+                continue
+
+            for answer_id in chunk:
+                result = chunk_results.get(answer_id)
+                if result is None:
+                    error_msg = f"answer_id={answer_id}: 解答が見つかりません"
+                    errors.append(error_msg)
+                    logger.error(f"採点エラー: {error_msg}")
+                    continue
 
                 results.append({
                     "answer_id": answer_id,
@@ -51,20 +122,15 @@ def batch_scoring(self, answer_ids: List[int]) -> Dict[str, Any]:
                 })
                 processed += 1
 
-                # プログレス更新
-                current_task.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': processed,
-                        'total': total_answers,
-                        'status': f'採点中 ({processed}/{total_answers})'
-                    }
-                )
-
-            except Exception as e:
-                error_msg = f"answer_id={answer_id}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(f"採点エラー: {error_msg}")
+            # プログレス更新
+            current_task.update_state(
+                state='PROGRESS',
+                meta={
+                    'current': processed,
+                    'total': total_answers,
+                    'status': f'採点中 ({processed}/{total_answers})'
+                }
+            )
 
         db.close()
 
@@ -97,13 +163,15 @@ def single_scoring(self, answer_id: int) -> Dict[str, Any]:
         db = SessionLocal()
         service = ScoringService(db)
 
-        # 非同期採点の実行
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(service.evaluate_answer(answer_id))
-        loop.close()
-
-        db.close()
+        # 非同期採点の実行（AI Engine混雑時はRetry-After後にタスクを再スケジュール）
+        can_retry = self.request.retries < settings.AI_ENGINE_BUSY_RETRIES
+        try:
+            result = _run_async(service.evaluate_answer(answer_id, defer_on_busy=can_retry))
+        except AIEngineBusyError as e:
+            logger.info(f"AI Engine混雑のため再スケジュールします: task_id={task_id}, countdown={e.retry_after}s")
+            raise self.retry(exc=e, countdown=e.retry_after, max_retries=settings.AI_ENGINE_BUSY_RETRIES)
+        finally:
+            db.close()
 
         final_result = {
             'task_id': task_id,
@@ -117,26 +185,37 @@ def single_scoring(self, answer_id: int) -> Dict[str, Any]:
         logger.info(f"単一採点完了: task_id={task_id}, score={result.total_score}")
         return final_result
 
+    except Retry:
+        raise
     except Exception as e:
         logger.error(f"単一採点エラー: task_id={task_id}, error={e}")
         raise
 
 
-@celery_app.task
-def cleanup_old_results(days: int = 30) -> Dict[str, Any]:
-    """古い採点結果のクリーンアップ"""
+@celery_app.task(bind=True)
+def cleanup_old_results(self, days: int = 30, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """古い採点結果のクリーンアップ（現在の採点結果から置き換えられた結果を一定件数ずつ削除）"""
     logger.info(f"クリーンアップタスク開始: {days}日前のデータを削除")
+    before = datetime.now(timezone.utc) - timedelta(days=days)
+
+    def report_progress(deleted: int):
+        current_task.update_state(
+            state='PROGRESS',
+            meta={'current': deleted, 'status': f'削除中 ({deleted}件)'}
+        )
 
     try:
         db = SessionLocal()
-        # クリーンアップロジックを実装
-        # 実際の本番環境では、適切な削除条件を設定
-
-        db.close()
+        try:
+            cleaned = delete_superseded_results(
+                db, before, batch_size or settings.RESULT_CLEANUP_BATCH_SIZE, on_progress=report_progress
+            )
+        finally:
+            db.close()
 
         return {
             'status': 'completed',
-            'cleaned_records': 0,  # 実際の削除件数
+            'cleaned_records': cleaned,
             'completed_at': datetime.utcnow().isoformat()
         }
 
@@ -0,0 +1,187 @@
+"""
+AI Engine用の共有HTTPクライアント
+
+プロセス（イベントループ）ごとに1つの httpx.AsyncClient を共有し、AI Engineへの接続を
+解答ごとに作り直さずにキープアライブ（h2 がある場合はHTTP/2）で再利用する。
+接続エラーはジッター付きの指数バックオフで再試行し、接続プールの利用状況を集計する。
+"""
+import asyncio
+import logging
+import os
+import random
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401  HTTP/2はh2がある場合のみ使用
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# 再試行する接続エラー（リクエスト送信前の失敗のため、POSTでも再送できる）
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class AIEngineClient:
+    """AI Engineへの共有HTTPクライアント
+
+    httpx.AsyncClient は作成したイベントループでのみ使えるため、プロセスIDとイベントループごとに保持する。
+    fork後の子プロセス（Celeryワーカー）では親の接続を使わずに作り直す。
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http2: Optional[bool] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = base_url or settings.AI_ENGINE_URL
+        http2 = settings.AI_ENGINE_HTTP2 if http2 is None else http2
+        if http2 and not H2_AVAILABLE:
+            logger.warning("h2がインストールされていないため、AI EngineへはHTTP/1.1（キープアライブ）で接続します")
+        self.http2 = http2 and H2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=settings.AI_ENGINE_MAX_CONNECTIONS if max_connections is None else max_connections,
+            max_keepalive_connections=(
+                settings.AI_ENGINE_MAX_KEEPALIVE if max_keepalive_connections is None else max_keepalive_connections
+            ),
+            keepalive_expiry=settings.AI_ENGINE_KEEPALIVE_EXPIRY if keepalive_expiry is None else keepalive_expiry
+        )
+        self.connect_timeout = settings.AI_ENGINE_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        self.retries = settings.AI_ENGINE_CONNECT_RETRIES if retries is None else retries
+        self.backoff = settings.AI_ENGINE_RETRY_BACKOFF if backoff is None else backoff
+        self._transport = transport
+
+        self._pid = os.getpid()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._counters = {"clients_created": 0, "requests": 0, "connect_retries": 0, "connect_errors": 0}
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """接続プールを持つクライアントを作成"""
+        self._counters["clients_created"] += 1
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=self.http2,
+            limits=self.limits,
+            timeout=httpx.Timeout(30.0, connect=self.connect_timeout),
+            transport=self._transport
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        """実行中のイベントループ用のクライアント（なければ作成）"""
+        if self._pid != os.getpid():
+            # fork前の接続は親プロセスのものなので閉じずに破棄する
+            self._clients = weakref.WeakKeyDictionary()
+            self._pid = os.getpid()
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._build_client()
+            self._clients[loop] = client
+        return client
+
+    async def start(self):
+        """接続プールを作成（アプリケーション起動時）"""
+        self.client()
+        logger.info(
+            f"AI Engineクライアントを初期化しました: url={self.base_url}, http2={self.http2}, "
+            f"max_connections={self.limits.max_connections}"
+        )
+
+    async def aclose(self):
+        """実行中のイベントループのクライアントを閉じる（アプリケーション・ワーカー終了時）"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        client = self._clients.pop(loop, None)
+        if client is not None and self._pid == os.getpid():
+            await client.aclose()
+
+    def _retry_delay(self, attempt: int) -> float:
+        """再試行までの待機秒数（指数バックオフにフルジッターを掛ける）"""
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        timeout: float = 30.0,
+        retries: Optional[int] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """リクエスト送信（接続エラー時は再試行）"""
+        client = self.client()
+        retries = self.retries if retries is None else retries
+        request_timeout = httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout))
+
+        self._counters["requests"] += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    return await client.request(method, path, timeout=request_timeout, **kwargs)
+                except RETRYABLE_ERRORS as e:
+                    if attempt >= retries:
+                        self._counters["connect_errors"] += 1
+                        raise
+                    delay = self._retry_delay(attempt)
+                    attempt += 1
+                    self._counters["connect_retries"] += 1
+                    logger.warning(f"AI Engineへの接続に失敗したため{delay:.2f}秒後に再試行します（{attempt}/{retries}）: {e}")
+                    await asyncio.sleep(delay)
+        finally:
+            self._in_flight -= 1
+
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """接続プールの利用状況"""
+        connections = []
+        for client in list(self._clients.values()):
+            # httpcoreの接続プールから接続数を取得（内部属性のため取得できない場合は省略）
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections.extend(getattr(pool, "connections", ()))
+
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "clients": len(self._clients),
+            "connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            **self._counters
+        }
+
+
+ai_engine_client = AIEngineClient()
+
+
+def get_ai_engine_client() -> AIEngineClient:
+    """プロセス共有のAI Engineクライアントを取得"""
+    return ai_engine_client
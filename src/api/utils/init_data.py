@@ -8,6 +8,7 @@ from typing import Dict, Any
 from ..models.exam import Exam, ExamSeason
 from ..models.question import Question
 from ..models.answer import Answer
+from ..services.catalog import catalog
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +116,7 @@ def create_initial_data(db: Session) -> Dict[str, Any]:
 
         # コミット
         db.commit()
+        catalog.invalidate()
 
         logger.info("初期データの作成が完了しました")
         return {
@@ -0,0 +1,130 @@
+"""
+既存データベースのスキーマ更新
+
+テーブルは create_all で作成しており、既存のテーブルに後から追加した列・索引は作成されない。
+起動時に不足している列と索引だけを追加する（何度実行しても同じ結果になる）。
+answers.current_result_id を追加した場合は、既存の解答に現在の採点結果を設定する。
+解答の一意制約（受験者・問題ごとに1件。解答提出の ON CONFLICT に必要）がない場合は、
+重複する解答を最新の解答にまとめてから一意索引を作成する。
+"""
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import delete, func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import Column, CreateColumn
+
+from ..database import Base
+from .. import models  # noqa: F401  テーブル定義をメタデータに登録
+from ..models.answer import Answer
+from ..models.scoring import ScoringResult
+from ..services.result_cleanup import backfill_current_results
+
+logger = logging.getLogger(__name__)
+
+# 既存のテーブルに後から追加した列（テーブル名, 列名）
+ADDED_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("scoring_results", "fingerprint"),
+    ("scoring_results", "question_version"),
+    ("answers", "current_result_id"),
+)
+
+# 既存のテーブルに後から追加した一意制約（テーブル名, 制約名）
+ADDED_UNIQUE_CONSTRAINTS: Tuple[Tuple[str, str], ...] = (
+    ("answers", "uq_answers_exam_question_candidate"),
+)
+
+
+def add_column_ddl(engine: Engine, column: Column) -> str:
+    """列を追加する ALTER TABLE 文（外部キーは列の制約として付ける）"""
+    preparer = engine.dialect.identifier_preparer
+    ddl = f"ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {CreateColumn(column).compile(dialect=engine.dialect)}"
+    for foreign_key in column.foreign_keys:
+        if foreign_key.constraint.name:
+            ddl += f" CONSTRAINT {preparer.quote(foreign_key.constraint.name)}"
+        ddl += f" REFERENCES {preparer.format_table(foreign_key.column.table)} ({preparer.quote(foreign_key.column.name)})"
+    return ddl
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """既存のテーブルに不足している列・索引を追加し、追加した列（"テーブル.列"）を返す"""
+    tables = set(inspect(engine).get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table_name, column_name in ADDED_COLUMNS:
+            if table_name not in tables:
+                continue
+            if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+                continue
+            column = Base.metadata.tables[table_name].c[column_name]
+            conn.execute(text(add_column_ddl(engine, column)))
+            added.append(f"{table_name}.{column_name}")
+            logger.info(f"列を追加しました: {table_name}.{column_name}")
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    logger.info(f"索引を追加しました: {index.name}")
+
+    # 列の追加前の解答は現在の採点結果が未設定のため、採点結果一覧に表示されない
+    if "answers.current_result_id" in added:
+        with Session(engine) as db:
+            backfill_current_results(db)
+
+    for table_name, constraint_name in ADDED_UNIQUE_CONSTRAINTS:
+        if table_name in tables:
+            _add_unique_constraint(engine, table_name, constraint_name)
+
+    return added
+
+
+def _add_unique_constraint(engine: Engine, table_name: str, constraint_name: str):
+    """一意制約（一意索引）がなければ、重複する行をまとめてから一意索引を作成"""
+    inspector = inspect(engine)
+    existing = {constraint["name"] for constraint in inspector.get_unique_constraints(table_name)}
+    existing |= {index["name"] for index in inspector.get_indexes(table_name) if index["unique"]}
+    if constraint_name in existing:
+        return
+
+    constraint = next(c for c in Base.metadata.tables[table_name].constraints if c.name == constraint_name)
+    columns = list(constraint.columns)
+    with engine.begin() as conn:
+        if table_name == Answer.__tablename__:
+            merge_duplicate_answers(conn)
+        preparer = engine.dialect.identifier_preparer
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX {preparer.quote(constraint_name)} ON {preparer.format_table(constraint.table)} "
+            f"({', '.join(preparer.quote(column.name) for column in columns)})"
+        ))
+    logger.info(f"一意索引を追加しました: {constraint_name}")
+
+
+def merge_duplicate_answers(conn) -> int:
+    """同じ受験者・問題の解答を最新（IDが最大）の解答にまとめ、削除した解答の件数を返す
+
+    まとめた解答の採点結果は最新の解答の履歴（置き換え済みの結果）として残す。
+    """
+    key = (Answer.exam_id, Answer.question_id, Answer.candidate_id)
+    latest = conn.execute(
+        select(*key, func.max(Answer.id)).group_by(*key).having(func.count(Answer.id) > 1)
+    ).all()
+    merged = 0
+    for exam_id, question_id, candidate_id, keep_id in latest:
+        duplicate_ids = conn.scalars(select(Answer.id).where(
+            Answer.exam_id == exam_id, Answer.question_id == question_id, Answer.candidate_id == candidate_id,
+            Answer.id != keep_id
+        )).all()
+        conn.execute(update(ScoringResult).where(ScoringResult.answer_id.in_(duplicate_ids)).values(answer_id=keep_id))
+        merged += conn.execute(delete(Answer).where(Answer.id.in_(duplicate_ids))).rowcount
+    if merged:
+        logger.info(f"重複する解答をまとめました: {merged}件")
+    return merged
@@ -0,0 +1,89 @@
+"""
+AI Engine通信用の高速シリアライズと圧縮
+
+AI Engine側（ai_engine/utils/serialization.py）とネゴシエーション方式を合わせている。
+- 送信: orjson（なければ標準json）、一定サイズ以上は zstd / gzip で圧縮
+- 受信: application/x-msgpack を優先して要求し、Content-Typeに応じてデコード
+"""
+import gzip
+import json
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+def dumps_json(data: Any) -> bytes:
+    """JSONエンコード"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(body: bytes) -> Any:
+    """JSONデコード"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def accept_headers() -> Dict[str, str]:
+    """AI Engineへ送るAccept / Accept-Encodingヘッダー"""
+    accept = f"{MSGPACK_MEDIA_TYPE}, {JSON_MEDIA_TYPE};q=0.9" if MSGPACK_AVAILABLE else JSON_MEDIA_TYPE
+    accept_encoding = "zstd, gzip" if ZSTD_AVAILABLE else "gzip"
+    return {"Accept": accept, "Accept-Encoding": accept_encoding}
+
+
+def encode_request(payload: Any, compress_min_size: int) -> Tuple[bytes, Dict[str, str]]:
+    """リクエスト本文をエンコードし、サイズが大きい場合は圧縮"""
+    body = dumps_json(payload)
+    headers = {"Content-Type": JSON_MEDIA_TYPE}
+
+    if len(body) >= compress_min_size:
+        if ZSTD_AVAILABLE:
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers["Content-Encoding"] = "zstd"
+        else:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+    return body, headers
+
+
+def decode_response(content: bytes, content_type: Optional[str], content_encoding: Optional[str]) -> Any:
+    """レスポンス本文をデコード
+
+    gzipはhttpxが自動展開するため、ここではhttpxが扱わないzstdのみ展開する
+    """
+    if content_encoding == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstandardがインストールされていません")
+        content = zstandard.ZstdDecompressor().decompress(content)
+
+    if content_type and "msgpack" in content_type:
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("msgpackがインストールされていません")
+        return msgpack.unpackb(content, raw=False)
+
+    return loads_json(content)
@@ -33,7 +33,9 @@ interface ScoringResult {
 
 const ScoringList: React.FC = () => {
   const [results, setResults] = useState<ScoringResult[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [exporting, setExporting] = useState(false);
   const navigate = useNavigate();
@@ -43,7 +45,8 @@ const ScoringList: React.FC = () => {
       try {
         // 仮のexam_id=1で採点結果を取得
         const data = await apiService.getScoringResults(1);
-        setResults(data);
+        setResults(data.items);
+        setNextCursor(data.next_cursor);
       } catch (err) {
         setError('採点結果の取得に失敗しました');
       } finally {
@@ -54,6 +57,20 @@ const ScoringList: React.FC = () => {
     fetchResults();
   }, []);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await apiService.getScoringResults(1, undefined, nextCursor);
+      setResults((current) => [...current, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError('採点結果の取得に失敗しました');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getStatusChip = (status: string) => {
     const statusMap: { [key: string]: { label: string; color: any } } = {
       pending: { label: '待機中', color: 'default' },
@@ -244,6 +261,14 @@ const ScoringList: React.FC = () => {
           </TableBody>
         </Table>
       </TableContainer>
+
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={2}>
+          <Button variant="outlined" onClick={handleLoadMore} disabled={loadingMore}>
+            {loadingMore ? '読み込み中...' : 'さらに表示'}
+          </Button>
+        </Box>
+      )}
     </Container>
   );
 };
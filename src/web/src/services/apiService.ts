@@ -26,12 +26,15 @@ export const apiService = {
     return response.data;
   },
 
-  // 採点結果一覧取得
-  async getScoringResults(examId: number, candidateId?: string) {
+  // 採点結果一覧取得（1ページ分。次のページは next_cursor を cursor に指定して取得）
+  async getScoringResults(examId: number, candidateId?: string, cursor?: string) {
     const params: any = {};
     if (candidateId) {
       params.candidate_id = candidateId;
     }
+    if (cursor) {
+      params.cursor = cursor;
+    }
 
     const response = await apiClient.get(`/api/scoring/results/${examId}`, { params });
     return response.data;
@@ -15,6 +15,40 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture
+def api_db():
+    """API用のインメモリSQLiteセッション（試験1件・問題1件（max_chars=40）を登録済み）"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from src.api.database import Base
+    from src.api.models import Exam, ExamSeason, Question
+    from src.api.services.catalog import catalog
+    from src.api.services.question_cache import question_limits
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    exam = Exam(year=2024, season=ExamSeason.AUTUMN, title="テスト試験")
+    session.add(exam)
+    session.flush()
+    session.add(Question(
+        exam_id=exam.id, title="リスク管理", question_number="設問1", background_text="",
+        question_text="理由を述べよ。", model_answer="要員のスキル不足", max_chars=40, points=25
+    ))
+    session.commit()
+    question_limits.invalidate()
+    catalog.invalidate()
+
+    yield session
+    session.close()
+    question_limits.invalidate()
+    catalog.invalidate()
+    engine.dispose()
+
+
 @pytest.fixture(scope="session")
 async def api_client():
     """API クライアント（セッション共有）"""
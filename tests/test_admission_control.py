@@ -0,0 +1,121 @@
+"""
+アドミッション制御のテスト
+AI Engineの429応答とAPI側のRetry-After対応を検証
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from src.ai_engine.utils.admission import AdmissionController, AdmissionRejected
+from src.api.services.scoring_service import ScoringService, AIEngineBusyError, _parse_retry_after
+
+
+class TestAdmissionController:
+    """AI Engine側アドミッション制御テスト"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        """実行枠と待ち行列が埋まっている場合は即座に拒否すること"""
+        controller = AdmissionController(max_concurrency=1, max_queue=1, default_max_wait=5)
+        release = asyncio.Event()
+
+        async def occupy():
+            async with controller.admit():
+                await release.wait()
+
+        running = asyncio.create_task(occupy())
+        queued = asyncio.create_task(occupy())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit():
+                pass
+
+        assert exc_info.value.reason == "queue_full"
+        assert exc_info.value.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert controller.get_status()["admitted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_max_queue_wait(self):
+        """待ち時間の上限を超えた要求は拒否されること"""
+        controller = AdmissionController(max_concurrency=1, max_queue=10, default_max_wait=5)
+        release = asyncio.Event()
+
+        async def occupy():
+            async with controller.admit():
+                await release.wait()
+
+        running = asyncio.create_task(occupy())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit(max_wait=0.01):
+                pass
+
+        assert exc_info.value.reason == "queue_timeout"
+        release.set()
+        await running
+
+    def test_retry_after_follows_throughput(self):
+        """Retry-Afterが処理スループットから算出されること"""
+        controller = AdmissionController(max_concurrency=2, max_queue=10, default_max_wait=5, max_retry_after=60)
+        assert controller.retry_after() == 1
+
+        controller._record_service_time(4.0)  # 2並列 × 4秒 → 0.5件/秒
+        controller._waiting = 3
+        assert controller.retry_after() == 8  # (3 + 0 + 1) / 0.5
+
+        controller._waiting = 1000
+        assert controller.retry_after() == 60
+
+
+class TestRetryAfterHandling:
+    """API側のRetry-After対応テスト"""
+
+    @pytest.fixture
+    def answer(self):
+        question = SimpleNamespace(points=25, keyword_list=["品質"])
+        return SimpleNamespace(id=1, answer_text="品質管理を徹底する", question=question)
+
+    def test_parse_retry_after(self):
+        assert _parse_retry_after("3") == 3.0
+        assert _parse_retry_after(None) == 1.0
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 1.0
+
+    @pytest.mark.asyncio
+    async def test_waits_retry_after_instead_of_fallback(self, answer):
+        """混雑時はフォールバックせずRetry-After後に再試行すること"""
+        service = ScoringService(db=None)
+        engine_result = {"total_score": 20, "model_name": "engine"}
+
+        with patch.object(
+            service, "_request_ai_scoring", AsyncMock(side_effect=[AIEngineBusyError(2), engine_result])
+        ), patch("src.api.services.scoring_service.asyncio.sleep", AsyncMock()) as mock_sleep:
+            result = await service._perform_ai_scoring(answer)
+
+        assert result == engine_result
+        mock_sleep.assert_awaited_once_with(2)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_busy_wait_exceeds_limit(self, answer):
+        """待機上限を超える場合はフォールバック採点すること"""
+        service = ScoringService(db=None)
+
+        with patch.object(service, "_request_ai_scoring", AsyncMock(side_effect=AIEngineBusyError(10_000))):
+            result = await service._perform_ai_scoring(answer)
+
+        assert result["model_name"] == "fallback"
+
+    @pytest.mark.asyncio
+    async def test_defer_on_busy_raises(self, answer):
+        """defer_on_busy指定時は待機せず例外を送出すること（Celery再スケジュール用）"""
+        service = ScoringService(db=None, defer_on_busy=True)
+
+        with patch.object(service, "_request_ai_scoring", AsyncMock(side_effect=AIEngineBusyError(5))):
+            with pytest.raises(AIEngineBusyError):
+                await service._perform_ai_scoring(answer, defer_on_busy=True)
@@ -0,0 +1,107 @@
+"""
+AI Engine用の共有HTTPクライアントのテスト
+接続の再利用、接続エラー時のジッター付き再試行、イベントループごとのクライアント保持を検証
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.api.services.scoring_service import ScoringService
+from src.api.utils import ai_engine_client as client_module
+from src.api.utils.ai_engine_client import AIEngineClient
+
+
+def _flaky_transport(failures: int):
+    """最初のfailures回は接続エラー、以降は200を返すトランスポート"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    return calls, httpx.MockTransport(handler)
+
+
+class TestAIEngineClient:
+    """AI Engineクライアントテスト"""
+
+    @pytest.mark.asyncio
+    async def test_retries_connect_errors_with_jitter(self):
+        """接続エラーはジッター付きの待機後に再試行し、同じクライアントを使い回すこと"""
+        calls, transport = _flaky_transport(failures=2)
+        engine = AIEngineClient(base_url="http://engine", retries=3, backoff=0.5, transport=transport)
+
+        with patch.object(client_module.random, "uniform", side_effect=lambda low, high: high) as mock_uniform, \
+                patch.object(client_module.asyncio, "sleep", AsyncMock()) as mock_sleep:
+            response = await engine.post("/score", json={})
+            await engine.get("/health")
+
+        assert response.json() == {"path": "/score"}
+        assert len(calls) == 4
+        assert [call.args for call in mock_uniform.call_args_list] == [(0, 0.5), (0, 1.0)]
+        assert [call.args for call in mock_sleep.await_args_list] == [(0.5,), (1.0,)]
+
+        stats = engine.stats()
+        assert stats["clients_created"] == 1
+        assert stats["requests"] == 2
+        assert stats["connect_retries"] == 2
+        assert stats["in_flight"] == 0
+        await engine.aclose()
+
+    @pytest.mark.asyncio
+    async def test_raises_after_retries_exhausted(self):
+        """再試行回数を超えた接続エラーは送出すること"""
+        calls, transport = _flaky_transport(failures=10)
+        engine = AIEngineClient(base_url="http://engine", retries=1, transport=transport)
+
+        with patch.object(client_module.asyncio, "sleep", AsyncMock()):
+            with pytest.raises(httpx.ConnectError):
+                await engine.post("/score", json={})
+
+        assert len(calls) == 2
+        assert engine.stats()["connect_errors"] == 1
+
+    def test_client_per_event_loop(self):
+        """イベントループごとにクライアントを作成し、同じループでは再利用すること"""
+        engine = AIEngineClient(base_url="http://engine", transport=_flaky_transport(failures=0)[1])
+
+        async def get_client():
+            return engine.client(), engine.client()
+
+        first, again = asyncio.run(get_client())
+        second, _ = asyncio.run(get_client())
+
+        assert first is again
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_scoring_service_uses_shared_client(self):
+        """採点サービスは共有クライアントでAI Engineに送信すること"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"total_score": 20})
+
+        engine = AIEngineClient(base_url="http://engine", transport=httpx.MockTransport(handler))
+        answer = SimpleNamespace(
+            id=1, question_id=1, answer_text="品質管理を徹底する",
+            question=SimpleNamespace(
+                question_text="問", model_answer="模範", keyword_list=["品質"], grading_intention="",
+                max_chars=40, points=25, criteria_dict={}
+            )
+        )
+
+        with patch.object(client_module, "ai_engine_client", engine):
+            service = ScoringService(db=None)
+            results = [await service._request_ai_scoring(answer) for _ in range(2)]
+
+        assert results == [{"total_score": 20}, {"total_score": 20}]
+        assert [request.url.path for request in requests] == ["/score", "/score"]
+        assert engine.stats()["clients_created"] == 1
+        await engine.aclose()
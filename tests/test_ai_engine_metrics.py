@@ -0,0 +1,79 @@
+"""
+AI Engineメトリクスのテスト
+Prometheus形式の出力と採点各段階の計測を検証
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from src.ai_engine import main as engine_main
+from src.ai_engine.llm.base import LLMProvider, LLMResponse, ScoringCriteria
+from src.ai_engine.llm.lmstudio import LMStudioProvider
+from src.ai_engine.utils import metrics
+from src.ai_engine.utils.metrics import MetricsRegistry
+
+
+class TestAIEngineMetrics:
+    """AI Engineメトリクステスト"""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        """ヒストグラムが累積バケット・合計・件数を出力すること"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_seconds", "テスト", ("stage",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="llm")
+        histogram.observe(0.5, stage="llm")
+        histogram.observe(5.0, stage="llm")
+
+        text = registry.render()
+        assert "# TYPE test_seconds histogram" in text
+        assert 'test_seconds_bucket{stage="llm",le="0.1"} 1' in text
+        assert 'test_seconds_bucket{stage="llm",le="1"} 2' in text
+        assert 'test_seconds_bucket{stage="llm",le="+Inf"} 3' in text
+        assert 'test_seconds_count{stage="llm"} 3' in text
+        assert 'test_seconds_sum{stage="llm"} 5.55' in text
+
+    def test_label_mismatch_is_rejected(self):
+        """定義と異なるラベルを指定するとエラーになること"""
+        counter = MetricsRegistry().counter("test_total", "テスト", ("type",))
+        with pytest.raises(ValueError):
+            counter.inc(kind="x")
+
+    @pytest.mark.asyncio
+    async def test_lmstudio_stage_timings_and_parse_fallback(self):
+        """LMStudio採点でプロンプト構築・LLM・解析時間とフォールバックが記録されること"""
+        provider = LMStudioProvider({})
+        criteria = ScoringCriteria(question_text="問題", answer_text="解答", max_score=25)
+        response = LLMResponse(content="total_score: 18, confidence: 0.6", provider=LLMProvider.LMSTUDIO, model="m")
+
+        before = {
+            "prompt": metrics.PROMPT_BUILD_SECONDS.get_count(provider="lmstudio"),
+            "llm": metrics.LLM_SECONDS.get_count(provider="lmstudio"),
+            "parse": metrics.PARSE_SECONDS.get_count(provider="lmstudio"),
+            "fallback": metrics.PARSE_FALLBACKS.get(provider="lmstudio")
+        }
+
+        with patch.object(provider, "generate_response", AsyncMock(return_value=response)):
+            result = await provider.score_answer(criteria)
+
+        assert result.total_score == 18.0
+        assert metrics.PROMPT_BUILD_SECONDS.get_count(provider="lmstudio") == before["prompt"] + 1
+        assert metrics.LLM_SECONDS.get_count(provider="lmstudio") == before["llm"] + 1
+        assert metrics.PARSE_SECONDS.get_count(provider="lmstudio") == before["parse"] + 1
+        assert metrics.PARSE_FALLBACKS.get(provider="lmstudio") == before["fallback"] + 1
+
+    def test_metrics_endpoint_exposes_request_metrics(self):
+        """/metricsで採点リクエストの処理時間・待ち時間・エラー件数が取得できること"""
+        client = TestClient(engine_main.app)
+        unavailable_before = metrics.ERRORS.get(type="llm_unavailable")
+
+        with patch.object(engine_main.llm_manager, "is_available", return_value=False):
+            response = client.post("/score", json={"answer_text": "解答", "question_data": {}})
+        assert response.status_code == 503
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert metrics.ERRORS.get(type="llm_unavailable") == unavailable_before + 1
+        assert 'ai_engine_score_request_seconds_count{endpoint="score"}' in response.text
+        assert 'ai_engine_in_flight_requests{endpoint="score"} 0' in response.text
+        assert "# TYPE ai_engine_provider_up gauge" in response.text
@@ -0,0 +1,75 @@
+"""
+AI Engine起動処理のテスト
+遅延インポートとLLMプロバイダーのバックグラウンド初期化を検証
+"""
+import sys
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.ai_engine.llm.base import LLMProvider
+from src.ai_engine.llm.manager import LLMManager
+from src.ai_engine.utils.startup import StartupReport
+
+
+class TestAIEngineStartup:
+    """AI Engine起動処理テスト"""
+
+    def test_integrator_does_not_import_numpy(self):
+        """統合採点モジュールがnumpyに依存しないこと"""
+        from src.ai_engine.scoring.integrator import ScoringIntegrator
+
+        integrator = ScoringIntegrator()
+        assert integrator._calculate_confidence([0.5, 0.5, 0.5]) == 0.9
+        assert integrator._calculate_confidence([0.0, 1.0, 0.5]) == 0.5
+        assert "numpy" not in sys.modules["src.ai_engine.scoring.integrator"].__dict__
+
+    def test_scoring_package_lazy_exports(self):
+        """採点クラスが属性アクセス時に読み込まれること"""
+        import src.ai_engine.scoring as scoring
+
+        assert scoring.RuleBasedScoring.__name__ == "RuleBasedScoring"
+        with pytest.raises(AttributeError):
+            scoring.UnknownScoring
+
+    def test_startup_report_orders_by_cost(self):
+        """起動レポートがインポートコストの大きい順に並ぶこと"""
+        report = StartupReport()
+        report.record_import("fast_module", 0.001)
+        report.record_import("slow_module", 0.5)
+        report.record_import("slow_module", 9.9)  # 2回目以降は無視
+        report.mark("app_ready")
+
+        data = report.as_dict()
+        assert [item["module"] for item in data["imports"]] == ["slow_module", "fast_module"]
+        assert data["imports"][0]["import_ms"] == 500.0
+        assert data["phases"][0]["phase"] == "app_ready"
+
+    @pytest.mark.asyncio
+    async def test_provider_initialization_retries_until_ready(self):
+        """LLM未起動時もバックオフ付きで再試行し、起動後に利用可能になること"""
+        manager = LLMManager()
+
+        with patch.object(
+            manager, "initialize_provider", AsyncMock(side_effect=[False, False, True])
+        ) as mock_init, patch("src.ai_engine.llm.manager.asyncio.sleep", AsyncMock()) as mock_sleep:
+            task = manager.start_initialization(LLMProvider.LMSTUDIO, {}, initial_backoff=1.0, max_backoff=2.0)
+            assert await task is True
+
+        assert mock_init.call_count == 3
+        assert mock_sleep.call_count == 2
+        status = manager.get_initialization_status()["lmstudio"]
+        assert status["state"] == "ready"
+        assert status["attempts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_provider_initialization_gives_up_after_max_attempts(self):
+        """最大試行回数を指定した場合は断念すること"""
+        manager = LLMManager()
+
+        with patch.object(manager, "initialize_provider", AsyncMock(return_value=False)), \
+                patch("src.ai_engine.llm.manager.asyncio.sleep", AsyncMock()):
+            task = manager.start_initialization(LLMProvider.LMSTUDIO, {}, max_attempts=2)
+            assert await task is False
+
+        assert manager.get_initialization_status()["lmstudio"]["state"] == "failed"
+        assert manager.is_available() is False
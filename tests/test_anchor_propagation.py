@@ -0,0 +1,96 @@
+"""
+レビュー済み解答（アンカー）からの得点伝播のテスト
+近傍アンカーの一致条件、再レビュー・再起動時の索引の更新、採点エンドポイントでのLLM省略を検証
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.ai_engine import main as engine_main
+from src.ai_engine.scoring import anchors
+from src.ai_engine.scoring.anchors import AnchorRegistry
+
+ANSWER = "要員のスキル不足により設計段階での品質問題が見過ごされたため。"
+QUESTION_DATA = {"question_id": 3, "question_text": "理由を40字以内で述べよ。", "max_chars": 40, "points": 20}
+
+
+def _anchors(scores, text=ANSWER):
+    return [
+        {"answer_id": i, "answer_text": text + "。" * i, "score": score, "max_score": 20}
+        for i, score in enumerate(scores)
+    ]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    with patch.object(anchors.settings, "EMBEDDING_CACHE_DIR", str(tmp_path / "embeddings")):
+        yield AnchorRegistry(str(tmp_path / "anchors"))
+
+
+class TestAnchorRegistry:
+    """アンカー索引テスト"""
+
+    def test_propagates_when_neighbours_agree(self, registry):
+        """近傍アンカーが近く得点が一致する場合のみ、得点を伝播すること"""
+        assert registry.add(3, _anchors([16, 16, 17])) == 3
+
+        similar, unrelated = registry.propagate(3, [ANSWER, "天候不良により出荷が遅れた。"], points=20)
+
+        assert unrelated is None
+        assert 16 <= similar.score <= 17
+        assert [n.answer_id for n in similar.neighbours] == [0, 1, 2]
+        assert registry.propagate(4, [ANSWER], points=20) == [None]
+
+    def test_disagreeing_neighbours_are_not_propagated(self, registry):
+        """近傍アンカーの得点がばらつく場合は伝播しないこと"""
+        registry.add(3, _anchors([5, 16, 17]))
+
+        assert registry.propagate(3, [ANSWER], points=20) == [None]
+
+    def test_review_updates_and_restart(self, registry, tmp_path):
+        """再レビューで得点が上書きされ、再起動後も索引を読み込めること"""
+        registry.add(3, _anchors([5, 16, 17]))
+        registry.add(3, [{"answer_id": 0, "answer_text": ANSWER, "score": 16, "max_score": 20}])
+
+        reloaded = AnchorRegistry(str(tmp_path / "anchors"))
+
+        assert len(reloaded.index(3)) == 3
+        assert reloaded.propagate(3, [ANSWER], points=20)[0].score == pytest.approx(16.33, abs=0.01)
+
+
+    def test_question_versions_are_separate(self, registry):
+        """問題の版が異なるアンカーからは伝播しないこと"""
+        registry.add(3, _anchors([16, 16, 16]), version="v1")
+
+        assert registry.propagate(3, [ANSWER], points=20, version="v1")[0].score == pytest.approx(16)
+        assert registry.propagate(3, [ANSWER], points=20, version="v2") == [None]
+        assert registry.propagate(3, [ANSWER], points=20) == [None]
+
+
+class TestAnchorEndpoint:
+    """採点エンドポイントでの得点伝播テスト"""
+
+    def test_registered_anchors_skip_llm(self, registry):
+        """登録したアンカーから伝播できる解答はLLMを呼ばず、根拠のアンカーを記録すること（問題の編集後は伝播しない）"""
+        score_mock = AsyncMock(side_effect=RuntimeError("LLMは呼ばれない"))
+
+        with patch.object(anchors, "anchor_registry", registry), \
+                patch.object(engine_main.llm_manager, "is_available", return_value=True), \
+                patch.object(engine_main, "_score_with_llm", score_mock):
+            client = TestClient(engine_main.app)
+            response = client.post("/anchors", json={
+                "question_id": 3, "question_data": QUESTION_DATA, "anchors": _anchors([16, 16, 16])
+            })
+            scored = client.post("/score", json={"answer_text": ANSWER, "question_data": QUESTION_DATA})
+            edited = client.post("/score", json={
+                "answer_text": ANSWER, "question_data": {**QUESTION_DATA, "question_text": "原因を述べよ。"}
+            })
+
+        assert response.json() == {"question_id": 3, "anchor_count": 3}
+        assert scored.json()["total_score"] == pytest.approx(16)
+        assert scored.json()["details"]["method"] == "anchor_propagation"
+        assert len(scored.json()["details"]["anchors"]) == 3
+        # 問題を編集した後は編集前のアンカーから伝播せず、LLMで採点する
+        assert edited.status_code == 500
+        assert score_mock.await_count == 1
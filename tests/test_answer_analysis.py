@@ -0,0 +1,88 @@
+"""
+解答解析（AnalyzedAnswer）のテスト
+正規化・文分割・キャッシュと、採点クラス間での正規化の一貫性を検証
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from src.ai_engine.scoring.analysis import AnalyzedAnswer, _AnalysisCache, analyze_answer, split_sentences
+from src.ai_engine.scoring.rule_based import RuleBasedScoring
+from src.ai_engine.scoring.comprehensive import ComprehensiveScoring
+
+QUESTION_DATA = {
+    "keywords": ["ＷＢＳ", "スケジュール"],
+    "max_chars": 40,
+    "points": 25
+}
+
+
+class TestAnswerAnalysis:
+    """解答解析テスト"""
+
+    def test_normalizes_width_before_matching(self):
+        """全角英数字・半角カナを正規化してからキーワード照合すること"""
+        analysis = analyze_answer("WBSを見直しｽｹｼﾞｭｰﾙを再作成した。", QUESTION_DATA)
+
+        assert analysis.text == "WBSを見直しスケジュールを再作成した。"
+        assert analysis.length == len(analysis.text)
+        assert analysis.matches.contains("WBS")
+        assert analysis.matches.contains("スケジュール")
+
+        keyword_details = RuleBasedScoring().score(analysis.raw, QUESTION_DATA)["details"]["keyword_evaluation"]
+        assert keyword_details["matched"] == ["ＷＢＳ", "スケジュール"]
+        assert keyword_details["offsets"]["スケジュール"] == [analysis.text.index("スケジュール")]
+
+    def test_cached_by_answer_and_keywords(self):
+        """同じ解答・キーワードでは解析結果を再利用すること"""
+        first = analyze_answer("進捗会議を週次で実施した。", QUESTION_DATA)
+
+        assert analyze_answer("進捗会議を週次で実施した。", QUESTION_DATA) is first
+        assert analyze_answer("進捗会議を週次で実施した。", {"keywords": ["進捗"]}) is not first
+
+    def test_cache_keyed_by_normalized_text_digest(self):
+        """正規化後に同じ解答は解析結果を共有し、キャッシュのキーには解答文ではなくハッシュを使うこと"""
+        cache = _AnalysisCache(max_size=8)
+        answer = "ＷＢＳを見直した。" * 50
+
+        first = cache.get(answer, ("WBS",))
+
+        assert cache.get(answer.replace("ＷＢＳ", "WBS"), ("WBS",)) is first
+        assert len(cache) == 1
+        assert all(len(key) == 40 for key in cache._entries)
+
+    def test_cache_shared_between_threads(self):
+        """複数のワーカースレッドから同時に参照しても上限を超えず、同じ解答は同じ解析結果となること"""
+        cache = _AnalysisCache(max_size=16)
+        answers = [f"進捗会議を週次で実施した{index % 32}。" for index in range(400)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda answer: cache.get(answer, ("進捗",)), answers))
+
+        assert len(cache) <= 16
+        assert all(result.text == answer for result, answer in zip(results, answers))
+
+    def test_slots_and_ngrams(self):
+        """__slots__で属性を固定し、n-gramは要求時に計算すること"""
+        analysis = analyze_answer("リスク対策", {})
+
+        assert not hasattr(analysis, "__dict__")
+        assert analysis.ngrams(2)["リス"] == 1
+        assert analysis.ngrams(2) is analysis.ngrams(2)
+        assert isinstance(analysis, AnalyzedAnswer)
+
+    def test_sentence_boundaries(self):
+        """句点・感嘆符・疑問符・改行で文を分割すること"""
+        text = "要員が不足した。そのため遅延した!\n対策は?残り"
+        assert [text[start:end] for start, end in split_sentences(text)] == [
+            "要員が不足した。", "そのため遅延した!", "対策は?", "残り"
+        ]
+
+    def test_batch_uses_same_normalization(self):
+        """一括採点も1件ずつの採点と同じ正規化で計算されること"""
+        answers = ["ＷＢＳの粒度が粗く、ｽｹｼﾞｭｰﾙが遅延したため。", "ＷＢＳ", ""]
+        scorer = RuleBasedScoring()
+
+        batch = scorer.score_batch(answers, QUESTION_DATA)
+
+        assert batch.scores.tolist() == [scorer.score(answer, QUESTION_DATA)["score"] for answer in answers]
+        assert batch.match_ratios.tolist() == [1.0, 0.5, 0.0]
+        assert ComprehensiveScoring().score(answers[0], QUESTION_DATA)["score"] > 0
@@ -0,0 +1,112 @@
+"""
+重複・類似解答のクラスタリングのテスト
+完全一致・類似の判定と、一括採点で代表解答のみLLM採点して結果を展開することを検証
+"""
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from src.ai_engine import main as engine_main
+from src.ai_engine.scoring.dedup import cluster_answers, cluster_batch, dedup_text
+
+QUESTION_DATA = {
+    "question_text": "プロジェクトでリスクが顕在化した理由を40字以内で述べよ。",
+    "keywords": ["スキル不足", "品質問題"],
+    "max_chars": 40,
+    "points": 25
+}
+
+MODEL_PHRASE = "要員のスキル不足により、設計段階での品質問題が見過ごされ、後工程で手戻りが発生したため。"
+
+
+def _scoring_response(answer_text, question_data):
+    return engine_main.ScoringResponse(
+        total_score=20.0,
+        max_score=25,
+        percentage=80.0,
+        confidence=0.8,
+        rule_based_score=None,
+        semantic_score=None,
+        comprehensive_score=20.0,
+        details={"method": "llm_scoring"},
+        reasons=[answer_text],
+        suggestions=[],
+        model_name="test-model",
+        temperature=0.1,
+        tokens_used=0,
+        processing_time_ms=1
+    )
+
+
+class TestAnswerClustering:
+    """クラスタリングテスト"""
+
+    def test_whitespace_and_punctuation_variants_are_exact(self):
+        """空白・句読点・全角半角の違いは完全一致として扱うこと"""
+        assert dedup_text("ＷＢＳ の 見直し、。") == "wbsの見直し"
+
+        assignments = cluster_answers([MODEL_PHRASE, MODEL_PHRASE.replace("、", " "), "", "　"])
+
+        assert [a.representative for a in assignments] == [0, 0, 2, 2]
+        assert all(a.exact for a in assignments)
+
+    def test_numeric_answers_keep_signs_and_decimals(self):
+        """数字に隣接する符号・小数点は残し、値の異なる数値解答を完全一致としないこと"""
+        assert dedup_text("x = -3。") == "x=-3"
+        assert dedup_text("３．１４") == "3.14"
+        assert dedup_text("1/2, 3") == "1/2,3"
+        assert dedup_text("コスト-削減.") == "コスト削減"
+
+        assignments = cluster_answers(["x=-3", "x=3", "3.14", "314", "x = -3", "-1,000", "1000"])
+
+        assert [a.representative for a in assignments] == [0, 1, 2, 3, 0, 5, 6]
+        assert assignments[4].exact
+
+    def test_near_duplicates_join_representative(self):
+        """しきい値以上の類似解答は代表解答のクラスタに加わり、異なる解答は別クラスタとなること"""
+        answers = [MODEL_PHRASE, MODEL_PHRASE.replace("ため。", "から。"), "天候不良により出荷が遅れた。"]
+
+        assignments = cluster_answers(answers, threshold=0.8)
+
+        assert assignments[1].representative == 0
+        assert not assignments[1].exact
+        assert 0.8 <= assignments[1].similarity < 1.0
+        assert assignments[2].representative == 2
+        assert cluster_answers(answers, threshold=0.8, near_duplicates=False)[1].representative == 1
+
+    def test_batch_clusters_per_question(self):
+        """異なる問題の同じ解答は同じクラスタにしないこと"""
+        other_question = {**QUESTION_DATA, "points": 10}
+        assignments = cluster_batch([
+            ("スキル不足のため。", QUESTION_DATA),
+            ("スキル不足のため。", other_question),
+            ("スキル不足のため", QUESTION_DATA)
+        ])
+
+        assert [a.cluster_id for a in assignments] == [0, 1, 0]
+
+
+class TestBatchFanOut:
+    """一括採点の結果展開テスト"""
+
+    def test_representatives_only_are_scored(self):
+        """クラスタごとに1回だけLLM採点し、結果とクラスタ情報を各解答に展開すること"""
+        score_mock = AsyncMock(side_effect=_scoring_response)
+        answers = [MODEL_PHRASE, MODEL_PHRASE.replace("、", ""), MODEL_PHRASE.replace("ため。", "から。"), "天候不良のため。"]
+
+        with patch.object(engine_main.llm_manager, "is_available", return_value=True), \
+                patch.object(engine_main, "_score_with_llm", score_mock), \
+                patch.object(engine_main.settings, "DEDUP_SIMILARITY_THRESHOLD", 0.8):
+            response = TestClient(engine_main.app).post("/score/batch", json={"items": [
+                {"answer_text": answer, "question_data": QUESTION_DATA} for answer in answers
+            ]})
+
+        results = response.json()["results"]
+        assert score_mock.await_count == 2
+        assert [item["result"]["reasons"] for item in results] == [[MODEL_PHRASE]] * 3 + [["天候不良のため。"]]
+
+        clusters = [item["result"]["details"].get("cluster") for item in results]
+        assert clusters[0]["size"] == 3 and not clusters[0]["review_required"]
+        assert clusters[1]["exact_duplicate"] and not clusters[1]["review_required"]
+        assert clusters[2]["review_required"] and clusters[2]["representative_index"] == 0
+        assert clusters[3] is None
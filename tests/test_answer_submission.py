@@ -0,0 +1,69 @@
+"""
+解答提出（upsert）のテスト
+受験者・問題ごとの一意制約、再提出時の採点結果の一括無効化、問題の制約のキャッシュとSQL文の数を検証
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from src.api.models import Answer, ScoringMethod, ScoringResult, ScoringStatus
+from src.api.services.scoring_service import ScoringService
+
+
+def _count_statements(db):
+    """実行したSQL文を記録するリスト"""
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestAnswerSubmission:
+    """解答提出テスト"""
+
+    @pytest.mark.asyncio
+    async def test_resubmission_updates_same_answer(self, api_db):
+        """再提出は同じ解答を更新し、採点済みの結果を無効化すること"""
+        service = ScoringService(api_db)
+        first = await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+        answer_id = first.id
+        api_db.add(ScoringResult(answer_id=answer_id, status=ScoringStatus.COMPLETED, scoring_method=ScoringMethod.COMPREHENSIVE))
+        api_db.commit()
+
+        second = await service.submit_answer(1, 1, "C001", "品質問題が見過ごされたため")
+
+        assert second.id == answer_id
+        assert second.answer_text == "品質問題が見過ごされたため"
+        assert second.char_count == len("品質問題が見過ごされたため")
+        assert second.updated_at is not None
+        assert api_db.query(Answer).count() == 1
+        assert api_db.query(ScoringResult).one().status == ScoringStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_submit_round_trips(self, api_db):
+        """問題の制約はキャッシュし、提出はupsertと無効化の2文で行うこと"""
+        service = ScoringService(api_db)
+        await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+
+        statements = _count_statements(api_db)
+        await service.submit_answer(1, 1, "C001", "品質問題が見過ごされたため")
+
+        assert len(statements) == 2
+        assert "ON CONFLICT" in statements[0] and "RETURNING" in statements[0]
+        assert statements[1].startswith("UPDATE scoring_results")
+
+    @pytest.mark.asyncio
+    async def test_validation_and_unique_constraint(self, api_db):
+        """文字数制限・存在しない問題を拒否し、重複する解答はデータベースで拒否すること"""
+        service = ScoringService(api_db)
+
+        with pytest.raises(ValueError):
+            await service.submit_answer(1, 1, "C001", "あ" * 41)
+        with pytest.raises(ValueError):
+            await service.submit_answer(1, 999, "C001", "解答")
+
+        api_db.add_all([
+            Answer(exam_id=1, question_id=1, candidate_id="C002", answer_text="解答"),
+            Answer(exam_id=1, question_id=1, candidate_id="C002", answer_text="解答")
+        ])
+        with pytest.raises(IntegrityError):
+            api_db.commit()
@@ -0,0 +1,112 @@
+"""
+非同期データベースセッションのテスト
+AsyncSession（aiosqlite）での解答提出・採点・レビュー・結果取得と、非同期ドライバのURL変換を検証
+"""
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.api.database import Base, async_database_url, get_db_session
+from src.api.models import Exam, ExamSeason, Question
+from src.api.routers import scoring as scoring_router
+from src.api.services.question_cache import question_limits
+from src.api.services.scoring_service import SUBMISSION_ACCEPTED, ScoringService
+
+ENGINE_RESULT = {"total_score": 20, "max_score": 25, "percentage": 80.0, "model_name": "test-model"}
+
+
+def _engine_response(path, payload, timeout):
+    """AI Engineの単一採点・一括採点・アンカー登録の応答"""
+    if path == "/score/batch":
+        return {"results": [{"index": i, "result": ENGINE_RESULT} for i in range(len(payload["items"]))]}
+    return ENGINE_RESULT
+
+
+@asynccontextmanager
+async def _async_session():
+    """インメモリSQLiteの AsyncSession（試験1件・問題1件（max_chars=40）を登録済み）"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    async with session_factory() as session:
+        exam = Exam(year=2024, season=ExamSeason.AUTUMN, title="テスト試験")
+        session.add(exam)
+        await session.flush()
+        session.add(Question(
+            exam_id=exam.id, title="リスク管理", question_number="設問1", background_text="",
+            question_text="理由を述べよ。", model_answer="要員のスキル不足", max_chars=40, points=25
+        ))
+        await session.commit()
+        question_limits.invalidate()
+        try:
+            yield session
+        finally:
+            question_limits.invalidate()
+    await engine.dispose()
+
+
+class TestAsyncDatabase:
+    """非同期データベースセッションテスト"""
+
+    def test_async_database_url(self):
+        """DATABASE_URL を非同期ドライバのURLに変換し、非対応のデータベースは拒否すること"""
+        assert async_database_url("postgresql://user:pass@db:5432/pm") == "postgresql+asyncpg://user:pass@db:5432/pm"
+        assert async_database_url("postgresql+psycopg2://db/pm") == "postgresql+asyncpg://db/pm"
+        assert async_database_url("sqlite:///./pm_scoring.db") == "sqlite+aiosqlite:///./pm_scoring.db"
+        with pytest.raises(ValueError):
+            async_database_url("mysql://db/pm")
+
+    @pytest.mark.asyncio
+    async def test_service_with_async_session(self):
+        """AsyncSession で提出・採点・レビュー・結果取得ができ、返した結果は再読み込みなしで参照できること"""
+        async with _async_session() as session:
+            service = ScoringService(session)
+            post = AsyncMock(side_effect=_engine_response)
+
+            answer = await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+            statuses = await service.submit_answers([
+                {"exam_id": 1, "question_id": 1, "candidate_id": f"C{i:03d}", "answer_text": "品質問題のため"}
+                for i in range(2, 5)
+            ])
+            assert [item["status"] for item in statuses] == [SUBMISSION_ACCEPTED] * 3
+
+            with patch.object(service, "_post_to_ai_engine", post):
+                result = await service.evaluate_answer(answer.id)
+                results = await service.evaluate_answers([item["answer_id"] for item in statuses])
+                reviewed = await service.review_result(result.id, human_score=22, reviewer_id="R001")
+
+            assert (result.total_score, result.grade) == (20, "B")
+            assert [scoring_result.total_score for scoring_result in results.values()] == [20] * 3
+            assert reviewed.final_score == 22
+            assert post.await_args.args[0] == "/anchors"
+            assert post.await_args.args[1]["question_data"]["model_answer"] == "要員のスキル不足"
+            assert len((await service.get_scoring_result_page(1))[0]) == 4
+            assert (await service.get_scoring_result_by_id(result.id)).is_reviewed
+
+    @pytest.mark.asyncio
+    async def test_router_with_async_session(self):
+        """採点APIが AsyncSession で提出・採点・結果取得を処理すること"""
+        async with _async_session() as session:
+            app = FastAPI()
+            app.include_router(scoring_router.router, prefix="/api/scoring")
+            app.dependency_overrides[get_db_session] = lambda: session
+
+            transport = httpx.ASGITransport(app=app)
+            with patch.object(ScoringService, "_post_to_ai_engine", AsyncMock(side_effect=_engine_response)):
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    submitted = await client.post("/api/scoring/submit", json={
+                        "exam_id": 1, "question_id": 1, "candidate_id": "C001", "answer_text": "要員のスキル不足のため"
+                    })
+                    evaluated = await client.post("/api/scoring/evaluate", json={"answer_id": submitted.json()["id"]})
+                    results = await client.get("/api/scoring/results/1")
+
+            assert submitted.status_code == 200
+            assert evaluated.status_code == 200 and evaluated.json()["total_score"] == 20
+            assert [item["id"] for item in results.json()["items"]] == [evaluated.json()["id"]]
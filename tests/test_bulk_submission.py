@@ -0,0 +1,97 @@
+"""
+解答一括提出エンドポイントのテスト
+JSON配列・NDJSONの受け付け、項目ごとの状態、チャンク単位の書き込み、採点タスクの一括登録を検証
+"""
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.database import get_db_session
+from src.api.models import Answer
+from src.api.routers import scoring as scoring_router
+from src.api.services.scoring_service import ScoringService
+
+
+@pytest.fixture
+def client(api_db):
+    app = FastAPI()
+    app.include_router(scoring_router.router, prefix="/api/scoring")
+    app.dependency_overrides[get_db_session] = lambda: api_db
+    return TestClient(app)
+
+
+def _answer(candidate_id: str, answer_text: str = "要員のスキル不足のため", question_id: int = 1):
+    return {"exam_id": 1, "question_id": question_id, "candidate_id": candidate_id, "answer_text": answer_text}
+
+
+class TestBulkSubmission:
+    """解答一括提出テスト"""
+
+    def test_json_array_with_item_statuses(self, client, api_db):
+        """項目ごとに受理・拒否・置き換えの状態を返し、受理した解答のみ登録すること"""
+        response = client.post("/api/scoring/submit/bulk", json=[
+            _answer("C001"),
+            _answer("C002", "あ" * 41),
+            _answer("C003", question_id=999),
+            {"exam_id": 1, "question_id": 1},
+            _answer("C001", "品質問題が見過ごされたため")
+        ])
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["status"] for item in body["results"]] == [
+            "superseded", "rejected", "rejected", "rejected", "accepted"
+        ]
+        assert "文字数制限" in body["results"][1]["error"]
+        assert "candidate_id" in body["results"][3]["error"]
+        assert (body["total"], body["accepted"], body["rejected"], body["superseded"], body["failed"]) == (5, 1, 3, 1, 0)
+        answer = api_db.query(Answer).one()
+        assert answer.id == body["results"][4]["answer_id"]
+        assert answer.answer_text == "品質問題が見過ごされたため"
+
+    def test_ndjson_stream_in_chunks_and_enqueue(self, client, api_db):
+        """NDJSONを受け付け、チャンクごとに書き込み、受理した解答を1つの採点タスクで登録すること"""
+        lines = [json.dumps(_answer(f"C{i:03d}"), ensure_ascii=False) for i in range(5)] + ["{invalid"]
+        delay = MagicMock(return_value=MagicMock(id="task-1"))
+        submit_answers = ScoringService.submit_answers
+
+        async def submit_in_chunks(self, submissions, **kwargs):
+            return await submit_answers(self, submissions, chunk_size=2, **kwargs)
+
+        with patch.object(ScoringService, "submit_answers", submit_in_chunks), \
+                patch("src.api.tasks.scoring_tasks.batch_scoring.delay", delay):
+            response = client.post(
+                "/api/scoring/submit/bulk?enqueue_scoring=true",
+                content="\n".join(lines).encode("utf-8"),
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["accepted"] == 5
+        assert body["results"][5]["status"] == "rejected"
+        assert body["scoring_task_id"] == "task-1"
+        answer_ids = [item["answer_id"] for item in body["results"][:5]]
+        delay.assert_called_once_with(answer_ids)
+        assert api_db.query(Answer).count() == 5
+
+    def test_counts_each_status(self, client):
+        """書き込みエラー・置き換えは検証エラーと別に集計すること"""
+        statuses = [
+            {"index": 0, "status": "failed", "error": "書き込みエラー"},
+            {"index": 1, "status": "superseded", "error": "置き換え"},
+            {"index": 2, "status": "accepted", "answer_id": 1}
+        ]
+        with patch.object(ScoringService, "submit_answers", AsyncMock(return_value=statuses)):
+            body = client.post("/api/scoring/submit/bulk", json=[_answer(f"C{i:03d}") for i in range(3)] + [{}]).json()
+
+        assert (body["accepted"], body["rejected"], body["superseded"], body["failed"]) == (1, 1, 1, 1)
+
+    def test_rejects_oversized_and_malformed_requests(self, client):
+        """上限を超える件数・配列でない本文はリクエスト全体を拒否すること"""
+        with patch.object(scoring_router.settings, "BULK_SUBMIT_MAX_ITEMS", 2):
+            assert client.post("/api/scoring/submit/bulk", json=[_answer("C001")] * 3).status_code == 413
+        assert client.post("/api/scoring/submit/bulk", json={"answer": "x"}).status_code == 400
@@ -0,0 +1,158 @@
+"""
+試験・問題カタログのキャッシュのテスト
+ETagと304、問題一覧の要約、キャッシュからの応答、作成・更新による無効化、Redisでの無効化の共有を検証
+"""
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.api.auth.admin_auth import AdminAuth
+from src.api.database import get_db
+from src.api.routers import admin as admin_router
+from src.api.services.catalog import CatalogCache
+
+
+class _FakeRedis:
+    """プロセス間で共有するRedisの代わり（get・set・incrのみ）"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def client(api_db):
+    app = FastAPI()
+    app.include_router(admin_router.router, prefix="/api/admin")
+    app.dependency_overrides[get_db] = lambda: api_db
+    app.dependency_overrides[AdminAuth.require_admin_auth] = lambda: True
+    return TestClient(app)
+
+
+def _count_selects(db):
+    selects = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    return selects, lambda: event.remove(db.get_bind(), "before_cursor_execute", record)
+
+
+class TestCatalogCache:
+    """カタログのキャッシュテスト"""
+
+    def test_etag_and_not_modified(self, client, api_db):
+        """ETagが一致する場合は304を返し、2回目以降はデータベースを読まないこと"""
+        first = client.get("/api/admin/questions", params={"exam_id": 1})
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.json()[0]["display_name"] == "設問1: リスク管理"
+
+        selects, stop = _count_selects(api_db)
+        try:
+            cached = client.get("/api/admin/questions", params={"exam_id": 1}, headers={"If-None-Match": etag})
+            again = client.get("/api/admin/questions", params={"exam_id": 1})
+        finally:
+            stop()
+
+        assert cached.status_code == 304 and cached.headers["etag"] == etag and cached.content == b""
+        assert again.status_code == 200 and again.json() == first.json()
+        assert selects == []
+
+    def test_summary_omits_long_text(self, client):
+        """要約は背景情報・設問文・模範解答を含まず、全文とは別のETagになること"""
+        full = client.get("/api/admin/questions")
+        summary = client.get("/api/admin/questions", params={"view": "summary"})
+
+        assert summary.status_code == 200
+        assert set(summary.json()[0]) == {
+            "id", "exam_id", "title", "question_number", "sub_questions",
+            "max_chars", "points", "has_sub_questions", "display_name"
+        }
+        assert "model_answer" in full.json()[0]
+        assert summary.headers["etag"] != full.headers["etag"]
+
+    def test_writes_invalidate_catalog(self, client):
+        """試験・問題の作成・更新・削除でカタログを無効化し、新しい内容とETagを返すこと"""
+        exams = client.get("/api/admin/exams")
+        question = client.get("/api/admin/questions/1")
+
+        client.post("/api/admin/exams", json={"title": "2025年度春期"})
+        client.put("/api/admin/questions/1", json={"title": "リスク管理（改）"})
+
+        updated_exams = client.get("/api/admin/exams", headers={"If-None-Match": exams.headers["etag"]})
+        updated_question = client.get("/api/admin/questions/1", headers={"If-None-Match": question.headers["etag"]})
+        assert updated_exams.status_code == 200 and len(updated_exams.json()) == len(exams.json()) + 1
+        assert updated_question.status_code == 200 and updated_question.json()["title"] == "リスク管理（改）"
+
+        client.delete("/api/admin/questions/1")
+        assert client.get("/api/admin/questions/1").status_code == 404
+        assert client.get("/api/admin/questions").json() == []
+
+    def test_redis_shares_invalidation(self):
+        """Redisを共有するプロセスでは、他のプロセスでの無効化後に内容を読み直すこと"""
+        shared = _FakeRedis()
+        caches = [CatalogCache(ttl=60, sync_interval=0), CatalogCache(ttl=60, sync_interval=0)]
+        for cache in caches:
+            cache._redis = shared
+
+        loads = []
+
+        def loader():
+            loads.append(len(loads))
+            return {"version": len(loads)}
+
+        for cache in caches:
+            cache.refresh()
+        first = caches[0].get("exams", loader)
+        # 他のプロセスは共有された内容を使う
+        assert caches[1].get("exams", loader) == first and loads == [0]
+
+        caches[1].invalidate()
+        # バックグラウンドで世代を確認した後は読み直す
+        caches[0].refresh()
+        assert caches[0].get("exams", loader).body == {"version": 2}
+        assert caches[0].get("exams", loader).etag != first.etag and len(loads) == 2
+
+    def test_generation_check_does_not_block(self):
+        """Redisの世代の確認はバックグラウンドのスレッドで行い、呼び出し元は最後に確認した世代を使うこと"""
+        class _SlowRedis(_FakeRedis):
+            def get(self, key):
+                threads.append(threading.current_thread())
+                released.wait(5)
+                return super().get(key)
+
+        threads = []
+        released = threading.Event()
+        shared = _SlowRedis()
+        shared.data["catalog:generation"] = 3
+        cache = CatalogCache(ttl=60, sync_interval=0)
+        cache._redis = shared
+
+        started = time.monotonic()
+        assert cache.generation() == (0, None)
+        assert cache.generation() == (0, None)
+        assert time.monotonic() - started < 1
+
+        released.set()
+        for _ in range(100):
+            if cache._remote_generation is not None:
+                break
+            time.sleep(0.01)
+        assert cache._remote_generation == 3
+        assert len(threads) == 1 and threads[0] is not threading.current_thread()
@@ -0,0 +1,141 @@
+"""
+埋め込みバックエンドと永続キャッシュのテスト
+キャッシュにない解答だけを推論すること、再起動後の再利用、意味理解採点への組み込みを検証
+"""
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.ai_engine.scoring.embedding import (
+    EmbeddingEncoder, EmbeddingStore, HashingEmbeddingBackend, set_embedding_encoder
+)
+from src.ai_engine.scoring.semantic import SemanticScoring
+from src.ai_engine.scoring.semantic_model import semantic_models
+
+QUESTION_DATA = {
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされ、後工程で手戻りが発生したため。",
+    "grading_intention": "要員のスキル不足が品質問題と手戻りにつながったことを理解しているかを問う。",
+    "keywords": ["スキル不足", "品質問題", "手戻り"],
+    "max_chars": 40,
+    "points": 25
+}
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    """推論したテキストを記録するバックエンド"""
+
+    def __init__(self):
+        super().__init__(dim=64)
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return super().encode(texts)
+
+
+def _append_texts(directory, texts, start):
+    """別プロセスから同じキャッシュディレクトリに追記する"""
+    backend = HashingEmbeddingBackend(dim=8)
+    store = EmbeddingStore(directory, backend.model_id, backend.dim)
+    start.wait()
+    for text in texts:
+        store.append([store.key(text)], backend.encode([text]))
+
+
+@pytest.fixture(autouse=True)
+def reset_encoder():
+    semantic_models.clear()
+    yield
+    set_embedding_encoder(None)
+    semantic_models.clear()
+
+
+class TestEmbeddingCache:
+    """埋め込みキャッシュテスト"""
+
+    def test_only_new_texts_are_encoded(self, tmp_path):
+        """キャッシュ済みの解答は推論せず、新規・変更された解答だけを推論すること"""
+        backend = CountingBackend()
+        encoder = EmbeddingEncoder(backend, str(tmp_path))
+
+        first = encoder.encode(["スキル不足のため。", "ＷＢＳを見直した。", "スキル不足のため。"])
+        second = encoder.encode(["WBSを見直した。", "手戻りが発生した。"])
+
+        assert backend.encoded == ["スキル不足のため。", "WBSを見直した。", "手戻りが発生した。"]
+        assert first.shape == (3, 64)
+        np.testing.assert_array_equal(first[1], second[0])
+        assert len(encoder.store) == 3
+
+    def test_store_persists_across_restarts(self, tmp_path):
+        """再起動後もメモリマップしたキャッシュから同じベクトルを読み出すこと"""
+        encoder = EmbeddingEncoder(CountingBackend(), str(tmp_path))
+        vectors = encoder.encode(["品質問題が発生した。", "進捗が遅延した。"])
+
+        backend = CountingBackend()
+        reloaded = EmbeddingEncoder(backend, str(tmp_path))
+
+        np.testing.assert_array_equal(reloaded.encode(["品質問題が発生した。", "進捗が遅延した。"]), vectors)
+        assert backend.encoded == []
+
+    def test_incomplete_rows_are_discarded(self, tmp_path):
+        """キー書き込み前に停止したベクトル行は読み込まないこと"""
+        backend = HashingEmbeddingBackend(dim=8)
+        store = EmbeddingStore(str(tmp_path), backend.model_id, backend.dim)
+        store.append([store.key("a")], backend.encode(["ab"]))
+        with open(store._vectors_path, "ab") as f:
+            f.write(np.ones(8, dtype=np.float32).tobytes())
+
+        reloaded = EmbeddingStore(str(tmp_path), backend.model_id, backend.dim)
+
+        assert len(reloaded) == 1
+        assert reloaded.lookup([store.key("a"), store.key("b")]) == [0, None]
+
+    def test_stores_sharing_directory(self, tmp_path):
+        """同じディレクトリを共有するストアは、互いの追記を読み込んでから行番号を割り当てること"""
+        backend = HashingEmbeddingBackend(dim=8)
+        first = EmbeddingStore(str(tmp_path), backend.model_id, backend.dim)
+        second = EmbeddingStore(str(tmp_path), backend.model_id, backend.dim)
+        keys = {text: first.key(text) for text in ("a", "b", "c")}
+
+        assert first.append([keys["a"], keys["b"]], backend.encode(["a", "b"])) == [0, 1]
+        assert second.append([keys["c"], keys["a"]], backend.encode(["c", "a"])) == [2, 0]
+
+        assert first.lookup([keys["c"]]) == [2]
+        np.testing.assert_array_equal(first.rows([2]), backend.encode(["c"]))
+        assert len(EmbeddingStore(str(tmp_path), backend.model_id, backend.dim)) == 3
+
+    def test_concurrent_processes(self, tmp_path):
+        """複数のプロセスが同時に追記しても、各キーの行に正しいベクトルが対応すること"""
+        texts = [[f"p{worker}-{i}" for i in range(100)] for worker in range(3)]
+        context = multiprocessing.get_context("spawn")
+        start = context.Event()
+        processes = [context.Process(target=_append_texts, args=(str(tmp_path), chunk, start)) for chunk in texts]
+        for process in processes:
+            process.start()
+        start.set()
+        for process in processes:
+            process.join(60)
+            assert process.exitcode == 0
+
+        backend = HashingEmbeddingBackend(dim=8)
+        store = EmbeddingStore(str(tmp_path), backend.model_id, backend.dim)
+        all_texts = [text for chunk in texts for text in chunk]
+        rows = store.lookup([store.key(text) for text in all_texts])
+
+        assert len(store) == len(all_texts) and sorted(rows) == list(range(len(all_texts)))
+        np.testing.assert_array_equal(store.rows(rows), backend.encode(all_texts))
+
+    def test_semantic_scoring_uses_embeddings(self, tmp_path):
+        """埋め込みモデル設定時は一括採点・1件ずつの採点とも埋め込みの類似度を使用すること"""
+        set_embedding_encoder(EmbeddingEncoder(HashingEmbeddingBackend(), str(tmp_path)))
+        scorer = SemanticScoring()
+        answers = ["要員のスキル不足で品質問題を見逃し、手戻りが発生したため。", "天候不良により出荷が遅れた。"]
+
+        batch = scorer.score_batch(answers, QUESTION_DATA)
+        results = [scorer.score(answer, QUESTION_DATA) for answer in answers]
+
+        assert results[0]["details"]["method"] == "char_ngram_tfidf+embedding"
+        assert results[0]["details"]["semantic_validity"] > results[1]["details"]["semantic_validity"]
+        for index, result in enumerate(results):
+            assert batch["semantic_validity"][index] == pytest.approx(result["details"]["semantic_validity"])
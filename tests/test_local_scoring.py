@@ -0,0 +1,84 @@
+"""
+プロセス内採点のテスト
+AI Engineと同じ採点結果になること、SCORING_MODE=local での通信なしの採点、AI Engine障害時のフォールバックを検証
+"""
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.ai_engine import main as engine_main
+from src.api.models import ScoringResult
+from src.api.services.fingerprint import engine_version
+from src.api.services.local_scoring import LocalScorer
+from src.api.services.scoring_service import ScoringService
+
+ANSWER = "要員のスキル不足により、設計段階での品質問題が見過ごされたため。"
+QUESTION_DATA = {
+    "question_id": 11,
+    "question_text": "プロジェクトでリスクが顕在化した理由を40字以内で述べよ。",
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされ、後工程で大規模な手戻りが発生したため。",
+    "keywords": ["スキル不足", "品質問題", "手戻り"],
+    "grading_intention": "",
+    "max_chars": 40,
+    "points": 25,
+    "grading_criteria": {}
+}
+
+
+def _without_timings(result: dict) -> dict:
+    result = {**result, "details": dict(result["details"])}
+    result.pop("processing_time_ms")
+    pipeline = dict(result["details"].pop("pipeline"))
+    result["details"]["pipeline_stages"] = [
+        {key: value for key, value in stage.items() if key != "elapsed_ms"} for stage in pipeline.pop("stages")
+    ]
+    return result
+
+
+class TestLocalScoring:
+    """プロセス内採点テスト"""
+
+    @pytest.mark.asyncio
+    async def test_same_result_as_engine(self):
+        """同じステージ構成ならAI Engineの採点結果と一致すること"""
+        with patch.object(engine_main.settings, "SCORING_PIPELINE", "rule_based"), \
+                patch.object(engine_main, "_scoring_pipeline", None):
+            engine_result = await engine_main._score_with_pipeline(
+                engine_main.ScoringRequest(answer_text=ANSWER, question_data=QUESTION_DATA)
+            )
+
+        local_result = await LocalScorer("rule_based").score(ANSWER, QUESTION_DATA)
+
+        assert _without_timings(local_result) == _without_timings(engine_result.model_dump())
+        assert local_result["rule_based_score"] == local_result["total_score"] > 0
+
+    @pytest.mark.asyncio
+    async def test_local_mode_scores_without_engine(self, api_db):
+        """SCORING_MODE=local ではAI Engineに送らずプロセス内で採点し、採点結果の指紋も別になること"""
+        post = AsyncMock()
+        with patch("src.api.services.local_scoring.settings.SCORING_MODE", "local"), \
+                patch.object(ScoringService, "_post_to_ai_engine", post):
+            assert engine_version().startswith("local:rule_based/")
+            service = ScoringService(api_db)
+            answer = await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+            result = await service.evaluate_answer(answer.id)
+
+        post.assert_not_awaited()
+        assert result.rule_based_score == result.total_score > 0
+        assert result.scoring_details["local_scoring"] == "local"
+
+    @pytest.mark.asyncio
+    async def test_engine_outage_falls_back_to_local_pipeline(self, api_db):
+        """AI Engineに接続できない場合はキーワードマッチングではなくプロセス内の採点パイプラインで採点すること"""
+        post = AsyncMock(side_effect=httpx.ConnectError("connection refused"))
+        with patch.object(ScoringService, "_post_to_ai_engine", post):
+            service = ScoringService(api_db)
+            answer = await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+            result = await service.evaluate_answer(answer.id)
+
+        post.assert_awaited()
+        stored = api_db.get(ScoringResult, result.id)
+        assert stored.scoring_details["local_scoring"] == "fallback"
+        assert stored.model_name != "fallback"
+        assert stored.rule_based_score == stored.total_score
@@ -0,0 +1,72 @@
+"""
+形態素解析による語句照合のテスト
+見出し語での一致・形態素境界での一致、解析結果のキャッシュ、採点クラスへの組み込みを検証
+"""
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("janome")
+
+from src.ai_engine.scoring import analysis, morphology  # noqa: E402
+from src.ai_engine.scoring.matcher import get_matcher  # noqa: E402
+from src.ai_engine.scoring.morphology import MorphologicalAnalyzer, match_tokens  # noqa: E402
+from src.ai_engine.scoring.rule_based import RuleBasedScoring  # noqa: E402
+
+QUESTION_DATA = {
+    "keywords": ["遅延する", "スキル不足"],
+    "max_chars": 40,
+    "points": 20
+}
+
+
+@pytest.fixture
+def morphological(tmp_path):
+    """形態素解析による照合を有効にする"""
+    analysis._analysis_cache.clear()
+    morphology.set_analyzer(MorphologicalAnalyzer(cache_path=str(tmp_path / "tokens.sqlite3")))
+    with patch.object(analysis.settings, "MORPHOLOGICAL_MATCHING", True):
+        yield
+    morphology.set_analyzer(None)
+    analysis._analysis_cache.clear()
+
+
+class TestMorphologicalMatching:
+    """形態素解析による照合テスト"""
+
+    def test_lemma_and_boundary_matching(self):
+        """活用した語は見出し語で一致し、語の一部への一致は除外すること"""
+        analyzer = MorphologicalAnalyzer()
+        matcher = get_matcher(("遅延する", "ため"))
+
+        inflected = "進捗が遅延したため、対策した。"
+        assert match_tokens(matcher, inflected, analyzer.tokenize(inflected)).matched("keyword") == ["遅延する", "ため"]
+
+        partial = "ためしに実施した。"
+        assert matcher.match(partial).contains("ため")
+        assert not match_tokens(matcher, partial, analyzer.tokenize(partial)).contains("ため")
+
+    def test_tokens_are_cached_on_disk(self, tmp_path):
+        """解析結果はディスクキャッシュから再利用し、未解析のテキストだけを解析すること"""
+        path = str(tmp_path / "tokens.sqlite3")
+        first = MorphologicalAnalyzer(cache_path=path)
+        tokens = first.tokenize_many(["要員が不足した。", "品質が低下した。"])
+        first.close()
+
+        second = MorphologicalAnalyzer(cache_path=path)
+        with patch.object(morphology, "_tokenize_texts", wraps=morphology._tokenize_texts) as tokenize:
+            assert second.tokenize_many(["品質が低下した。", "要員が不足した。", "新しい解答"]) == \
+                [tokens[1], tokens[0], second.tokenize("新しい解答")]
+        tokenize.assert_called_once_with(["新しい解答"])
+        second.close()
+
+    def test_rule_based_scoring_uses_lemmas(self, morphological):
+        """有効時はルールベース採点が見出し語で照合し、一括採点とも一致すること"""
+        answers = ["スキル不足で設計が遅延しました。", "スキル不足のため。"]
+        scorer = RuleBasedScoring()
+
+        result = scorer.score(answers[0], QUESTION_DATA)
+        batch = scorer.score_batch(answers, QUESTION_DATA)
+
+        assert result["details"]["keyword_evaluation"]["matched"] == ["遅延する", "スキル不足"]
+        assert batch.scores.tolist() == [scorer.score(answer, QUESTION_DATA)["score"] for answer in answers]
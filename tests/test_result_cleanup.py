@@ -0,0 +1,111 @@
+"""
+現在の採点結果と置き換え済みの採点結果のクリーンアップのテスト
+再採点時の現在の採点結果の更新、結果取得での履歴の除外、一定件数ずつの削除と進捗の通知を検証
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.models import Answer, ScoringMethod, ScoringResult, ScoringStatus
+from src.api.services.result_cleanup import delete_superseded_results
+from src.api.services.scoring_service import AIEngineBusyError, ScoringService
+
+ENGINE_RESULT = {"total_score": 20, "max_score": 25, "percentage": 80.0}
+
+
+def _result(answer_id: int, status: ScoringStatus = ScoringStatus.PENDING, **values) -> ScoringResult:
+    return ScoringResult(answer_id=answer_id, status=status, scoring_method=ScoringMethod.COMPREHENSIVE, **values)
+
+
+class TestResultCleanup:
+    """現在の採点結果・クリーンアップテスト"""
+
+    @pytest.mark.asyncio
+    async def test_rescoring_moves_current_result(self, api_db):
+        """再採点で現在の採点結果が移り、結果取得は解答ごとに現在の結果だけを返すこと"""
+        result_ids = []
+        with patch.object(ScoringService, "_post_to_ai_engine", AsyncMock(return_value=ENGINE_RESULT)):
+            for text in ("要員のスキル不足のため", "品質問題のため", "進捗遅延のため"):
+                service = ScoringService(api_db)
+                answer = await service.submit_answer(1, 1, "C001", text)
+                result_ids.append((await service.evaluate_answer(answer.id)).id)
+
+        answer = api_db.query(Answer).one()
+        assert answer.current_result_id == result_ids[-1]
+        assert api_db.query(ScoringResult).count() == 3
+        results, _ = await ScoringService(api_db).get_scoring_result_page(1)
+        assert [result.id for result in results] == [result_ids[-1]]
+
+    @pytest.mark.asyncio
+    async def test_deferred_scoring_clears_current_result(self, api_db):
+        """AI Engine混雑で延期した採点結果は削除し、現在の採点結果の参照も外すこと"""
+        service = ScoringService(api_db)
+        answer = await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+
+        with patch.object(ScoringService, "_post_to_ai_engine", AsyncMock(side_effect=AIEngineBusyError(5))):
+            with pytest.raises(AIEngineBusyError):
+                await service.evaluate_answer(answer.id, defer_on_busy=True)
+
+        assert api_db.query(ScoringResult).count() == 0
+        assert api_db.query(Answer).one().current_result_id is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("batch", [False, True])
+    async def test_deferred_rescoring_restores_previous_result(self, api_db, batch):
+        """採点済みの解答の再採点を延期した場合は、採点開始前の現在の採点結果に戻すこと"""
+        with patch.object(ScoringService, "_post_to_ai_engine", AsyncMock(return_value=ENGINE_RESULT)):
+            service = ScoringService(api_db)
+            answer = await service.submit_answer(1, 1, "C001", "要員のスキル不足のため")
+            answer_id = answer.id
+            previous_id = (await service.evaluate_answer(answer_id)).id
+
+        service = ScoringService(api_db)
+        with patch("src.api.services.fingerprint.settings.SCORING_ENGINE_VERSION", "2"), \
+                patch.object(ScoringService, "_post_to_ai_engine", AsyncMock(side_effect=AIEngineBusyError(5))):
+            with pytest.raises(AIEngineBusyError):
+                if batch:
+                    await service.evaluate_answers([answer_id], defer_on_busy=True)
+                else:
+                    await service.evaluate_answer(answer_id, defer_on_busy=True)
+
+        assert [result.id for result in api_db.query(ScoringResult)] == [previous_id]
+        assert api_db.query(Answer).one().current_result_id == previous_id
+        assert service._previous_results == {}
+        assert delete_superseded_results(api_db, datetime.now(timezone.utc) + timedelta(days=1)) == 0
+
+    def test_delete_superseded_results_in_batches(self, api_db):
+        """置き換え済みの結果を一定件数ずつ削除し、現在・レビュー済み・採点中の結果と新しい結果は残すこと"""
+        current = Answer(exam_id=1, question_id=1, candidate_id="C001", answer_text="解答")
+        legacy = Answer(exam_id=1, question_id=1, candidate_id="C002", answer_text="解答")
+        api_db.add_all([current, legacy])
+        api_db.flush()
+
+        superseded = [_result(current.id) for _ in range(5)]
+        kept = [
+            _result(current.id, is_reviewed=True),
+            _result(current.id, ScoringStatus.IN_PROGRESS),
+            _result(current.id, ScoringStatus.COMPLETED)
+        ]
+        # 現在の採点結果が未設定の解答は最新の採点完了済みの結果を現在の結果とする
+        legacy_results = [_result(legacy.id, ScoringStatus.COMPLETED), _result(legacy.id, ScoringStatus.FAILED)]
+        api_db.add_all(superseded + kept + legacy_results)
+        api_db.flush()
+        current.current_result_id = kept[-1].id
+        api_db.commit()
+        kept_ids = {result.id for result in kept} | {legacy_results[0].id}
+
+        progress = []
+        deleted = delete_superseded_results(
+            api_db, datetime.now(timezone.utc) + timedelta(days=1), batch_size=2, on_progress=progress.append
+        )
+
+        assert deleted == 6
+        assert progress == [2, 4, 6]
+        assert {result.id for result in api_db.query(ScoringResult)} == kept_ids
+        assert api_db.get(Answer, legacy.id).current_result_id == legacy_results[0].id
+
+        # 保持期間内の結果は削除しない
+        api_db.add(_result(current.id))
+        api_db.commit()
+        assert delete_superseded_results(api_db, datetime.now(timezone.utc) - timedelta(days=1)) == 0
@@ -0,0 +1,117 @@
+"""
+採点結果一覧のページ分割のテスト
+カーソルによるページ分割と並べ替え、絞り込み、一覧に使う列だけの読み込み、不正なカーソルの扱いを検証
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from src.api.database import get_db_session
+from src.api.models import Answer, ScoringMethod, ScoringResult, ScoringStatus
+from src.api.routers import scoring as scoring_router
+from src.api.services.result_query import ResultFilters
+from src.api.services.scoring_service import ScoringService
+
+# (percentage, confidence, is_reviewed, status)
+RESULTS = [
+    (80.0, 0.9, False, ScoringStatus.COMPLETED),
+    (None, None, False, ScoringStatus.FAILED),
+    (60.0, 0.5, True, ScoringStatus.COMPLETED),
+    (80.0, 0.7, False, ScoringStatus.COMPLETED),
+    (40.0, 0.4, False, ScoringStatus.COMPLETED),
+]
+
+
+@pytest.fixture
+def client(api_db):
+    app = FastAPI()
+    app.include_router(scoring_router.router, prefix="/api/scoring")
+    app.dependency_overrides[get_db_session] = lambda: api_db
+    return TestClient(app)
+
+
+@pytest.fixture
+def result_ids(api_db):
+    """受験者ごとに置き換え済みの結果と現在の結果を登録し、現在の結果のIDを返す"""
+    ids = []
+    for i, (percentage, confidence, is_reviewed, status) in enumerate(RESULTS):
+        answer = Answer(exam_id=1, question_id=1, candidate_id=f"C{i:03d}", answer_text="要員のスキル不足のため")
+        api_db.add(answer)
+        api_db.flush()
+        superseded = ScoringResult(
+            answer_id=answer.id, status=ScoringStatus.COMPLETED, scoring_method=ScoringMethod.COMPREHENSIVE,
+            percentage=100.0, confidence=1.0
+        )
+        current = ScoringResult(
+            answer_id=answer.id, status=status, scoring_method=ScoringMethod.COMPREHENSIVE,
+            total_score=None if percentage is None else percentage / 4, max_score=25,
+            percentage=percentage, confidence=confidence, is_reviewed=is_reviewed,
+            scoring_details={"method": "test"}, scoring_reasons=["理由"], suggestions=["提案"]
+        )
+        api_db.add_all([superseded, current])
+        api_db.flush()
+        answer.current_result_id = current.id
+        ids.append(current.id)
+    api_db.commit()
+    return ids
+
+
+def _all_pages(client, **params):
+    items, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/scoring/results/1", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return [item["id"] for item in items], pages
+
+
+class TestResultPages:
+    """採点結果一覧のページ分割テスト"""
+
+    def test_keyset_pages_follow_sort_order(self, client, result_ids):
+        """カーソルで全ページをたどると、並べ替え順に重複・欠落なく現在の採点結果だけを返すこと"""
+        ids, pages = _all_pages(client, limit=2)
+        assert ids == result_ids and pages == 3
+
+        ids, _ = _all_pages(client, sort="-id", limit=2)
+        assert ids == result_ids[::-1]
+
+        # 同じ値は並べ替えと同じ向きのID順、値がない結果は最後
+        ids, _ = _all_pages(client, sort="-percentage", limit=2)
+        assert ids == [result_ids[i] for i in (3, 0, 2, 4, 1)]
+        ids, _ = _all_pages(client, sort="confidence", limit=1)
+        assert ids == [result_ids[i] for i in (4, 2, 3, 0, 1)]
+
+    def test_filters(self, client, result_ids):
+        """状態・信頼度の範囲・レビュー済みで絞り込めること"""
+        assert _all_pages(client, status="failed")[0] == [result_ids[1]]
+        assert _all_pages(client, min_confidence=0.5, max_confidence=0.8)[0] == [result_ids[2], result_ids[3]]
+        assert _all_pages(client, is_reviewed=True)[0] == [result_ids[2]]
+        assert _all_pages(client, is_reviewed=False, status="completed", sort="-percentage")[0] == [
+            result_ids[3], result_ids[0], result_ids[4]
+        ]
+        assert _all_pages(client, question_id=2)[0] == []
+
+    def test_invalid_cursor_and_sort(self, client, result_ids):
+        """不正なカーソル・並べ替えの条件と一致しないカーソル・未対応の並べ替えは拒否すること"""
+        cursor = client.get("/api/scoring/results/1", params={"limit": 1}).json()["next_cursor"]
+
+        assert client.get("/api/scoring/results/1", params={"cursor": "不正"}).status_code == 400
+        assert client.get("/api/scoring/results/1", params={"cursor": cursor, "sort": "-id"}).status_code == 400
+        assert client.get("/api/scoring/results/1", params={"sort": "answer_text"}).status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_loads_only_listed_columns(self, api_db, result_ids):
+        """採点詳細・理由・改善提案のJSON列は読み込まないこと"""
+        api_db.expunge_all()
+        results, next_cursor = await ScoringService(api_db).get_scoring_result_page(1, ResultFilters(), limit=10)
+
+        assert [result.id for result in results] == result_ids and next_cursor is None
+        unloaded = inspect(results[0]).unloaded
+        assert {"scoring_details", "scoring_reasons", "suggestions"} <= unloaded
+        assert "percentage" not in unloaded and results[0].grade == "B"
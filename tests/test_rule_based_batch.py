@@ -0,0 +1,55 @@
+"""
+ルールベース一括採点のテスト
+列形式の一括採点結果が1件ずつの採点と完全に一致することを検証
+"""
+import random
+import pytest
+
+from src.ai_engine.scoring.rule_based import RuleBasedScoring
+from src.ai_engine.scoring.terms import TERM_DICTIONARY
+
+KEYWORDS = ["スキル不足", "品質問題", "手戻り", "ため", "リスク"]
+CHARACTERS = sorted({char for terms in TERM_DICTIONARY.values() for term in terms for char in term} | set("".join(KEYWORDS)))
+
+
+def _random_answers(seed: int, count: int):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(CHARACTERS) for _ in range(rng.randint(0, 120))) for _ in range(count)]
+
+
+class TestRuleBasedBatch:
+    """ルールベース一括採点テスト"""
+
+    @pytest.mark.parametrize("question_data", [
+        {"keywords": KEYWORDS, "max_chars": 40, "points": 25},
+        {"keywords": KEYWORDS[:2], "max_chars": 33, "points": 7},
+        {"keywords": [], "max_chars": 100, "points": 100},
+        {"max_chars": 10},
+        {"keywords": KEYWORDS, "max_chars": 0, "points": 25},
+    ])
+    def test_batch_matches_per_answer_scoring(self, question_data):
+        """一括採点の全列・詳細が1件ずつの採点結果と一致すること"""
+        scorer = RuleBasedScoring()
+        answers = _random_answers(seed=len(question_data.get("keywords", [])), count=300) + [""]
+
+        batch = scorer.score_batch(answers, question_data)
+
+        assert len(batch) == len(answers)
+        for index, answer in enumerate(answers):
+            expected = scorer.score(answer, question_data)
+            assert batch.scores[index].item() == expected["score"]
+            assert batch.percentages[index].item() == expected["percentage"]
+            if "length_evaluation" in expected["details"]:
+                assert batch.length_scores[index].item() == expected["details"]["length_evaluation"]["score"]
+                assert batch.structure_scores[index].item() == expected["details"]["structure_evaluation"]["score"]
+            assert batch.result(index) == expected
+
+    def test_columns_are_json_serializable(self):
+        """列形式の結果をJSON化可能なリストで取得できること"""
+        answers = ["スキル不足により品質問題が発生したため。", "未回答"]
+        columns = RuleBasedScoring().score_batch(answers, {"keywords": KEYWORDS, "max_chars": 40, "points": 25}).as_columns()
+
+        assert columns["char_count"] == [len(answer) for answer in answers]
+        assert columns["match_ratio"] == [0.6, 0.0]
+        assert columns["has_causal_expressions"] == [True, False]
+        assert all(isinstance(value, float) for value in columns["score"])
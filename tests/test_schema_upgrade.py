@@ -0,0 +1,119 @@
+"""
+既存データベースのスキーマ更新のテスト
+後から追加した列・索引がないテーブルに、起動時の更新で列・索引を追加することを検証
+"""
+import pytest
+from sqlalchemy import MetaData, Table, create_engine, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.api.database import Base
+from src.api.models import Answer, ExamSeason, ScoringMethod, ScoringResult, ScoringStatus
+from src.api.services.question_cache import question_limits
+from src.api.services.scoring_service import ScoringService
+from src.api.utils.schema_upgrade import ADDED_COLUMNS, upgrade_schema
+
+
+@pytest.fixture
+def old_engine():
+    """後から追加した列・複合索引・一意制約がない（追加前の）テーブルを作成したデータベース"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    old = MetaData()
+    for table in Base.metadata.sorted_tables:
+        Table(table.name, old, *[
+            column._copy() for column in table.columns if (table.name, column.name) not in ADDED_COLUMNS
+        ])
+    old.create_all(bind=engine)
+    engine.old_tables = old.tables
+    yield engine
+    engine.dispose()
+
+
+def _insert_exam(conn, tables):
+    conn.execute(tables["exams"].insert(), {"id": 1, "year": 2024, "season": ExamSeason.AUTUMN, "title": "試験"})
+    conn.execute(tables["questions"].insert(), {
+        "id": 1, "exam_id": 1, "title": "設問", "question_number": "設問1", "background_text": "",
+        "question_text": "理由を述べよ。", "model_answer": "スキル不足", "max_chars": 40, "points": 25
+    })
+
+
+class TestSchemaUpgrade:
+    """スキーマ更新テスト"""
+
+    def test_adds_missing_columns_and_indexes(self, old_engine):
+        """不足している列・索引を追加し、2回目以降は何もしないこと"""
+        assert "fingerprint" not in {column["name"] for column in inspect(old_engine).get_columns("scoring_results")}
+
+        added = upgrade_schema(old_engine)
+
+        inspector = inspect(old_engine)
+        assert set(added) == {f"{table}.{column}" for table, column in ADDED_COLUMNS}
+        assert {"fingerprint", "question_version"} <= {
+            column["name"] for column in inspector.get_columns("scoring_results")
+        }
+        assert {"ix_scoring_results_fingerprint", "ix_scoring_results_percentage_id"} <= {
+            index["name"] for index in inspector.get_indexes("scoring_results")
+        }
+        assert upgrade_schema(old_engine) == []
+
+    def test_backfills_current_results(self, old_engine):
+        """現在の採点結果の列を追加した場合、既存の解答に最新の採点完了済みの結果を設定すること"""
+        tables = old_engine.old_tables
+        with old_engine.begin() as conn:
+            _insert_exam(conn, tables)
+            conn.execute(tables["answers"].insert(), [
+                {"id": answer_id, "exam_id": 1, "question_id": 1, "candidate_id": f"C{answer_id}", "answer_text": "解答"}
+                for answer_id in (1, 2)
+            ])
+            conn.execute(tables["scoring_results"].insert(), [
+                {"id": 1, "answer_id": 1, "status": ScoringStatus.COMPLETED, "scoring_method": ScoringMethod.COMPREHENSIVE},
+                {"id": 2, "answer_id": 1, "status": ScoringStatus.COMPLETED, "scoring_method": ScoringMethod.COMPREHENSIVE},
+                {"id": 3, "answer_id": 1, "status": ScoringStatus.FAILED, "scoring_method": ScoringMethod.COMPREHENSIVE},
+            ])
+
+        assert "answers.current_result_id" in upgrade_schema(old_engine)
+
+        with old_engine.connect() as conn:
+            current = dict(conn.execute(text("SELECT id, current_result_id FROM answers")).all())
+        assert current == {1: 2, 2: None}
+        assert "ix_answers_exam_current_result" in {index["name"] for index in inspect(old_engine).get_indexes("answers")}
+
+    @pytest.mark.asyncio
+    async def test_merges_duplicate_answers_and_submits(self, old_engine):
+        """重複する解答を最新の解答にまとめて一意索引を作成し、更新後のデータベースに解答を提出できること"""
+        tables = old_engine.old_tables
+        with old_engine.begin() as conn:
+            _insert_exam(conn, tables)
+            conn.execute(tables["answers"].insert(), [
+                {"id": 1, "exam_id": 1, "question_id": 1, "candidate_id": "C001", "answer_text": "古い解答"},
+                {"id": 2, "exam_id": 1, "question_id": 1, "candidate_id": "C001", "answer_text": "新しい解答"},
+            ])
+            conn.execute(tables["scoring_results"].insert(), [
+                {"id": 1, "answer_id": 1, "status": ScoringStatus.COMPLETED, "scoring_method": ScoringMethod.COMPREHENSIVE},
+            ])
+
+        upgrade_schema(old_engine)
+        question_limits.invalidate()
+
+        with Session(old_engine) as session:
+            assert [(a.id, a.answer_text) for a in session.query(Answer)] == [(2, "新しい解答")]
+            assert session.get(ScoringResult, 1).answer_id == 2
+
+            answer = await ScoringService(session).submit_answer(1, 1, "C001", "要員のスキル不足のため")
+            other = await ScoringService(session).submit_answer(1, 1, "C002", "品質問題のため")
+
+            assert answer.id == 2 and other.id != 2
+            assert session.query(Answer).count() == 2
+        question_limits.invalidate()
+
+    def test_current_schema_is_unchanged(self):
+        """create_all で作成した最新のテーブルには何も追加しないこと"""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            before = conn.execute(text("SELECT sql FROM sqlite_master ORDER BY name")).all()
+
+        assert upgrade_schema(engine) == []
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT sql FROM sqlite_master ORDER BY name")).all() == before
+        engine.dispose()
@@ -0,0 +1,112 @@
+"""
+採点の指紋によるべき等性のテスト
+内容が変わらない再提出での採点結果の再利用、採点エンジンの版の変更、問題の更新による無効化を検証
+"""
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.api.models import Question, ScoringResult, ScoringStatus
+from src.api.routers.admin import QuestionUpdate, update_question
+from src.api.services.fingerprint import normalize_answer_text, scoring_fingerprint
+from src.api.services.scoring_service import ScoringService
+
+ENGINE_RESULT = {"total_score": 20, "max_score": 25, "percentage": 80.0}
+
+
+async def _submit_and_score(service, candidate_id: str, answer_text: str, question_id: int = 1):
+    answer = await service.submit_answer(1, question_id, candidate_id, answer_text)
+    return await service.evaluate_answer(answer.id)
+
+
+class TestScoringFingerprint:
+    """採点の指紋テスト"""
+
+    def test_fingerprint_normalization(self):
+        """空白・全角半角の違いは同じ指紋、解答文・問題・採点エンジンの版の違いは別の指紋になること"""
+        assert normalize_answer_text("  要員の　スキル不足\n のため ") == "要員の スキル不足 のため"
+        base = scoring_fingerprint("要員のスキル不足（ＰＭ）", "q1")
+        assert scoring_fingerprint(" 要員のスキル不足(PM) ", "q1") == base
+        assert scoring_fingerprint("要員のスキル不足", "q1") != base
+        assert scoring_fingerprint("要員のスキル不足（ＰＭ）", "q2") != base
+        assert scoring_fingerprint("要員のスキル不足（ＰＭ）", "q1", "gpt-4/2") != base
+
+    @pytest.mark.asyncio
+    async def test_unchanged_resubmission_reuses_result(self, api_db):
+        """内容が変わらない再提出は採点結果を再利用し、解答文の変更時のみ再採点すること"""
+        service = ScoringService(api_db)
+        post = AsyncMock(return_value=ENGINE_RESULT)
+
+        with patch.object(ScoringService, "_post_to_ai_engine", post):
+            first = await _submit_and_score(service, "C001", "要員のスキル不足のため")
+            first_id = first.id
+            reused = await _submit_and_score(ScoringService(api_db), "C001", "　要員のスキル不足のため\n")
+            assert post.await_count == 1
+            assert reused.id == first_id
+
+            changed = await _submit_and_score(ScoringService(api_db), "C001", "品質問題が見過ごされたため")
+            assert post.await_count == 2
+            assert changed.id != first_id
+
+            # 元の解答文に戻した場合は無効化されていた結果を再利用する
+            restored = await _submit_and_score(ScoringService(api_db), "C001", "要員のスキル不足のため")
+            assert post.await_count == 2
+            assert restored.id == first_id
+
+        statuses = {result.id: result.status for result in api_db.query(ScoringResult)}
+        assert statuses == {first_id: ScoringStatus.COMPLETED, changed.id: ScoringStatus.PENDING}
+
+    @pytest.mark.asyncio
+    async def test_engine_version_change_rescores(self, api_db):
+        """採点エンジンの版が変わった場合は再採点すること"""
+        post = AsyncMock(return_value=ENGINE_RESULT)
+        with patch.object(ScoringService, "_post_to_ai_engine", post):
+            first = await _submit_and_score(ScoringService(api_db), "C001", "要員のスキル不足のため")
+            first_id = first.id
+            with patch("src.api.services.fingerprint.settings.SCORING_ENGINE_VERSION", "2"):
+                second = await ScoringService(api_db).evaluate_answer(first.answer_id)
+
+        assert post.await_count == 2
+        assert second.id != first_id
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("local_fallback", [True, False])
+    async def test_fallback_result_is_rescored_after_recovery(self, api_db, local_fallback):
+        """AI Engine障害時のフォールバック採点の結果は、復旧後の採点で再利用せず再採点すること"""
+        down = AsyncMock(side_effect=httpx.ConnectError("接続できません"))
+        with patch("src.api.services.scoring_service.settings.LOCAL_SCORING_FALLBACK", local_fallback), \
+                patch.object(ScoringService, "_post_to_ai_engine", down):
+            fallback = await _submit_and_score(ScoringService(api_db), "C001", "要員のスキル不足のため")
+        fallback_id, answer_id = fallback.id, fallback.answer_id
+        assert fallback.status == ScoringStatus.COMPLETED and fallback.total_score != 20
+
+        up = AsyncMock(return_value=ENGINE_RESULT)
+        with patch.object(ScoringService, "_post_to_ai_engine", up):
+            rescored = await ScoringService(api_db).evaluate_answer(answer_id)
+            reused = await ScoringService(api_db).evaluate_answer(answer_id)
+
+        assert up.await_count == 1
+        assert rescored.id != fallback_id and rescored.total_score == 20
+        assert reused.id == rescored.id
+
+    @pytest.mark.asyncio
+    async def test_question_edit_invalidates_only_its_results(self, api_db):
+        """問題の採点に使う内容の変更はその問題の採点結果だけを無効化し、それ以外の変更では無効化しないこと"""
+        api_db.add(Question(
+            exam_id=1, title="品質管理", question_number="設問2", background_text="",
+            question_text="対策を述べよ。", model_answer="レビューを実施する", max_chars=40, points=25
+        ))
+        api_db.commit()
+
+        with patch.object(ScoringService, "_post_to_ai_engine", AsyncMock(return_value=ENGINE_RESULT)):
+            edited = [(await _submit_and_score(ScoringService(api_db), f"C{i}", "要員のスキル不足のため")).id for i in range(3)]
+            other = (await _submit_and_score(ScoringService(api_db), "C9", "レビューを実施する", question_id=2)).id
+
+        update_question(1, QuestionUpdate(title="リスク管理（改）", background_text="背景"), db=api_db)
+        assert api_db.query(ScoringResult).filter(ScoringResult.status == ScoringStatus.PENDING).count() == 0
+
+        update_question(1, QuestionUpdate(model_answer="要員のスキル不足と教育計画の欠如"), db=api_db)
+        statuses = {result.id: result.status for result in api_db.query(ScoringResult)}
+        assert [statuses[result_id] for result_id in edited] == [ScoringStatus.PENDING] * 3
+        assert statuses[other] == ScoringStatus.COMPLETED
@@ -0,0 +1,86 @@
+"""
+問題ごとの採点計画（ScoringPlan）のテスト
+問題内容のハッシュによるキャッシュ、類義語の展開、採点基準による重みの変更を検証
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.ai_engine.scoring.integrator import ScoringIntegrator
+from src.ai_engine.scoring.plan import DEFAULT_WEIGHTS, _ScoringPlanCache, get_plan
+from src.ai_engine.scoring.rule_based import RuleBasedScoring
+
+QUESTION_DATA = {
+    "question_id": 1,
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされたため。",
+    "keywords": ["スキル不足", "品質問題", "手戻り"],
+    "max_chars": 40,
+    "points": 25,
+    "grading_criteria": {"synonyms": {"スキル不足": ["技術力不足", "経験不足"]}}
+}
+
+ANSWERS = [
+    "メンバーの技術力不足により、品質問題が見過ごされたため。",
+    "要員のスキル不足と経験不足で手戻りが発生した。",
+    "天候不良により出荷が遅れた。"
+]
+
+
+class TestScoringPlan:
+    """採点計画テスト"""
+
+    def test_plan_is_cached_by_content(self):
+        """同じ内容の問題データは同じ計画を返し、内容が変われば作り直すこと"""
+        cache = _ScoringPlanCache(max_size=2)
+        plan = cache.get(QUESTION_DATA)
+
+        assert cache.get(dict(QUESTION_DATA)) is plan
+        assert cache.get({**QUESTION_DATA, "question_id": 2}) is plan
+        assert cache.get({**QUESTION_DATA, "keywords": ["手戻り"]}) is not plan
+
+        cache.get({**QUESTION_DATA, "points": 10})
+        assert cache.get(QUESTION_DATA) is not plan
+
+    def test_plan_shared_between_threads(self):
+        """複数のワーカースレッドから同時に取得しても、同じ内容の問題には同じ計画を返すこと"""
+        cache = _ScoringPlanCache(max_size=4)
+        questions = [{**QUESTION_DATA, "points": 10 + index % 8} for index in range(200)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            plans = list(executor.map(cache.get, questions))
+
+        assert len(cache._plans) <= 4
+        assert all(plan.fingerprint == cache.get(question).fingerprint for plan, question in zip(plans, questions))
+
+    def test_synonyms_match_keywords(self):
+        """類義語が出現した解答はキーワードに一致し、一括採点とも一致すること"""
+        scorer = RuleBasedScoring()
+        plan = get_plan(QUESTION_DATA)
+
+        result = scorer.score(ANSWERS[0], QUESTION_DATA, plan=plan)
+        batch = scorer.score_batch(ANSWERS, QUESTION_DATA, plan=plan)
+
+        keyword_details = result["details"]["keyword_evaluation"]
+        assert keyword_details["matched"] == ["スキル不足", "品質問題"]
+        assert keyword_details["offsets"]["スキル不足"] == [ANSWERS[0].index("技術力不足")]
+        assert scorer.score(ANSWERS[1], QUESTION_DATA)["details"]["keyword_evaluation"]["offsets"]["スキル不足"] == [
+            ANSWERS[1].index("スキル不足"), ANSWERS[1].index("経験不足")
+        ]
+        assert batch.scores.tolist() == [scorer.score(answer, QUESTION_DATA)["score"] for answer in ANSWERS]
+
+    @pytest.mark.asyncio
+    async def test_weights_from_grading_criteria(self):
+        """採点基準の重みで統合スコアを求め、不正な重みは無視すること"""
+        question_data = {
+            **QUESTION_DATA,
+            "grading_criteria": {"weights": {"rule_based": 2, "semantic": 1, "comprehensive": 1, "unknown": 1}}
+        }
+
+        result = await ScoringIntegrator().score(ANSWERS[0], question_data)
+
+        weights = result["details"]["integration"]["weights"]
+        assert weights == {"rule_based": 0.5, "semantic": 0.25, "comprehensive": 0.25}
+        assert result["total_score"] == pytest.approx(
+            result["rule_based_score"] * 0.5 + result["semantic_score"] * 0.25 + result["comprehensive_score"] * 0.25
+        )
+        assert get_plan({**QUESTION_DATA, "grading_criteria": {"weights": "invalid"}}).weights == DEFAULT_WEIGHTS
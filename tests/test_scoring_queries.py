@@ -0,0 +1,104 @@
+"""
+採点処理のクエリ数のテスト
+解答・問題・採点済み結果をまとめて読み込み、解答数によらない一定のクエリ数で採点することを検証
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event
+
+from src.api.models import Answer, Question
+from src.api.services.scoring_service import ScoringService
+
+
+def _add_answers(db, count: int, prefix: str):
+    """2つの問題に交互に解答を登録してIDを返す"""
+    answers = [
+        Answer(exam_id=1, question_id=1 + i % 2, candidate_id=f"{prefix}{i:03d}", answer_text=f"解答{i}")
+        for i in range(count)
+    ]
+    db.add_all(answers)
+    db.commit()
+    ids = [answer.id for answer in answers]
+    db.expire_all()
+    return ids
+
+
+def _engine_response(path, payload, timeout):
+    """AI Engineの一括採点・単一採点の応答"""
+    result = {"total_score": 10, "max_score": 20, "model_name": "test-model"}
+    if path == "/score/batch":
+        return {"results": [{"index": i, "result": result} for i in range(len(payload["items"]))]}
+    return result
+
+
+@pytest.fixture
+def db(api_db):
+    api_db.add(Question(
+        exam_id=1, title="リスク対策", question_number="設問2", background_text="",
+        question_text="対策を述べよ。", model_answer="研修を実施する", max_chars=30, points=20
+    ))
+    api_db.commit()
+    return api_db
+
+
+def _record_selects(db):
+    """実行したSELECT文を記録するリストと、記録を止める関数"""
+    selects = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    return selects, lambda: event.remove(db.get_bind(), "before_cursor_execute", record)
+
+
+class TestScoringQueries:
+    """採点処理のクエリ数テスト"""
+
+    @pytest.mark.asyncio
+    async def test_batch_query_count_is_constant(self, db):
+        """一括採点のSELECT数は解答数によらず一定で、問題の送信内容は問題ごとに共有すること"""
+        counts = []
+        for count, prefix in ((2, "A"), (8, "B")):
+            answer_ids = _add_answers(db, count, prefix)
+            service = ScoringService(db)
+            post = AsyncMock(side_effect=_engine_response)
+
+            selects, stop = _record_selects(db)
+            try:
+                with patch.object(service, "_post_to_ai_engine", post):
+                    results = await service.evaluate_answers(answer_ids)
+                # 呼び出し側での結果の参照で再読み込みしないこと
+                scores = [results[answer_id].total_score for answer_id in answer_ids]
+            finally:
+                stop()
+
+            assert scores == [10] * count
+            items = post.await_args.args[1]["items"]
+            assert len({id(item["question_data"]) for item in items}) == 2
+            counts.append(len(selects))
+
+        # 解答・問題（初回のみ。以降は問題のキャッシュから取得）・採点済み結果・採点結果の読み直し（2回）
+        assert counts == [5, 4]
+
+    @pytest.mark.asyncio
+    async def test_single_evaluation_does_not_lazy_load(self, db):
+        """単一採点は問題をキャッシュから取得し、同じ問題の解答の採点では問題を読み込まないこと"""
+        answer_ids = _add_answers(db, 3, "C")
+        question_selects = []
+        for answer_id in (answer_ids[0], answer_ids[2]):  # 同じ問題の解答
+            service = ScoringService(db)
+            selects, stop = _record_selects(db)
+            try:
+                with patch.object(service, "_post_to_ai_engine", AsyncMock(side_effect=_engine_response)):
+                    result = await service.evaluate_answer(answer_id)
+            finally:
+                stop()
+
+            assert result.total_score == 10
+            assert len(selects) <= 5
+            question_selects.append(sum("FROM questions" in statement for statement in selects))
+
+        assert question_selects == [1, 0]
@@ -0,0 +1,81 @@
+"""
+意味理解採点（文字n-gram TF-IDF）のテスト
+決定的な採点結果、問題ごとのモデルキャッシュ、一括採点との一致を検証
+"""
+import pytest
+
+from src.ai_engine.scoring.semantic import SemanticScoring
+from src.ai_engine.scoring.semantic_model import get_semantic_model, semantic_models
+
+QUESTION_DATA = {
+    "question_text": "プロジェクトでリスクが顕在化した理由を40字以内で述べよ。",
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされ、後工程で手戻りが発生したため。",
+    "grading_intention": "要員のスキル不足が品質問題と手戻りにつながったことを理解しているかを問う。",
+    "keywords": ["スキル不足", "品質問題", "手戻り"],
+    "max_chars": 40,
+    "points": 25
+}
+
+ANSWERS = [
+    "要員のスキル不足で設計の品質問題を見逃し、後工程で手戻りが発生したため。",
+    "スキル不足により品質問題が生じたため。",
+    "天候不良により出荷が遅れた。",
+    ""
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_models():
+    semantic_models.clear()
+    yield
+    semantic_models.clear()
+
+
+class TestSemanticScoring:
+    """意味理解採点テスト"""
+
+    def test_scores_are_deterministic_and_ranked(self):
+        """同じ解答は常に同じスコアとなり、模範解答に近い解答ほど高得点となること"""
+        scorer = SemanticScoring()
+        results = [scorer.score(answer, QUESTION_DATA) for answer in ANSWERS]
+
+        assert [scorer.score(answer, QUESTION_DATA)["score"] for answer in ANSWERS] == [r["score"] for r in results]
+        assert results[0]["score"] > results[1]["score"] > results[2]["score"]
+        assert results[0]["details"]["method"] == "char_ngram_tfidf"
+        assert results[3]["details"]["lexical_similarity"] == 0.0
+
+    def test_model_is_cached_per_question(self):
+        """TF-IDFモデルは問題ごとに1回だけ学習されること"""
+        model = get_semantic_model(QUESTION_DATA)
+
+        assert get_semantic_model(dict(QUESTION_DATA)) is model
+        assert get_semantic_model({**QUESTION_DATA, "model_answer": "別の模範解答"}) is not model
+
+    def test_batch_matches_per_answer_scoring(self):
+        """一括採点（疎行列積）の結果が1件ずつの採点と一致すること"""
+        scorer = SemanticScoring()
+        batch = scorer.score_batch(ANSWERS, QUESTION_DATA, fit_corpus=False)
+
+        for index, answer in enumerate(ANSWERS):
+            expected = scorer.score(answer, QUESTION_DATA)
+            assert batch["scores"][index] == pytest.approx(expected["score"], rel=1e-12)
+            assert batch["logical_consistency"][index] == expected["details"]["logical_consistency"]
+
+    def test_corpus_fit_does_not_change_cached_model(self):
+        """解答群を含めた一括採点の後も、1件ずつの採点は参照文のみのモデルで同じ結果となること"""
+        scorer = SemanticScoring()
+        before = scorer.score(ANSWERS[1], QUESTION_DATA)["score"]
+
+        scorer.score_batch(ANSWERS, QUESTION_DATA)
+        scorer.score_batch(ANSWERS[:2], QUESTION_DATA)
+
+        assert get_semantic_model(QUESTION_DATA).corpus_size == 0
+        assert scorer.score(ANSWERS[1], QUESTION_DATA)["score"] == before
+
+    def test_missing_reference_texts(self):
+        """模範解答・出題趣旨・問題文がない場合も採点できること"""
+        result = SemanticScoring().score("スキル不足のため。", {"points": 10})
+
+        assert result["details"]["lexical_similarity"] == 0.0
+        assert result["details"]["semantic_validity"] == 0.0
+        assert result["score"] == pytest.approx(result["details"]["logical_consistency"] * 0.2 * 10)
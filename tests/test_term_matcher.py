@@ -0,0 +1,95 @@
+"""
+用語照合オートマトンのテスト
+Aho–Corasick照合の出現位置と、各採点クラスでの照合結果の共有を検証
+"""
+import pytest
+from unittest.mock import patch
+
+from src.ai_engine.scoring import matcher as matcher_module
+from src.ai_engine.scoring.analysis import analyze_answer
+from src.ai_engine.scoring.matcher import TermMatcher, get_matcher
+from src.ai_engine.scoring.rule_based import RuleBasedScoring
+from src.ai_engine.scoring.semantic import SemanticScoring
+from src.ai_engine.scoring.comprehensive import ComprehensiveScoring
+from src.ai_engine.scoring.integrator import ScoringIntegrator
+from src.ai_engine.scoring.plan import ScoringPlan
+
+QUESTION_DATA = {
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされたため。",
+    "keywords": ["スキル不足", "品質問題", "手戻り"],
+    "max_chars": 40,
+    "points": 25
+}
+
+ANSWER = "メンバーのスキル不足により品質問題が発生し、そのため手戻りが生じた。"
+
+BACKENDS = [False, True] if matcher_module.AHOCORASICK_AVAILABLE else [False]
+
+
+def _naive_offsets(text, term):
+    return [i for i in range(len(text)) if text.startswith(term, i)]
+
+
+class TestTermMatcher:
+    """用語照合テスト"""
+
+    @pytest.mark.parametrize("native", BACKENDS)
+    def test_offsets_match_naive_search(self, native):
+        """重なり合う語句も含め、全出現位置を取得できること"""
+        dictionary = {"causal": ("ため", "そのため", "ので", "なので"), "keyword": ("品質", "品質問題")}
+        term_matcher = TermMatcher(dictionary, native=native)
+        text = "品質問題なので、そのため品質を見直すため。"
+
+        result = term_matcher.match(text)
+
+        for terms in dictionary.values():
+            for term in terms:
+                assert result.contains(term) == (term in text)
+                assert result.offsets(term) == _naive_offsets(text, term)
+        assert result.matched("causal") == ["ため", "そのため", "ので", "なので"]
+        assert result.hits("keyword")[0] == ("品質問題", 0, 4)
+
+    def test_matcher_is_cached_per_keyword_set(self):
+        """同じキーワード集合ではオートマトンを再構築しないこと"""
+        assert get_matcher(["a", "b"]) is get_matcher(("a", "b"))
+        assert get_matcher(["a", "b"]) is not get_matcher(["b", "a"])
+
+    def test_keyword_evaluation_reports_offsets(self):
+        """キーワード評価に出現位置が含まれること"""
+        result = RuleBasedScoring().score(ANSWER, QUESTION_DATA)
+        keyword_details = result["details"]["keyword_evaluation"]
+
+        assert keyword_details["matched"] == ["スキル不足", "品質問題", "手戻り"]
+        assert keyword_details["offsets"]["品質問題"] == [ANSWER.index("品質問題")]
+        assert result["details"]["structure_evaluation"]["has_causal_expressions"] is True
+
+    @pytest.mark.asyncio
+    async def test_integrator_matches_answer_once(self):
+        """統合採点では解答の解析・照合が1回だけ行われ、各採点で共有されること"""
+        integrator = ScoringIntegrator()
+        expected = {
+            "rule": RuleBasedScoring().score(ANSWER, QUESTION_DATA),
+            "comprehensive": ComprehensiveScoring().score(ANSWER, QUESTION_DATA)
+        }
+
+        with patch("src.ai_engine.scoring.integrator.analyze_answer", wraps=analyze_answer) as mock_match, \
+                patch.object(ScoringPlan, "analyze") as scorer_match:
+            result = await integrator.score(ANSWER, QUESTION_DATA)
+
+        assert mock_match.call_count == 1
+        # 各採点クラスは統合採点で解析した結果を使い、解析し直さない
+        scorer_match.assert_not_called()
+        assert result["rule_based_score"] == expected["rule"]["score"]
+        assert result["comprehensive_score"] == expected["comprehensive"]["score"]
+        assert SemanticScoring()._evaluate_logical_consistency(analyze_answer(ANSWER, QUESTION_DATA).matches) == 0.7
+
+    @pytest.mark.parametrize("native", BACKENDS)
+    def test_scan_many_does_not_match_across_answers(self, native):
+        """連結走査で解答をまたいだ出現を検出しないこと"""
+        term_matcher = TermMatcher({"causal": ("ため", "ので")}, native=native)
+        texts = ["遅れた", "めので", "", "そのため"]
+
+        starts, hits = term_matcher.scan_many(texts)
+
+        assert starts == [0, 4, 8, 9]
+        assert [(end, term_matcher.terms[term_id]) for end, term_id in hits] == [(6, "ので"), (12, "ため")]
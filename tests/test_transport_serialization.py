@@ -0,0 +1,113 @@
+"""
+API ↔ AI Engine間の通信形式テスト
+orjson / msgpack のネゴシエーションと zstd・gzip 圧縮を検証
+"""
+import gzip
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from src.ai_engine import main as engine_main
+from src.ai_engine.utils import serialization as engine_serialization
+from src.api.utils import serialization as api_serialization
+
+QUESTION_DATA = {
+    "question_text": "プロジェクトでリスクが顕在化した理由を40字以内で述べよ。",
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされたため。",
+    "keywords": ["スキル不足", "品質問題"],
+    "max_chars": 40,
+    "points": 25
+}
+
+
+def _scoring_response(answer_text, question_data):
+    return engine_main.ScoringResponse(
+        total_score=20.0,
+        max_score=25,
+        percentage=80.0,
+        confidence=0.8,
+        rule_based_score=None,
+        semantic_score=None,
+        comprehensive_score=20.0,
+        details={"method": "llm_scoring", "reasoning": "設計段階の品質問題に言及している。" * 50},
+        reasons=[answer_text],
+        suggestions=[],
+        model_name="test-model",
+        temperature=0.1,
+        tokens_used=0,
+        processing_time_ms=1
+    )
+
+
+@pytest.fixture
+def engine_client():
+    with patch.object(engine_main.llm_manager, "is_available", return_value=True), \
+            patch.object(engine_main, "_score_with_llm", AsyncMock(side_effect=_scoring_response)):
+        yield TestClient(engine_main.app)
+
+
+class TestTransportSerialization:
+    """通信形式テスト"""
+
+    def test_plain_json_is_still_supported(self, engine_client):
+        """従来どおりのJSONリクエスト・レスポンスが使えること"""
+        response = engine_client.post(
+            "/score",
+            json={"answer_text": "スキル不足のため", "question_data": QUESTION_DATA},
+            headers={"Accept-Encoding": "identity"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        assert response.json()["reasons"] == ["スキル不足のため"]
+
+    def test_msgpack_and_zstd_round_trip(self, engine_client):
+        """msgpack＋zstd圧縮の一括採点リクエストを受け付け、同形式で応答すること"""
+        if not (api_serialization.MSGPACK_AVAILABLE and api_serialization.ZSTD_AVAILABLE):
+            pytest.skip("msgpack / zstandard が未インストール")
+
+        payload = {"items": [{"answer_text": f"解答{i}", "question_data": QUESTION_DATA} for i in range(30)]}
+        body, headers = api_serialization.encode_request(payload, compress_min_size=1024)
+        assert headers["Content-Encoding"] == "zstd"
+        headers.update(api_serialization.accept_headers())
+
+        response = engine_client.post("/score/batch", content=body, headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == api_serialization.MSGPACK_MEDIA_TYPE
+        assert response.headers["content-encoding"] == "zstd"
+
+        data = api_serialization.decode_response(
+            response.content, response.headers["content-type"], response.headers["content-encoding"]
+        )
+        assert [item["index"] for item in data["results"]] == list(range(30))
+        assert data["results"][3]["result"]["reasons"] == ["解答3"]
+
+    def test_batch_item_failure_is_isolated(self, engine_client):
+        """一括採点で一部が失敗しても他の結果は返ること"""
+        def flaky(answer_text, question_data):
+            if answer_text == "失敗":
+                raise RuntimeError("LLM error")
+            return _scoring_response(answer_text, question_data)
+
+        with patch.object(engine_main, "_score_with_llm", AsyncMock(side_effect=flaky)):
+            response = engine_client.post("/score/batch", json={"items": [
+                {"answer_text": "成功", "question_data": QUESTION_DATA},
+                {"answer_text": "失敗", "question_data": QUESTION_DATA}
+            ]})
+
+        results = response.json()["results"]
+        assert results[0]["result"]["reasons"] == ["成功"]
+        assert results[1]["result"] is None
+        assert "LLM error" in results[1]["error"]
+
+    def test_small_bodies_are_not_compressed(self):
+        """小さい本文は圧縮しないこと"""
+        body, encoding = engine_serialization.compress(b"{}", "zstd, gzip")
+        assert (body, encoding) == (b"{}", None)
+
+        large = b"x" * 4096
+        body, encoding = engine_serialization.compress(large, "gzip")
+        assert encoding == "gzip"
+        assert engine_serialization.decompress(body, "gzip") == large
+        assert gzip.decompress(body) == large
@@ -0,0 +1,78 @@
+"""
+採点前トリアージのテスト
+白紙・短すぎる解答・字数超過・模範解答の丸写しをLLMを使わずに採点し、問題別に計数することを検証
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.ai_engine import main as engine_main
+from src.ai_engine.scoring.triage import TriageRules
+from src.ai_engine.utils import metrics
+
+QUESTION_DATA = {
+    "question_id": 7,
+    "question_text": "プロジェクトでリスクが顕在化した理由を40字以内で述べよ。",
+    "model_answer": "要員のスキル不足により、設計段階での品質問題が見過ごされたため。",
+    "max_chars": 40,
+    "points": 25
+}
+
+
+class TestTriageRules:
+    """トリアージルールテスト"""
+
+    @pytest.mark.parametrize("answer, rule, score", [
+        ("   ", "blank", 0.0),
+        ("あ。", "too_short", 0.0),
+        ("スキル不足" * 20, "over_length", 0.0),
+        ("要員のスキル不足により 設計段階での品質問題が見過ごされたため", "model_answer_copy", 25.0),
+        ("スキル不足のため。", None, None),
+    ])
+    def test_rules(self, answer, rule, score):
+        """各ルールの理由コードと得点"""
+        decision = TriageRules().evaluate(answer, QUESTION_DATA)
+
+        if rule is None:
+            assert decision is None
+        else:
+            assert (decision.rule, decision.score, decision.max_score) == (rule, score, 25)
+            assert 0 < decision.confidence <= 1
+
+    def test_rules_are_configurable(self):
+        """無効にしたルールは適用せず、未対応のルール名は拒否すること"""
+        rules = TriageRules(enabled_rules=["blank"], over_length_ratio=1.0)
+
+        assert rules.evaluate("あ", QUESTION_DATA) is None
+        assert TriageRules(over_length_ratio=1.0).evaluate("あ" * 41, QUESTION_DATA).rule == "over_length"
+        with pytest.raises(ValueError):
+            TriageRules(enabled_rules=["unknown"])
+
+
+class TestTriageEndpoint:
+    """トリアージの採点エンドポイントへの組み込みテスト"""
+
+    def test_triaged_answers_skip_llm(self):
+        """トリアージで確定した解答はLLMを呼ばず、問題別に判定件数を記録すること"""
+        score_mock = AsyncMock(side_effect=RuntimeError("LLMは呼ばれない"))
+        before = metrics.TRIAGE_DECISIONS.get(question_id="7", rule="blank")
+
+        with patch.object(engine_main.llm_manager, "is_available", return_value=False), \
+                patch.object(engine_main, "_score_with_llm", score_mock):
+            client = TestClient(engine_main.app)
+            single = client.post("/score", json={"answer_text": "", "question_data": QUESTION_DATA})
+            batch = client.post("/score/batch", json={"items": [
+                {"answer_text": "", "question_data": QUESTION_DATA},
+                {"answer_text": QUESTION_DATA["model_answer"], "question_data": QUESTION_DATA}
+            ]})
+
+        assert single.status_code == 200
+        details = single.json()["details"]
+        assert (details["method"], details["triage_rule"]) == ("triage", "blank")
+        assert [(stage["stage"], stage["status"]) for stage in details["pipeline"]["stages"]] == [("triage", "final")]
+        results = batch.json()["results"]
+        assert [item["result"]["details"]["triage_rule"] for item in results] == ["blank", "model_answer_copy"]
+        assert results[1]["result"]["total_score"] == 25
+        score_mock.assert_not_awaited()
+        assert metrics.TRIAGE_DECISIONS.get(question_id="7", rule="blank") == before + 2